@@ -1,4 +1,17 @@
-from .api_Operation import PDFQA
-from .api_load import load_api
+import importlib
 
-__all__ = ['PDFQA', 'load_api'] 
\ No newline at end of file
+# Os símbolos abaixo são resolvidos sob demanda: importar o pacote AI (por
+# exemplo, para obter o cliente lazy em AI.client) não deve carregar o SDK do Gemini.
+_LAZY_EXPORTS = {
+    'PDFQA': 'api_Operation',
+    'load_api': 'api_load',
+}
+
+__all__ = ['PDFQA', 'load_api']
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(f"{__name__}.{_LAZY_EXPORTS[name]}")
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
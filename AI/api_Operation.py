@@ -1,168 +1,401 @@
-import google.generativeai as genai
-from AI.api_load import load_api
-from AI.api_key_manager import get_api_key_manager
+from AI.api_key_manager import get_api_key_manager, is_key_error
+from AI.gemini_backend import get_gemini_backend
+from AI.extraction_cache import get_extraction_cache, extraction_key
+from AI.file_handles import get_file_handle_cache
+from AI.model_routing import get_model_router, count_pages
+from AI.json_repair import extract_with_repair, InvalidExtractionError, REPAIR_TRAILING_COMMAS
 import time
+import hashlib
 import streamlit as st
 import logging
 
 logger = logging.getLogger('api_operation')
 
+
+class _SilentUI:
+    """Substitui o `st` no PDFQA com `show_messages = False` (extrações e perguntas): toda chamada é ignorada."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_SILENT_UI = _SilentUI()
+
 class PDFQA:
-    def __init__(self):
-        load_api()  # Carrega a API
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
-        self.key_manager = get_api_key_manager()
+    def __init__(self, backend=None, key_manager=None, router=None, extraction_cache=None):
+        """
+        Sem argumentos usa os componentes globais; o benchmark (AI.benchmark) injeta um
+        backend falso, gerenciador de chaves, roteador e cache isolados.
+        """
+        self.backend = backend or get_gemini_backend()
+        self.key_manager = key_manager or get_api_key_manager()
+        self.router = router or get_model_router()
+        self.extraction_cache = extraction_cache or get_extraction_cache()
+        self.use_local_extraction = True
+        # False silencia os avisos das extrações e perguntas (o benchmark roda o fluxo real sem poluir a página)
+        self.show_messages = True
+        self.model_name = 'gemini-2.5-pro'
+        self._models = {}
+
+    @property
+    def ui(self):
+        return st if self.show_messages else _SILENT_UI
+
+    def _reserve_key(self, failed_keys=()):
+        """
+        Reserva uma chave (e seu orçamento) para a próxima requisição, evitando as que já
+        falharam nesta chamada. A requisição sai pelo cliente próprio da chave, nunca pelo
+        genai.configure global, que outras sessões podem trocar a qualquer momento.
+        """
+        api_key = self.key_manager.acquire(exclude=failed_keys)
+        if not api_key:
+            logger.error("Nenhuma chave API com orçamento disponível")
+            self.ui.error("❌ Nenhuma chave API disponível no momento. Tente novamente em instantes.")
+        return api_key
 
-    def ask_gemini(self, pdf_files, question):
-        """Faz pergunta ao Gemini com retry automático e rotação de chaves"""
+    def ask_gemini(self, pdf_files, question, stream=False):
+        """
+        Faz pergunta ao Gemini com retry automático e rotação de chaves. Cada PDF é enviado
+        ao File API uma única vez por chave (ver AI.file_handles): perguntas seguintes sobre
+        os mesmos documentos enviam apenas a referência e a pergunta.
+
+        Com stream=True, a resposta é renderizada conforme chega (ver _stream_answer).
+        """
         max_retries = self.key_manager.max_retries
         retry_delay = self.key_manager.retry_delay
+        handles = get_file_handle_cache()
+
+        documents = []
+        for pdf_file in pdf_files:
+            if hasattr(pdf_file, 'read'):
+                pdf_bytes = pdf_file.read()
+                pdf_file.seek(0)
+            else:
+                with open(pdf_file, 'rb') as f:
+                    pdf_bytes = f.read()
+            documents.append((getattr(pdf_file, 'name', str(pdf_file)), pdf_bytes))
+
+        model_name = self.model_name
+        failed_keys = set()
+
+        if stream:
+            # Criado uma única vez: as novas tentativas reaproveitam o mesmo botão
+            cancel_placeholder = self.ui.empty()
+            cancel_placeholder.button(
+                "⏹️ Cancelar geração",
+                key=f"ai_stream_cancel_{hashlib.sha256(question.encode('utf-8')).hexdigest()[:12]}"
+            )
         
         for attempt in range(max_retries):
+            # Reserva uma chave (e seu orçamento) para esta tentativa
+            api_key = self._reserve_key(failed_keys)
+            if not api_key:
+                if stream:
+                    cancel_placeholder.empty()
+                return None
             try:
-                progress_bar = st.progress(0)
-                
                 # Prepara inputs
                 inputs = []
-                progress_bar.progress(20)
-                
-                for pdf_file in pdf_files:
-                    if hasattr(pdf_file, 'read'):
-                        pdf_bytes = pdf_file.read()
-                        pdf_file.seek(0)
-                    else:
-                        with open(pdf_file, 'rb') as f:
-                            pdf_bytes = f.read()
-                    
-                    part = {"mime_type": "application/pdf", "data": pdf_bytes}
-                    inputs.append(part)
-                
-                progress_bar.progress(40)
+                for name, pdf_bytes in documents:
+                    inputs.append(handles.part_for(pdf_bytes, api_key, display_name=name, backend=self.backend))
                 inputs.append({"text": question})
-                progress_bar.progress(60)
-                
+                model = self._generative_model(model_name, api_key)
+
+                if stream:
+                    # Falhas antes do primeiro token caem no retry abaixo
+                    return self._stream_answer(model, api_key, inputs, cancel_placeholder)
+
                 # Tenta gerar resposta
-                response = self.model.generate_content(inputs)
-                progress_bar.progress(100)
+                with self.ui.spinner("🤖 Gerando resposta..."):
+                    response = model.generate_content(inputs)
                 
                 # Sucesso! Registra e retorna
-                current_key = self.key_manager.keys[self.key_manager.current_key_index]
-                self.key_manager.report_key_success(current_key)
+                self.key_manager.report_key_success(api_key, self._tokens_used(response))
                 
-                st.success("✅ Resposta gerada com sucesso!")
+                self.ui.success("✅ Resposta gerada com sucesso!")
                 return response.text
                 
             except Exception as e:
                 error_msg = str(e)
                 logger.error(f"Tentativa {attempt + 1}/{max_retries} falhou: {error_msg}")
                 
-                # Registra falha da chave atual
-                current_key = self.key_manager.keys[self.key_manager.current_key_index]
-                self.key_manager.report_key_failure(current_key, error_msg)
+                # Registra falha da chave usada
+                failed_keys.add(api_key)
+                self.key_manager.report_key_failure(api_key, error_msg)
+                # O arquivo pode ter expirado ou sido removido: reenvia na próxima tentativa
+                handles.invalidate(api_key)
                 
                 # Se não é a última tentativa, troca de chave e tenta novamente
                 if attempt < max_retries - 1:
-                    st.warning(f"⚠️ Erro na chave atual. Tentando com outra chave... ({attempt + 1}/{max_retries})")
+                    self.ui.warning(f"⚠️ Erro na chave atual. Tentando com outra chave... ({attempt + 1}/{max_retries})")
                     
                     # Aguarda antes de tentar novamente
                     time.sleep(retry_delay)
                     
-                    # Recarrega API com nova chave
-                    load_api()
-                    self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+                    # A próxima tentativa reserva outra chave e usa o modelo alternativo
+                    model_name = 'gemini-2.0-flash-exp'
                 else:
                     # Última tentativa falhou
-                    st.error(f"❌ Erro após {max_retries} tentativas com diferentes chaves: {error_msg}")
+                    if stream:
+                        cancel_placeholder.empty()
+                    self.ui.error(f"❌ Erro após {max_retries} tentativas com diferentes chaves: {error_msg}")
                     
                     # Mostra estatísticas
                     stats = self.key_manager.get_statistics()
-                    st.warning(f"📊 Chaves disponíveis: {stats['available_keys']}/{stats['total_keys']}")
+                    self.ui.warning(f"📊 Chaves disponíveis: {stats['available_keys']}/{stats['total_keys']}")
                     
                     return None
         
         return None
 
+    def _stream_answer(self, model, api_key, inputs, cancel_placeholder):
+        """
+        Gera a resposta em streaming com st.write_stream. O spinner cobre só a espera pelo
+        primeiro trecho; o botão "Cancelar" (em `cancel_placeholder`) interrompe a execução:
+        o Streamlit reinicia o script e a geração em andamento é abandonada. Mostra o tempo
+        até o primeiro token e a latência total.
+        """
+        start = time.perf_counter()
+        with self.ui.spinner("🤖 Gerando resposta..."):
+            response = model.generate_content(inputs, stream=True)
+            chunks = iter(response)
+            first_chunk = next(chunks, None)
+        time_to_first_token = time.perf_counter() - start
+
+        def _chunk_text(chunk):
+            try:
+                return chunk.text
+            except ValueError:
+                return ""  # trecho sem texto (ex.: apenas metadados)
+
+        def _tokens():
+            completed = False
+            try:
+                if first_chunk is not None:
+                    yield _chunk_text(first_chunk)
+                for chunk in chunks:
+                    yield _chunk_text(chunk)
+                completed = True
+            except Exception as e:
+                # Erro no meio da geração: mantém o que já foi exibido
+                self.key_manager.report_key_failure(api_key, str(e))
+                yield f"\n\n⚠️ Resposta interrompida: {e}"
+            finally:
+                if completed:
+                    self.key_manager.report_key_success(api_key, self._tokens_used(response))
+                else:
+                    logger.info(f"Geração em streaming interrompida após {time.perf_counter() - start:.1f}s")
+
+        # Sem mensagens na tela, o texto é apenas consumido (o gerador registra o uso da chave)
+        answer = self.ui.write_stream(_tokens()) if self.show_messages else "".join(_tokens())
+        total_latency = time.perf_counter() - start
+        cancel_placeholder.empty()
+
+        self.ui.caption(f"⏱️ Primeiro token em {time_to_first_token:.2f}s · resposta completa em {total_latency:.1f}s")
+        logger.info(f"Resposta em streaming: TTFT {time_to_first_token:.2f}s, total {total_latency:.1f}s")
+        return answer if isinstance(answer, str) else "".join(str(part) for part in answer)
+
+    def _tokens_used(self, response):
+        """Total de tokens da resposta, para o orçamento TPM da chave."""
+        usage = getattr(response, 'usage_metadata', None)
+        return getattr(usage, 'total_token_count', 0) or 0
+
+    def _generative_model(self, model_name, api_key):
+        """Modelo com o cliente próprio da chave reservada (um por modelo e chave)."""
+        if (model_name, api_key) not in self._models:
+            self._models[(model_name, api_key)] = self.backend.model(model_name, api_key=api_key)
+        return self._models[(model_name, api_key)]
+
+    def _extract_locally(self, pdf_file, pdf_bytes, prompt):
+        """Tenta os modelos de layout dos fornecedores (AI.local_extraction) antes da IA."""
+        if not self.use_local_extraction:
+            return None
+        from AI.local_extraction import try_local_extraction
+        data, template_name = try_local_extraction(pdf_bytes, prompt)
+        if data is None:
+            return None
+        self.key_manager.report_local_hit()
+        logger.info(f"'{pdf_file.name}' extraído localmente com o modelo '{template_name}'")
+        self.ui.success(f"✅ Dados de '{pdf_file.name}' lidos diretamente do PDF (layout reconhecido, sem IA).")
+        return data
+
     def extract_structured_data(self, pdf_file, prompt):
-        """Extrai dados estruturados com retry e rotação de chaves"""
+        """
+        Extrai dados estruturados com retry e rotação de chaves. Layouts conhecidos são lidos
+        localmente, sem IA; os demais vão ao modelo rápido ou ao pro conforme a complexidade
+        do documento (ver AI.model_routing), trocando de modelo se a tentativa falhar por erro
+        do modelo (erros da chave só trocam a chave). JSON
+        malformado é reparado e validado pelo schema do prompt (ver AI.json_repair), com uma
+        consulta só de texto se preciso, sem reenviar o PDF. O resultado da IA fica em cache
+        por conteúdo (PDF + prompt + modelo): reenviar o mesmo arquivo não chama a IA.
+        """
         max_retries = self.key_manager.max_retries
         retry_delay = self.key_manager.retry_delay
+
+        pdf_bytes = pdf_file.read()
+        pdf_file.seek(0)
+        local_data = self._extract_locally(pdf_file, pdf_bytes, prompt)
+        if local_data is not None:
+            return local_data
+        route, model_name = self.router.choose(pdf_bytes, prompt)
+        pages = count_pages(pdf_bytes)
+        cache = self.extraction_cache
+        routed_cache_model = self.backend.cache_model_id(model_name)
+        cached = cache.get(extraction_key(pdf_bytes, prompt, routed_cache_model))
+        if cached is not None:
+            self.key_manager.report_cache_hit()
+            self.ui.success(f"✅ Dados de '{pdf_file.name}' recuperados do cache (arquivo já analisado).")
+            return cached
         
+        failed_keys = set()
         for attempt in range(max_retries):
+            api_key = self._reserve_key(failed_keys)
+            if not api_key:
+                return None
+            start = time.perf_counter()
             try:
-                with st.spinner(f"🤖 Analisando '{pdf_file.name}' com IA (tentativa {attempt + 1})..."):
-                    pdf_bytes = pdf_file.read()
-                    pdf_file.seek(0)
-
+                with self.ui.spinner(f"🤖 Analisando '{pdf_file.name}' com IA (tentativa {attempt + 1})..."):
                     part_pdf = {"mime_type": "application/pdf", "data": pdf_bytes}
                     
-                    generation_config = genai.types.GenerationConfig(
-                        response_mime_type="application/json"
-                    )
+                    generation_config = self.backend.json_generation_config()
 
-                    response = self.model.generate_content(
+                    model = self._generative_model(model_name, api_key)
+                    response = model.generate_content(
                         [prompt, part_pdf],
                         generation_config=generation_config
                     )
+                    self.key_manager.report_key_success(api_key, self._tokens_used(response))
                     
-                    # Processa resposta
-                    import json
-                    cleaned_response = self._clean_json_string(response.text)
-                    extracted_data = json.loads(cleaned_response)
+                    # Processa resposta (reparando o JSON se preciso)
+                    extracted_data, repairs = extract_with_repair(
+                        response.text, prompt,
+                        ask=lambda fix_prompt: self._ask_text(model, api_key, fix_prompt, generation_config)
+                    )
                     
                     # Sucesso!
-                    current_key = self.key_manager.keys[self.key_manager.current_key_index]
-                    self.key_manager.report_key_success(current_key)
+                    self.router.record(route, time.perf_counter() - start, True, pages)
+                    if any(repair != REPAIR_TRAILING_COMMAS for repair in repairs):
+                        self.ui.warning(f"⚠️ A resposta da IA para '{pdf_file.name}' precisou de reparo "
+                                   f"({'; '.join(repairs)}). Confira se todos os itens foram extraídos.")
+                    cache_model = self.backend.cache_model_id(model_name)
+                    cache.set(extraction_key(pdf_bytes, prompt, cache_model), extracted_data, cache_model)
+                    if cache_model != routed_cache_model:
+                        # O reenvio do arquivo é roteado ao modelo original: também precisa achar o resultado
+                        cache.set(extraction_key(pdf_bytes, prompt, routed_cache_model), extracted_data, routed_cache_model)
                     
-                    st.success(f"✅ Dados extraídos com sucesso de '{pdf_file.name}'!")
+                    self.ui.success(f"✅ Dados extraídos com sucesso de '{pdf_file.name}'!")
                     return extracted_data
                     
-            except json.JSONDecodeError as je:
-                st.error("❌ A IA não retornou JSON válido")
-                st.text_area("Resposta recebida:", value=response.text, height=150)
+            except InvalidExtractionError as ie:
+                self.router.record(route, time.perf_counter() - start, False, pages)
+                self.ui.error("❌ A IA não retornou JSON válido")
+                self.ui.text_area("Resposta recebida:", value=ie.raw_text, height=150)
                 return None
                 
             except Exception as e:
                 error_msg = str(e)
                 logger.error(f"Tentativa {attempt + 1}/{max_retries} falhou na extração: {error_msg}")
+                key_error = is_key_error(error_msg)
+                if not key_error:
+                    self.router.record(route, time.perf_counter() - start, False, pages)
                 
                 # Registra falha
-                current_key = self.key_manager.keys[self.key_manager.current_key_index]
-                self.key_manager.report_key_failure(current_key, error_msg)
+                failed_keys.add(api_key)
+                self.key_manager.report_key_failure(api_key, error_msg)
                 
                 if attempt < max_retries - 1:
-                    st.warning(f"⚠️ Erro na chave atual. Tentando novamente... ({attempt + 1}/{max_retries})")
+                    self.ui.warning(f"⚠️ Erro na chave atual. Tentando novamente... ({attempt + 1}/{max_retries})")
                     time.sleep(retry_delay)
                     
-                    # Recarrega com nova chave
-                    load_api()
-                    self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+                    # A próxima tentativa reserva outra chave; só um erro do modelo troca de modelo
+                    if not key_error:
+                        route, model_name = self.router.fallback(route)
                 else:
-                    st.error(f"❌ Falha após {max_retries} tentativas: {e}")
+                    self.ui.error(f"❌ Falha após {max_retries} tentativas: {e}")
                     return None
         
         return None
 
-    def _clean_json_string(self, text):
-        """Limpa o texto da resposta da IA para extrair apenas o JSON."""
-        import re
-        match = re.search(r'```(json)?\s*({.*?})\s*```', text, re.DOTALL)
-        if match:
-            return match.group(2)
-        return text.strip()
+    def extract_structured_data_batch(self, pdf_files, prompt):
+        """
+        Extrai dados estruturados de vários PDFs em paralelo, distribuindo as requisições
+        entre as chaves da pool (ver AI.batch_extraction), cada arquivo no modelo escolhido
+        pela sua complexidade. Não exibe nada: quem chama consome os resultados conforme
+        terminam e mostra o progresso.
+
+        Yields:
+            tuple: (índice do arquivo, arquivo, dados extraídos ou None, erro ou None)
+        """
+        from AI.batch_extraction import extract_batch
+        prompts = [prompt] * len(pdf_files) if isinstance(prompt, str) else list(prompt)
+        model_names = []
+        for pdf_file, file_prompt in zip(pdf_files, prompts):
+            model_names.append(self.router.choose(pdf_file.read(), file_prompt)[1])
+            pdf_file.seek(0)
+        return extract_batch(pdf_files, prompts, model_names, self._parse_json_response, backend=self.backend,
+                             key_manager=self.key_manager, router=self.router, cache=self.extraction_cache)
+
+    def extract_structured_data_chunked(self, pdf_file, prompt, list_key, id_field, shared_fields=()):
+        """
+        Para PDFs longos: extrai em trechos de páginas processados em paralelo e junta as
+        listas `list_key` sem repetir `id_field` (ver AI.pdf_chunking). Trechos que falharem
+        são repetidos sozinhos; os que ainda assim falharem são avisados ao usuário, e os
+        itens das demais páginas são retornados. PDFs curtos seguem pelo fluxo normal.
+        """
+        pdf_bytes = pdf_file.read()
+        pdf_file.seek(0)
+        local_data = self._extract_locally(pdf_file, pdf_bytes, prompt)
+        if local_data is not None:
+            return local_data
+
+        from AI.pdf_chunking import extract_chunked
+        progress_bar = self.ui.progress(0.0, f"🤖 Analisando '{pdf_file.name}' em trechos com IA...")
+        merged, failed_ranges = extract_chunked(
+            self, pdf_bytes, prompt, list_key, id_field, shared_fields,
+            progress_callback=lambda fraction, text: progress_bar.progress(fraction, text)
+        )
+        progress_bar.empty()
+        if merged is None:
+            return self.extract_structured_data(pdf_file, prompt)
+
+        for first, last in failed_ranges:
+            self.ui.warning(f"⚠️ Não foi possível extrair as páginas {first}-{last} de '{pdf_file.name}'. Confira esses itens manualmente.")
+        if not merged[list_key] and failed_ranges:
+            self.ui.error(f"❌ Falha ao extrair dados de '{pdf_file.name}'.")
+            return None
+        self.ui.success(f"✅ Dados extraídos com sucesso de '{pdf_file.name}'!")
+        return merged
+
+    def _ask_text(self, model, api_key, prompt, generation_config):
+        """Consulta só de texto (ex.: pedido de correção de JSON), na chave da requisição em andamento."""
+        response = model.generate_content([prompt], generation_config=generation_config)
+        self.key_manager.report_key_success(api_key, self._tokens_used(response))
+        return response.text
+
+    def _parse_json_response(self, text, prompt, ask=None):
+        """Dados da resposta da IA, reparados e validados pelo schema do prompt (ver AI.json_repair)."""
+        data, _ = extract_with_repair(text, prompt, ask)
+        return data
 
-    def answer_question(self, pdf_files, question):
-        """Responde pergunta com tratamento de erros aprimorado"""
+    def answer_question(self, pdf_files, question, stream=False):
+        """Responde pergunta com tratamento de erros aprimorado (stream=True exibe a resposta conforme chega)"""
         start_time = time.time()
         try:
-            answer = self.ask_gemini(pdf_files, question)
+            answer = self.ask_gemini(pdf_files, question, stream=stream)
             if answer:
                 return answer, time.time() - start_time
             else:
-                st.error("❌ Não foi possível obter resposta após múltiplas tentativas.")
+                self.ui.error("❌ Não foi possível obter resposta após múltiplas tentativas.")
                 return None, 0
         except Exception as e:
-            st.error(f"❌ Erro inesperado: {str(e)}")
-            st.exception(e)
+            self.ui.error(f"❌ Erro inesperado: {str(e)}")
+            self.ui.exception(e)
             return None, 0
 
 
@@ -1,35 +1,120 @@
 import streamlit as st
-import logging
+import os
+import json
 import time
-import random
+import atexit
+import hashlib
+import logging
+import tempfile
+import threading
 from typing import Optional, List
 from datetime import datetime, timedelta
 from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
+# Configuráveis em st.secrets["gemini_config"]
+DEFAULT_REQUESTS_PER_MINUTE = 10
+DEFAULT_TOKENS_PER_MINUTE = 250000
+DEFAULT_ACQUIRE_TIMEOUT_SECONDS = 30
+DEFAULT_STATS_PATH = os.path.join(tempfile.gettempdir(), "isf_api_key_stats.json")
+
+COOLDOWN_MINUTES = 5
+# Trechos de mensagens de erro que indicam cota esgotada da chave
+RATE_LIMIT_PHRASES = ["rate limit", "quota", "too many requests", "429"]
+# ... e de erros da própria chave (inválida, sem permissão), não do modelo
+INVALID_KEY_PHRASES = ["api key", "api_key", "permission denied", "permission_denied", "unauthenticated", "401", "403"]
+# Intervalo mínimo entre gravações das estatísticas em disco
+STATS_SAVE_INTERVAL_SECONDS = 30
+
+
+def is_key_error(error_message):
+    """Se o erro se deve à chave (cota ou chave inválida): outra chave resolve, o modelo não muda."""
+    message = str(error_message).lower()
+    return any(phrase in message for phrase in RATE_LIMIT_PHRASES + INVALID_KEY_PHRASES)
+
+
+class TokenBucket:
+    """
+    Balde de tokens reabastecido continuamente até `capacity` a `capacity` por minuto.
+    O saldo pode ficar negativo quando o consumo real (ex.: tokens da resposta) é
+    registrado depois; a chave então espera até o balde se recompor.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = float(capacity)
+        self.refill_per_second = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def available(self):
+        self._refill()
+        return self.tokens
+
+    def consume(self, amount):
+        self._refill()
+        self.tokens -= amount
+
+    def seconds_until(self, amount):
+        """Tempo até haver `amount` tokens disponíveis (0 se já houver)."""
+        missing = min(amount, self.capacity) - self.available()
+        return max(missing / self.refill_per_second, 0.0)
+
+
 class APIKeyManager:
-    """Gerenciador inteligente de múltiplas chaves API do Gemini"""
-    
-    def __init__(self):
-        self.keys = self._load_api_keys()
-        self.current_key_index = 0
+    """
+    Escalonador das múltiplas chaves API do Gemini, compartilhado por todas as sessões
+    do processo (cada sessão Streamlit roda em sua própria thread).
+
+    Cada chave tem baldes de requisições por minuto (RPM) e de tokens por minuto (TPM);
+    `acquire` escolhe a chave com maior saldo e, se nenhuma tiver saldo, espera no
+    máximo `timeout` segundos antes de desistir. Todo o estado é protegido por lock e
+    as estatísticas de uso são persistidas em disco entre reinícios.
+
+    `keys` e `config` substituem st.secrets (ex.: gerenciador isolado do benchmark em
+    AI.benchmark); com `stats_path` None as estatísticas não são persistidas.
+    """
+
+    def __init__(self, keys: Optional[List[str]] = None, config: Optional[dict] = None):
+        self.keys = list(keys) if keys else self._load_api_keys()
         self.key_usage_count = defaultdict(int)
         self.key_failures = defaultdict(int)
+        self.key_tokens = defaultdict(int)
         self.key_last_used = {}
         self.key_cooldown = {}  # Chaves em cooldown por rate limit
-        
-        self.max_retries = st.secrets.get("gemini_config", {}).get("max_retries", 3)
-        self.retry_delay = st.secrets.get("gemini_config", {}).get("retry_delay_seconds", 2)
-        self.rotation_strategy = st.secrets.get("gemini_config", {}).get("rotation_strategy", "round_robin")
-        
-        logger.info(f"APIKeyManager inicializado com {len(self.keys)} chaves")
-        logger.info(f"Estratégia de rotação: {self.rotation_strategy}")
-    
+        self.cache_hits = 0  # Extrações atendidas pelo cache, sem consumir cota
+        self.local_hits = 0  # Extrações feitas pelos modelos locais (AI.local_extraction), sem IA
+
+        config = st.secrets.get("gemini_config", {}) if config is None else config
+        self.max_retries = config.get("max_retries", 3)
+        self.retry_delay = config.get("retry_delay_seconds", 2)
+        self.acquire_timeout = config.get("acquire_timeout_seconds", DEFAULT_ACQUIRE_TIMEOUT_SECONDS)
+        self.requests_per_minute = config.get("requests_per_minute", DEFAULT_REQUESTS_PER_MINUTE)
+        self.tokens_per_minute = config.get("tokens_per_minute", DEFAULT_TOKENS_PER_MINUTE)
+        self.cooldown_minutes = config.get("cooldown_minutes", COOLDOWN_MINUTES)
+        self.rotation_strategy = "remaining_budget"
+
+        self._rpm_buckets = {key: TokenBucket(self.requests_per_minute) for key in self.keys}
+        self._tpm_buckets = {key: TokenBucket(self.tokens_per_minute) for key in self.keys}
+        self._cond = threading.Condition(threading.RLock())
+        self._local = threading.local()
+
+        self.stats_path = config.get("stats_path", DEFAULT_STATS_PATH)
+        self._stats_saved_at = 0.0
+        self._load_persisted_stats()
+
+        logger.info(f"APIKeyManager inicializado com {len(self.keys)} chaves "
+                    f"({self.requests_per_minute} RPM / {self.tokens_per_minute} TPM por chave)")
+
     def _load_api_keys(self) -> List[str]:
         """Carrega todas as chaves API disponíveis"""
         keys = []
-        
+
         try:
             # Tenta carregar da seção gemini_api_keys
             gemini_keys = st.secrets.get("gemini_api_keys", {})
@@ -38,7 +123,7 @@ class APIKeyManager:
                 logger.info(f"Carregadas {len(keys)} chaves de gemini_api_keys")
         except Exception as e:
             logger.warning(f"Erro ao carregar gemini_api_keys: {e}")
-        
+
         # Fallback: chave principal do general
         if not keys:
             try:
@@ -48,116 +133,236 @@ class APIKeyManager:
                     logger.info("Usando chave principal do general como fallback")
             except Exception as e:
                 logger.error(f"Nenhuma chave API encontrada: {e}")
-        
+
         if not keys:
             raise ValueError("❌ Nenhuma chave API do Gemini configurada!")
-        
+
         return keys
-    
-    def get_next_key(self) -> str:
-        """Obtém a próxima chave disponível baseada na estratégia"""
-        
-        # Remove chaves em cooldown que já expiraram
-        current_time = datetime.now()
-        expired_cooldowns = [
-            key for key, cooldown_until in self.key_cooldown.items()
-            if current_time > cooldown_until
-        ]
-        for key in expired_cooldowns:
+
+    # --- Seleção de chaves ---
+
+    def acquire(self, estimated_tokens: int = 0, timeout: Optional[float] = None, exclude=()) -> Optional[str]:
+        """
+        Reserva uma requisição na chave com maior saldo de orçamento.
+
+        Args:
+            estimated_tokens: Tokens previstos para a requisição (debitados do TPM)
+            timeout: Espera máxima em segundos (0 = não bloqueia; None = padrão configurado)
+            exclude: Chaves a evitar (ex.: a que acabou de falhar), se houver alternativa
+
+        Returns:
+            A chave reservada, ou None se nenhuma ficar disponível dentro do prazo
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                key, wait = self._pick_key(estimated_tokens, exclude)
+                if key:
+                    self._rpm_buckets[key].consume(1)
+                    self._tpm_buckets[key].consume(estimated_tokens)
+                    self.report_key_usage(key)
+                    self._local.key = key
+                    return key
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Nenhuma chave com orçamento disponível em {timeout}s")
+                    return None
+                self._cond.wait(min(wait, remaining))
+
+    def _pick_key(self, estimated_tokens, exclude):
+        """Retorna (chave escolhida ou None, segundos até alguma ficar disponível). Chamado com lock."""
+        now = datetime.now()
+        for key in [k for k, until in self.key_cooldown.items() if now > until]:
             del self.key_cooldown[key]
             logger.info(f"Chave saiu do cooldown: {self._mask_key(key)}")
-        
-        # Filtra chaves disponíveis (não em cooldown)
-        available_keys = [k for k in self.keys if k not in self.key_cooldown]
-        
-        if not available_keys:
-            logger.warning("Todas as chaves estão em cooldown! Aguardando...")
-            # Aguarda a chave mais próxima de sair do cooldown
+
+        candidates = [k for k in self.keys if k not in self.key_cooldown]
+        if exclude and any(k not in exclude for k in candidates):
+            candidates = [k for k in candidates if k not in exclude]
+        if not candidates:
             next_available = min(self.key_cooldown.values())
-            wait_time = (next_available - current_time).total_seconds()
-            if wait_time > 0:
-                time.sleep(min(wait_time, 60))  # Max 60s de espera
-            return self.get_next_key()  # Tenta novamente
-        
-        # Seleciona chave baseada na estratégia
-        if self.rotation_strategy == "round_robin":
-            key = self._round_robin_selection(available_keys)
-        elif self.rotation_strategy == "random":
-            key = random.choice(available_keys)
-        elif self.rotation_strategy == "least_used":
-            key = self._least_used_selection(available_keys)
-        else:
-            key = available_keys[0]
-        
-        # Registra uso
-        self.key_usage_count[key] += 1
-        self.key_last_used[key] = datetime.now()
-        
-        logger.debug(f"Chave selecionada: {self._mask_key(key)} (uso #{self.key_usage_count[key]})")
-        return key
-    
-    def _round_robin_selection(self, available_keys: List[str]) -> str:
-        """Seleção round-robin entre chaves disponíveis"""
-        # Garante que o índice está dentro do range de chaves disponíveis
-        if self.current_key_index >= len(available_keys):
-            self.current_key_index = 0
-        
-        key = available_keys[self.current_key_index]
-        self.current_key_index = (self.current_key_index + 1) % len(available_keys)
+            return None, max((next_available - now).total_seconds(), 0.1)
+
+        ready, wait = [], None
+        for key in candidates:
+            rpm, tpm = self._rpm_buckets[key], self._tpm_buckets[key]
+            key_wait = max(rpm.seconds_until(1), tpm.seconds_until(estimated_tokens))
+            if key_wait <= 0:
+                budget = min(rpm.available() / rpm.capacity, tpm.available() / tpm.capacity)
+                ready.append((budget, -self.key_usage_count[key], key))
+            else:
+                wait = key_wait if wait is None else min(wait, key_wait)
+        if ready:
+            return max(ready)[2], 0.0
+        return None, max(wait, 0.05)
+
+    def get_next_key(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Obtém a chave com maior saldo (ver acquire); None se nenhuma ficar disponível a tempo"""
+        key = self.acquire(timeout=timeout)
+        if key:
+            logger.debug(f"Chave selecionada: {self._mask_key(key)} (uso #{self.key_usage_count[key]})")
         return key
-    
-    def _least_used_selection(self, available_keys: List[str]) -> str:
-        """Seleciona a chave menos utilizada"""
-        return min(available_keys, key=lambda k: self.key_usage_count[k])
-    
+
+    def current_key(self) -> Optional[str]:
+        """Última chave reservada pela thread atual (a que a requisição em andamento usa)"""
+        return getattr(self._local, 'key', None)
+
+    # --- Registro de resultados ---
+
+    def report_key_usage(self, key: str):
+        """Registra o uso de uma chave"""
+        with self._cond:
+            self.key_usage_count[key] += 1
+            self.key_last_used[key] = datetime.now()
+            self._save_stats_if_due()
+
     def report_key_failure(self, key: str, error_message: str):
         """Registra falha de uma chave e coloca em cooldown se necessário"""
-        self.key_failures[key] += 1
-        
-        # Detecta rate limit e coloca em cooldown
-        if any(phrase in str(error_message).lower() for phrase in [
-            "rate limit", "quota", "too many requests", "429"
-        ]):
-            cooldown_minutes = 5  # Cooldown de 5 minutos
-            cooldown_until = datetime.now() + timedelta(minutes=cooldown_minutes)
-            self.key_cooldown[key] = cooldown_until
-            
-            logger.warning(
-                f"⚠️ Chave em cooldown por {cooldown_minutes}min devido a rate limit: "
-                f"{self._mask_key(key)}"
-            )
-        
+        with self._cond:
+            self.key_failures[key] += 1
+
+            # Detecta rate limit e coloca em cooldown
+            if any(phrase in str(error_message).lower() for phrase in RATE_LIMIT_PHRASES):
+                self.key_cooldown[key] = datetime.now() + timedelta(minutes=self.cooldown_minutes)
+                logger.warning(
+                    f"⚠️ Chave em cooldown por {self.cooldown_minutes}min devido a rate limit: "
+                    f"{self._mask_key(key)}"
+                )
+            self._save_stats_if_due()
+
         logger.error(f"Falha na chave {self._mask_key(key)}: {error_message}")
-    
-    def report_key_success(self, key: str):
-        """Registra sucesso de uma chave (limpa contador de falhas)"""
-        if key in self.key_failures:
-            self.key_failures[key] = max(0, self.key_failures[key] - 1)
-    
+
+    def report_key_success(self, key: str, tokens_used: int = 0):
+        """Registra sucesso de uma chave (reduz o contador de falhas) e os tokens consumidos"""
+        with self._cond:
+            if key in self.key_failures:
+                self.key_failures[key] = max(0, self.key_failures[key] - 1)
+            if tokens_used and key in self._tpm_buckets:
+                self._tpm_buckets[key].consume(tokens_used)
+                self.key_tokens[key] += tokens_used
+            self._save_stats_if_due()
+
+    def report_cache_hit(self):
+        """Registra uma requisição atendida pelo cache de extrações (nenhuma chave usada)"""
+        with self._cond:
+            self.cache_hits += 1
+
+    def report_local_hit(self):
+        """Registra uma extração resolvida por um modelo local de fornecedor (nenhuma chave usada)"""
+        with self._cond:
+            self.local_hits += 1
+
+    def clear_cooldowns(self):
+        with self._cond:
+            self.key_cooldown.clear()
+            self._cond.notify_all()
+
+    def reset_statistics(self):
+        with self._cond:
+            self.key_usage_count.clear()
+            self.key_failures.clear()
+            self.key_tokens.clear()
+            self.key_last_used.clear()
+            self.cache_hits = 0
+            self.local_hits = 0
+            self._save_stats()
+
+    # --- Persistência das estatísticas ---
+
+    def _key_id(self, key: str) -> str:
+        """Identificador estável da chave para o arquivo de estatísticas (nunca a chave em si)"""
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+    def _load_persisted_stats(self):
+        if not self.stats_path:
+            return
+        try:
+            with open(self.stats_path, encoding="utf-8") as f:
+                persisted = json.load(f)
+        except (OSError, ValueError):
+            return
+        keys_by_id = {self._key_id(key): key for key in self.keys}
+        for key_id, values in persisted.get("keys", {}).items():
+            key = keys_by_id.get(key_id)
+            if not key:
+                continue
+            self.key_usage_count[key] = values.get("usage", 0)
+            self.key_failures[key] = values.get("failures", 0)
+            self.key_tokens[key] = values.get("tokens", 0)
+            if values.get("last_used"):
+                self.key_last_used[key] = datetime.fromisoformat(values["last_used"])
+        self.cache_hits = persisted.get("cache_hits", 0)
+        self.local_hits = persisted.get("local_hits", 0)
+
+    def _save_stats_if_due(self):
+        # Chamado com self._cond adquirido
+        if time.monotonic() - self._stats_saved_at >= STATS_SAVE_INTERVAL_SECONDS:
+            self._save_stats()
+
+    def _save_stats(self):
+        if not self.stats_path:
+            return
+        with self._cond:
+            self._stats_saved_at = time.monotonic()
+            persisted = {
+                "cache_hits": self.cache_hits,
+                "local_hits": self.local_hits,
+                "keys": {
+                    self._key_id(key): {
+                        "usage": self.key_usage_count.get(key, 0),
+                        "failures": self.key_failures.get(key, 0),
+                        "tokens": self.key_tokens.get(key, 0),
+                        "last_used": self.key_last_used[key].isoformat() if key in self.key_last_used else None,
+                    } for key in self.keys
+                },
+            }
+        try:
+            tmp_path = f"{self.stats_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(persisted, f)
+            os.replace(tmp_path, self.stats_path)
+        except OSError as e:
+            logger.warning(f"Falha ao gravar estatísticas das chaves: {e}")
+
     def _mask_key(self, key: str) -> str:
         """Mascara a chave para logs (mostra apenas primeiros e últimos 4 caracteres)"""
         if len(key) <= 8:
             return "****"
         return f"{key[:4]}...{key[-4:]}"
-    
+
     def get_statistics(self) -> dict:
         """Retorna estatísticas de uso das chaves"""
-        return {
-            "total_keys": len(self.keys),
-            "available_keys": len([k for k in self.keys if k not in self.key_cooldown]),
-            "keys_in_cooldown": len(self.key_cooldown),
-            "usage_count": dict(self.key_usage_count),
-            "failure_count": dict(self.key_failures),
-            "strategy": self.rotation_strategy
-        }
+        with self._cond:
+            return {
+                "total_keys": len(self.keys),
+                "available_keys": len([k for k in self.keys if k not in self.key_cooldown]),
+                "keys_in_cooldown": len(self.key_cooldown),
+                "usage_count": dict(self.key_usage_count),
+                "failure_count": dict(self.key_failures),
+                "token_count": dict(self.key_tokens),
+                "remaining_budget": {
+                    key: {
+                        "rpm": round(max(self._rpm_buckets[key].available(), 0), 1),
+                        "tpm": round(max(self._tpm_buckets[key].available(), 0)),
+                    } for key in self.keys
+                },
+                "cache_hits": self.cache_hits,
+                "local_hits": self.local_hits,
+                "strategy": self.rotation_strategy
+            }
 
 
 # Instância global (singleton)
 _api_key_manager = None
+_api_key_manager_lock = threading.Lock()
 
 def get_api_key_manager() -> APIKeyManager:
     """Retorna a instância global do gerenciador de chaves"""
     global _api_key_manager
     if _api_key_manager is None:
-        _api_key_manager = APIKeyManager()
+        with _api_key_manager_lock:
+            if _api_key_manager is None:
+                _api_key_manager = APIKeyManager()
+                atexit.register(_api_key_manager._save_stats)
     return _api_key_manager
@@ -3,14 +3,16 @@ import google.generativeai as genai
 import streamlit as st
 import logging
 from AI.api_key_manager import get_api_key_manager
+from AI.gemini_backend import get_gemini_backend
 
 logger = logging.getLogger('api_load')
 
-def load_api():
-    """Carrega a API do Gemini com suporte a múltiplas chaves"""
+def load_api(key_manager=None, backend=None):
+    """Carrega a API do Gemini com suporte a múltiplas chaves (por padrão, os globais)"""
     try:
         # Obtém uma chave do gerenciador
-        key_manager = get_api_key_manager()
+        key_manager = key_manager or get_api_key_manager()
+        backend = backend or get_gemini_backend()
         api_key = key_manager.get_next_key()
         
         if not api_key:
@@ -20,7 +22,7 @@ def load_api():
             return None
 
         # Configura a API Gemini com a chave selecionada
-        genai.configure(api_key=api_key)
+        backend.configure(api_key)
         logger.info(f"API Gemini configurada com chave {key_manager._mask_key(api_key)}")
         
         return genai
@@ -0,0 +1,133 @@
+import streamlit as st
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from AI.api_key_manager import get_api_key_manager, is_key_error
+from AI.extraction_cache import get_extraction_cache, extraction_key
+from AI.gemini_backend import get_gemini_backend
+from AI.json_repair import InvalidExtractionError
+from AI.model_routing import get_model_router, count_pages
+
+logger = logging.getLogger(__name__)
+
+# Configurável em st.secrets["gemini_config"]
+DEFAULT_MAX_PARALLEL_REQUESTS = 8  # limite de workers por lote
+
+# Um cliente por chave (independente do genai.configure global, que só comporta uma chave por vez)
+_models = {}
+_models_lock = threading.Lock()
+
+
+def _model_for_key(backend, api_key, model_name):
+    with _models_lock:
+        if (backend, api_key, model_name) not in _models:
+            _models[(backend, api_key, model_name)] = backend.model(model_name, api_key)
+        return _models[(backend, api_key, model_name)]
+
+
+def _tokens_used(response):
+    usage = getattr(response, 'usage_metadata', None)
+    return getattr(usage, 'total_token_count', 0) or 0
+
+
+def _extract_one(backend, key_manager, router, pdf_bytes, prompt, model_name, parse_response):
+    """Roda em uma thread do pool: sem chamadas ao Streamlit."""
+    generation_config = backend.json_generation_config()
+    part_pdf = {"mime_type": "application/pdf", "data": pdf_bytes}
+    route = router.route_for_model(model_name)
+    pages = count_pages(pdf_bytes)
+    failed_keys, last_error = set(), None
+    for attempt in range(key_manager.max_retries):
+        # O escalonador escolhe a chave com maior saldo, evitando as que já falharam neste arquivo
+        api_key = key_manager.acquire(exclude=failed_keys)
+        if api_key is None:
+            raise TimeoutError("Nenhuma chave API com orçamento disponível")
+        start = time.perf_counter()
+        try:
+            model = _model_for_key(backend, api_key, model_name)
+            response = model.generate_content([prompt, part_pdf], generation_config=generation_config)
+
+            def ask(fix_prompt):
+                # Correção do JSON só com texto, na mesma chave, sem reenviar o PDF
+                fix_response = model.generate_content([fix_prompt], generation_config=generation_config)
+                key_manager.report_key_success(api_key, _tokens_used(fix_response))
+                return fix_response.text
+
+            data = parse_response(response.text, prompt, ask)
+        except InvalidExtractionError as e:
+            router.record(route, time.perf_counter() - start, False, pages)
+            # A chave funcionou; repetir com outra não corrige a resposta
+            key_manager.report_key_success(api_key, _tokens_used(response))
+            raise ValueError("A IA não retornou JSON válido") from e
+        except Exception as e:
+            if not is_key_error(e):
+                # Erros da chave (cota, chave inválida) não contam contra o modelo
+                router.record(route, time.perf_counter() - start, False, pages)
+            last_error = e
+            failed_keys.add(api_key)
+            key_manager.report_key_failure(api_key, str(e))
+            logger.warning(f"Tentativa {attempt + 1}/{key_manager.max_retries} falhou no lote: {e}")
+            if attempt < key_manager.max_retries - 1:
+                time.sleep(key_manager.retry_delay)
+            continue
+        router.record(route, time.perf_counter() - start, True, pages)
+        key_manager.report_key_success(api_key, _tokens_used(response))
+        return data
+    raise last_error
+
+
+def extract_batch(pdf_files, prompt, model_name, parse_response, backend=None, key_manager=None, router=None, cache=None):
+    """
+    Extrai dados estruturados de vários PDFs em paralelo, com até um worker por chave
+    da pool; cada requisição reserva sua chave no escalonador (APIKeyManager.acquire).
+    Resultados em cache retornam imediatamente; os demais chegam na ordem em que terminam.
+    `prompt` e `model_name` podem ser um valor único ou uma lista com um valor por arquivo.
+    Backend, gerenciador de chaves, roteador e cache são os globais, salvo se informados.
+
+    Yields:
+        tuple: (índice do arquivo, arquivo, dados extraídos ou None, erro ou None)
+    """
+    backend = backend or get_gemini_backend()
+    key_manager = key_manager or get_api_key_manager()
+    router = router or get_model_router()
+    cache = cache or get_extraction_cache()
+    config = st.secrets.get("gemini_config", {})
+
+    prompts = [prompt] * len(pdf_files) if isinstance(prompt, str) else list(prompt)
+    model_names = [model_name] * len(pdf_files) if isinstance(model_name, str) else list(model_name)
+    pending = []
+    for index, pdf_file in enumerate(pdf_files):
+        pdf_bytes = pdf_file.read()
+        pdf_file.seek(0)
+        key = extraction_key(pdf_bytes, prompts[index], backend.cache_model_id(model_names[index]))
+        cached = cache.get(key)
+        if cached is not None:
+            key_manager.report_cache_hit()
+            yield index, pdf_file, cached, None
+        else:
+            pending.append((index, pdf_file, pdf_bytes, key))
+    if not pending:
+        return
+
+    max_workers = min(len(pending), len(key_manager.keys),
+                      config.get("max_parallel_requests", DEFAULT_MAX_PARALLEL_REQUESTS))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-batch") as executor:
+        futures = {
+            executor.submit(_extract_one, backend, key_manager, router, pdf_bytes, prompts[index],
+                            model_names[index], parse_response): (index, pdf_file, key)
+            for index, pdf_file, pdf_bytes, key in pending
+        }
+        for future in as_completed(futures):
+            index, pdf_file, key = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                yield index, pdf_file, None, e
+                continue
+            cache.set(key, data, backend.cache_model_id(model_names[index]))
+            yield index, pdf_file, data, None
+    logger.info(f"Lote de {len(pending)} PDF(s) extraído(s) com {max_workers} worker(s) "
+                f"em {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,123 @@
+import io
+import math
+import time
+import tempfile
+import logging
+from collections import Counter
+
+from AI.api_key_manager import APIKeyManager
+from AI.extraction_cache import ExtractionCache
+from AI.fake_gemini import FakeGeminiBackend
+from AI.model_routing import (
+    ModelRouter, DEFAULT_COMPLEXITY_THRESHOLD, DEFAULT_MIN_CHARS_PER_PAGE, DEFAULT_MAX_FAST_ERROR_RATE
+)
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_MODES = {
+    "single": "Individual (um PDF por vez)",
+    "batch": "Lote paralelo",
+    "chunked": "Trechos de páginas",
+}
+# O modo em trechos é usado em produção para relatórios de extintores
+CHUNKED_LIST_KEY, CHUNKED_ID_FIELD = "extintores", "numero_identificacao"
+
+
+def synthetic_pdf(pages, name="benchmark.pdf"):
+    """
+    PDF com `pages` páginas em branco (o backend falso não lê o conteúdo). O nome vai nos
+    metadados para que cada arquivo tenha conteúdo próprio e não seja atendido pelo cache.
+    """
+    from pypdf import PdfWriter
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)  # A4
+    writer.add_metadata({"/Title": name})
+    pdf_file = io.BytesIO()
+    writer.write(pdf_file)
+    pdf_file.seek(0)
+    pdf_file.name = name
+    return pdf_file
+
+
+def percentile(values, fraction):
+    """Percentil pelo método do posto mais próximo (0 para lista vazia)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def run_benchmark(mode, pdf_files, prompt, fake_config, num_keys=4, requests_per_minute=60, max_retries=3):
+    """
+    Executa uma extração completa contra o Gemini simulado, com gerenciador de chaves,
+    roteador e cache isolados: não consome cota nem altera as estatísticas globais.
+
+    Args:
+        mode: "single", "batch" ou "chunked" (ver BENCHMARK_MODES)
+        pdf_files: Arquivos (BytesIO com `name`) a extrair
+        prompt: Prompt de extração (no modo "chunked", o de extintores)
+        fake_config: AI.fake_gemini.FakeGeminiConfig com latência e taxas de erro
+
+    Returns:
+        dict: documentos, sucessos, tempo total, vazão (documentos/min), latência p50/p95
+        das requisições, desfechos (ok/429/JSON malformado), uso por chave e por modelo
+    """
+    if mode not in BENCHMARK_MODES:
+        raise ValueError(f"Modo de benchmark desconhecido: {mode}")
+
+    backend = FakeGeminiBackend(fake_config)
+    keys = [f"fake-key-{i + 1:02d}" for i in range(num_keys)]
+    key_manager = APIKeyManager(keys=keys, config={
+        "max_retries": max_retries,
+        "retry_delay_seconds": 0.1,
+        "requests_per_minute": requests_per_minute,
+        "cooldown_minutes": 0.1,
+        "stats_path": None,
+    })
+    router = ModelRouter("fake-flash", "fake-pro", DEFAULT_COMPLEXITY_THRESHOLD,
+                         DEFAULT_MIN_CHARS_PER_PAGE, DEFAULT_MAX_FAST_ERROR_RATE)
+
+    from AI.api_Operation import PDFQA
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Cache vazio a cada execução: todas as requisições chegam ao backend
+        cache = ExtractionCache(cache_dir, ttl_seconds=3600, max_size_bytes=50 * 1024 * 1024)
+        pdf_qa = PDFQA(backend=backend, key_manager=key_manager, router=router, extraction_cache=cache)
+        pdf_qa.use_local_extraction = False
+        # Os avisos por documento do fluxo real não devem aparecer na página do benchmark
+        pdf_qa.show_messages = False
+
+        start = time.perf_counter()
+        if mode == "batch":
+            results = [data for _, _, data, _ in pdf_qa.extract_structured_data_batch(pdf_files, prompt)]
+        elif mode == "chunked":
+            results = [pdf_qa.extract_structured_data_chunked(f, prompt, CHUNKED_LIST_KEY, CHUNKED_ID_FIELD)
+                       for f in pdf_files]
+        else:
+            results = [pdf_qa.extract_structured_data(f, prompt) for f in pdf_files]
+        wall_seconds = time.perf_counter() - start
+
+    calls = list(backend.calls)
+    latencies = [call["seconds"] for call in calls]
+    calls_per_key = Counter(call["api_key"] for call in calls)
+    # Uso de cada chave frente ao RPM disponível durante a execução
+    rpm_capacity = requests_per_minute * max(wall_seconds, 1e-9) / 60
+    report = {
+        "mode": mode,
+        "documents": len(pdf_files),
+        "successes": sum(data is not None for data in results),
+        "wall_seconds": wall_seconds,
+        "throughput_per_minute": len(pdf_files) / wall_seconds * 60 if wall_seconds else 0.0,
+        "requests": len(calls),
+        "latency_p50": percentile(latencies, 0.50),
+        "latency_p95": percentile(latencies, 0.95),
+        "outcomes": dict(Counter(call["outcome"] for call in calls)),
+        "calls_per_model": dict(Counter(call["model"] for call in calls)),
+        "key_utilization": {
+            key: {"requests": calls_per_key.get(key, 0), "rpm_share": calls_per_key.get(key, 0) / rpm_capacity}
+            for key in keys
+        },
+    }
+    logger.info(f"Benchmark {mode}: {report['documents']} documento(s) em {wall_seconds:.1f}s, "
+                f"p50 {report['latency_p50']:.2f}s, p95 {report['latency_p95']:.2f}s")
+    return report
@@ -0,0 +1,38 @@
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Instância global (singleton), criada apenas na primeira requisição de IA
+_pdf_qa = None
+_lock = threading.Lock()
+
+
+def get_pdf_qa():
+    """
+    Retorna o cliente PDFQA compartilhado pelo processo.
+
+    A construção do PDFQA importa o SDK do Gemini e prepara o backend, o roteador
+    de modelos e o cache de extrações; por isso ela só acontece quando a primeira
+    requisição de IA é feita, e não ao importar as páginas. Chaves e modelos não são
+    criados aqui: cada requisição reserva a sua chave e o backend monta o modelo dela.
+    """
+    global _pdf_qa
+    if _pdf_qa is None:
+        with _lock:
+            if _pdf_qa is None:
+                from AI.api_Operation import PDFQA
+                _pdf_qa = PDFQA()
+                logger.info("Cliente de IA (PDFQA) inicializado")
+    return _pdf_qa
+
+
+class LazyPDFQA:
+    """Fachada com a mesma interface do PDFQA que delega ao cliente compartilhado."""
+
+    def __getattr__(self, name):
+        return getattr(get_pdf_qa(), name)
+
+
+# Pode ser importado no nível de módulo sem custo: nada é criado até o primeiro uso
+pdf_qa = LazyPDFQA()
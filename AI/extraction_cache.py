@@ -0,0 +1,146 @@
+import streamlit as st
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Configuráveis em st.secrets["ai_cache"]
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "isf_ai_extractions")
+DEFAULT_TTL_HOURS = 24 * 7
+DEFAULT_MAX_SIZE_MB = 200
+
+
+def content_hash(data):
+    """SHA-256 (hex) de bytes ou texto."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def extraction_key(pdf_bytes, prompt, model_name):
+    """Chave endereçada pelo conteúdo: mesmo PDF + mesmo prompt + mesmo modelo = mesma extração."""
+    return content_hash(f"{content_hash(pdf_bytes)}:{content_hash(prompt)}:{model_name}")
+
+
+class ExtractionCache:
+    """
+    Cache persistente em disco dos resultados de extração da IA, um arquivo JSON por
+    chave. Sobrevive a reinícios do processo e é compartilhado entre sessões. Entradas
+    expiram após `ttl_seconds`; quando o diretório passa de `max_size_bytes`, as
+    entradas usadas há mais tempo são removidas primeiro.
+    """
+
+    def __init__(self, cache_dir, ttl_seconds, max_size_bytes):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = max_size_bytes
+        self._lock = threading.Lock()
+        self.metrics = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Retorna o resultado armazenado ou None (ausente, expirado ou corrompido)."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            if time.time() - entry["created_at"] > self.ttl_seconds:
+                os.remove(path)
+                entry = None
+            else:
+                os.utime(path)  # Marca como usada recentemente (ordem de remoção)
+        except (OSError, ValueError, KeyError):
+            entry = None
+
+        with self._lock:
+            self.metrics["hits" if entry else "misses"] += 1
+        return entry["data"] if entry else None
+
+    def set(self, key, data, model_name=None):
+        entry = {"created_at": time.time(), "model": model_name, "data": data}
+        path = self._path(key)
+        try:
+            # Escrita atômica: outra sessão nunca lê um arquivo pela metade
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Falha ao gravar extração no cache: {e}")
+            return
+        with self._lock:
+            self.metrics["stores"] += 1
+        self._enforce_size_limit()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _enforce_size_limit(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_size_bytes:
+            return
+        evicted = 0
+        for _, size, name in sorted(entries):
+            if total <= self.max_size_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        with self._lock:
+            self.metrics["evictions"] += evicted
+
+    def clear(self):
+        for _, _, name in self._entries():
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def stats(self):
+        entries = self._entries()
+        with self._lock:
+            lookups = self.metrics["hits"] + self.metrics["misses"]
+            return dict(self.metrics, entries=len(entries),
+                        size_bytes=sum(size for _, size, _ in entries),
+                        hit_rate=self.metrics["hits"] / lookups if lookups else 0.0)
+
+
+# Instância global (singleton)
+_extraction_cache = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache():
+    """Retorna o cache de extrações do processo, criado na primeira chamada."""
+    global _extraction_cache
+    if _extraction_cache is None:
+        with _extraction_cache_lock:
+            if _extraction_cache is None:
+                config = st.secrets.get("ai_cache", {})
+                _extraction_cache = ExtractionCache(
+                    cache_dir=config.get("dir", DEFAULT_CACHE_DIR),
+                    ttl_seconds=float(config.get("ttl_hours", DEFAULT_TTL_HOURS)) * 3600,
+                    max_size_bytes=int(float(config.get("max_size_mb", DEFAULT_MAX_SIZE_MB)) * 1024 * 1024),
+                )
+    return _extraction_cache
@@ -0,0 +1,98 @@
+from utils.prompts import get_prompt_kind
+
+# Identificadores podem vir como texto ou número, mas não vazios/nulos
+_ID = {"type": ["string", "number"]}
+
+
+def _list_schema(list_key, id_field, **item_properties):
+    return {
+        "type": "object",
+        "required": [list_key],
+        "properties": {
+            list_key: {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "required": [id_field],
+                    "properties": {id_field: _ID, **item_properties},
+                },
+            },
+        },
+    }
+
+
+# JSON Schema (subconjunto: type, required, properties, items) da saída de cada prompt de
+# utils/prompts.py, pela chave de get_prompt_kind. Só o essencial para o registro ser útil:
+# campos opcionais ausentes continuam virando null/"N/A" nas telas.
+EXTRACTION_SCHEMAS = {
+    "extintores": _list_schema("extintores", "numero_identificacao"),
+    "mangueiras": _list_schema("mangueiras", "id_mangueira"),
+    "abrigos": _list_schema("abrigos", "id_abrigo", itens={"type": "object"}),
+    "scbas": _list_schema("scbas", "numero_serie_equipamento"),
+    "laudo": {
+        "type": "object",
+        "required": ["laudo"],
+        "properties": {
+            "laudo": {
+                "type": "object",
+                "required": ["data_ensaio", "resultado_geral"],
+                "properties": {"cilindros": {"type": "array", "items": _ID}},
+            },
+        },
+    },
+    "calibracao": {
+        "type": "object",
+        "required": ["calibracao"],
+        "properties": {
+            "calibracao": {
+                "type": "object",
+                "required": ["numero_serie", "data_calibracao"],
+                "properties": {"numero_serie": _ID, "resultados_detalhados": {"type": ["object", "null"]}},
+            },
+        },
+    },
+}
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def get_schema_for_prompt(prompt):
+    """Schema da saída esperada para o prompt (None para prompts sem schema)."""
+    return EXTRACTION_SCHEMAS.get(get_prompt_kind(prompt))
+
+
+def validate(data, schema, path="$"):
+    """
+    Valida `data` contra o subconjunto de JSON Schema usado acima.
+
+    Returns:
+        list: mensagens de erro (vazia se válido)
+    """
+    types = schema.get("type")
+    if types:
+        types = [types] if isinstance(types, str) else types
+        # bool é subclasse de int em Python, mas não é número em JSON
+        if not any(isinstance(data, _TYPES[t]) and not (t in ("number", "integer") and isinstance(data, bool))
+                   for t in types):
+            return [f"{path}: esperado {' ou '.join(types)}"]
+
+    errors = []
+    if isinstance(data, dict):
+        for field in schema.get("required", []):
+            if field not in data:
+                errors.append(f"{path}: campo obrigatório '{field}' ausente")
+        for field, sub_schema in schema.get("properties", {}).items():
+            if field in data:
+                errors.extend(validate(data[field], sub_schema, f"{path}.{field}"))
+    if isinstance(data, list) and "items" in schema:
+        for index, item in enumerate(data):
+            errors.extend(validate(item, schema["items"], f"{path}[{index}]"))
+    return errors
@@ -0,0 +1,183 @@
+import io
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class FakeRateLimitError(Exception):
+    """Simula o erro 429 da API (a mensagem aciona o cooldown do APIKeyManager)."""
+
+
+class FakeGeminiConfig:
+    """
+    Comportamento do substituto local do Gemini. Em st.secrets:
+
+        [gemini_config]
+        backend = "fake"
+        [gemini_config.fake]
+        latency_seconds = 1.5
+        rate_limit_rate = 0.1
+
+    `canned_responses` mapeia o tipo de prompt (utils.prompts.get_prompt_kind) para a
+    resposta; sem entrada, usa o exemplo de JSON do próprio prompt.
+    """
+
+    def __init__(self, latency_seconds=1.0, latency_jitter=0.3, seconds_per_page=0.0, rate_limit_rate=0.0,
+                 malformed_json_rate=0.0, tokens_per_request=2000, canned_responses=None, seed=None):
+        self.latency_seconds = float(latency_seconds)
+        self.latency_jitter = float(latency_jitter)  # variação relativa (+/-) da latência
+        self.seconds_per_page = float(seconds_per_page)  # latência extra por página do PDF
+        self.rate_limit_rate = float(rate_limit_rate)  # fração de requisições que falham com 429
+        self.malformed_json_rate = float(malformed_json_rate)  # fração de respostas com JSON truncado
+        self.tokens_per_request = int(tokens_per_request)
+        self.canned_responses = dict(canned_responses or {})
+        self.seed = seed
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**dict(values))
+
+
+class FakeUsage:
+    def __init__(self, total_token_count):
+        self.total_token_count = total_token_count
+
+
+class FakeResponse:
+    """Resposta com `text` e `usage_metadata`; iterável em trechos quando pedida com stream=True."""
+
+    def __init__(self, text, tokens, chunk_size=None, chunk_delay=0.0):
+        self.text = text
+        self.usage_metadata = FakeUsage(tokens)
+        self._chunk_size = chunk_size
+        self._chunk_delay = chunk_delay
+
+    def __iter__(self):
+        size = self._chunk_size or len(self.text) or 1
+        for start in range(0, len(self.text), size):
+            if start:
+                time.sleep(self._chunk_delay)
+            yield FakeResponse(self.text[start:start + size], 0)
+
+
+def _example_json(prompt):
+    """Exemplo de saída embutido no prompt (do primeiro '{' ao último '}'), se for JSON válido."""
+    start, end = prompt.find("{"), prompt.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        return json.loads(prompt[start:end + 1])
+    except ValueError:
+        return None
+
+
+class FakeGenerativeModel:
+    def __init__(self, backend, model_name, api_key):
+        self.backend = backend
+        self.model_name = model_name
+        self.api_key = api_key
+
+    def generate_content(self, contents, generation_config=None, stream=False):
+        return self.backend.generate(self, contents, stream)
+
+
+class FakeGeminiBackend:
+    """
+    Substituto local do Gemini, com a mesma interface de AI.gemini_backend.GeminiBackend:
+    latência, taxa de 429 e JSON malformado configuráveis, e respostas prontas por tipo de
+    prompt. Cada chamada fica registrada em `calls` (ver AI.benchmark).
+    """
+
+    name = "fake"
+    PAGE_BYTES = 50_000  # tamanho médio de uma página, se o pypdf não estiver instalado
+
+    def __init__(self, config=None):
+        self.config = config or FakeGeminiConfig()
+        self.calls = []
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._configured_key = None
+
+    # --- Interface do backend ---
+
+    def configure(self, api_key):
+        self._configured_key = api_key
+
+    def model(self, model_name, api_key=None):
+        return FakeGenerativeModel(self, model_name, api_key)
+
+    def json_generation_config(self):
+        return None
+
+    def upload_file(self, pdf_bytes, display_name, api_key=None):
+        digest = hashlib.sha256(pdf_bytes).hexdigest()[:16]
+        return f"fake://files/{digest}", f"files/{digest}"
+
+    def cache_model_id(self, model_name):
+        return f"fake:{model_name}"
+
+    # --- Simulação ---
+
+    def _count_pages(self, pdf_bytes):
+        try:
+            from pypdf import PdfReader
+            return len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+        except Exception:
+            return max(len(pdf_bytes) // self.PAGE_BYTES, 1)
+
+    def _split_contents(self, contents):
+        """Texto do prompt e total de páginas dos PDFs enviados inline."""
+        texts, pages = [], 0
+        for part in contents:
+            if isinstance(part, str):
+                texts.append(part)
+            elif isinstance(part, dict) and "text" in part:
+                texts.append(part["text"])
+            elif isinstance(part, dict) and "data" in part:
+                pages += self._count_pages(part["data"])
+        return "\n".join(texts), pages
+
+    def _response_text(self, prompt):
+        from utils.prompts import get_prompt_kind
+        kind = get_prompt_kind(prompt)
+        canned = self.config.canned_responses.get(kind)
+        if canned is None:
+            canned = _example_json(prompt)
+        if canned is None:
+            canned = {kind: []} if kind else {"resposta": "Resposta simulada."}
+        return canned if isinstance(canned, str) else json.dumps(canned, ensure_ascii=False)
+
+    def generate(self, model, contents, stream=False):
+        config = self.config
+        prompt, pages = self._split_contents(contents)
+        with self._lock:
+            jitter = 1 + self._random.uniform(-config.latency_jitter, config.latency_jitter)
+            rate_limited = self._random.random() < config.rate_limit_rate
+            malformed = not rate_limited and self._random.random() < config.malformed_json_rate
+        latency = max((config.latency_seconds + pages * config.seconds_per_page) * jitter, 0.0)
+        api_key = model.api_key or self._configured_key
+
+        start = time.perf_counter()
+        time.sleep(latency)
+        outcome = "rate_limited" if rate_limited else "malformed" if malformed else "ok"
+        with self._lock:
+            self.calls.append({"api_key": api_key, "model": model.model_name, "seconds": time.perf_counter() - start,
+                               "outcome": outcome, "at": time.perf_counter()})
+        if rate_limited:
+            raise FakeRateLimitError("429 Resource has been exhausted (e.g. check quota). [simulado]")
+
+        text = self._response_text(prompt)
+        if malformed:
+            text = text[:max(len(text) // 2, 1)]  # JSON truncado, como em respostas cortadas
+        if stream:
+            return FakeResponse(text, config.tokens_per_request, chunk_size=40, chunk_delay=0.02)
+        return FakeResponse(text, config.tokens_per_request)
+
+    def reset(self):
+        with self._lock:
+            self.calls = []
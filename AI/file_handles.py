@@ -0,0 +1,96 @@
+import streamlit as st
+import time
+import hashlib
+import logging
+import threading
+
+from AI.extraction_cache import content_hash
+from AI.gemini_backend import get_gemini_backend
+
+logger = logging.getLogger(__name__)
+
+# O File API do Gemini guarda arquivos por 48h; a margem evita usar um handle prestes a expirar.
+# Configurável em st.secrets["gemini_config"]["file_handle_ttl_hours"].
+DEFAULT_FILE_HANDLE_TTL_HOURS = 46
+
+
+def _key_id(api_key):
+    # Arquivos enviados pertencem ao projeto da chave usada no upload
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class FileHandleCache:
+    """
+    Handles de PDFs já enviados ao File API, por (hash do conteúdo, chave API).
+    Perguntas seguintes sobre os mesmos documentos referenciam o arquivo pela URI em
+    vez de reenviar os bytes. Compartilhado por todas as sessões do processo.
+    """
+
+    def __init__(self, ttl_seconds):
+        self.ttl_seconds = ttl_seconds
+        self._handles = {}
+        self._lock = threading.Lock()
+        self.metrics = {"hits": 0, "uploads": 0, "upload_failures": 0}
+
+    def _get(self, digest, api_key):
+        with self._lock:
+            handle = self._handles.get((digest, _key_id(api_key)))
+            if handle and handle["expires_at"] > time.time():
+                self.metrics["hits"] += 1
+                return handle
+            return None
+
+    def _upload(self, pdf_bytes, api_key, display_name, backend):
+        # Enviado pelo cliente da mesma chave sob a qual o handle fica guardado
+        uri, name = backend.upload_file(pdf_bytes, display_name, api_key=api_key)
+        return {"uri": uri, "name": name, "expires_at": time.time() + self.ttl_seconds}
+
+    def part_for(self, pdf_bytes, api_key, display_name="documento.pdf", backend=None):
+        """
+        Parte de conteúdo para generate_content: referência ao arquivo já enviado (enviando
+        na primeira vez) ou, se o upload falhar, os bytes inline como antes.
+        """
+        digest = content_hash(pdf_bytes)
+        handle = self._get(digest, api_key) if api_key else None
+        if handle is None and api_key:
+            try:
+                handle = self._upload(pdf_bytes, api_key, display_name, backend or get_gemini_backend())
+            except Exception as e:
+                logger.warning(f"Upload de '{display_name}' ao File API falhou; enviando inline: {e}")
+                with self._lock:
+                    self.metrics["upload_failures"] += 1
+            else:
+                with self._lock:
+                    self._handles[(digest, _key_id(api_key))] = handle
+                    self.metrics["uploads"] += 1
+        if handle is None:
+            return {"mime_type": "application/pdf", "data": pdf_bytes}
+        return {"file_data": {"mime_type": "application/pdf", "file_uri": handle["uri"]}}
+
+    def invalidate(self, api_key):
+        """Descarta os handles de uma chave (ex.: após erro que pode indicar arquivo removido)."""
+        if not api_key:
+            return
+        key_id = _key_id(api_key)
+        with self._lock:
+            for handle_key in [k for k in self._handles if k[1] == key_id]:
+                del self._handles[handle_key]
+
+    def stats(self):
+        with self._lock:
+            return dict(self.metrics, handles=len(self._handles))
+
+
+# Instância global (singleton)
+_file_handle_cache = None
+_file_handle_cache_lock = threading.Lock()
+
+
+def get_file_handle_cache():
+    global _file_handle_cache
+    if _file_handle_cache is None:
+        with _file_handle_cache_lock:
+            if _file_handle_cache is None:
+                ttl_hours = st.secrets.get("gemini_config", {}).get("file_handle_ttl_hours", DEFAULT_FILE_HANDLE_TTL_HOURS)
+                _file_handle_cache = FileHandleCache(ttl_seconds=float(ttl_hours) * 3600)
+    return _file_handle_cache
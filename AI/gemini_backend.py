@@ -0,0 +1,91 @@
+import streamlit as st
+import io
+import threading
+
+import google.generativeai as genai
+
+# O SDK só expõe a chave global (genai.configure). Os clientes por chave em model() e
+# _file_client() usam detalhes internos estáveis em toda a série 0.8 (GenerativeModel._client,
+# preenchido só se ainda for None, e client._ClientManager), conferidos de 0.8.0 a 0.8.6:
+# a versão fica presa a essa série em requirements.txt. Ao atualizar, confira os dois pontos.
+
+
+class GeminiBackend:
+    """
+    Ponto único de criação de modelos e uploads do Gemini. O pipeline de IA (PDFQA,
+    AI.batch_extraction, AI.file_handles) só fala com o backend, o que permite trocar a
+    API real pelo substituto local de AI.fake_gemini em testes e benchmarks.
+    """
+
+    name = "gemini"
+
+    def __init__(self):
+        self._file_clients = {}
+        self._file_clients_lock = threading.Lock()
+
+    def configure(self, api_key):
+        genai.configure(api_key=api_key)
+
+    def model(self, model_name, api_key=None):
+        """Modelo com a chave global (genai.configure) ou, com `api_key`, um cliente próprio da chave."""
+        model = genai.GenerativeModel(model_name)
+        if api_key:
+            # Independente do genai.configure global, que só comporta uma chave por vez. O SDK
+            # usa `_client` se já estiver definido (ver o aviso no topo do módulo)
+            import google.ai.generativelanguage as glm
+            model._client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+        return model
+
+    def json_generation_config(self):
+        return genai.types.GenerationConfig(response_mime_type="application/json")
+
+    def _file_client(self, api_key):
+        # Cliente do File API próprio da chave, como o dos modelos em model(); _ClientManager
+        # é o que genai.configure usa internamente (ver o aviso no topo do módulo)
+        with self._file_clients_lock:
+            if api_key not in self._file_clients:
+                from google.generativeai.client import _ClientManager
+                clients = _ClientManager()
+                clients.configure(api_key=api_key)
+                self._file_clients[api_key] = clients.get_default_client("file")
+            return self._file_clients[api_key]
+
+    def upload_file(self, pdf_bytes, display_name, api_key=None):
+        """
+        Envia o PDF ao File API; retorna (uri, nome do arquivo). Com `api_key`, o arquivo
+        pertence ao projeto dessa chave, e só requisições com ela podem referenciá-lo.
+        """
+        if not api_key:
+            uploaded = genai.upload_file(io.BytesIO(pdf_bytes), mime_type="application/pdf", display_name=display_name)
+            return uploaded.uri, uploaded.name
+        uploaded = self._file_client(api_key).create_file(
+            path=io.BytesIO(pdf_bytes), mime_type="application/pdf", display_name=display_name
+        )
+        return uploaded.uri, uploaded.name
+
+    def cache_model_id(self, model_name):
+        """Modelo usado na chave do cache de extrações (backends falsos não podem colidir com o real)."""
+        return model_name
+
+
+# Instância global (singleton)
+_gemini_backend = None
+_gemini_backend_lock = threading.Lock()
+
+
+def get_gemini_backend():
+    """
+    Backend configurado em st.secrets["gemini_config"]["backend"]: "gemini" (padrão) ou
+    "fake", para desenvolver sem consumir cota (ver AI.fake_gemini).
+    """
+    global _gemini_backend
+    if _gemini_backend is None:
+        with _gemini_backend_lock:
+            if _gemini_backend is None:
+                config = st.secrets.get("gemini_config", {})
+                if config.get("backend", "gemini") == "fake":
+                    from AI.fake_gemini import FakeGeminiBackend, FakeGeminiConfig
+                    _gemini_backend = FakeGeminiBackend(FakeGeminiConfig.from_dict(config.get("fake", {})))
+                else:
+                    _gemini_backend = GeminiBackend()
+    return _gemini_backend
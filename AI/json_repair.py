@@ -0,0 +1,187 @@
+import re
+import json
+import logging
+
+from AI.extraction_schemas import get_schema_for_prompt, validate
+
+logger = logging.getLogger(__name__)
+
+# Quantos itens do fim de uma lista truncada podem ser descartados na tentativa de salvá-la
+MAX_SALVAGE_CUTS = 5
+# Respostas longas demais não são reenviadas inteiras no pedido de correção
+MAX_FIX_TEXT_CHARS = 60000
+
+REPAIR_TRAILING_COMMAS = "vírgulas sobrando removidas"
+REPAIR_CLOSED = "resposta truncada completada"
+REPAIR_SALVAGED = "resposta truncada: itens incompletos do final descartados"
+REPAIR_FOLLOW_UP = "JSON corrigido pela IA em nova consulta só de texto"
+
+
+class InvalidExtractionError(ValueError):
+    """A resposta da IA não pôde ser convertida em JSON válido para o schema do prompt."""
+
+    def __init__(self, raw_text, errors):
+        super().__init__(f"A IA não retornou JSON válido: {'; '.join(errors[:3])}")
+        self.raw_text = raw_text
+        self.errors = errors
+
+
+def _strip_to_json(text):
+    """Remove cercas de markdown e texto antes do primeiro '{' ou '['."""
+    fenced = re.search(r"```(?:json)?\s*(.*?)(?:```|$)", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    return text[min(starts):].strip() if starts else None
+
+
+def _scan(text):
+    """
+    Percorre o JSON (possivelmente truncado) fora de strings.
+
+    Returns:
+        tuple: (pilha de '{'/'[' ainda abertos, se terminou dentro de uma string,
+                posições logo após cada elemento completo de uma lista,
+                posição logo após o último valor completo)
+    """
+    stack, in_string, escape, cuts, complete = [], False, False, [], 0
+    for i, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+                complete = i + 1
+                if stack and stack[-1] == "[":
+                    cuts.append(i + 1)
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append(char)
+            complete = i + 1
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            complete = i + 1
+            if stack and stack[-1] == "[":
+                cuts.append(i + 1)
+        elif char == ",":
+            # A vírgula encerra números e literais (true/false/null), que não têm delimitador próprio
+            complete = i
+            if stack and stack[-1] == "[" and (not cuts or text[cuts[-1]:i].strip()):
+                cuts.append(i)
+    return stack, in_string, cuts, complete
+
+
+def _close(text):
+    """Fecha string, objetos e listas abertos, descartando chave ou vírgula pendurada no fim."""
+    stack, in_string, _, _ = _scan(text)
+    if in_string:
+        text += '"'
+    text = text.rstrip()
+    if stack and stack[-1] == "{":
+        # '"chave"' ou '"chave":' sem valor
+        text = re.sub(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$', r"\1", text)
+    text = re.sub(r"[\s,:]+$", "", text)
+    return text + "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+
+def _decode(text):
+    # raw_decode ignora texto depois do JSON (ex.: explicações da IA)
+    return json.JSONDecoder().raw_decode(text)[0]
+
+
+def parse_candidates(text):
+    """
+    Interpretações do texto em ordem de fidelidade: como veio, sem vírgulas sobrando e,
+    se estiver truncado, descartando itens incompletos do fim e, por último, fechando as
+    estruturas depois do último valor completo.
+
+    Yields:
+        tuple: (dados, lista de reparos aplicados)
+    """
+    candidate = _strip_to_json(text or "")
+    if candidate is None:
+        return
+    attempts = [(candidate, [])]
+    without_commas = re.sub(r",\s*([}\]])", r"\1", candidate)
+    comma_repairs = [REPAIR_TRAILING_COMMAS] if without_commas != candidate else []
+    if comma_repairs:
+        attempts.append((without_commas, comma_repairs))
+    stack, in_string, cuts, complete = _scan(without_commas)
+    if stack or in_string:
+        # Um valor cortado não pode ser completado: '"EXT-10' pode ser o EXT-1024. O item
+        # incompleto é descartado antes, e o fechamento só considera valores inteiros.
+        for cut in reversed(cuts[-MAX_SALVAGE_CUTS:]):
+            attempts.append((_close(without_commas[:cut]), comma_repairs + [REPAIR_SALVAGED]))
+        attempts.append((_close(without_commas[:complete]), comma_repairs + [REPAIR_CLOSED]))
+
+    seen = set()
+    for attempt, repairs in attempts:
+        if attempt in seen:
+            continue
+        seen.add(attempt)
+        try:
+            yield _decode(attempt), repairs
+        except ValueError:
+            continue
+
+
+def parse_extraction(text, prompt):
+    """
+    Primeira interpretação do texto válida para o schema do prompt.
+
+    Returns:
+        tuple: (dados ou None, reparos aplicados, erros de validação)
+    """
+    schema = get_schema_for_prompt(prompt)
+    fallback = None
+    for data, repairs in parse_candidates(text):
+        errors = validate(data, schema) if schema else []
+        if not errors:
+            return data, repairs, []
+        fallback = fallback or (data, repairs, errors)
+    return fallback or (None, [], ["o texto não contém JSON"])
+
+
+def fix_json_prompt(text, prompt, errors):
+    """Pedido só de texto para a IA corrigir a própria resposta, sem reenviar o PDF."""
+    schema = get_schema_for_prompt(prompt)
+    schema_text = f"\nJSON Schema esperado:\n{json.dumps(schema, ensure_ascii=False)}\n" if schema else ""
+    return (
+        "O texto abaixo deveria ser um JSON válido, mas apresenta estes problemas: "
+        f"{'; '.join(errors[:10])}.\n"
+        "Corrija-o: feche estruturas abertas, remova o que não for JSON e mantenha todos os valores "
+        "já presentes, sem inventar dados (use null para o que faltar). Retorne APENAS o JSON corrigido.\n"
+        f"{schema_text}\nTexto:\n{text[:MAX_FIX_TEXT_CHARS]}"
+    )
+
+
+def extract_with_repair(text, prompt, ask=None):
+    """
+    Converte a resposta da IA em dados válidos para o schema do prompt, reparando o JSON
+    localmente e, se não bastar, pedindo a correção à IA com `ask(pedido) -> texto`.
+
+    Returns:
+        tuple: (dados, reparos aplicados)
+
+    Raises:
+        InvalidExtractionError: se nem o reparo nem a nova consulta produzirem JSON válido
+    """
+    data, repairs, errors = parse_extraction(text, prompt)
+    if data is not None and not errors:
+        if repairs:
+            logger.info(f"JSON da IA reparado localmente: {', '.join(repairs)}")
+        return data, repairs
+    if ask is None:
+        raise InvalidExtractionError(text, errors)
+
+    logger.warning(f"JSON da IA inválido ({'; '.join(errors[:3])}); pedindo correção só de texto")
+    fixed_text = ask(fix_json_prompt(text, prompt, errors))
+    data, fixed_repairs, fixed_errors = parse_extraction(fixed_text, prompt)
+    if data is not None and not fixed_errors:
+        return data, [REPAIR_FOLLOW_UP] + fixed_repairs
+    raise InvalidExtractionError(text, fixed_errors or errors)
@@ -0,0 +1,388 @@
+import streamlit as st
+import io
+import re
+import time
+import logging
+import unicodedata
+from abc import ABC, abstractmethod
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+# Abaixo desta confiança o resultado local é descartado e a IA é chamada.
+# Configurável em st.secrets["local_extraction"]["min_confidence"].
+DEFAULT_MIN_CONFIDENCE = 0.9
+
+# Campos de um item preenchidos por estimativa, não lidos do documento (ex.: data calculada
+# a partir de outra). Não contam para a confiança e são removidos antes de devolver os dados.
+ESTIMATED_FIELDS_KEY = "_campos_estimados"
+
+
+def normalize_text(value):
+    """Maiúsculas, sem acentos e com espaços simples, para comparar cabeçalhos e rótulos."""
+    text = unicodedata.normalize("NFKD", str(value or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", text).strip().upper()
+
+
+def parse_date(value):
+    """'08/10/2024' -> '2024-10-08'; '08 / 2025' (mês/ano) -> '2025-08-01'; outros -> None."""
+    text = str(value or "").strip()
+    match = re.search(r"(\d{1,2})\s*[/.-]\s*(\d{1,2})\s*[/.-]\s*(\d{2,4})", text)
+    if match:
+        day, month, year = (int(g) for g in match.groups())
+    else:
+        match = re.search(r"(\d{1,2})\s*/\s*(\d{4})", text)
+        if not match:
+            return None
+        day, month, year = 1, int(match.group(1)), int(match.group(2))
+    if year < 100:
+        year += 2000
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+def shift_years(iso_date, years):
+    if not iso_date:
+        return None
+    year, month, day = (int(part) for part in iso_date.split("-"))
+    if month == 2 and day == 29:
+        day = 28
+    return date(year + years, month, day).isoformat()
+
+
+def search(pattern, text):
+    """Primeiro grupo da regex no texto (normalizado ou não), já sem espaços nas pontas."""
+    match = re.search(pattern, text, re.IGNORECASE)
+    return match.group(1).strip() if match else None
+
+
+class ParsedDocument:
+    """Texto e tabelas de um PDF, extraídos uma única vez com pdfplumber."""
+
+    def __init__(self, pages_text, tables):
+        self.text = "\n".join(pages_text)
+        # Inclui as células das tabelas: nem todo PDF repete o texto delas em extract_text
+        cells = " ".join(str(cell) for table in tables for row in table for cell in row if cell)
+        self.normalized_text = normalize_text(f"{self.text} {cells}")
+        self.lines = [line.strip() for line in self.text.splitlines() if line.strip()]
+        self.tables = tables
+
+
+def read_document(pdf_bytes):
+    """Retorna o ParsedDocument ou None se o pdfplumber não estiver instalado ou o PDF não tiver texto."""
+    try:
+        import pdfplumber
+    except ImportError:
+        logger.info("pdfplumber não instalado - extração local desativada")
+        return None
+    pages_text, tables = [], []
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        for page in pdf.pages:
+            pages_text.append(page.extract_text() or "")
+            tables.extend(page.extract_tables() or [])
+    if not any(text.strip() for text in pages_text):
+        return None  # PDF escaneado: só a IA consegue ler
+    return ParsedDocument(pages_text, tables)
+
+
+class VendorTemplate(ABC):
+    """
+    Modelo de layout fixo de um fornecedor. `markers` (já normalizados) precisam aparecer
+    no texto para o modelo ser tentado; `parse` retorna o mesmo JSON do prompt
+    correspondente em utils/prompts.py e `required_fields` define a confiança. Itens com
+    valores estimados os listam em ESTIMATED_FIELDS_KEY.
+    """
+
+    name = ""
+    schema_key = ""
+    markers = ()
+    required_fields = ()
+
+    def matches(self, document):
+        return all(marker in document.normalized_text for marker in self.markers)
+
+    @abstractmethod
+    def parse(self, document):
+        """Dados no formato do prompt correspondente em utils/prompts.py."""
+
+    def _items(self, data):
+        items = data.get(self.schema_key)
+        return items if isinstance(items, list) else [items] if items else []
+
+    def confidence(self, data):
+        """Fração dos itens com todos os campos obrigatórios lidos do documento (estimativas não contam)."""
+        items = self._items(data)
+        if not items:
+            return 0.0
+        complete = sum(
+            all(item.get(field) not in (None, "") and field not in item.get(ESTIMATED_FIELDS_KEY, ())
+                for field in self.required_fields)
+            for item in items
+        )
+        return complete / len(items)
+
+    def strip_estimate_marks(self, data):
+        for item in self._items(data):
+            if isinstance(item, dict):
+                item.pop(ESTIMATED_FIELDS_KEY, None)
+        return data
+
+
+class TableTemplate(VendorTemplate):
+    """
+    Modelo para relatórios em tabela: `columns` mapeia cada campo para trechos do texto
+    do cabeçalho (normalizados). Cada célula de cabeçalho fica com o campo do trecho mais
+    longo que ela contém, e as tabelas sem cabeçalho com o mesmo número de colunas são
+    tratadas como continuação (tabelas quebradas entre páginas).
+    """
+
+    columns = {}
+    id_field = ""
+    min_header_matches = 3
+
+    def _header_map(self, row):
+        mapping = {}
+        for position, cell in enumerate(row):
+            header = normalize_text(cell)
+            best = max(
+                ((len(keyword), field) for field, keywords in self.columns.items()
+                 for keyword in keywords if keyword in header),
+                default=None
+            )
+            if best and best[1] not in mapping:
+                mapping[best[1]] = position
+        return mapping
+
+    def rows(self, document):
+        mapping, width = None, None
+        for table in document.tables:
+            start = 0
+            for i, row in enumerate(table[:3]):
+                candidate = self._header_map(row)
+                if len(candidate) >= self.min_header_matches and self.id_field in candidate:
+                    mapping, width, start = candidate, len(row), i + 1
+                    break
+            else:
+                if mapping is None or len(table[0]) != width:
+                    continue
+            for row in table[start:]:
+                item = {field: (row[pos] or "").strip() if pos < len(row) else ""
+                        for field, pos in mapping.items()}
+                if item.get(self.id_field):
+                    yield item
+
+    def parse(self, document):
+        items = [self.build_item(row, document) for row in self.rows(document)]
+        return {self.schema_key: [item for item in items if item]}
+
+    def build_item(self, row, document):
+        return row
+
+
+class ExtinguisherServiceReport(TableTemplate):
+    """Relatórios de manutenção de extintores com a coluna 'N° do cilindro / recipiente'."""
+
+    name = "relatorio_extintores_tabela"
+    schema_key = "extintores"
+    markers = ("SELO INMETRO", "CILINDRO")
+    id_field = "numero_identificacao"
+    required_fields = ("numero_identificacao", "tipo_servico", "data_servico", "aprovado_inspecao")
+    columns = {
+        "numero_identificacao": ("N DO CILINDRO", "Nº DO CILINDRO", "N° DO CILINDRO", "RECIPIENTE", "EXTIN"),
+        "numero_selo_inmetro": ("SELO INMETRO", "CASA DA MOEDA"),
+        "tipo_agente": ("TIPO",),
+        "capacidade": ("CAPAC",),
+        "marca_fabricante": ("FABRIC. OU MARCA", "MARCA"),
+        "ano_fabricacao": ("ANO FABRIC",),
+        "nivel_manutencao": ("MANUTENCAO NIVEL",),
+        "nivel_inspecao": ("NIVEL DA INSPECAO",),
+        "status": ("STATUS", "INSPECAO FINAL"),
+        "observacoes_gerais": ("ALTERACOES", "PECA"),
+    }
+
+    def build_item(self, row, document):
+        text = document.text
+        if row.get("nivel_manutencao", "").strip() == "3":
+            tipo_servico = "Manutenção Nível 3"
+        elif row.get("nivel_manutencao", "").strip() == "2":
+            tipo_servico = "Manutenção Nível 2"
+        else:
+            tipo_servico = "Inspeção"
+        status = normalize_text(row.get("status"))
+        aprovado = "Não" if status in ("N/CONFORME", "NAO CONFORME", "R") else "Sim" if status in ("CONFORME", "A") else None
+        ano = row.get("ano_fabricacao", "")
+        if re.fullmatch(r"\d{2}", ano):
+            ano = f"20{ano}"
+        return {
+            "numero_identificacao": row["numero_identificacao"],
+            "numero_selo_inmetro": row.get("numero_selo_inmetro") or None,
+            "tipo_agente": row.get("tipo_agente") or None,
+            "capacidade": row.get("capacidade") or None,
+            "marca_fabricante": row.get("marca_fabricante") or None,
+            "ano_fabricacao": ano or None,
+            "tipo_servico": tipo_servico,
+            "data_servico": parse_date(search(r"Data\s+sa[ií]da[.\s]*:?\s*([\d/.-]+)", text) or ""),
+            "inspetor_responsavel": search(r"Respons[áa]vel\s+T[ée]cnico\s*:?\s*([^\n]+)", text),
+            "empresa_executante": document.lines[0] if document.lines else None,
+            "aprovado_inspecao": aprovado,
+            "observacoes_gerais": row.get("observacoes_gerais") or None,
+        }
+
+
+class HoseTestReport(TableTemplate):
+    """Certificados de inspeção de mangueiras (NBR 12779) com 'Resultado final' por linha."""
+
+    name = "certificado_mangueiras_nbr12779"
+    schema_key = "mangueiras"
+    markers = ("IDENTIFICACAO", "RESULTADO FINAL", "PROXIMA MANUTENCAO")
+    id_field = "id_mangueira"
+    required_fields = ("id_mangueira", "data_inspecao", "resultado")
+    columns = {
+        "item": ("ITEM",),
+        "id_mangueira": ("IDENTIFICACAO",),
+        "marca": ("FABRICANTE",),
+        "diametro": ("DIAMETRO",),
+        "tipo": ("TIPO",),
+        "comprimento": ("COMPRIMENTO",),
+        "ano_fabricacao": ("ANO DE FABRICACAO", "ANO FABRIC"),
+        "data_proximo_teste": ("PROXIMA MANUTENCAO",),
+        "resultado": ("RESULTADO FINAL",),
+    }
+    RESULTADOS = {"A": "Aprovado", "R": "Reprovado", "C": "Condenada"}
+
+    def build_item(self, row, document):
+        id_mangueira = row["id_mangueira"]
+        if normalize_text(id_mangueira) == "COND":
+            id_mangueira = f"COND-{row.get('item', '').strip()}"
+        proximo_teste = parse_date(row.get("data_proximo_teste"))
+        estimated = []
+        data_inspecao = parse_date(search(r"\bData\s+(\d{1,2}\s*/\s*\d{4})", document.text) or "")
+        if not data_inspecao and proximo_teste:
+            data_inspecao = shift_years(proximo_teste, -1)
+            estimated.append("data_inspecao")
+        # Sem a coluna, o prompt estima a fabricação 5 anos antes do próximo teste
+        ano = row.get("ano_fabricacao")
+        if not ano and proximo_teste:
+            ano = str(int(proximo_teste[:4]) - 5)
+            estimated.append("ano_fabricacao")
+        resultado = normalize_text(row.get("resultado"))
+        return {
+            "id_mangueira": id_mangueira,
+            "marca": row.get("marca") or None,
+            "diametro": (row.get("diametro") or "").replace('"', "").strip() or None,
+            "tipo": row.get("tipo") or None,
+            "comprimento": row.get("comprimento") or None,
+            "ano_fabricacao": ano or None,
+            "data_inspecao": data_inspecao,
+            "data_proximo_teste": proximo_teste,
+            "empresa_executante": document.lines[0] if document.lines else None,
+            "inspetor_responsavel": search(r"Respons[áa]vel\s+T[ée]cnico\s*:?\s*([^\n]+)", document.text),
+            "resultado": self.RESULTADOS.get(resultado[:1]) if resultado else None,
+            ESTIMATED_FIELDS_KEY: estimated,
+        }
+
+
+class AlmontCalibrationCertificate(VendorTemplate):
+    """Certificados de calibração de detectores multigás da Almont do Brasil."""
+
+    name = "certificado_calibracao_almont"
+    schema_key = "calibracao"
+    markers = ("ALMONT", "RESULTADO OBTIDO")
+    required_fields = ("numero_serie", "data_calibracao", "numero_certificado")
+    GASES = {"CH4": "LEL", "LEL": "LEL", "O2": "O2", "CO": "CO", "H2S": "H2S"}
+    MAX_ERROR_PERCENT = 5.0
+
+    def _results(self, document):
+        results, approved = {}, True
+        for table in document.tables:
+            header = [normalize_text(cell) for cell in table[0]] if table else []
+            if not any("GAS" in cell for cell in header) or not any("R.M" in cell for cell in header):
+                continue
+            col = {name: next((i for i, cell in enumerate(header) if name in cell), None)
+                   for name in ("GAS", "V.R", "R.M", "ERRO")}
+            for row in table[1:]:
+                gas = self.GASES.get(normalize_text(row[col["GAS"]]).replace(" ", ""))
+                if not gas:
+                    continue
+                results[gas] = {"referencia": (row[col["V.R"]] or "").strip(), "medido": (row[col["R.M"]] or "").strip()}
+                if col["ERRO"] is not None:
+                    error = re.sub(r"[^\d,.-]", "", row[col["ERRO"]] or "").replace(",", ".")
+                    try:
+                        approved &= abs(float(error)) < self.MAX_ERROR_PERCENT
+                    except ValueError:
+                        pass
+        return results, approved
+
+    def parse(self, document):
+        text = document.text
+        data_calibracao = parse_date(search(r"Data\s+da\s+Calibra[çc][ãa]o\s*:?\s*([\d/.-]+)", text) or "")
+        results, approved = self._results(document)
+        return {"calibracao": {
+            "numero_serie": search(r"N\.?\s*[º°o]?\s*de\s+S[ée]rie\s*:?\s*(\S+)", text),
+            "marca": search(r"Marca\s*:?\s*([^\n]+)", text),
+            "modelo": search(r"Modelo\s*:?\s*([^\n]+)", text),
+            "data_calibracao": data_calibracao,
+            "proxima_calibracao": shift_years(data_calibracao, 1),
+            "numero_certificado": search(r"N\s*[º°o]\s*(\d+\s*-\s*\d{4})", text),
+            "empresa_executante": search(r"(Almont[^\n]*)", text),
+            "tecnico_responsavel": search(r"T[ée]cnico\s+Executor\s*:?\s*([^\n]+)", text),
+            "resultado_geral": "Aprovado" if approved else "Reprovado",
+            "resultados_detalhados": results,
+        }}
+
+
+# Modelos registrados, tentados em ordem. Novos fornecedores: subclasse + register_template.
+TEMPLATES = []
+
+
+def register_template(template):
+    TEMPLATES.append(template)
+    return template
+
+
+register_template(ExtinguisherServiceReport())
+register_template(HoseTestReport())
+register_template(AlmontCalibrationCertificate())
+
+
+def try_local_extraction(pdf_bytes, prompt):
+    """
+    Tenta extrair o PDF sem IA, com o primeiro modelo de fornecedor que reconhecer o layout.
+
+    Returns:
+        tuple: (dados no formato do prompt, nome do modelo) ou (None, None) se nenhum modelo
+        se aplicar ou a confiança ficar abaixo do mínimo
+    """
+    from utils.prompts import get_prompt_kind
+    schema_key = get_prompt_kind(prompt)
+    candidates = [t for t in TEMPLATES if t.schema_key == schema_key]
+    if not candidates:
+        return None, None
+
+    start = time.perf_counter()
+    try:
+        document = read_document(pdf_bytes)
+    except Exception as e:
+        logger.warning(f"Falha ao ler o PDF localmente: {e}")
+        return None, None
+    if document is None:
+        return None, None
+
+    min_confidence = float(st.secrets.get("local_extraction", {}).get("min_confidence", DEFAULT_MIN_CONFIDENCE))
+    for template in candidates:
+        if not template.matches(document):
+            continue
+        try:
+            data = template.parse(document)
+        except Exception as e:
+            logger.warning(f"Modelo local '{template.name}' falhou: {e}")
+            continue
+        confidence = template.confidence(data)
+        logger.info(f"Modelo local '{template.name}': confiança {confidence:.0%} "
+                    f"em {(time.perf_counter() - start) * 1000:.0f} ms")
+        if confidence >= min_confidence:
+            return template.strip_estimate_marks(data), template.name
+    return None, None
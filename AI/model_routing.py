@@ -0,0 +1,202 @@
+import streamlit as st
+import io
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Configuráveis em st.secrets["model_routing"]
+DEFAULT_FAST_MODEL = "gemini-2.5-flash"
+DEFAULT_PRO_MODEL = "gemini-2.5-pro"
+DEFAULT_COMPLEXITY_THRESHOLD = 2.0  # acima disso o documento vai para o modelo pro
+DEFAULT_MIN_CHARS_PER_PAGE = 200  # abaixo disso a página é tratada como escaneada
+DEFAULT_MAX_FAST_ERROR_RATE = 0.2
+
+# Peso de cada tipo de prompt (utils.prompts.get_prompt_kind) na complexidade por página:
+# certificados de um equipamento são simples; relatórios em tabela com muitos itens, não.
+KIND_WEIGHTS = {
+    "calibracao": 0.5,
+    "laudo": 0.5,
+    "mangueiras": 1.0,
+    "extintores": 1.0,
+    "abrigos": 1.0,
+    "scbas": 1.0,
+}
+UNKNOWN_KIND_WEIGHT = 1.5
+SCANNED_PENALTY = 1.5  # sem camada de texto, o modelo precisa "ler" a imagem
+
+# Ajuste do limite pelas métricas: janela de resultados e passo de cada ajuste
+FEEDBACK_WINDOW = 20
+THRESHOLD_STEP = 0.1
+MIN_THRESHOLD_FACTOR, MAX_THRESHOLD_FACTOR = 0.25, 3.0
+
+FAST, PRO = "fast", "pro"
+
+
+def profile_document(pdf_bytes, sample_pages=3):
+    """
+    Páginas e densidade de texto (caracteres por página nas primeiras `sample_pages`).
+
+    Returns:
+        tuple: (páginas, caracteres por página) ou (None, None) se o pypdf não estiver
+        instalado ou o PDF não puder ser lido
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None, None
+    try:
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        pages = reader.pages
+        sample = [page.extract_text() or "" for page in pages[:sample_pages]]
+    except Exception as e:
+        logger.warning(f"Falha ao analisar o PDF para o roteamento de modelo: {e}")
+        return None, None
+    return len(pages), sum(len(text.strip()) for text in sample) / max(len(sample), 1)
+
+
+def count_pages(pdf_bytes):
+    """Número de páginas do PDF, ou None se o pypdf não estiver instalado ou não puder lê-lo."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    try:
+        return len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+    except Exception:
+        return None
+
+
+class ModelRouter:
+    """
+    Escolhe entre o modelo rápido e o pro pela complexidade estimada do documento
+    (páginas × peso do tipo de prompt × penalidade de PDF escaneado). Latência e erros
+    de cada rota ajustam o limite: erros demais no rápido mandam mais documentos ao pro;
+    o rápido saudável e bem mais ágil que o pro, em segundos por página (o pro recebe os
+    documentos maiores), recebe documentos maiores.
+    """
+
+    def __init__(self, fast_model, pro_model, threshold, min_chars_per_page, max_fast_error_rate):
+        self.models = {FAST: fast_model, PRO: pro_model}
+        self.base_threshold = threshold
+        self.threshold = threshold
+        self.min_chars_per_page = min_chars_per_page
+        self.max_fast_error_rate = max_fast_error_rate
+        self._lock = threading.Lock()
+        self._recent = {FAST: deque(maxlen=FEEDBACK_WINDOW), PRO: deque(maxlen=FEEDBACK_WINDOW)}
+        self._since_adjust = 0
+        self.metrics = {route: {"requests": 0, "errors": 0, "total_seconds": 0.0} for route in (FAST, PRO)}
+
+    def complexity(self, pdf_bytes, prompt):
+        from utils.prompts import get_prompt_kind
+        pages, chars_per_page = profile_document(pdf_bytes)
+        if pages is None:
+            return None
+        score = pages * KIND_WEIGHTS.get(get_prompt_kind(prompt), UNKNOWN_KIND_WEIGHT)
+        if chars_per_page < self.min_chars_per_page:
+            score *= SCANNED_PENALTY
+        return score
+
+    def choose(self, pdf_bytes, prompt):
+        """
+        Returns:
+            tuple: (rota, nome do modelo). Sem como estimar a complexidade, usa o pro.
+        """
+        score = self.complexity(pdf_bytes, prompt)
+        with self._lock:
+            route = PRO if score is None or score > self.threshold else FAST
+        logger.info(f"Roteamento: complexidade {score} (limite {self.threshold:.2f}) -> {self.models[route]}")
+        return route, self.models[route]
+
+    def fallback(self, route):
+        """Rota alternativa para a próxima tentativa após uma falha."""
+        other = PRO if route == FAST else FAST
+        return other, self.models[other]
+
+    def route_for_model(self, model_name):
+        return next((route for route, name in self.models.items() if name == model_name), None)
+
+    def record(self, route, seconds, success, pages=None):
+        """
+        Registra o resultado de uma requisição da rota e reavalia o limite a cada janela.
+        `pages` (páginas do documento enviado) permite comparar a latência das rotas por página.
+        """
+        if route not in self.models:
+            return
+        with self._lock:
+            metrics = self.metrics[route]
+            metrics["requests"] += 1
+            metrics["total_seconds"] += seconds
+            if not success:
+                metrics["errors"] += 1
+            self._recent[route].append((seconds, success, pages))
+            self._since_adjust += 1
+            if self._since_adjust >= FEEDBACK_WINDOW:
+                self._since_adjust = 0
+                self._adjust_threshold()
+
+    def _adjust_threshold(self):
+        # Chamado com self._lock adquirido
+        fast = self._recent[FAST]
+        if not fast:
+            return
+        fast_error_rate = sum(not ok for _, ok, _ in fast) / len(fast)
+        # Por página: o pro recebe os documentos maiores e seria sempre "mais lento" no total
+        fast_latency = _seconds_per_page(fast)
+        pro_latency = _seconds_per_page(self._recent[PRO])
+
+        if fast_error_rate > self.max_fast_error_rate:
+            factor = 1 - THRESHOLD_STEP
+        elif (fast_error_rate <= self.max_fast_error_rate / 2 and fast_latency and pro_latency
+              and pro_latency > 2 * fast_latency):
+            factor = 1 + THRESHOLD_STEP
+        else:
+            return
+        self.threshold = min(max(self.threshold * factor, self.base_threshold * MIN_THRESHOLD_FACTOR),
+                             self.base_threshold * MAX_THRESHOLD_FACTOR)
+        logger.info(f"Limite de complexidade ajustado para {self.threshold:.2f} "
+                    f"(erros no rápido: {fast_error_rate:.0%})")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "threshold": self.threshold,
+                "routes": {
+                    route: dict(
+                        model=self.models[route],
+                        requests=m["requests"],
+                        errors=m["errors"],
+                        avg_seconds=m["total_seconds"] / m["requests"] if m["requests"] else 0.0,
+                    ) for route, m in self.metrics.items()
+                },
+            }
+
+
+def _seconds_per_page(results):
+    """Latência média por página das requisições bem-sucedidas com páginas conhecidas, ou None."""
+    timed = [(seconds, pages) for seconds, ok, pages in results if ok and pages]
+    if not timed:
+        return None
+    return sum(seconds for seconds, _ in timed) / sum(pages for _, pages in timed)
+
+
+# Instância global (singleton)
+_model_router = None
+_model_router_lock = threading.Lock()
+
+
+def get_model_router():
+    global _model_router
+    if _model_router is None:
+        with _model_router_lock:
+            if _model_router is None:
+                config = st.secrets.get("model_routing", {})
+                _model_router = ModelRouter(
+                    fast_model=config.get("fast_model", DEFAULT_FAST_MODEL),
+                    pro_model=config.get("pro_model", DEFAULT_PRO_MODEL),
+                    threshold=float(config.get("complexity_threshold", DEFAULT_COMPLEXITY_THRESHOLD)),
+                    min_chars_per_page=int(config.get("min_chars_per_page", DEFAULT_MIN_CHARS_PER_PAGE)),
+                    max_fast_error_rate=float(config.get("max_fast_error_rate", DEFAULT_MAX_FAST_ERROR_RATE)),
+                )
+    return _model_router
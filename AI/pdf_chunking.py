@@ -0,0 +1,138 @@
+import streamlit as st
+import io
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Configurável em st.secrets["gemini_config"]["pages_per_chunk"]
+DEFAULT_PAGES_PER_CHUNK = 8
+# Rodadas extras só para os trechos que falharam (além das tentativas de cada requisição)
+CHUNK_RETRY_ROUNDS = 1
+
+
+def get_pages_per_chunk():
+    return int(st.secrets.get("gemini_config", {}).get("pages_per_chunk", DEFAULT_PAGES_PER_CHUNK))
+
+
+def split_pdf_pages(pdf_bytes, pages_per_chunk):
+    """
+    Divide o PDF em trechos de até `pages_per_chunk` páginas.
+
+    Returns:
+        list: [(primeira página, última página, arquivo do trecho)] com páginas a partir de 1,
+        ou None se o PDF couber em um trecho, se o pypdf não estiver instalado ou não
+        conseguir ler o arquivo
+    """
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        logger.warning("pypdf não instalado - extração em trechos desativada")
+        return None
+
+    try:
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        total_pages = len(reader.pages)
+        if total_pages <= pages_per_chunk:
+            return None
+
+        chunks = []
+        for first in range(0, total_pages, pages_per_chunk):
+            last = min(first + pages_per_chunk, total_pages)
+            writer = PdfWriter()
+            for page in reader.pages[first:last]:
+                writer.add_page(page)
+            chunk_file = io.BytesIO()
+            writer.write(chunk_file)
+            chunk_file.seek(0)
+            chunk_file.name = f"páginas {first + 1}-{last}"
+            chunks.append((first + 1, last, chunk_file))
+    except Exception as e:
+        # PDF criptografado ou malformado: o arquivo inteiro segue para a IA em uma requisição
+        logger.warning(f"Não foi possível dividir o PDF em trechos ({e}); usando requisição única")
+        return None
+    return chunks
+
+
+def chunk_prompt(prompt, first_page, last_page, total_pages):
+    return (
+        f"{prompt}\n\n"
+        f"**Atenção:** este arquivo contém apenas as páginas {first_page} a {last_page} de um relatório "
+        f"de {total_pages} páginas. Extraia somente os itens presentes nestas páginas. Se dados gerais do "
+        f"relatório (data, responsável, empresa) não aparecerem aqui, retorne-os como null."
+    )
+
+
+def _normalize_id(value):
+    return str(value).strip().upper() if value not in (None, "") else None
+
+
+def merge_chunk_results(results, list_key, id_field, shared_fields=()):
+    """
+    Junta as listas `list_key` dos trechos (em ordem de página), sem repetir itens com o
+    mesmo `id_field`: campos vazios do primeiro registro são completados pelos seguintes.
+    Campos gerais do relatório (`shared_fields`) que faltarem em algum item recebem o
+    valor mais frequente entre os demais.
+    """
+    merged, by_id = [], {}
+    for data in results:
+        for item in (data or {}).get(list_key) or []:
+            if not isinstance(item, dict):
+                continue
+            item_id = _normalize_id(item.get(id_field))
+            if item_id is None or item_id not in by_id:
+                item = dict(item)
+                merged.append(item)
+                if item_id is not None:
+                    by_id[item_id] = item
+                continue
+            existing = by_id[item_id]
+            for field, value in item.items():
+                if existing.get(field) in (None, "") and value not in (None, ""):
+                    existing[field] = value
+
+    for field in shared_fields:
+        values = Counter(item[field] for item in merged if item.get(field) not in (None, ""))
+        if values:
+            common = values.most_common(1)[0][0]
+            for item in merged:
+                if item.get(field) in (None, ""):
+                    item[field] = common
+    return {list_key: merged}
+
+
+def extract_chunked(pdf_qa, pdf_bytes, prompt, list_key, id_field, shared_fields=(), progress_callback=None):
+    """
+    Extrai um PDF grande em trechos de páginas processados em paralelo; cada trecho
+    falho é repetido sozinho, sem reenviar o documento inteiro.
+
+    Returns:
+        tuple: (dados mesclados ou None se o PDF não precisar ser dividido,
+                lista de (primeira, última página) dos trechos que falharam)
+    """
+    chunks = split_pdf_pages(pdf_bytes, get_pages_per_chunk())
+    if not chunks:
+        return None, []
+
+    total_pages = chunks[-1][1]
+    results = {}
+    remaining = chunks
+    for round_number in range(1 + CHUNK_RETRY_ROUNDS):
+        # Todos os trechos pendentes vão em um único lote paralelo, cada um com seu prompt
+        prompts = [chunk_prompt(prompt, first, last, total_pages) for first, last, _ in remaining]
+        failed = []
+        for index, _, data, error in pdf_qa.extract_structured_data_batch([f for _, _, f in remaining], prompts):
+            first, last, _ = remaining[index]
+            if isinstance(data, dict) and isinstance(data.get(list_key), list):
+                results[first] = data
+                if progress_callback:
+                    progress_callback(len(results) / len(chunks), f"Páginas {first}-{last} concluídas")
+            else:
+                logger.warning(f"Trecho {first}-{last} falhou (rodada {round_number + 1}): {error}")
+                failed.append(remaining[index])
+        remaining = sorted(failed, key=lambda chunk: chunk[0])
+        if not remaining:
+            break
+
+    merged = merge_chunk_results([results[first] for first in sorted(results)], list_key, id_field, shared_fields)
+    return merged, [(first, last) for first, last, _ in remaining]
@@ -18,49 +18,35 @@ from auth.login_page import show_login_page, show_user_header, show_logout_butto
 from utils.auditoria import log_action
 from config.page_config import set_page_config
 
-# Import com tratamento de erro para módulos opcionais
-try:
-    from views import (
-        administracao, dashboard, resumo_gerencial, inspecao_extintores, 
-        inspecao_mangueiras, inspecao_scba, inspecao_chuveiros,
-        inspecao_camaras_espuma, inspecao_multigas, historico, inspecao_alarmes,
-        utilitarios, demo_page, trial_expired_page, inspecao_canhoes_monitores
-    )
-    
-    # Import condicional do perfil_usuario
-    try:
-        from views import perfil_usuario
-        PERFIL_DISPONIVEL = True
-    except ImportError as e:
-        PERFIL_DISPONIVEL = False
-        st.error(f"Módulo perfil_usuario não encontrado: {e}. Algumas funcionalidades podem não estar disponíveis.")
-        
-except ImportError as e:
-    st.error(f"Erro ao importar módulos: {e}")
-    st.stop()
+from views.page_registry import LazyPage, build_pages, is_page_available
 
 set_page_config()
 
-# Páginas base (sempre disponíveis)
-PAGES = {
-    "Dashboard": dashboard.show_page, 
-    "Resumo Gerencial": resumo_gerencial.show_page, 
-    "Inspeção de Extintores": inspecao_extintores.show_page, 
-    "Inspeção de Mangueiras": inspecao_mangueiras.show_page,
-    "Inspeção de SCBA": inspecao_scba.show_page, 
-    "Inspeção de Chuveiros/LO": inspecao_chuveiros.show_page,
-    "Inspeção de Câmaras de Espuma": inspecao_camaras_espuma.show_page, 
-    "Inspeção Multigás": inspecao_multigas.show_page,
-    "Inspeção de Alarmes": inspecao_alarmes.show_page,
-    "Inspeção de Canhões Monitores": inspecao_canhoes_monitores.show_page,
-    "Histórico e Logs": historico.show_page, 
-    "Utilitários": utilitarios.show_page, 
-    "Super Admin": administracao.show_page,
-}
+# Páginas base (sempre disponíveis). Cada página é importada apenas na primeira
+# navegação até ela, para que a tela de login não pague o custo de todas as views.
+PAGES = build_pages({
+    "Dashboard": "views.dashboard",
+    "Resumo Gerencial": "views.resumo_gerencial",
+    "Inspeção de Extintores": "views.inspecao_extintores",
+    "Inspeção de Mangueiras": "views.inspecao_mangueiras",
+    "Inspeção de SCBA": "views.inspecao_scba",
+    "Inspeção de Chuveiros/LO": "views.inspecao_chuveiros",
+    "Inspeção de Câmaras de Espuma": "views.inspecao_camaras_espuma",
+    "Inspeção Multigás": "views.inspecao_multigas",
+    "Inspeção de Alarmes": "views.inspecao_alarmes",
+    "Inspeção de Canhões Monitores": "views.inspecao_canhoes_monitores",
+    "Histórico e Logs": "views.historico",
+    "Utilitários": "views.utilitarios",
+    "Super Admin": "views.administracao",
+})
+
+show_demo_page = LazyPage("views.demo_page")
+show_trial_expired_page = LazyPage("views.trial_expired_page")
 
 # Adiciona perfil apenas se disponível
+PERFIL_DISPONIVEL = is_page_available("views.perfil_usuario")
 if PERFIL_DISPONIVEL:
-    PAGES["Meu Perfil"] = perfil_usuario.show_page
+    PAGES["Meu Perfil"] = LazyPage("views.perfil_usuario")
 
 def main():
     """Função principal do aplicativo"""
@@ -116,7 +102,7 @@ def main():
                 st.session_state['unauthorized_logged'] = True
             
             show_user_header()
-            demo_page.show_page()
+            show_demo_page()
             st.stop()
 
         effective_status = get_effective_user_status()
@@ -128,7 +114,7 @@ def main():
                 st.session_state['trial_expired_logged'] = True
             
             show_user_header()
-            trial_expired_page.show_page()
+            show_trial_expired_page()
             st.stop()
 
         # Usuário inativo (exceto admins)
@@ -5,6 +5,10 @@ import pytz
 
 from gdrive.gdrive_upload import GoogleDriveUploader
 from gdrive.config import USERS_SHEET_NAME, ACCESS_REQUESTS_SHEET_NAME
+from auth.user_index import find_user
+
+# Hierarquia de perfis (do menor para o maior)
+ROLE_HIERARCHY = {"viewer": 1, "editor": 2, "admin": 3}
 
 
 def is_oidc_available():
@@ -170,14 +174,9 @@ def get_user_info() -> dict | None:
             'trial_end_date': None
         }
 
-    # Se não for o superusuário, executa a lógica normal.
-    user_email = get_user_email()
-    if not user_email: return None
-    users_df = get_users_data()
-    if users_df.empty: return None
-    
-    user_entry = users_df[users_df['email'] == user_email]
-    return user_entry.iloc[0].to_dict() if not user_entry.empty else None
+    # Se não for o superusuário, busca no índice de usuários (O(1), sem pandas).
+    record = find_user(get_user_email())
+    return record.to_dict() if record else None
 
 # --- NOVAS FUNÇÕES RÁPIDAS ---
 def get_current_user_info() -> dict | None:
@@ -198,7 +197,7 @@ def get_effective_user_status() -> str:
     trial_end_date = user_info.get('trial_end_date')
     if sheet_status != 'ativo':
         return sheet_status
-    if not pd.isna(trial_end_date) and isinstance(trial_end_date, date) and date.today() > trial_end_date:
+    if isinstance(trial_end_date, date) and date.today() > trial_end_date:
         return 'trial_expirado'
     return sheet_status
 
@@ -207,7 +206,7 @@ def is_on_trial() -> bool:
     if not user_info:
         return False
     trial_end_date = user_info.get('trial_end_date')
-    if pd.isna(trial_end_date):
+    if not isinstance(trial_end_date, date):
         return False
     return date.today() <= trial_end_date
 
@@ -240,16 +239,13 @@ def check_user_access(required_role="viewer"):
             st.warning("You need editor permissions or higher.")
             return
     """
-    role_hierarchy = {"viewer": 1, "editor": 2, "admin": 3}
-    user_role = get_user_role()
-    
     # Superuser always has access
     if is_superuser():
         return True
         
     # If required_role isn't in the hierarchy, default to viewer
-    required_level = role_hierarchy.get(required_role, 1)
-    user_level = role_hierarchy.get(user_role, 0)
+    required_level = ROLE_HIERARCHY.get(required_role, 1)
+    user_level = ROLE_HIERARCHY.get(get_user_role(), 0)
     
     return user_level >= required_level
 
@@ -275,7 +271,7 @@ def setup_sidebar():
     spreadsheet_id = user_info.get('spreadsheet_id')
     folder_id = user_info.get('folder_id')
     
-    if pd.isna(spreadsheet_id) or spreadsheet_id == '' or pd.isna(folder_id) or folder_id == '':
+    if not spreadsheet_id or not folder_id:
         if not is_superuser():
             st.sidebar.error("Erro no ambiente de dados. Contate o suporte.")
         return False
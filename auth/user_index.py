@@ -0,0 +1,136 @@
+import streamlit as st
+import pandas as pd
+import time
+from datetime import date
+
+from gdrive.gdrive_upload import GoogleDriveUploader
+from gdrive.config import USERS_SHEET_NAME
+
+# Colunas da planilha de usuários e seus valores padrão quando ausentes
+USER_FIELD_DEFAULTS = {
+    'email': '',
+    'nome': 'Nome não informado',
+    'role': 'viewer',
+    'plano': 'basico',
+    'status': 'inativo',
+    'spreadsheet_id': '',
+    'folder_id': '',
+    'data_cadastro': '',
+    'trial_end_date': None,
+    'telefone': '',
+    'empresa': '',
+    'cargo': '',
+}
+
+# Campos comparados sem diferenciar maiúsculas/espaços
+_NORMALIZED_FIELDS = ('email', 'role', 'plano', 'status')
+
+
+def _parse_date(value):
+    """
+    Converte a data em date; valores vazios ou inválidos viram None. A planilha é lida com
+    valores formatados, então a data pode vir em ISO ('2025-01-15', com ou sem horário) ou
+    no formato da planilha pt-BR ('15/01/2025').
+    """
+    if isinstance(value, date):
+        return value
+    text = '' if value is None else str(value).strip()
+    if not text:
+        return None
+    try:
+        # ISO primeiro: com dayfirst, o pandas trocaria dia e mês de '2025-01-05'
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        pass
+    parsed = pd.to_datetime(text, errors='coerce', dayfirst=True)
+    return None if pd.isna(parsed) else parsed.date()
+
+
+class UserRecord:
+    """Registro compacto de um usuário da planilha, com acesso no estilo dict."""
+
+    __slots__ = tuple(USER_FIELD_DEFAULTS)
+
+    def __init__(self, values):
+        for field, default in USER_FIELD_DEFAULTS.items():
+            setattr(self, field, values.get(field, default))
+
+    def get(self, field, default=None):
+        return getattr(self, field, default) if field in USER_FIELD_DEFAULTS else default
+
+    def __getitem__(self, field):
+        if field not in USER_FIELD_DEFAULTS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in USER_FIELD_DEFAULTS}
+
+
+def _record_from_row(header, row):
+    values = {}
+    for i, column in enumerate(header):
+        if column not in USER_FIELD_DEFAULTS:
+            continue
+        cell = row[i] if i < len(row) else ''
+        cell = '' if cell is None else str(cell)
+        values[column] = cell.lower().strip() if column in _NORMALIZED_FIELDS else cell
+    values['trial_end_date'] = _parse_date(values.get('trial_end_date'))
+    return UserRecord(values)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _users_data_version():
+    """
+    Versão dos dados de usuários. Fica em st.cache_data para mudar junto com
+    st.cache_data.clear() (chamado após alterações na planilha) ou após o TTL.
+    """
+    return time.time_ns()
+
+
+@st.cache_resource(max_entries=2, show_spinner="Verificando permissões...")
+def _build_user_index(version):
+    """
+    Lê a planilha de usuários e monta o índice email -> UserRecord uma vez por versão.
+    O índice é compartilhado (por referência) entre as sessões e nunca é alterado.
+    """
+    uploader = GoogleDriveUploader(is_matrix=True)
+    users_data = uploader.get_data_from_sheet(USERS_SHEET_NAME)
+    if not users_data or len(users_data) < 2:
+        return {}
+
+    header = [str(column).strip() for column in users_data[0]]
+    index = {}
+    for row in users_data[1:]:
+        if not any(str(cell).strip() for cell in row if cell):
+            continue
+        record = _record_from_row(header, row)
+        # Mantém o primeiro registro de cada email, como a busca anterior no DataFrame
+        if record.email and record.email not in index:
+            index[record.email] = record
+    return index
+
+
+def get_user_index():
+    """
+    Retorna o índice de usuários da versão atual, memorizado na sessão para que
+    as verificações de permissão em cada rerun sejam apenas buscas em dict.
+    """
+    version = _users_data_version()
+    memo = st.session_state.get('_user_index')
+    if memo is not None and memo[0] == version:
+        return memo[1]
+    try:
+        index = _build_user_index(version)
+    except Exception as e:
+        st.error(f"Erro crítico ao carregar dados de usuários: {e}")
+        return {}
+    st.session_state['_user_index'] = (version, index)
+    return index
+
+
+def find_user(email):
+    """Busca O(1) do registro de um usuário pelo email (normalizado)."""
+    if not email:
+        return None
+    return get_user_index().get(str(email).lower().strip())
@@ -61,6 +61,24 @@ class GoogleDriveUploader:
         except Exception as e:
             st.error(f"Erro ao ler dados da planilha '{sheet_name}': {e}"); raise
 
+    def get_data_from_sheets(self, sheet_names):
+        """
+        Busca várias abas da planilha selecionada em uma única requisição (values.batchGet).
+        Retorna um dict nome da aba -> linhas. Se alguma aba não existir, a requisição
+        inteira falha.
+        """
+        if not self.spreadsheet_id:
+            st.error("ID da planilha não definido. Acesso aos dados impossível."); return {}
+        try:
+            result = self.sheets_service.spreadsheets().values().batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=[f"{name}!A:Z" for name in sheet_names]
+            ).execute()
+            value_ranges = result.get('valueRanges', [])
+            return {name: value_range.get('values', []) for name, value_range in zip(sheet_names, value_ranges)}
+        except Exception as e:
+            st.error(f"Erro ao ler as abas {', '.join(sheet_names)}: {e}"); raise
+
     def append_data_to_sheet(self, sheet_name, data_rows):
         """Adiciona uma ou mais linhas ao final de uma aba específica."""
         if not self.spreadsheet_id:
@@ -120,6 +138,59 @@ class GoogleDriveUploader:
         except Exception as e:
             st.error(f"Erro ao sobrescrever a planilha '{sheet_name}': {e}"); raise
 
+    def get_sheet_ids(self):
+        """Retorna um dict título da aba -> sheetId da planilha selecionada."""
+        if not self.spreadsheet_id:
+            st.error("ID da planilha não definido. Acesso aos dados impossível."); return {}
+        try:
+            metadata = self.sheets_service.spreadsheets().get(
+                spreadsheetId=self.spreadsheet_id, fields='sheets.properties(sheetId,title)'
+            ).execute()
+            return {s['properties']['title']: s['properties']['sheetId'] for s in metadata.get('sheets', [])}
+        except Exception as e:
+            st.error(f"Erro ao listar as abas da planilha: {e}"); raise
+
+    def add_sheet(self, sheet_name, headers):
+        """Cria uma nova aba na planilha selecionada com a linha de cabeçalho informada."""
+        if not self.spreadsheet_id:
+            st.error("ID da planilha não definido. A criação da aba falhou."); return None
+        try:
+            self.sheets_service.spreadsheets().batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={'requests': [{'addSheet': {'properties': {'title': sheet_name}}}]}
+            ).execute()
+            return self.sheets_service.spreadsheets().values().update(
+                spreadsheetId=self.spreadsheet_id, range=f"{sheet_name}!A1",
+                valueInputOption='RAW', body={'values': [headers]}
+            ).execute()
+        except Exception as e:
+            st.error(f"Erro ao criar a aba '{sheet_name}': {e}"); raise
+
+    def delete_rows(self, sheet_name, start_row, end_row):
+        """
+        Remove as linhas [start_row, end_row) de uma aba (índices base 0, cabeçalho = 0).
+        Linhas anexadas depois da leitura não são afetadas, ao contrário de overwrite_sheet.
+        """
+        return self.delete_row_ranges(sheet_name, [(start_row, end_row)])
+
+    def delete_row_ranges(self, sheet_name, ranges):
+        """Remove vários intervalos [início, fim) de linhas de uma aba em uma única requisição."""
+        if not self.spreadsheet_id:
+            st.error("ID da planilha não definido. A remoção de linhas falhou."); return None
+        if not ranges:
+            return None
+        try:
+            sheet_id = self.get_sheet_ids()[sheet_name]
+            # De baixo para cima, para que cada remoção não desloque os intervalos seguintes
+            requests = [{'deleteDimension': {'range': {
+                'sheetId': sheet_id, 'dimension': 'ROWS', 'startIndex': start, 'endIndex': end
+            }}} for start, end in sorted(ranges, reverse=True)]
+            return self.sheets_service.spreadsheets().batchUpdate(
+                spreadsheetId=self.spreadsheet_id, body={'requests': requests}
+            ).execute()
+        except Exception as e:
+            st.error(f"Erro ao remover linhas da aba '{sheet_name}': {e}"); raise
+
     def create_new_spreadsheet(self, name):
         """Cria uma nova Planilha Google e retorna seu ID. (Função de Admin)"""
         spreadsheet_body = {'properties': {'title': name}}
@@ -12,6 +12,7 @@ from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from operations.photo_operations import upload_evidence_photo
 from utils.auditoria import log_action
+from operations.dashboard_operations import select_status
 
 # Define a estrutura do checklist de inspeção para sistemas de alarme
 CHECKLIST_QUESTIONS = {
@@ -340,11 +341,10 @@ def get_alarm_status_df(df_inspections):
          (latest_inspections['data_proxima_inspecao'] >= today))
     ]
     
-    # Define os valores correspondentes para cada condição
-    choices = ['🔴 VENCIDO', '🟠 COM PENDÊNCIAS']
-    
-    # Aplica as condições para criar a coluna de status
-    latest_inspections['status_dashboard'] = np.select(conditions, choices, default='🟢 OK')
+    # Aplica as condições para criar as colunas de status (código e exibição)
+    latest_inspections['status_code'], latest_inspections['status_dashboard'] = select_status(
+        conditions, [('expired', '🔴 VENCIDO'), ('pending', '🟠 COM PENDÊNCIAS')]
+    )
     
     return latest_inspections
 
@@ -0,0 +1,158 @@
+import streamlit as st
+import pandas as pd
+import json
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Colunas da tabela longa de checklist (uma linha por pergunta respondida)
+CHECKLIST_COLUMNS = ['inspection_id', 'category', 'question', 'status', 'note', 'is_ok', 'is_nc']
+
+# Respostas consideradas conformes / não conformes nos diferentes checklists
+# (alarmes, chuveiros, câmaras de espuma, canhões, abrigos e SCBA)
+OK_STATUSES = {"CONFORME", "C", "APROVADO", "SIM", "OK"}
+NC_STATUSES = {"NÃO CONFORME", "N/C", "REPROVADO"}
+
+
+def _flatten_results(results):
+    """
+    Achata o dicionário de resultados de uma inspeção em tuplas
+    (categoria, pergunta, status, observação).
+
+    Suporta os três formatos gravados pelo sistema:
+    - Plano: {"Pergunta": "Conforme"}
+    - Por categoria: {"Cilindro": {"Pergunta": "C"}}
+    - Itens com detalhes: {"Item": {"status": "OK", "observacao": "..."}}
+    """
+    rows = []
+    for key, value in results.items():
+        if isinstance(value, dict) and 'status' in value:
+            rows.append(('', str(key), str(value.get('status', 'N/A')), str(value.get('observacao', '') or '')))
+        elif isinstance(value, dict):
+            for question, answer in value.items():
+                if isinstance(answer, dict):
+                    rows.append((str(key), str(question), str(answer.get('status', 'N/A')), str(answer.get('observacao', '') or '')))
+                else:
+                    rows.append((str(key), str(question), str(answer), ''))
+        else:
+            rows.append(('', str(key), str(value), ''))
+    return rows
+
+
+@lru_cache(maxsize=8192)
+def parse_checklist(raw_json):
+    """
+    Faz o parse de um `resultados_json` uma única vez por conteúdo.
+
+    Returns:
+        tuple | None: Tupla imutável de (categoria, pergunta, status, observação),
+                      tupla vazia se não houver resultados, ou None se o JSON for inválido.
+    """
+    if not raw_json or not isinstance(raw_json, str) or not raw_json.strip():
+        return ()
+    try:
+        results = json.loads(raw_json)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    if not isinstance(results, dict):
+        return None
+    return tuple(_flatten_results(results))
+
+
+class ChecklistStore:
+    """
+    Tabela normalizada dos checklists de um conjunto de inspeções.
+
+    O `inspection_id` é o rótulo do índice da linha no DataFrame de origem,
+    de modo que as views podem consultar diretamente com `row.name`; por isso
+    `build_checklist_store` exige um índice sem rótulos repetidos.
+    """
+
+    def __init__(self, items, invalid_ids):
+        self.items = items
+        self.invalid_ids = frozenset(invalid_ids)
+        self.nc_counts = items.groupby('inspection_id')['is_nc'].sum().astype(int) if not items.empty else pd.Series(dtype=int)
+        self._by_inspection = items.set_index('inspection_id').sort_index() if not items.empty else items
+
+    def is_invalid(self, inspection_id):
+        return inspection_id in self.invalid_ids
+
+    def items_for(self, inspection_id, category=None):
+        """Retorna as linhas do checklist de uma inspeção (opcionalmente de uma categoria)."""
+        if self.items.empty or inspection_id not in self.nc_counts.index:
+            return pd.DataFrame(columns=CHECKLIST_COLUMNS[1:])
+        rows = self._by_inspection.loc[[inspection_id]]
+        if category is not None:
+            rows = rows[rows['category'] == category]
+        return rows
+
+    def has_items(self, inspection_id):
+        return inspection_id in self.nc_counts.index
+
+    def nc_count(self, inspection_id):
+        return int(self.nc_counts.get(inspection_id, 0))
+
+    def non_conformities(self, inspection_id):
+        """Itens não conformes de uma inspeção, no formato usado pelas tabelas do dashboard."""
+        if self.nc_count(inspection_id) == 0:
+            return pd.DataFrame(columns=['Status'])
+        rows = self.items_for(inspection_id)
+        rows = rows[rows['is_nc']]
+        return pd.DataFrame({'Status': rows['status'].values}, index=rows['question'].values)
+
+    def compliance_by_question(self):
+        """Taxa de conformidade por pergunta considerando todas as inspeções da tabela."""
+        if self.items.empty:
+            return pd.DataFrame(columns=['category', 'question', 'total', 'nao_conformes', 'conformidade_pct'])
+        summary = (
+            self.items.groupby(['category', 'question'], sort=False, observed=True)['is_nc']
+            .agg(total='size', nao_conformes='sum')
+            .reset_index()
+        )
+        summary['conformidade_pct'] = (1 - summary['nao_conformes'] / summary['total']) * 100
+        return summary.sort_values('conformidade_pct')
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def build_checklist_store(df_inspections, json_column='resultados_json'):
+    """
+    Converte a coluna de resultados de um DataFrame de inspeções em uma tabela longa
+    (inspection_id, category, question, status, note). O resultado é memoizado pelo
+    conteúdo do DataFrame, ou seja, o parse acontece uma vez por versão dos dados.
+
+    Args:
+        df_inspections (pd.DataFrame): Inspeções com a coluna de resultados em JSON
+        json_column (str): Nome da coluna com o JSON
+
+    Returns:
+        ChecklistStore: Tabela normalizada com contagens de não conformidades por inspeção
+
+    Raises:
+        ValueError: se o índice do DataFrame tiver rótulos repetidos (os checklists
+            de inspeções diferentes seriam misturados)
+    """
+    if df_inspections is None or df_inspections.empty or json_column not in df_inspections.columns:
+        return ChecklistStore(pd.DataFrame(columns=CHECKLIST_COLUMNS), [])
+    if not df_inspections.index.is_unique:
+        raise ValueError("build_checklist_store exige um índice único no DataFrame de inspeções "
+                         "(use reset_index(drop=True) após concatenar)")
+
+    records = []
+    invalid_ids = []
+    for inspection_id, raw_json in df_inspections[json_column].items():
+        parsed = parse_checklist(raw_json if isinstance(raw_json, str) else None)
+        if parsed is None:
+            invalid_ids.append(inspection_id)
+            continue
+        records.extend((inspection_id,) + item for item in parsed)
+
+    if invalid_ids:
+        logger.warning(f"{len(invalid_ids)} inspeções com resultados_json inválido")
+
+    items = pd.DataFrame.from_records(records, columns=CHECKLIST_COLUMNS[:5])
+    normalized_status = items['status'].str.strip().str.upper()
+    items['is_ok'] = normalized_status.isin(OK_STATUSES)
+    items['is_nc'] = normalized_status.isin(NC_STATUSES)
+    items['category'] = items['category'].astype('category')
+    return ChecklistStore(items, invalid_ids)
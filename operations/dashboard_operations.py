@@ -5,6 +5,7 @@ import json
 from datetime import date
 from dateutil.relativedelta import relativedelta
 from operations.history import load_sheet_data
+from operations.disposal_index import get_disposed_index
 from gdrive.config import (
     HOSE_SHEET_NAME, SHELTER_SHEET_NAME, INSPECTIONS_SHELTER_SHEET_NAME,
     LOG_SHELTER_SHEET_NAME, SCBA_SHEET_NAME, SCBA_VISUAL_INSPECTIONS_SHEET_NAME,
@@ -37,12 +38,41 @@ def safe_percentage(numerator, denominator):
         return 0.0
     return (numerator / denominator) * 100
 
+# Códigos de status emitidos pelos builders junto ao status de exibição (coluna
+# 'status_code'); as contagens usam apenas os códigos, nunca o texto com emoji.
+STATUS_CODES = ['ok', 'expired', 'pending', 'unknown']
+STATUS_CODE_DTYPE = pd.CategoricalDtype(categories=STATUS_CODES)
+
+
+def select_status_codes(conditions, codes, default='ok'):
+    """Código de status de cada item pela primeira condição verdadeira (como np.select), categórico."""
+    return pd.Categorical(np.select(conditions, codes, default=default), dtype=STATUS_CODE_DTYPE)
+
+
+def select_status(conditions, statuses, default=('ok', '🟢 OK')):
+    """
+    Código e status de exibição de cada item pela primeira condição verdadeira (como np.select).
+
+    Args:
+        conditions: Máscaras booleanas, em ordem de prioridade
+        statuses: (código, texto de exibição) correspondente a cada condição
+        default: (código, texto de exibição) quando nenhuma condição é verdadeira
+
+    Returns:
+        tuple: (códigos categóricos, textos de exibição)
+    """
+    codes = select_status_codes(conditions, [code for code, _ in statuses], default[0])
+    labels = np.select(conditions, [label for _, label in statuses], default=default[1])
+    return codes, labels
+
+
 def calculate_equipment_metrics(status_series):
     """
-    Calcula métricas de status de equipamentos.
+    Calcula métricas de status de equipamentos em uma única passada (bincount
+    sobre os códigos categóricos).
     
     Args:
-        status_series: Série pandas com os status dos equipamentos
+        status_series: Coluna 'status_code' de um builder de status (códigos categóricos)
         
     Returns:
         dict: Dicionário com métricas calculadas
@@ -56,10 +86,11 @@ def calculate_equipment_metrics(status_series):
             'compliance_rate': 0.0
         }
     
-    total = len(status_series)
-    ok_count = sum(1 for status in status_series if '🟢' in str(status))
-    expired_count = sum(1 for status in status_series if '🔴' in str(status))
-    pending_count = sum(1 for status in status_series if '🟠' in str(status) or '🔵' in str(status))
+    codes = pd.Categorical(status_series, dtype=STATUS_CODE_DTYPE).codes
+    # Valores fora dos códigos conhecidos (-1) contam como 'unknown'
+    counts = np.bincount(np.where(codes < 0, STATUS_CODES.index('unknown'), codes), minlength=len(STATUS_CODES))
+    total = len(codes)
+    ok_count, expired_count, pending_count = (int(c) for c in counts[:3])
     
     compliance_rate = safe_percentage(ok_count, total)
     
@@ -72,6 +103,406 @@ def calculate_equipment_metrics(status_series):
     }
 
 
+def get_canhao_monitor_status_df(df_inspections):
+    if df_inspections.empty:
+        return pd.DataFrame()
+
+    df_inspections['data_inspecao'] = pd.to_datetime(df_inspections['data_inspecao'], errors='coerce')
+    latest_inspections = df_inspections.sort_values('data_inspecao', ascending=False).drop_duplicates(subset='id_equipamento', keep='first').copy()
+    
+    today = pd.Timestamp(date.today())
+    latest_inspections['data_proxima_inspecao'] = pd.to_datetime(latest_inspections['data_proxima_inspecao'], errors='coerce')
+    
+    conditions = [
+        (latest_inspections['data_proxima_inspecao'] < today),
+        (latest_inspections['status_geral'] == 'Reprovado com Pendências')
+    ]
+    latest_inspections['status_code'], latest_inspections['status_dashboard'] = select_status(
+        conditions, [('expired', '🔴 VENCIDO'), ('pending', '🟠 COM PENDÊNCIAS')]
+    )
+    
+    return latest_inspections
+
+
+def get_multigas_status_df(df_inventory, df_inspections):
+    if df_inventory.empty:
+        return pd.DataFrame()
+
+    # Começa com o inventário
+    dashboard_df = df_inventory.copy()
+
+    # Se não houver inspeções, define todos como pendentes e retorna
+    # Esta parte garante que a estrutura de colunas seja sempre a mesma
+    if df_inspections.empty:
+        dashboard_df['status_calibracao'] = '🔵 PENDENTE'
+        dashboard_df['status_bump_test'] = '🔵 PENDENTE'
+        dashboard_df['proxima_calibracao'] = pd.NaT
+        dashboard_df['resultado_ultimo_bump_test'] = 'N/A'
+        dashboard_df['data_ultimo_bump_test'] = pd.NaT
+        dashboard_df['link_certificado'] = None
+        dashboard_df['status_code'] = pd.Categorical(['pending'] * len(dashboard_df), dtype=STATUS_CODE_DTYPE)
+        dashboard_df['status_geral'] = '🔵'
+        return dashboard_df
+
+    # Converte a coluna de data para o formato datetime uma única vez
+    df_inspections['data_teste'] = pd.to_datetime(df_inspections['data_teste'], errors='coerce')
+
+    # Cria as colunas de resultados no DataFrame principal com valores padrão
+    dashboard_df['proxima_calibracao'] = pd.NaT
+    dashboard_df['link_certificado'] = None
+    dashboard_df['resultado_ultimo_bump_test'] = 'N/A'
+    dashboard_df['data_ultimo_bump_test'] = pd.NaT
+
+    # Itera sobre cada equipamento do inventário para encontrar seus últimos testes
+    for index, row in dashboard_df.iterrows():
+        equip_id = row['id_equipamento']
+        # Filtra as inspeções apenas para o equipamento atual
+        equip_inspections = df_inspections[df_inspections['id_equipamento'] == equip_id]
+
+        if not equip_inspections.empty:
+            # Encontra a última calibração anual
+            calibrations = equip_inspections[equip_inspections['tipo_teste'] == 'Calibração Anual']
+            if not calibrations.empty:
+                last_calib = calibrations.sort_values('data_teste', ascending=False).iloc[0]
+                dashboard_df.loc[index, 'proxima_calibracao'] = last_calib.get('proxima_calibracao')
+                dashboard_df.loc[index, 'link_certificado'] = last_calib.get('link_certificado')
+
+            # Encontra o último bump test (qualquer teste que não seja calibração anual)
+            bump_tests = equip_inspections[equip_inspections['tipo_teste'] != 'Calibração Anual']
+            if not bump_tests.empty:
+                last_bump = bump_tests.sort_values('data_teste', ascending=False).iloc[0]
+                dashboard_df.loc[index, 'resultado_ultimo_bump_test'] = last_bump.get('resultado_teste')
+                dashboard_df.loc[index, 'data_ultimo_bump_test'] = last_bump.get('data_teste')
+
+    # Agora que os dados estão consolidados, calcula os status
+    today = pd.Timestamp(date.today())
+    
+    # Status da Calibração
+    dashboard_df['proxima_calibracao'] = pd.to_datetime(dashboard_df['proxima_calibracao'], errors='coerce')
+    calib_pending = dashboard_df['proxima_calibracao'].isna()
+    calib_expired = dashboard_df['proxima_calibracao'] < today
+    calib_codes, dashboard_df['status_calibracao'] = select_status(
+        [calib_pending, calib_expired], [('pending', '🔵 PENDENTE'), ('expired', '🔴 VENCIDO')]
+    )
+
+    # Status do Bump Test
+    bump_pending = dashboard_df['resultado_ultimo_bump_test'].isin(['N/A', None, ''])
+    bump_failed = dashboard_df['resultado_ultimo_bump_test'] == 'Reprovado'
+    bump_codes, dashboard_df['status_bump_test'] = select_status(
+        [bump_pending, bump_failed], [('pending', '🔵 PENDENTE'), ('pending', '🟠 REPROVADO')]
+    )
+
+    # Status consolidado: OK apenas se calibração e bump test estão OK; vencido se a calibração venceu
+    dashboard_df['status_code'] = select_status_codes(
+        [calib_codes == 'expired', (calib_codes == 'ok') & (bump_codes == 'ok')], ['expired', 'ok'], default='pending'
+    )
+    # Ícone de status geral (a pior condição prevalece)
+    dashboard_df['status_geral'] = np.select(
+        [calib_expired, bump_failed, calib_pending | bump_pending], ['🔴', '🟠', '🔵'], default='🟢'
+    )
+    
+    return dashboard_df
+
+
+def get_foam_chamber_status_df(df_inspections):
+    if df_inspections.empty:
+        return pd.DataFrame()
+
+    df_inspections['data_inspecao'] = pd.to_datetime(df_inspections['data_inspecao'], errors='coerce')
+    latest_inspections = df_inspections.sort_values('data_inspecao', ascending=False).drop_duplicates(subset='id_camara', keep='first').copy()
+    
+    today = pd.Timestamp(date.today())
+    latest_inspections['data_proxima_inspecao'] = pd.to_datetime(latest_inspections['data_proxima_inspecao'], errors='coerce')
+    
+    conditions = [
+        (latest_inspections['data_proxima_inspecao'] < today),
+        (latest_inspections['status_geral'] == 'Reprovado com Pendências')
+    ]
+    latest_inspections['status_code'], latest_inspections['status_dashboard'] = select_status(
+        conditions, [('expired', '🔴 VENCIDO'), ('pending', '🟠 COM PENDÊNCIAS')]
+    )
+    
+    return latest_inspections
+
+
+def get_eyewash_status_df(df_inspections):
+    if df_inspections.empty:
+        return pd.DataFrame()
+
+    # Garante que a coluna de data é do tipo datetime
+    df_inspections['data_inspecao'] = pd.to_datetime(df_inspections['data_inspecao'], errors='coerce')
+    
+    # Pega o último registro para cada equipamento
+    latest_inspections = df_inspections.sort_values('data_inspecao', ascending=False).drop_duplicates(subset='id_equipamento', keep='first').copy()
+    
+    today = pd.Timestamp(date.today())
+    latest_inspections['data_proxima_inspecao'] = pd.to_datetime(latest_inspections['data_proxima_inspecao'], errors='coerce')
+    
+    conditions = [
+        (latest_inspections['data_proxima_inspecao'] < today),
+        (latest_inspections['status_geral'] == 'Reprovado com Pendências')
+    ]
+    latest_inspections['status_code'], latest_inspections['status_dashboard'] = select_status(
+        conditions, [('expired', '🔴 VENCIDO'), ('pending', '🟠 COM PENDÊNCIAS')]
+    )
+    
+    return latest_inspections
+
+
+def get_scba_status_df(df_scba_main, df_scba_visual):
+    if df_scba_main.empty:
+        return pd.DataFrame()
+
+    equipment_tests = df_scba_main.dropna(subset=['numero_serie_equipamento', 'data_teste']).copy()
+    if equipment_tests.empty:
+        return pd.DataFrame()
+        
+    latest_tests = equipment_tests.sort_values('data_teste', ascending=False).drop_duplicates(subset='numero_serie_equipamento', keep='first')
+    
+    if not df_scba_visual.empty:
+        df_scba_visual['data_inspecao'] = pd.to_datetime(df_scba_visual['data_inspecao'], errors='coerce')
+        latest_visual = df_scba_visual.sort_values('data_inspecao', ascending=False).drop_duplicates(subset='numero_serie_equipamento', keep='first')
+        dashboard_df = pd.merge(latest_tests, latest_visual, on='numero_serie_equipamento', how='left', suffixes=('_teste', '_visual'))
+    else:
+        dashboard_df = latest_tests
+        for col in ['data_inspecao', 'data_proxima_inspecao', 'status_geral', 'resultados_json']:
+            dashboard_df[col] = None
+
+    today = pd.Timestamp(date.today())
+    dashboard_df['data_validade'] = pd.to_datetime(dashboard_df['data_validade'], errors='coerce')
+    dashboard_df['data_proxima_inspecao'] = pd.to_datetime(dashboard_df['data_proxima_inspecao'], errors='coerce')
+    
+    conditions = [
+        (dashboard_df['data_validade'] < today),
+        (dashboard_df['data_proxima_inspecao'] < today),
+        (dashboard_df['status_geral'] == 'Reprovado com Pendências')
+    ]
+    dashboard_df['status_code'], dashboard_df['status_consolidado'] = select_status(conditions, [
+        ('expired', '🔴 VENCIDO (Teste Posi3)'),
+        ('expired', '🔴 VENCIDO (Insp. Periódica)'),
+        ('pending', '🟠 COM PENDÊNCIAS'),
+    ])
+    
+    return dashboard_df
+
+
+def get_hose_status_df(df_hoses, df_disposals=None):
+    if df_hoses.empty:
+        return pd.DataFrame()
+    
+    # Garante que as colunas de data existam e sejam do tipo datetime
+    for col in ['data_inspecao', 'data_proximo_teste']:
+        if col not in df_hoses.columns:
+            df_hoses[col] = pd.NaT
+        df_hoses[col] = pd.to_datetime(df_hoses[col], errors='coerce')
+
+    # Pega apenas o último registro de cada mangueira
+    latest_hoses = df_hoses.sort_values('data_inspecao', ascending=False).drop_duplicates(subset='id_mangueira', keep='first').copy()
+    
+    # Remove mangueiras que já foram baixadas (índice de baixas do tenant, ou o log informado)
+    if df_disposals is None:
+        latest_hoses = get_disposed_index(strict=True).exclude(latest_hoses, 'mangueiras')
+    elif not df_disposals.empty and 'id_mangueira' in df_disposals.columns:
+        disposed_ids = df_disposals['id_mangueira'].astype(str).unique()
+        latest_hoses = latest_hoses[~latest_hoses['id_mangueira'].astype(str).isin(disposed_ids)]
+
+    if latest_hoses.empty:
+        return pd.DataFrame()
+
+    today = pd.Timestamp(date.today())
+    
+    if 'resultado' not in latest_hoses.columns:
+        latest_hoses['resultado'] = ''
+    latest_hoses['resultado'] = latest_hoses['resultado'].fillna('').str.lower()
+    
+    rejection_keywords = ['reprovado', 'condenada', 'rejeitado', 'condenado']
+    
+    is_rejected = latest_hoses['resultado'].str.contains('|'.join(rejection_keywords), na=False)
+
+    conditions = [
+        is_rejected,  # 1. Prioridade máxima: se o resultado for negativo
+        (latest_hoses['data_proximo_teste'] < today) # 2. Segunda prioridade: se a data estiver vencida
+    ]
+    latest_hoses['status_code'], latest_hoses['status'] = select_status(
+        conditions, [('pending', '🟠 REPROVADA'), ('expired', '🔴 VENCIDO')]
+    )
+    
+    # As datas continuam datetime (ordenação correta); a formatação dd/mm/aaaa fica na exibição
+    
+    display_columns = [
+        'id_mangueira', 'status', 'status_code', 'marca', 'diametro', 'tipo',
+        'comprimento', 'ano_fabricacao', 'data_inspecao',
+        'data_proximo_teste', 'link_certificado_pdf', 'registrado_por'
+    ]
+    
+    existing_display_columns = [col for col in display_columns if col in latest_hoses.columns]
+    
+    return latest_hoses[existing_display_columns]
+
+
+def get_shelter_status_df(df_shelters_registered, df_inspections):
+    if df_shelters_registered.empty:
+        return pd.DataFrame()
+
+    latest_inspections_list = []
+    if not df_inspections.empty:
+        df_inspections['data_inspecao'] = pd.to_datetime(df_inspections['data_inspecao'], errors='coerce').dt.date
+
+        for shelter_id in df_shelters_registered['id_abrigo'].unique():
+            shelter_inspections = df_inspections[df_inspections['id_abrigo'] == shelter_id].copy()
+            if not shelter_inspections.empty:
+                shelter_inspections = shelter_inspections.sort_values(by='data_inspecao', ascending=False)
+                
+        
+                latest_date = shelter_inspections['data_inspecao'].iloc[0]
+                inspections_on_latest_date = shelter_inspections[shelter_inspections['data_inspecao'] == latest_date]
+                
+                approved_on_latest = inspections_on_latest_date[inspections_on_latest_date['status_geral'] != 'Reprovado com Pendências']
+                
+                if not approved_on_latest.empty:
+                    latest_inspections_list.append(approved_on_latest.iloc[0])
+                else:
+                    latest_inspections_list.append(inspections_on_latest_date.iloc[0])
+
+    latest_inspections = pd.DataFrame(latest_inspections_list)
+
+    if not latest_inspections.empty:
+        dashboard_df = pd.merge(df_shelters_registered[['id_abrigo', 'cliente', 'local']], latest_inspections, on='id_abrigo', how='left')
+    else:
+
+        dashboard_df = df_shelters_registered.copy()
+        for col in ['data_inspecao', 'data_proxima_inspecao', 'status_geral', 'inspetor', 'resultados_json']:
+            dashboard_df[col] = None
+
+    today = pd.to_datetime(date.today()).date()
+    dashboard_df['data_proxima_inspecao'] = pd.to_datetime(dashboard_df['data_proxima_inspecao'], errors='coerce').dt.date
+
+    conditions = [
+        (dashboard_df['data_inspecao'].isna()),
+        (dashboard_df['data_proxima_inspecao'] < today),
+        (dashboard_df['status_geral'] == 'Reprovado com Pendências')
+    ]
+    dashboard_df['status_code'], dashboard_df['status_dashboard'] = select_status(conditions, [
+        ('pending', '🔵 PENDENTE (Nova Inspeção)'),
+        ('expired', '🔴 VENCIDO'),
+        ('pending', '🟠 COM PENDÊNCIAS'),
+    ])
+
+    dashboard_df['data_inspecao_str'] = dashboard_df['data_inspecao'].apply(lambda x: x.strftime('%d/%m/%Y') if pd.notna(x) else 'N/A')
+    dashboard_df['data_proxima_inspecao_str'] = dashboard_df['data_proxima_inspecao'].apply(lambda x: x.strftime('%d/%m/%Y') if pd.notna(x) else 'N/A')
+    dashboard_df['inspetor'] = dashboard_df['inspetor'].fillna('N/A')
+    dashboard_df['resultados_json'] = dashboard_df['resultados_json'].fillna('{}')
+
+    display_columns = ['id_abrigo', 'status_dashboard', 'status_code', 'data_inspecao_str', 'data_proxima_inspecao_str', 'status_geral', 'inspetor', 'resultados_json', 'local']
+    existing_columns = [col for col in display_columns if col in dashboard_df.columns]
+    
+    return dashboard_df[existing_columns]
+
+
+def get_consolidated_status_df(df_full, df_locais):
+    if df_full.empty: 
+        return pd.DataFrame()
+    
+    consolidated_data = []
+    # Anti-join com os extintores baixados antes de qualquer processamento
+    df_copy = get_disposed_index(strict=True).exclude(df_full, 'extintores').copy()
+    df_copy['data_servico'] = pd.to_datetime(df_copy['data_servico'], errors='coerce')
+    df_copy = df_copy.dropna(subset=['data_servico'])
+    
+    unique_ids = df_copy['numero_identificacao'].unique()
+
+    for ext_id in unique_ids:
+        ext_df = df_copy[df_copy['numero_identificacao'] == ext_id].sort_values(by='data_servico')
+        if ext_df.empty: 
+            continue
+        
+        latest_record_info = ext_df.iloc[-1]
+        
+        # Busca as últimas datas de cada tipo de serviço
+        last_insp_date = ext_df['data_servico'].max()
+        last_maint2_date = ext_df[ext_df['tipo_servico'] == 'Manutenção Nível 2']['data_servico'].max()
+        last_maint3_date = ext_df[ext_df['tipo_servico'] == 'Manutenção Nível 3']['data_servico'].max()
+        
+        # ✅ CORREÇÃO: Calcula próximos vencimentos considerando a hierarquia
+        # Nível 3 renova TUDO (vale por 1, 2 e 3)
+        # Nível 2 renova 1 e 2 (mas não o 3)
+        # Inspeção renova apenas o 1
+        
+        # Próxima inspeção mensal (Nível 1)
+        # Usa a data mais recente entre inspeção, N2 ou N3 (todos renovam o N1)
+        dates_that_renew_inspection = [last_insp_date, last_maint2_date, last_maint3_date]
+        valid_dates_inspection = [d for d in dates_that_renew_inspection if pd.notna(d)]
+        if valid_dates_inspection:
+            most_recent_inspection_renewal = max(valid_dates_inspection)
+            next_insp = most_recent_inspection_renewal + relativedelta(months=1)
+        else:
+            next_insp = pd.NaT
+        
+        # Próxima Manutenção Nível 2
+        # Usa a data mais recente entre N2 ou N3 (N3 também renova o N2)
+        dates_that_renew_n2 = [last_maint2_date, last_maint3_date]
+        valid_dates_n2 = [d for d in dates_that_renew_n2 if pd.notna(d)]
+        if valid_dates_n2:
+            most_recent_n2_renewal = max(valid_dates_n2)
+            next_maint2 = most_recent_n2_renewal + relativedelta(months=12)
+        else:
+            next_maint2 = pd.NaT
+        
+        # Próxima Manutenção Nível 3
+        # Apenas o próprio N3 renova o N3
+        if pd.notna(last_maint3_date):
+            next_maint3 = last_maint3_date + relativedelta(years=5)
+        else:
+            next_maint3 = pd.NaT
+        
+        # Determina o próximo vencimento mais crítico
+        vencimentos = [d for d in [next_insp, next_maint2, next_maint3] if pd.notna(d)]
+        if not vencimentos: 
+            continue
+        proximo_vencimento_real = min(vencimentos)
+        
+        today_ts = pd.Timestamp(date.today())
+        status_atual, status_code = "OK", 'ok'
+        
+        if latest_record_info.get('plano_de_acao') == "FORA DE OPERAÇÃO (SUBSTITUÍDO)":
+            status_atual = "FORA DE OPERAÇÃO"
+        elif latest_record_info.get('aprovado_inspecao') == 'Não': 
+            status_atual, status_code = "NÃO CONFORME (Aguardando Ação)", 'pending'
+        elif proximo_vencimento_real < today_ts: 
+            status_atual, status_code = "VENCIDO", 'expired'
+
+        if status_atual == "FORA DE OPERAÇÃO":
+            continue
+
+        consolidated_data.append({
+            'numero_identificacao': ext_id,
+            'numero_selo_inmetro': latest_record_info.get('numero_selo_inmetro'),
+            'tipo_agente': latest_record_info.get('tipo_agente'),
+            'status_atual': status_atual,
+            'status_code': status_code,
+            'proximo_vencimento_geral': proximo_vencimento_real.strftime('%d/%m/%Y'),
+            'prox_venc_inspecao': next_insp.strftime('%d/%m/%Y') if pd.notna(next_insp) else "N/A",
+            'prox_venc_maint2': next_maint2.strftime('%d/%m/%Y') if pd.notna(next_maint2) else "N/A",
+            'prox_venc_maint3': next_maint3.strftime('%d/%m/%Y') if pd.notna(next_maint3) else "N/A",
+            'plano_de_acao': latest_record_info.get('plano_de_acao'),
+        })
+
+    if not consolidated_data:
+        return pd.DataFrame()
+
+    dashboard_df = pd.DataFrame(consolidated_data)
+    dashboard_df['status_code'] = dashboard_df['status_code'].astype(STATUS_CODE_DTYPE)
+    if not df_locais.empty:
+        df_locais = df_locais.rename(columns={'id': 'numero_identificacao'})
+        df_locais['numero_identificacao'] = df_locais['numero_identificacao'].astype(str)
+        dashboard_df = pd.merge(dashboard_df, df_locais[['numero_identificacao', 'local']], on='numero_identificacao', how='left')
+        dashboard_df['status_instalacao'] = dashboard_df['local'].apply(lambda x: f"✅ {x}" if pd.notna(x) and str(x).strip() != '' else "⚠️ Local não definido")
+    else:
+        dashboard_df['status_instalacao'] = "⚠️ Local não definido"
+        
+    return dashboard_df
+
+
 @st.cache_data(ttl=300, show_spinner=False)
 def load_all_dashboard_data():
     """
@@ -110,126 +541,3 @@ def load_all_dashboard_data():
             'foam_inspections', 'foam_actions', 'multigas_inventory', 'multigas_inspections',
             'alarm_inspections', 'alarm_inventory', 'alarm_actions'
         ]}
-
-def get_dashboard_summary_stats(all_data):
-    """
-    Gera estatísticas resumidas para o dashboard principal.
-    
-    Args:
-        all_data: Dicionário com todos os dados carregados
-        
-    Returns:
-        dict: Estatísticas consolidadas de todos os equipamentos
-    """
-    summary = {
-        'equipments': {},
-        'overall_health': {},
-        'alerts': []
-    }
-    
-    try:
-        # Estatísticas de Mangueiras
-        hose_df = get_hose_status_df(all_data['hoses'], all_data['hose_disposals'])
-        if not hose_df.empty:
-            hose_metrics = calculate_equipment_metrics(hose_df['status'])
-            summary['equipments']['hoses'] = hose_metrics
-        
-        # Estatísticas de Abrigos
-        shelter_df = get_shelter_status_df(all_data['shelters'], all_data['shelter_inspections'])
-        if not shelter_df.empty:
-            shelter_metrics = calculate_equipment_metrics(shelter_df['status_dashboard'])
-            summary['equipments']['shelters'] = shelter_metrics
-        
-        # Estatísticas de SCBAs
-        scba_df = get_scba_status_df(all_data['scba_main'], all_data['scba_visual'])
-        if not scba_df.empty:
-            scba_metrics = calculate_equipment_metrics(scba_df['status_consolidado'])
-            summary['equipments']['scba'] = scba_metrics
-        
-        # Estatísticas de Chuveiros/Lava-olhos
-        eyewash_df = get_eyewash_status_df(all_data['eyewash_inspections'])
-        if not eyewash_df.empty:
-            eyewash_metrics = calculate_equipment_metrics(eyewash_df['status_dashboard'])
-            summary['equipments']['eyewash'] = eyewash_metrics
-        
-        # Estatísticas de Câmaras de Espuma
-        foam_df = get_foam_chamber_status_df(all_data['foam_inspections'])
-        if not foam_df.empty:
-            foam_metrics = calculate_equipment_metrics(foam_df['status_dashboard'])
-            summary['equipments']['foam'] = foam_metrics
-        
-        # Estatísticas de Detectores Multigás
-        multigas_df = get_multigas_status_df(all_data['multigas_inventory'], all_data['multigas_inspections'])
-        if not multigas_df.empty:
-            # Para multigás, consideramos OK apenas se ambos calibração e bump test estão OK
-            multigas_overall_status = []
-            for _, row in multigas_df.iterrows():
-                if row['status_calibracao'] == '🟢 OK' and row['status_bump_test'] == '🟢 OK':
-                    multigas_overall_status.append('🟢 OK')
-                elif '🔴' in str(row['status_calibracao']) or '🔴' in str(row['status_bump_test']):
-                    multigas_overall_status.append('🔴 CRÍTICO')
-                else:
-                    multigas_overall_status.append('🟠 PENDENTE')
-            
-            multigas_metrics = calculate_equipment_metrics(pd.Series(multigas_overall_status))
-            summary['equipments']['multigas'] = multigas_metrics
-            
-        # Estatísticas de Sistemas de Alarme
-        alarm_df = get_alarm_status_df(all_data['alarm_inspections'])
-        if not alarm_df.empty:
-            alarm_metrics = calculate_equipment_metrics(alarm_df['status_dashboard'])
-            summary['equipments']['alarm'] = alarm_metrics
-        
-        # Cálculo da saúde geral do sistema
-        total_equipment = 0
-        total_ok = 0
-        total_critical = 0
-        
-        for equipment_type, metrics in summary['equipments'].items():
-            total_equipment += metrics.get('total', 0)
-            total_ok += metrics.get('ok_count', 0)
-            if equipment_type != 'multigas':
-                total_critical += metrics.get('expired_count', 0)
-            else:
-                # Para multigás, critical inclui vencidos e reprovados
-                total_critical += metrics.get('expired_count', 0)
-        
-        # Saúde geral do sistema com proteção contra divisão por zero
-        overall_health_percentage = safe_percentage(total_ok, total_equipment)
-        critical_percentage = safe_percentage(total_critical, total_equipment)
-        
-        summary['overall_health'] = {
-            'total_equipment': total_equipment,
-            'healthy_percentage': overall_health_percentage,
-            'critical_percentage': critical_percentage,
-            'health_status': 'Excelente' if overall_health_percentage >= 90 else 
-                           'Bom' if overall_health_percentage >= 75 else
-                           'Regular' if overall_health_percentage >= 60 else 'Crítico'
-        }
-        
-        # Geração de alertas automáticos
-        for equipment_type, metrics in summary['equipments'].items():
-            if metrics.get('expired_count', 0) > 0:
-                summary['alerts'].append({
-                    'type': 'critical',
-                    'equipment': equipment_type,
-                    'count': metrics['expired_count'],
-                    'message': f"{equipment_type.title()}: {metrics['expired_count']} equipamento(s) vencido(s)"
-                })
-            
-            # Alerta para baixa conformidade
-            if metrics.get('compliance_rate', 0) < 50:
-                summary['alerts'].append({
-                    'type': 'warning', 
-                    'equipment': equipment_type,
-                    'percentage': metrics['compliance_rate'],
-                    'message': f"{equipment_type.title()}: Taxa de conformidade baixa ({metrics['compliance_rate']:.1f}%)"
-                })
-    
-    except Exception as e:
-        st.error(f"Erro ao calcular estatísticas do dashboard: {e}")
-        summary['equipments'] = {}
-        summary['overall_health'] = {'health_status': 'Erro no cálculo', 'total_equipment': 0}
-        summary['alerts'] = [{'type': 'error', 'message': f'Erro no processamento: {e}'}]
-    
-    return summary
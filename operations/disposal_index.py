@@ -0,0 +1,118 @@
+import streamlit as st
+import pandas as pd
+import logging
+from gdrive.gdrive_upload import GoogleDriveUploader
+from gdrive.config import EXTINGUISHER_DISPOSAL_LOG_SHEET_NAME, HOSE_DISPOSAL_LOG_SHEET_NAME
+from operations.history import current_tenant_key, get_sheet_versions, invalidate_sheet_data
+
+logger = logging.getLogger(__name__)
+
+# Tipos de equipamento com log de baixa -> (aba de log, coluna de ID)
+DISPOSAL_LOGS = {
+    'extintores': (EXTINGUISHER_DISPOSAL_LOG_SHEET_NAME, 'numero_identificacao'),
+    'mangueiras': (HOSE_DISPOSAL_LOG_SHEET_NAME, 'id_mangueira'),
+}
+
+
+def get_disposal_version():
+    """Versão combinada dos logs de baixa do tenant atual (ver operations.history)."""
+    return get_sheet_versions(*(sheet_name for sheet_name, _ in DISPOSAL_LOGS.values()))
+
+
+def invalidate_disposal_index():
+    """Deve ser chamada após registrar uma baixa para que a próxima leitura busque o log atualizado."""
+    invalidate_sheet_data(*(sheet_name for sheet_name, _ in DISPOSAL_LOGS.values()))
+
+
+def _rows_to_dataframe(data):
+    if not data or len(data) < 2:
+        return pd.DataFrame()
+    headers = data[0]
+    num_columns = len(headers)
+    rows = [row + [None] * (num_columns - len(row)) if len(row) < num_columns else row[:num_columns] for row in data[1:]]
+    return pd.DataFrame(rows, columns=headers)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_disposal_log(sheet_name, tenant, version):
+    """
+    Lê um log de baixas uma única vez por (tenant, versão).
+    `tenant` e `version` fazem parte apenas da chave de cache.
+    Exceções são propagadas para que falhas de leitura não fiquem em cache.
+    """
+    uploader = GoogleDriveUploader()
+    return _rows_to_dataframe(uploader.get_data_from_sheet(sheet_name))
+
+
+class DisposedIndex:
+    """
+    Conjunto de IDs baixados por tipo de equipamento, com busca por hash
+    e anti-join vetorizado sobre DataFrames de status e seleção.
+    """
+
+    def __init__(self, ids_by_kind):
+        self._ids = {kind: frozenset(ids) for kind, ids in ids_by_kind.items()}
+
+    def ids(self, kind):
+        return self._ids.get(kind, frozenset())
+
+    def contains(self, kind, equipment_id):
+        return str(equipment_id).strip() in self.ids(kind)
+
+    def mask(self, ids, kind):
+        """Série booleana indicando quais IDs estão baixados."""
+        disposed = self.ids(kind)
+        if not disposed:
+            return pd.Series(False, index=ids.index)
+        return ids.astype(str).str.strip().isin(disposed)
+
+    def exclude(self, df, kind, id_column=None):
+        """Remove do DataFrame os equipamentos baixados (anti-join pela coluna de ID)."""
+        id_column = id_column or DISPOSAL_LOGS[kind][1]
+        if df.empty or id_column not in df.columns or not self.ids(kind):
+            return df
+        return df[~self.mask(df[id_column], kind)]
+
+
+def _ids_from_log(df_log, id_column):
+    if df_log.empty or id_column not in df_log.columns:
+        return []
+    ids = df_log[id_column].dropna().astype(str).str.strip()
+    return ids[ids != ''].unique().tolist()
+
+
+def _is_missing_sheet_error(error):
+    # A aba ainda não existe (nenhuma baixa registrada): o log está legitimamente vazio
+    return "Unable to parse range" in str(error) or "not found" in str(error).lower()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _build_disposed_index(tenant, version):
+    """Outras falhas de leitura são propagadas para que o índice incompleto não fique em cache."""
+    ids_by_kind = {}
+    for kind, (sheet_name, id_column) in DISPOSAL_LOGS.items():
+        try:
+            df_log = load_disposal_log(sheet_name, tenant, version)
+        except Exception as e:
+            if not _is_missing_sheet_error(e):
+                raise
+            logger.info(f"Log de baixas '{sheet_name}' inexistente: {e}")
+            df_log = pd.DataFrame()
+        ids_by_kind[kind] = _ids_from_log(df_log, id_column)
+    return DisposedIndex(ids_by_kind)
+
+
+def get_disposed_index(strict=False):
+    """
+    Retorna o índice de equipamentos baixados do tenant atual (em cache por versão).
+    Se a leitura falhar, retorna um índice vazio e a próxima chamada tenta de novo.
+    Resultados que ficam em cache (ex.: status do dashboard) devem usar `strict=True`:
+    a falha é propagada e o status com equipamentos baixados como ativos não é guardado.
+    """
+    try:
+        return _build_disposed_index(current_tenant_key(), get_disposal_version())
+    except Exception as e:
+        if strict:
+            raise
+        logger.warning(f"Falha ao ler os logs de baixa; índice vazio nesta execução: {e}")
+        return DisposedIndex({})
@@ -7,37 +7,35 @@ from gdrive.config import EXTINGUISHER_DISPOSAL_LOG_SHEET_NAME, EXTINGUISHER_SHE
 from auth.auth_utils import get_user_display_name
 from utils.auditoria import log_action
 from operations.photo_operations import upload_evidence_photo
+from operations.disposal_index import (
+    get_disposed_index, get_disposal_version, invalidate_disposal_index, load_disposal_log, current_tenant_key
+)
 
 def get_disposed_extinguishers():
     """
     Retorna a lista de extintores baixados.
-    Cria a aba se ela não existir.
+    Cria a aba se ela não existir. A leitura fica em cache por tenant e é
+    invalidada a cada nova baixa (ver operations.disposal_index).
     
     Returns:
         pd.DataFrame: DataFrame com extintores baixados
     """
+    tenant = current_tenant_key()
     try:
-        uploader = GoogleDriveUploader()
-        
         # Tenta carregar os dados
         try:
-            disposal_data = uploader.get_data_from_sheet(EXTINGUISHER_DISPOSAL_LOG_SHEET_NAME)
+            return load_disposal_log(EXTINGUISHER_DISPOSAL_LOG_SHEET_NAME, tenant, get_disposal_version())
         except Exception as e:
             if "Unable to parse range" in str(e) or "not found" in str(e).lower():
                 # A aba não existe, criar ela
                 st.info("Criando aba de baixas de extintores...")
                 _create_disposal_sheet()
+                invalidate_disposal_index()
                 # Tenta carregar novamente
-                disposal_data = uploader.get_data_from_sheet(EXTINGUISHER_DISPOSAL_LOG_SHEET_NAME)
+                return load_disposal_log(EXTINGUISHER_DISPOSAL_LOG_SHEET_NAME, tenant, get_disposal_version())
             else:
                 raise e
         
-        if not disposal_data or len(disposal_data) < 2:
-            return pd.DataFrame()
-            
-        df = pd.DataFrame(disposal_data[1:], columns=disposal_data[0])
-        return df
-        
     except Exception as e:
         st.error(f"Erro ao carregar registros de baixa: {e}")
         return pd.DataFrame()
@@ -102,11 +100,7 @@ def is_equipment_disposed(equipment_id):
     Returns:
         bool: True se foi baixado, False caso contrário
     """
-    df_disposed = get_disposed_extinguishers()
-    if df_disposed.empty:
-        return False
-        
-    return equipment_id in df_disposed['numero_identificacao'].values
+    return get_disposed_index().contains('extintores', equipment_id)
 
 def register_extinguisher_disposal(equipment_id, condemnation_reason, substitute_id=None, observations="", photo_evidence=None):
     """
@@ -151,6 +145,7 @@ def register_extinguisher_disposal(equipment_id, condemnation_reason, substitute
         ]
         
         uploader.append_data_to_sheet(EXTINGUISHER_DISPOSAL_LOG_SHEET_NAME, [disposal_row])
+        invalidate_disposal_index()
         
         # Marca o equipamento como "BAIXADO" no sistema principal
         _mark_equipment_as_disposed(equipment_id, condemnation_reason, substitute_id)
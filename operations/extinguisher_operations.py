@@ -3,15 +3,14 @@ import pandas as pd
 from datetime import date
 from dateutil.relativedelta import relativedelta
 from gdrive.gdrive_upload import GoogleDriveUploader
-from gdrive.config import EXTINGUISHER_SHEET_NAME, LOCATIONS_SHEET_NAME, AUDIT_LOG_SHEET_NAME
-from AI.api_Operation import PDFQA
+from gdrive.config import EXTINGUISHER_SHEET_NAME, LOCATIONS_SHEET_NAME
+from AI.client import pdf_qa
 from utils.prompts import get_extinguisher_inspection_prompt
-from utils.auditoria import log_action, get_sao_paulo_time_str
+from utils.auditoria import log_action, log_audit_rows, get_sao_paulo_time_str
 from auth.auth_utils import get_user_display_name, get_user_email, get_user_role
 
 # Inicialização de serviços
 uploader = GoogleDriveUploader()
-pdf_qa = PDFQA()
 
 
 # Mapeamento de palavras-chave para ações corretivas
@@ -39,6 +38,20 @@ ACTION_MAP = {
     "CORROSAO": "Avaliar extensão da corrosão. Se superficial, limpar e pintar. Se profunda, reprovar equipamento.",
 }
 
+# Ordem das colunas da aba de extintores (mesma ordem usada em save_inspection)
+INSPECTION_ROW_COLUMNS = [
+    'numero_identificacao', 'numero_selo_inmetro', 'tipo_agente', 'capacidade',
+    'marca_fabricante', 'ano_fabricacao', 'tipo_servico', 'data_servico',
+    'inspetor_responsavel', 'empresa_executante', 'data_proxima_inspecao',
+    'data_proxima_manutencao_2_nivel', 'data_proxima_manutencao_3_nivel',
+    'data_ultimo_ensaio_hidrostatico', 'aprovado_inspecao', 'observacoes_gerais',
+    'plano_de_acao', 'link_relatorio_pdf', 'latitude', 'longitude',
+    'link_foto_nao_conformidade'
+]
+
+# Tamanho de cada append em lote na regularização em massa
+REGULARIZATION_CHUNK_SIZE = 500
+
 # Intervalos de manutenção por tipo de serviço
 MAINTENANCE_INTERVALS = {
     "Inspeção": {"next_inspection": 1},  # meses
@@ -170,7 +183,11 @@ def process_extinguisher_pdf(uploaded_file):
     
     with st.spinner("Analisando PDF com IA..."):
         prompt = get_extinguisher_inspection_prompt()
-        extracted_data = pdf_qa.extract_structured_data(uploaded_file, prompt)
+        # Relatórios longos são extraídos em trechos de páginas, em paralelo
+        extracted_data = pdf_qa.extract_structured_data_chunked(
+            uploaded_file, prompt, list_key="extintores", id_field="numero_identificacao",
+            shared_fields=("data_servico", "inspetor_responsavel", "empresa_executante")
+        )
         
         if extracted_data and "extintores" in extracted_data and isinstance(extracted_data["extintores"], list):
             st.success(f"✅ {len(extracted_data['extintores'])} extintores identificados no documento.")
@@ -505,10 +522,26 @@ def update_extinguisher_location(equip_id, location_desc):
 
 
 
+def _format_date_column(series):
+    """Normaliza uma coluna de datas para strings 'YYYY-MM-DD' (None quando inválida)."""
+    formatted = pd.to_datetime(series, errors='coerce').dt.strftime('%Y-%m-%d')
+    return formatted.astype(object).where(formatted.notna(), None)
+
+
+def _format_coordinate_column(series):
+    """Converte coordenadas para o padrão BR (vírgula decimal), mantendo vazios como ''."""
+    as_text = series.astype(object).where(series.notna(), '').astype(str)
+    return as_text.str.replace('.', ',', regex=False)
+
+
 def batch_regularize_monthly_inspections(df_all_extinguishers):
     """
     Encontra extintores com inspeção mensal vencida E que estavam 'Aprovado'
     na última verificação, cria novos registros de inspeção "Aprovado" e LOGA CADA AÇÃO.
+
+    As linhas de inspeção e de auditoria são montadas de forma colunar (sem iterrows)
+    e gravadas em appends em lote de até REGULARIZATION_CHUNK_SIZE linhas, com
+    barra de progresso por lote.
     
     Args:
         df_all_extinguishers (pd.DataFrame): DataFrame com todo o histórico de extintores
@@ -546,96 +579,73 @@ def batch_regularize_monthly_inspections(df_all_extinguishers):
         st.success("✅ Nenhuma inspeção mensal (de equipamentos previamente aprovados) está vencida. Tudo em dia!")
         return 0
 
-    # Prepara dados para salvamento em lote
-    new_inspection_rows = []
-    audit_log_rows = []
-    
+    total = len(vencidos_e_aprovados)
     user_name = get_user_display_name()
     user_email = get_user_email()
     user_role = get_user_role()
     current_time_str = get_sao_paulo_time_str()
     current_unit = st.session_state.get('current_unit_name', 'N/A')
-
-    with st.spinner(f"Regularizando {len(vencidos_e_aprovados)} extintores..."):
-        for _, original_record in vencidos_e_aprovados.iterrows():
-            new_record = original_record.copy()
-            
-            # Atualiza campos da nova inspeção
-            new_record.update({
-                'tipo_servico': "Inspeção",
-                'data_servico': date.today().isoformat(),
-                'inspetor_responsavel': user_name,
-                'aprovado_inspecao': "Sim",
-                'observacoes_gerais': "Inspeção mensal de rotina regularizada em massa.",
-                'plano_de_acao': "Manter em monitoramento periódico.",
-                'link_relatorio_pdf': None,
-                'link_foto_nao_conformidade': None
-            })
-
-            # Preserva datas de N2, N3 e TH
-            existing_dates = {
-                'data_proxima_manutencao_2_nivel': original_record.get('data_proxima_manutencao_2_nivel'),
-                'data_proxima_manutencao_3_nivel': original_record.get('data_proxima_manutencao_3_nivel'),
-                'data_ultimo_ensaio_hidrostatico': original_record.get('data_ultimo_ensaio_hidrostatico'),
-            }
-            
-            # Calcula apenas nova data de inspeção mensal
-            updated_dates = calculate_next_dates(
-                service_date_str=new_record['data_servico'],
-                service_level="Inspeção",
-                existing_dates=existing_dates
-            )
-            new_record.update(updated_dates)
-
-            # Prepara linha para salvar
-            new_inspection_rows.append([
-                new_record.get('numero_identificacao'), 
-                new_record.get('numero_selo_inmetro'),
-                new_record.get('tipo_agente'), 
-                new_record.get('capacidade'), 
-                new_record.get('marca_fabricante'),
-                new_record.get('ano_fabricacao'), 
-                new_record.get('tipo_servico'), 
-                new_record.get('data_servico'),
-                new_record.get('inspetor_responsavel'), 
-                new_record.get('empresa_executante'),
-                new_record.get('data_proxima_inspecao'), 
-                new_record.get('data_proxima_manutencao_2_nivel'),
-                new_record.get('data_proxima_manutencao_3_nivel'), 
-                new_record.get('data_ultimo_ensaio_hidrostatico'),
-                new_record.get('aprovado_inspecao'), 
-                new_record.get('observacoes_gerais'),
-                new_record.get('plano_de_acao'), 
-                new_record.get('link_relatorio_pdf'),
-                str(new_record.get('latitude', '')).replace('.', ','), 
-                str(new_record.get('longitude', '')).replace('.', ','), 
-                new_record.get('link_foto_nao_conformidade')
-            ])
-
-            # Prepara linha de auditoria
-            audit_log_rows.append([
-                current_time_str,
-                user_email or "não logado",
-                user_role,
-                "REGULARIZOU_INSPECAO_EXTINTOR_MASSA",
-                f"ID: {new_record.get('numero_identificacao')}",
-                current_unit
-            ])
-
+    service_date = date.today().isoformat()
+
+    # Monta todas as novas inspeções de uma vez, coluna a coluna
+    new_records = pd.DataFrame(index=vencidos_e_aprovados.index)
+    for col in INSPECTION_ROW_COLUMNS:
+        new_records[col] = vencidos_e_aprovados[col] if col in vencidos_e_aprovados.columns else None
+
+    new_records['tipo_servico'] = "Inspeção"
+    new_records['data_servico'] = service_date
+    new_records['inspetor_responsavel'] = user_name
+    new_records['aprovado_inspecao'] = "Sim"
+    new_records['observacoes_gerais'] = "Inspeção mensal de rotina regularizada em massa."
+    new_records['plano_de_acao'] = "Manter em monitoramento periódico."
+    new_records['link_relatorio_pdf'] = None
+    new_records['link_foto_nao_conformidade'] = None
+
+    # Mesma regra de calculate_next_dates para "Inspeção": renova só a inspeção mensal
+    # e preserva as datas de N2, N3 e TH já existentes
+    next_dates = calculate_next_dates(service_date, "Inspeção")
+    new_records['data_proxima_inspecao'] = next_dates['data_proxima_inspecao']
+    for col in ['data_proxima_manutencao_2_nivel', 'data_proxima_manutencao_3_nivel', 'data_ultimo_ensaio_hidrostatico']:
+        new_records[col] = _format_date_column(new_records[col])
+
+    new_records['latitude'] = _format_coordinate_column(new_records['latitude'])
+    new_records['longitude'] = _format_coordinate_column(new_records['longitude'])
+
+    new_records = new_records.astype(object).where(new_records.notna(), None)
+    new_inspection_rows = new_records[INSPECTION_ROW_COLUMNS].values.tolist()
+
+    audit_log_rows = pd.DataFrame({
+        'timestamp': current_time_str,
+        'email': user_email or "não logado",
+        'role': user_role,
+        'action': "REGULARIZOU_INSPECAO_EXTINTOR_MASSA",
+        'details': "ID: " + new_records['numero_identificacao'].astype(str),
+        'uo': current_unit,
+    }).values.tolist()
+
+    saved = 0
+    progress_bar = st.progress(0, text=f"Regularizando {total} extintores...")
     try:
         # ✅ CORREÇÃO: Cria uploader dentro da função para extintores
         extinguisher_uploader = GoogleDriveUploader()
-        extinguisher_uploader.append_data_to_sheet(EXTINGUISHER_SHEET_NAME, new_inspection_rows)
-        
-        # ✅ CORREÇÃO: Cria uploader separado para a planilha matriz (auditoria)
-        matrix_uploader = GoogleDriveUploader(is_matrix=True)
-        matrix_uploader.append_data_to_sheet(AUDIT_LOG_SHEET_NAME, audit_log_rows)
 
-        st.success(f"✅ {len(vencidos_e_aprovados)} extintores regularizados com sucesso!")
-        return len(vencidos_e_aprovados)
+        for start in range(0, total, REGULARIZATION_CHUNK_SIZE):
+            end = min(start + REGULARIZATION_CHUNK_SIZE, total)
+            extinguisher_uploader.append_data_to_sheet(EXTINGUISHER_SHEET_NAME, new_inspection_rows[start:end])
+            # A auditoria é gravada em segundo plano, em lotes
+            log_audit_rows(audit_log_rows[start:end])
+            saved = end
+            progress_bar.progress(saved / total, text=f"Regularizados {saved} de {total} extintores...")
+
+        progress_bar.empty()
+        st.success(f"✅ {total} extintores regularizados com sucesso!")
+        return total
         
     except Exception as e:
+        progress_bar.empty()
         st.error(f"❌ Ocorreu um erro durante a regularização em massa: {e}")
+        if saved:
+            st.warning(f"⚠️ {saved} de {total} extintores já haviam sido gravados antes da falha.")
         import traceback
         st.error(traceback.format_exc())
         
@@ -646,11 +656,10 @@ def batch_regularize_monthly_inspections(df_all_extinguishers):
                 user_email or "não logado",
                 user_role,
                 "FALHA_REGULARIZACAO_MASSA",
-                f"Erro: {str(e)[:200]}",
+                f"Gravados: {saved}/{total}. Erro: {str(e)[:200]}",
                 current_unit
             ]
-            matrix_uploader = GoogleDriveUploader(is_matrix=True)
-            matrix_uploader.append_data_to_sheet(AUDIT_LOG_SHEET_NAME, [error_log_row])
+            log_audit_rows([error_log_row])
         except:
             pass  
             
@@ -0,0 +1,217 @@
+import streamlit as st
+import pandas as pd
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Orçamento padrão de memória (MB) e validade das entradas, configuráveis em
+# st.secrets["frame_store"] (memory_budget_mb, ttl_seconds)
+DEFAULT_MEMORY_BUDGET_MB = 512
+DEFAULT_TTL_SECONDS = 600
+
+# Colunas de texto com proporção de valores distintos até este limite têm seus
+# valores deduplicados (cada valor distinto é guardado uma única vez)
+DEDUP_MAX_UNIQUE_RATIO = 0.5
+
+
+def _object_column_nbytes(values):
+    """Bytes reais de uma coluna object: ponteiros + cada objeto distinto uma única vez."""
+    seen = {}
+    for value in values:
+        seen.setdefault(id(value), value)
+    return values.nbytes + sum(sys.getsizeof(v) for v in seen.values())
+
+
+def frame_nbytes(df):
+    """
+    Memória residente de um DataFrame. Diferente de memory_usage(deep=True),
+    objetos compartilhados entre linhas (valores deduplicados) contam uma única vez.
+    """
+    total = df.index.memory_usage()
+    for col in range(df.shape[1]):
+        values = df.iloc[:, col].to_numpy()
+        total += _object_column_nbytes(values) if values.dtype == object else values.nbytes
+    return total
+
+
+def compact_frame(df):
+    """
+    Reduz a memória de um DataFrame lido da planilha sem mudar seus dtypes:
+    em colunas de texto com poucos valores distintos (status, datas, locais...),
+    todas as células iguais passam a apontar para o mesmo objeto str.
+
+    Dtypes categóricos/Arrow economizariam o mesmo, mas alteram a semântica de
+    fillna, atribuições e valores nulos para os consumidores de load_sheet_data.
+    """
+    if df.empty:
+        return df
+    compacted = {}
+    for col in range(df.shape[1]):
+        series = df.iloc[:, col]
+        if series.dtype != object:
+            continue
+        try:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        except TypeError:
+            # Valores não hasheáveis: a coluna é mantida como está
+            continue
+        if len(uniques) > DEDUP_MAX_UNIQUE_RATIO * len(series):
+            continue
+        values = uniques.to_numpy(dtype=object)[codes] if len(uniques) else series.to_numpy(dtype=object).copy()
+        # Preserva o valor nulo original (None/NaN) das células vazias
+        missing = codes == -1
+        values[missing] = series.to_numpy()[missing]
+        compacted[col] = values
+    if not compacted:
+        return df
+    result = df.copy(deep=False)
+    for col, values in compacted.items():
+        result.isetitem(col, values)
+    return result
+
+
+class _Entry:
+    __slots__ = ('frame', 'nbytes', 'loaded_at')
+
+    def __init__(self, frame, nbytes, loaded_at):
+        self.frame = frame
+        self.nbytes = nbytes
+        self.loaded_at = loaded_at
+
+
+class FrameStore:
+    """
+    Armazenamento de DataFrames compartilhado por todas as sessões do processo,
+    por (tenant, aba, versão). Os frames guardados nunca são alterados: quem
+    precisa modificar os dados recebe uma cópia (ver operations.history.load_sheet_data).
+
+    Quando o total ultrapassa o orçamento de memória, as entradas usadas há mais
+    tempo são descartadas (LRU).
+    """
+
+    def __init__(self, memory_budget_bytes, ttl_seconds):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._loading = defaultdict(threading.Lock)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get_fresh(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.loaded_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, tenant, name, version, loader):
+        """
+        Retorna o frame compartilhado, carregando-o com `loader()` se necessário.
+        Apenas uma sessão por chave executa o loader; as demais aguardam o resultado.
+        Exceções do loader são propagadas e nada é guardado.
+        """
+        key = (tenant, name, version)
+        with self._lock:
+            entry = self._get_fresh(key)
+            if entry is not None:
+                self.hits += 1
+                return entry.frame
+
+            load_lock = self._loading[key]
+
+        with load_lock:
+            with self._lock:
+                entry = self._get_fresh(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry.frame
+                self.misses += 1
+
+            try:
+                frame = compact_frame(loader())
+                nbytes = frame_nbytes(frame)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+            with self._lock:
+                self._discard_other_versions(tenant, name)
+                self._entries[key] = _Entry(frame, nbytes, time.monotonic())
+                self._evict(keep=key)
+            return frame
+
+    def contains(self, tenant, name, version):
+        """Se o frame está residente e válido, sem carregá-lo nem contar como acesso."""
+        with self._lock:
+            entry = self._entries.get((tenant, name, version))
+            return entry is not None and time.monotonic() - entry.loaded_at <= self.ttl_seconds
+
+    def _discard_other_versions(self, tenant, name):
+        for key in [k for k in self._entries if k[0] == tenant and k[1] == name]:
+            del self._entries[key]
+
+    def _evict(self, keep):
+        total = sum(entry.nbytes for entry in self._entries.values())
+        for key in list(self._entries):
+            if total <= self.memory_budget_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._entries.pop(key).nbytes
+            self.evictions += 1
+            logger.info(f"FrameStore: descartado {key[1]} do tenant {key[0]} (orçamento de memória)")
+
+    def clear(self, tenant=None):
+        """Descarta todos os frames (ou apenas os de um tenant)."""
+        with self._lock:
+            for key in [k for k in self._entries if tenant is None or k[0] == tenant]:
+                del self._entries[key]
+
+    def stats(self):
+        """Métricas do armazenamento, incluindo bytes residentes por tenant."""
+        with self._lock:
+            bytes_by_tenant = defaultdict(int)
+            frames_by_tenant = defaultdict(int)
+            for (tenant, _, _), entry in self._entries.items():
+                bytes_by_tenant[tenant] += entry.nbytes
+                frames_by_tenant[tenant] += 1
+            lookups = self.hits + self.misses
+            return {
+                "resident_bytes": sum(bytes_by_tenant.values()),
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "frames": len(self._entries),
+                "resident_bytes_by_tenant": dict(bytes_by_tenant),
+                "frames_by_tenant": dict(frames_by_tenant),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+# Instância global (singleton)
+_frame_store = None
+_frame_store_lock = threading.Lock()
+
+
+def get_frame_store():
+    """Retorna o armazenamento de frames do processo, criando-o na primeira chamada."""
+    global _frame_store
+    if _frame_store is None:
+        with _frame_store_lock:
+            if _frame_store is None:
+                config = st.secrets.get("frame_store", {})
+                budget_mb = config.get("memory_budget_mb", DEFAULT_MEMORY_BUDGET_MB)
+                ttl = config.get("ttl_seconds", DEFAULT_TTL_SECONDS)
+                _frame_store = FrameStore(int(budget_mb * 1024 * 1024), ttl)
+                logger.info(f"FrameStore inicializado com orçamento de {budget_mb} MB")
+    return _frame_store
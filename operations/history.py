@@ -3,44 +3,202 @@ import pandas as pd
 import sys
 import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Garante que o app encontre a pasta gdrive
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from gdrive.gdrive_upload import GoogleDriveUploader
 from gdrive.config import EXTINGUISHER_SHEET_NAME
+from operations.frame_store import get_frame_store
+
+logger = logging.getLogger(__name__)
+
+# Versão de cada aba por tenant. Invalidar uma aba faz apenas ela ser relida,
+# sem descartar o cache das demais (ao contrário de st.cache_data.clear()).
+_sheet_versions = {}
+# Geração por tenant (e global): clear_sheet_caches() a incrementa, invalidando todas as abas
+_tenant_generations = {}
+_global_generation = 0
+_sheet_versions_lock = threading.Lock()
+
+# Threads que leem abas em segundo plano (ver prefetch_sheet_data)
+PREFETCH_WORKERS = 2
+
+
+def current_tenant_key():
+    """Identifica o tenant pela planilha ativa na sessão."""
+    return st.session_state.get('current_spreadsheet_id') or 'default'
+
+
+def get_sheet_versions(*sheet_names):
+    """Versões atuais das abas informadas (útil como parte de chaves de cache)."""
+    return _tenant_sheet_versions(current_tenant_key(), sheet_names)
+
+
+def _tenant_sheet_versions(tenant, sheet_names):
+    with _sheet_versions_lock:
+        generation = _global_generation + _tenant_generations.get(tenant, 0)
+        return tuple((generation, _sheet_versions.get((tenant, name), 0)) for name in sheet_names)
+
+
+def invalidate_sheet_data(*sheet_names):
+    """Marca as abas informadas como alteradas para o tenant atual."""
+    tenant = current_tenant_key()
+    with _sheet_versions_lock:
+        for name in sheet_names:
+            _sheet_versions[(tenant, name)] = _sheet_versions.get((tenant, name), 0) + 1
+
+
+def clear_sheet_caches(all_tenants=False):
+    """
+    Descarta os dados em cache: o st.cache_data e todas as abas do tenant atual
+    (ou de todos, com all_tenants=True) no armazenamento compartilhado de frames.
+    Use no lugar de st.cache_data.clear().
+    """
+    global _global_generation
+    tenant = current_tenant_key()
+    st.cache_data.clear()
+    with _sheet_versions_lock:
+        if all_tenants:
+            _global_generation += 1
+        else:
+            _tenant_generations[tenant] = _tenant_generations.get(tenant, 0) + 1
+    get_frame_store().clear(None if all_tenants else tenant)
+
+
+def _read_sheet(sheet_name, uploader=None):
+    uploader = uploader or GoogleDriveUploader()
+    data = uploader.get_data_from_sheet(sheet_name)
+
+    if not data or len(data) < 2:
+        st.info(f"Os dados ainda não foram adicionados")
+        return pd.DataFrame()
+    return _rows_to_frame(data)
+
+
+def _rows_to_frame(data):
+    if not data or len(data) < 2:
+        return pd.DataFrame()
+
+    headers = data[0]
+    rows = data[1:]
+
+    # Garante que todas as linhas tenham o mesmo número de colunas do cabeçalho
+    num_columns = len(headers)
+    cleaned_rows = []
+    for row in rows:
+        # Completa a linha com 'None' se ela for mais curta que o cabeçalho
+        row.extend([None] * (num_columns - len(row)))
+        cleaned_rows.append(row[:num_columns])
+
+    return pd.DataFrame(cleaned_rows, columns=headers)
+
+
+def get_shared_sheet_data(sheet_name):
+    """
+    Retorna o DataFrame da aba compartilhado entre todas as sessões do processo
+    (ver operations.frame_store). O frame é somente leitura: não o altere;
+    filtros e seleções que geram novos frames podem ser usados livremente.
+    Exceções de leitura são propagadas e não ficam em cache.
+    """
+    tenant = current_tenant_key()
+    version = get_sheet_versions(sheet_name)[0]
+    return get_frame_store().get(tenant, sheet_name, version, lambda: _read_sheet(sheet_name))
+
 
-@st.cache_data(ttl=600)
 def load_sheet_data(sheet_name):
     """
     Carrega dados de uma aba específica do Google Sheets e os converte em um DataFrame do Pandas.
-    Esta é uma função de utilidade central.
+    Esta é uma função de utilidade central. Os dados ficam no armazenamento compartilhado,
+    separados por tenant e por versão da aba (ver invalidate_sheet_data); o chamador recebe
+    uma cópia própria, que pode alterar (os valores de texto continuam compartilhados).
     """
     try:
-        uploader = GoogleDriveUploader()
-        data = uploader.get_data_from_sheet(sheet_name)
-        
-        if not data or len(data) < 2:
-            st.info(f"Os dados ainda não foram adicionados")
-            return pd.DataFrame()
-            
-        headers = data[0]
-        rows = data[1:]
-        
-        # Garante que todas as linhas tenham o mesmo número de colunas do cabeçalho
-        num_columns = len(headers)
-        cleaned_rows = []
-        for row in rows:
-            # Completa a linha com 'None' se ela for mais curta que o cabeçalho
-            row.extend([None] * (num_columns - len(row)))
-            cleaned_rows.append(row[:num_columns])
-
-        df = pd.DataFrame(cleaned_rows, columns=headers)
-        return df
-
+        return get_shared_sheet_data(sheet_name).copy()
     except Exception as e:
         st.error(f"Erro ao carregar dados da planilha '{sheet_name}': {e}")
         return pd.DataFrame()
-        
+
+
+def is_sheet_data_loaded(*sheet_names):
+    """Se as abas informadas já estão no armazenamento compartilhado (nenhuma leitura é feita)."""
+    tenant = current_tenant_key()
+    store = get_frame_store()
+    return all(store.contains(tenant, name, version)
+               for name, version in zip(sheet_names, get_sheet_versions(*sheet_names)))
+
+
+def prefetch_sheet_data(*sheet_names):
+    """
+    Carrega em segundo plano, no armazenamento compartilhado, as abas informadas que
+    ainda não estão lá, sem bloquear a execução da página. As abas são lidas numa única
+    requisição (ou uma a uma, se alguma não existir); falhas são apenas registradas no log.
+    """
+    spreadsheet_id = st.session_state.get('current_spreadsheet_id')
+    if not spreadsheet_id:
+        return
+    tenant = current_tenant_key()
+    store = get_frame_store()
+    with _prefetch_lock:
+        pending = [
+            (name, version) for name, version in zip(sheet_names, get_sheet_versions(*sheet_names))
+            if (tenant, name, version) not in _prefetching | _prefetch_failed
+            and not store.contains(tenant, name, version)
+        ]
+        _prefetching.update((tenant, name, version) for name, version in pending)
+    if pending:
+        _get_prefetch_executor().submit(_prefetch_sheets, tenant, spreadsheet_id, pending)
+
+
+def _prefetch_sheets(tenant, spreadsheet_id, sheets):
+    # Roda fora da sessão do Streamlit: a planilha do tenant é informada ao uploader
+    try:
+        uploader = getattr(_prefetch_local, 'uploader', None)
+        if uploader is None:
+            uploader = GoogleDriveUploader()
+            _prefetch_local.uploader = uploader
+        uploader.spreadsheet_id = spreadsheet_id
+
+        try:
+            rows_by_sheet = uploader.get_data_from_sheets([name for name, _ in sheets])
+        except Exception as e:
+            logger.info(f"Pré-carregamento: leitura conjunta falhou, lendo as abas uma a uma: {e}")
+            rows_by_sheet = {}
+
+        store = get_frame_store()
+        for name, version in sheets:
+            if _tenant_sheet_versions(tenant, (name,))[0] != version:
+                continue  # a aba foi alterada durante a leitura: a página a relê na nova versão
+            rows = rows_by_sheet.get(name)
+            loader = (lambda: _rows_to_frame(rows)) if rows is not None else (lambda: _read_sheet(name, uploader))
+            try:
+                store.get(tenant, name, version, loader)
+            except Exception as e:
+                # Não tenta de novo até a aba mudar de versão (ex.: aba inexistente neste tenant)
+                with _prefetch_lock:
+                    _prefetch_failed.add((tenant, name, version))
+                logger.warning(f"Pré-carregamento da aba '{name}' falhou: {e}")
+    finally:
+        with _prefetch_lock:
+            _prefetching.difference_update((tenant, name, version) for name, version in sheets)
+
+
+# Pré-carregamento em segundo plano: executor global (singleton), abas em leitura e com falha
+_prefetch_executor = None
+_prefetch_lock = threading.Lock()
+_prefetching = set()
+_prefetch_failed = set()
+_prefetch_local = threading.local()
+
+
+def _get_prefetch_executor():
+    global _prefetch_executor
+    if _prefetch_executor is None:
+        with _prefetch_lock:
+            if _prefetch_executor is None:
+                _prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="sheet-prefetch")
+    return _prefetch_executor
 
 
 def find_last_record(df, search_value, column_name):
@@ -91,10 +249,10 @@ def find_last_record(df, search_value, column_name):
 
         # Filtra registros correspondentes
         try:
-            # Converte coluna para string e remove espaços para comparação
-            df_copy = df.copy()
-            df_copy[column_name] = df_copy[column_name].astype(str).str.strip()
-            records = df_copy[df_copy[column_name] == search_value_str].copy()
+            # Compara a coluna como string sem espaços; só as linhas encontradas são copiadas
+            mask = df[column_name].astype(str).str.strip() == search_value_str
+            records = df[mask].copy()
+            records[column_name] = search_value_str
         except Exception as e:
             logging.error(f"Erro ao filtrar registros: {e}")
             return None
@@ -241,9 +399,9 @@ def find_last_record_safe(df, search_value, column_name):
 
         # Verificação 2: Filtra registros com logging detalhado
         search_str = str(search_value).strip()
-        df_work = df.copy()
-        df_work[column_name] = df_work[column_name].astype(str).str.strip()
-        records = df_work[df_work[column_name] == search_str].copy()
+        mask = df[column_name].astype(str).str.strip() == search_str
+        records = df[mask].copy()
+        records[column_name] = search_str
         
         logging.info(f"[DEBUG] Encontrados {len(records)} registros correspondentes")
         
@@ -349,9 +507,9 @@ def find_all_records_for_equipment(df, search_value, column_name):
             
         # Filtra e limpa dados
         search_str = str(search_value).strip()
-        df_work = df.copy()
-        df_work[column_name] = df_work[column_name].astype(str).str.strip()
-        records = df_work[df_work[column_name] == search_str].copy()
+        mask = df[column_name].astype(str).str.strip() == search_str
+        records = df[mask].copy()
+        records[column_name] = search_str
         
         if records.empty:
             return pd.DataFrame()
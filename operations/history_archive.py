@@ -0,0 +1,226 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import re
+import logging
+from datetime import date, timedelta
+
+from gdrive.gdrive_upload import GoogleDriveUploader
+from gdrive.config import (
+    EXTINGUISHER_SHEET_NAME, HOSE_SHEET_NAME, INSPECTIONS_SHELTER_SHEET_NAME,
+    SCBA_SHEET_NAME, SCBA_VISUAL_INSPECTIONS_SHEET_NAME, EYEWASH_INSPECTIONS_SHEET_NAME,
+    FOAM_CHAMBER_INSPECTIONS_SHEET_NAME, ALARM_INSPECTIONS_SHEET_NAME,
+    CANHAO_MONITOR_INSPECTIONS_SHEET_NAME, MULTIGAS_INSPECTIONS_SHEET_NAME
+)
+from operations.history import (
+    load_sheet_data, current_tenant_key, get_sheet_versions, invalidate_sheet_data
+)
+from utils.auditoria import log_action
+
+logger = logging.getLogger(__name__)
+
+# Registros mais antigos que este horizonte (em dias) podem ir para as abas de arquivo.
+# Configurável em st.secrets["history_archive"]["retention_days"].
+DEFAULT_RETENTION_DAYS = 730
+
+# Abas de histórico arquiváveis -> (coluna de ID, coluna de data, colunas de tipo).
+# Por equipamento, o último registro e o último de cada tipo (ex.: Manutenção Nível 2/3)
+# ficam sempre na aba principal, pois o status atual depende deles.
+ARCHIVABLE_SHEETS = {
+    EXTINGUISHER_SHEET_NAME: ('numero_identificacao', 'data_servico', ['tipo_servico']),
+    HOSE_SHEET_NAME: ('id_mangueira', 'data_inspecao', []),
+    INSPECTIONS_SHELTER_SHEET_NAME: ('id_abrigo', 'data_inspecao', []),
+    SCBA_SHEET_NAME: ('numero_serie_equipamento', 'data_teste', []),
+    SCBA_VISUAL_INSPECTIONS_SHEET_NAME: ('numero_serie_equipamento', 'data_inspecao', []),
+    EYEWASH_INSPECTIONS_SHEET_NAME: ('id_equipamento', 'data_inspecao', []),
+    FOAM_CHAMBER_INSPECTIONS_SHEET_NAME: ('id_camara', 'data_inspecao', ['tipo_inspecao']),
+    ALARM_INSPECTIONS_SHEET_NAME: ('id_sistema', 'data_inspecao', []),
+    CANHAO_MONITOR_INSPECTIONS_SHEET_NAME: ('id_equipamento', 'data_inspecao', ['tipo_inspecao']),
+    MULTIGAS_INSPECTIONS_SHEET_NAME: ('id_equipamento', 'data_teste', ['tipo_teste']),
+}
+
+# Vencimentos consolidados pelo máximo de todo o histórico (ver history.find_last_record):
+# o registro que contém o maior valor de cada um também permanece na aba principal.
+CONSOLIDATED_DATE_COLUMNS = [
+    'data_proxima_manutencao_2_nivel', 'data_proxima_manutencao_3_nivel',
+    'data_ultimo_ensaio_hidrostatico', 'data_proxima_inspecao', 'data_validade',
+    'data_proximo_teste', 'proxima_calibracao'
+]
+
+
+def get_retention_days():
+    return int(st.secrets.get("history_archive", {}).get("retention_days", DEFAULT_RETENTION_DAYS))
+
+
+def archive_tab_name(sheet_name, year):
+    """'extintores', 2022 -> 'extintores_arquivo_2022'."""
+    return f"{sheet_name}_arquivo_{year}"
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _list_archive_years(tenant, version):
+    """`tenant` e `version` fazem parte apenas da chave de cache."""
+    uploader = GoogleDriveUploader()
+    years = {}
+    pattern = re.compile(r"^(.+)_arquivo_(\d{4})$")
+    for title in uploader.get_sheet_ids():
+        match = pattern.match(title)
+        if match:
+            years.setdefault(match.group(1), []).append(int(match.group(2)))
+    return {name: sorted(values) for name, values in years.items()}
+
+
+def get_archive_years(sheet_name):
+    """Anos com aba de arquivo para a aba informada, no tenant atual."""
+    try:
+        years = _list_archive_years(current_tenant_key(), get_sheet_versions('__archive_tabs__')[0])
+    except Exception as e:
+        logger.warning(f"Não foi possível listar as abas de arquivo: {e}")
+        return []
+    return years.get(sheet_name, [])
+
+
+def load_history_data(sheet_name, since=None):
+    """
+    Histórico de uma aba. Sem `since` (ou com `since` dentro do horizonte de retenção),
+    lê apenas a aba principal; para datas mais antigas, une de forma transparente as
+    abas de arquivo dos anos a partir de `since`.
+    """
+    df = load_sheet_data(sheet_name)
+    if since is None or sheet_name not in ARCHIVABLE_SHEETS:
+        return df
+
+    archived = [load_sheet_data(archive_tab_name(sheet_name, year))
+                for year in get_archive_years(sheet_name) if year >= since.year]
+    archived = [frame for frame in archived if not frame.empty]
+    if not archived:
+        return df
+    return pd.concat(archived + [df], ignore_index=True)
+
+
+def _rows_to_keep(df, id_column, date_column, type_columns, dates):
+    """Marca os registros que não podem ser arquivados (ver ARCHIVABLE_SHEETS)."""
+    keep = pd.Series(False, index=df.index)
+    valid = df[dates.notna()].assign(_data=dates[dates.notna()])
+    if valid.empty:
+        return keep
+
+    for group_columns in [[id_column]] + [[id_column, col] for col in type_columns if col in df.columns]:
+        latest = valid.sort_values('_data', kind='stable').groupby(group_columns, sort=False).tail(1).index
+        keep[latest] = True
+
+    for col in CONSOLIDATED_DATE_COLUMNS:
+        if col not in df.columns or col == date_column:
+            continue
+        values = pd.to_datetime(df[col], errors='coerce')
+        holders = values.dropna().groupby(df.loc[values.notna(), id_column]).idxmax()
+        keep[holders.to_numpy()] = True
+    return keep
+
+
+def _contiguous_ranges(positions):
+    """[3, 4, 5, 9] -> [(3, 6), (9, 10)]"""
+    ranges = []
+    for pos in positions:
+        if ranges and ranges[-1][1] == pos:
+            ranges[-1] = (ranges[-1][0], pos + 1)
+        else:
+            ranges.append((pos, pos + 1))
+    return ranges
+
+
+def _read_rows(uploader, sheet_name):
+    """(cabeçalho, linhas completadas até a largura do cabeçalho) da aba, ou (None, [])."""
+    data = uploader.get_data_from_sheet(sheet_name)
+    if not data:
+        return None, []
+    headers = data[0]
+    num_columns = len(headers)
+    return headers, [(list(row) + [''] * num_columns)[:num_columns] for row in data[1:]]
+
+
+def archive_sheet_history(sheet_name, retention_days=None):
+    """
+    Move para abas anuais de arquivo os registros anteriores ao horizonte de retenção,
+    exceto os que definem o status atual de cada equipamento. Os registros são primeiro
+    copiados para o arquivo (sem repetir os que já estão lá) e só depois removidos da aba
+    principal, após confirmar que continuam nas mesmas linhas.
+
+    Returns:
+        int: Número de registros arquivados
+
+    Raises:
+        RuntimeError: se a aba mudou desde a leitura (linhas inseridas ou removidas acima
+            dos registros); nada é removido e a próxima execução tenta de novo
+    """
+    id_column, date_column, type_columns = ARCHIVABLE_SHEETS[sheet_name]
+    cutoff = pd.Timestamp(date.today() - timedelta(days=retention_days or get_retention_days()))
+
+    uploader = GoogleDriveUploader()
+    headers, rows = _read_rows(uploader, sheet_name)
+    if not rows:
+        return 0
+    df = pd.DataFrame(rows, columns=headers)
+    if id_column not in df.columns or date_column not in df.columns:
+        logger.warning(f"Aba '{sheet_name}' sem as colunas '{id_column}'/'{date_column}'; arquivamento ignorado")
+        return 0
+
+    dates = pd.to_datetime(df[date_column], errors='coerce')
+    to_archive = (dates < cutoff) & ~_rows_to_keep(df, id_column, date_column, type_columns, dates)
+    if not to_archive.any():
+        return 0
+
+    existing_tabs = uploader.get_sheet_ids()
+    positions = np.flatnonzero(to_archive.to_numpy())
+    years = dates.dt.year.to_numpy()[positions]
+    for year in np.unique(years):
+        tab_name = archive_tab_name(sheet_name, int(year))
+        year_rows = [rows[i] for i in positions[years == year]]
+        if tab_name not in existing_tabs:
+            uploader.add_sheet(tab_name, headers)
+        else:
+            # Uma execução interrompida antes da remoção já copiou parte destes registros
+            archived = {tuple(row) for row in _read_rows(uploader, tab_name)[1]}
+            year_rows = [row for row in year_rows if tuple(row) not in archived]
+        if year_rows:
+            uploader.append_data_to_sheet(tab_name, year_rows)
+        invalidate_sheet_data(tab_name)
+
+    # A remoção é por posição: confere, logo antes, se os registros lidos continuam nas mesmas linhas
+    current_headers, current_rows = _read_rows(uploader, sheet_name)
+    key_columns = [headers.index(id_column), headers.index(date_column)]
+    if current_headers != headers or len(current_rows) <= positions[-1] or any(
+        [current_rows[i][c] for c in key_columns] != [rows[i][c] for c in key_columns] for i in positions
+    ):
+        invalidate_sheet_data(sheet_name, '__archive_tabs__')
+        raise RuntimeError(f"A aba '{sheet_name}' foi alterada durante o arquivamento; nenhum registro "
+                           f"foi removido. Execute o arquivamento novamente.")
+
+    # Linha 0 da aba é o cabeçalho: o registro na posição i está na linha i + 1
+    uploader.delete_row_ranges(sheet_name, _contiguous_ranges(positions + 1))
+    invalidate_sheet_data(sheet_name, '__archive_tabs__')
+    logger.info(f"Arquivados {len(positions)} registro(s) de '{sheet_name}' anteriores a {cutoff.date()}")
+    return len(positions)
+
+
+def archive_old_history(retention_days=None, progress_callback=None):
+    """
+    Executa o arquivamento em todas as abas de histórico do tenant atual.
+
+    Returns:
+        dict: aba -> número de registros arquivados (ou a mensagem de erro)
+    """
+    results = {}
+    for i, sheet_name in enumerate(ARCHIVABLE_SHEETS):
+        if progress_callback:
+            progress_callback(i / len(ARCHIVABLE_SHEETS), sheet_name)
+        try:
+            results[sheet_name] = archive_sheet_history(sheet_name, retention_days)
+        except Exception as e:
+            logger.error(f"Falha ao arquivar '{sheet_name}': {e}")
+            results[sheet_name] = f"Erro: {e}"
+
+    archived = {name: count for name, count in results.items() if isinstance(count, int) and count}
+    if archived:
+        log_action("ARQUIVOU_HISTORICO", ", ".join(f"{name}: {count}" for name, count in archived.items()))
+    return results
@@ -4,6 +4,7 @@ from gdrive.gdrive_upload import GoogleDriveUploader
 from gdrive.config import LOCATIONS_SHEET_NAME
 from auth.auth_utils import get_user_display_name
 from utils.auditoria import log_action
+from operations.history import clear_sheet_caches
 
 def get_all_locations():
     """
@@ -200,7 +201,7 @@ def show_location_selector(key_suffix="", required=False, current_value=None):
                     if new_id and new_name:
                         if save_new_location(new_id, new_name):
                             st.success(f"✅ Local '{new_name}' cadastrado!")
-                            st.cache_data.clear()
+                            clear_sheet_caches()
                             st.rerun()
                     else:
                         st.error("Preencha todos os campos obrigatórios.")
@@ -278,7 +279,7 @@ def show_location_selector(key_suffix="", required=False, current_value=None):
                         if save_new_location(new_id, new_name):
                             st.success(f"✅ Local '{new_name}' cadastrado com sucesso!")
                             st.session_state[f'show_new_location_form_{key_suffix}'] = False
-                            st.cache_data.clear()
+                            clear_sheet_caches()
                             st.rerun()
                     else:
                         st.error("❌ Preencha todos os campos obrigatórios.")
@@ -328,7 +329,7 @@ def show_location_management_interface():
                 if new_id and new_name:
                     if save_new_location(new_id, new_name):
                         st.success(f"✅ Local '{new_name}' cadastrado!")
-                        st.cache_data.clear()
+                        clear_sheet_caches()
                         st.rerun()
                 else:
                     st.error("Preencha todos os campos obrigatórios.")
@@ -379,7 +380,7 @@ def show_location_management_interface():
                         if new_name and new_name != current_name:
                             if update_location(location_to_edit, new_name):
                                 st.success(f"✅ Local atualizado!")
-                                st.cache_data.clear()
+                                clear_sheet_caches()
                                 st.rerun()
                         elif new_name == current_name:
                             st.info("Nenhuma alteração detectada.")
@@ -404,7 +405,7 @@ def show_location_management_interface():
                 if st.button(f"🗑️ Remover Local '{location_to_delete}'", type="secondary"):
                     if delete_location(location_to_delete):
                         st.success("✅ Local removido com sucesso!")
-                        st.cache_data.clear()
+                        clear_sheet_caches()
                         st.rerun()
     else:
         st.info("📍 Nenhum local cadastrado ainda. Use o formulário acima para começar.")
@@ -5,7 +5,7 @@ from datetime import date
 from gdrive.gdrive_upload import GoogleDriveUploader
 from gdrive.config import MULTIGAS_INVENTORY_SHEET_NAME, MULTIGAS_INSPECTIONS_SHEET_NAME, LOG_MULTIGAS_SHEET_NAME
 from utils.auditoria import log_action
-from AI.api_Operation import PDFQA
+from AI.client import pdf_qa
 from utils.prompts import get_multigas_calibration_prompt
 from operations.photo_operations import upload_evidence_photo
 
@@ -101,7 +101,6 @@ def process_calibration_pdf_analysis(pdf_file):
     """
     Analisa o PDF, extrai dados e verifica a existência do detector.
     """
-    pdf_qa = PDFQA()
     prompt = get_multigas_calibration_prompt()
     extracted_data = pdf_qa.extract_structured_data(pdf_file, prompt)
     
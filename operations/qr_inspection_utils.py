@@ -1,4 +1,3 @@
-import cv2
 import numpy as np
 import pandas as pd
 
@@ -7,6 +6,9 @@ def decode_qr_from_image(image_file):
     Decodifica o QR code, aplicando pré-processamento para melhorar a detecção.
     Retorna o ID do Equipamento e o Selo (se houver).
     """
+    # OpenCV é pesado: só é carregado quando um QR code precisa ser lido
+    import cv2
+
     try:
         file_bytes = np.asarray(bytearray(image_file.read()), dtype=np.uint8)
         img = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
@@ -1,5 +1,5 @@
 import pandas as pd
-import json
+from operations.checklist_store import build_checklist_store
 from datetime import datetime
 
 def generate_alarm_inspection_html(df_inspections, df_inventory, unit_name, period_type="monthly"):
@@ -43,20 +43,13 @@ def generate_alarm_inspection_html(df_inspections, df_inventory, unit_name, peri
     
     # Gera as linhas da tabela
     table_rows_html = ""
-    for _, row in report_df.iterrows():
+    checklist = build_checklist_store(report_df)
+    for inspection_id, row in report_df.iterrows():
         status_icon = "✅" if row['status_geral'] == "Aprovado" else "❌"
         status_class = "status-ok" if row['status_geral'] == "Aprovado" else "status-fail"
         
-        # Processa os resultados JSON para mostrar não conformidades
-        non_conformities = []
-        try:
-            if pd.notna(row['resultados_json']):
-                results = json.loads(row['resultados_json'])
-                for item, status in results.items():
-                    if status == "Não Conforme":
-                        non_conformities.append(item)
-        except (json.JSONDecodeError, TypeError):
-            pass
+        # Não conformidades vêm da tabela normalizada de checklist (parse único)
+        non_conformities = checklist.non_conformities(inspection_id).index.tolist()
         
         non_conf_text = ", ".join(non_conformities[:3]) if non_conformities else "Nenhuma"
         if len(non_conformities) > 3:
@@ -3,12 +3,11 @@ Módulo para geração de relatórios em PDF das inspeções de câmaras de espu
 """
 
 import streamlit as st
-from weasyprint import HTML, CSS
 from datetime import datetime
 import pandas as pd
-import json
 from io import BytesIO
 import base64
+from operations.checklist_store import build_checklist_store
 
 def generate_foam_chamber_consolidated_report(inspections_df, inventory_df):
     """
@@ -41,8 +40,9 @@ def generate_foam_chamber_consolidated_report(inspections_df, inventory_df):
     # Gera HTML
     html_content = _generate_html_content(merged_df)
     
-    # Converte para PDF
+    # Converte para PDF (WeasyPrint só é carregado aqui, por ser pesado)
     try:
+        from weasyprint import HTML, CSS
         pdf_file = BytesIO()
         HTML(string=html_content).write_pdf(pdf_file, stylesheets=[CSS(string=_get_css_styles())])
         pdf_file.seek(0)
@@ -237,8 +237,9 @@ def _generate_html_content(df):
     """
     
     # Detalhes de cada câmara
+    checklist = build_checklist_store(df)
     for idx, row in df.iterrows():
-        html += _generate_chamber_section(row, idx + 1)
+        html += _generate_chamber_section(row, idx + 1, checklist)
     
     # Considerações finais
     html += f"""
@@ -433,7 +434,7 @@ def _generate_html_content(df):
     return html
 
 
-def _generate_chamber_section(row, chamber_number):
+def _generate_chamber_section(row, chamber_number, checklist):
     """Gera a seção HTML de uma câmara específica"""
     
     status_class = "approved" if row['status_geral'] == "Aprovado" else "rejected"
@@ -486,7 +487,7 @@ def _generate_chamber_section(row, chamber_number):
     """
     
     # Checklist de resultados
-    html += _generate_checklist_html(row['resultados_json'])
+    html += _generate_checklist_html(checklist, row.name)
     
     # Plano de ação (se houver pendências)
     if row['status_geral'] != "Aprovado":
@@ -526,13 +527,13 @@ def _generate_chamber_section(row, chamber_number):
     
     return html
 
-def _generate_checklist_html(results_json):
-    """Gera o HTML do checklist de resultados"""
+def _generate_checklist_html(checklist, inspection_id):
+    """Gera o HTML do checklist de resultados a partir da tabela normalizada"""
     
-    try:
-        results = json.loads(results_json)
-    except:
+    # Toda inspeção de câmara grava o checklist: JSON ausente, vazio ou inválido é registro quebrado
+    if checklist.is_invalid(inspection_id) or not checklist.has_items(inspection_id):
         return "<p>Erro ao carregar resultados da inspeção.</p>"
+    items = checklist.items_for(inspection_id)
     
     html = """
     <div class="checklist">
@@ -547,7 +548,7 @@ def _generate_checklist_html(results_json):
             <tbody>
     """
     
-    for question, answer in results.items():
+    for question, answer in zip(items['question'], items['status']):
         result_class = ""
         if answer == "Conforme":
             result_class = "result-ok"
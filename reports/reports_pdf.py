@@ -1,7 +1,7 @@
-import json
 import pandas as pd
 import base64
 import requests
+from operations.checklist_store import build_checklist_store
 
 def generate_shelters_html(df_shelters_registered, df_inspections, df_action_log):
     """
@@ -33,6 +33,7 @@ def generate_shelters_html(df_shelters_registered, df_inspections, df_action_log
     if not df_inspections.empty:
         df_inspections['data_inspecao_dt'] = pd.to_datetime(df_inspections['data_inspecao'])
         latest_inspections = df_inspections.sort_values('data_inspecao_dt', ascending=False).drop_duplicates('id_abrigo', keep='first')
+    checklist = build_checklist_store(latest_inspections)
 
     for _, shelter in df_shelters_registered.iterrows():
         shelter_id = shelter['id_abrigo']
@@ -56,30 +57,25 @@ def generate_shelters_html(df_shelters_registered, df_inspections, df_action_log
             status_class_geral = "status-fail" if status_geral == "Reprovado com Pendências" else "status-ok"
             html += f"<p><strong>Data da Inspeção:</strong> {inspection_date} | <strong>Status Geral:</strong> <span class='{status_class_geral}'>{status_geral}</span></p>"
             
-            try:
-                results = json.loads(inspection_details['resultados_json'])
+            inspection_id = last_inspection.index[0]
+            if checklist.is_invalid(inspection_id):
+                html += "<p>Erro ao ler os detalhes da inspeção.</p>"
+            else:
+                items = checklist.items_for(inspection_id)
                 html += "<table><tr><th>Item</th><th>Status</th><th>Observação</th></tr>"
                 
-                # Itera sobre todas as categorias (Cilindro, Mascara, Testes Funcionais, etc.)
-                for category, items in results.items():
-                    # Adiciona uma linha de cabeçalho para a categoria, se houver mais de uma
-                    if len(results) > 1:
+                # Agrupa por categoria (itens do inventário, Condições Gerais, etc.)
+                show_category_header = items['category'].nunique() > 1
+                for category, category_items in items.groupby('category', sort=False, observed=True):
+                    if show_category_header and category:
                         html += f"<tr><th colspan='3' style='background-color: #e9ecef;'>{category}</th></tr>"
                     
-                    for item, details in items.items():
-                        # Lógica para determinar o status e a classe CSS
-                        item_status = details.get('status', 'N/A') if isinstance(details, dict) else details
-                        is_ok = str(item_status).upper() in ["C", "APROVADO", "SIM", "OK"]
+                    for item, item_status, observacao, is_ok in zip(category_items['question'], category_items['status'], category_items['note'], category_items['is_ok']):
                         status_class = "status-ok" if is_ok else "status-fail"
-                        
-                        observacao = details.get('observacao', '') if isinstance(details, dict) else ''
-
                         # Gera a linha da tabela com o destaque de cor se não estiver OK
                         html += f"<tr class='{status_class}'><td class='{status_class}'>{item}</td><td class='{status_class}'>{item_status}</td><td class='{status_class}'>{observacao}</td></tr>"
 
                 html += "</table>"
-            except (json.JSONDecodeError, TypeError):
-                html += "<p>Erro ao ler os detalhes da inspeção.</p>"
         else:
             html += "<p>Nenhuma inspeção registrada para este abrigo.</p>"
 
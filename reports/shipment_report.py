@@ -3,7 +3,6 @@ from datetime import date
 import base64
 import requests
 import io
-from weasyprint import HTML
 from gdrive.gdrive_upload import GoogleDriveUploader
 from gdrive.config import TH_SHIPMENT_LOG_SHEET_NAME, EXTINGUISHER_SHIPMENT_LOG_SHEET_NAME
 
@@ -76,6 +75,7 @@ def get_image_base64_from_drive(file_id):
 
 def generate_pdf_from_html(html_content):
     """Converte uma string HTML em um objeto de bytes de PDF usando WeasyPrint."""
+    from weasyprint import HTML  # import pesado, carregado apenas quando um PDF é gerado
     pdf_bytes = io.BytesIO()
     HTML(string=html_content).write_pdf(pdf_bytes)
     return pdf_bytes.getvalue()
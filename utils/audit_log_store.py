@@ -0,0 +1,242 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import re
+import logging
+import threading
+from datetime import datetime, time as dt_time
+
+from gdrive.gdrive_upload import GoogleDriveUploader
+from gdrive.config import AUDIT_LOG_SHEET_NAME
+from utils.auditoria import get_sao_paulo_time_str
+
+logger = logging.getLogger(__name__)
+
+# A aba "quente" (log_auditoria) recebe as novas linhas; meses anteriores ficam em
+# abas de arquivo log_auditoria_AAAA_MM, que só são lidas quando o período consultado as inclui.
+MONTH_TAB_PATTERN = re.compile(rf"^{AUDIT_LOG_SHEET_NAME}_(\d{{4}})_(\d{{2}})$")
+DEFAULT_HOT_MAX_ROWS = 5000  # configurável em st.secrets["audit_log"]["hot_max_rows"]
+
+# Posições das colunas nas linhas de auditoria (ver utils.auditoria.log_action)
+TIMESTAMP_COL, EMAIL_COL, ROLE_COL, ACTION_COL, DETAILS_COL, UO_COL = range(6)
+DEFAULT_HEADERS = ['timestamp', 'user_email', 'user_role', 'action', 'details', 'target_uo']
+INDEXED_FIELDS = {'email': EMAIL_COL, 'action': ACTION_COL, 'uo': UO_COL}
+
+# Versão de cada aba de auditoria neste processo (incrementada ao rotacionar/atualizar)
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def month_tab_name(month):
+    """'2024-05' -> 'log_auditoria_2024_05'."""
+    return f"{AUDIT_LOG_SHEET_NAME}_{month.replace('-', '_')}"
+
+
+def get_hot_max_rows():
+    return int(st.secrets.get("audit_log", {}).get("hot_max_rows", DEFAULT_HOT_MAX_ROWS))
+
+
+def _version(name):
+    with _versions_lock:
+        return _versions.get(name, 0)
+
+
+def invalidate_audit_partitions(*names):
+    """Força a releitura das abas informadas (ou da lista de abas, se nenhuma for informada)."""
+    with _versions_lock:
+        for name in names or ('__tabs__',):
+            _versions[name] = _versions.get(name, 0) + 1
+
+
+def _normalize_rows(data):
+    headers = list(data[0]) if data else []
+    headers += DEFAULT_HEADERS[len(headers):]
+    num_columns = len(headers)
+    rows = [(list(row) + [''] * num_columns)[:num_columns] for row in data[1:]]
+    return headers, rows
+
+
+def _row_months(timestamps):
+    """Mês (AAAA-MM) de cada linha; linhas sem data válida herdam o mês da linha anterior."""
+    parsed = pd.to_datetime(pd.Series(timestamps, dtype=object), errors='coerce')
+    return parsed.dt.strftime('%Y-%m').ffill().bfill().fillna(_current_month())
+
+
+def _current_month():
+    # Os timestamps do log estão no horário de São Paulo
+    return get_sao_paulo_time_str()[:7]
+
+
+class AuditPartition:
+    """
+    Uma aba do log de auditoria carregada em memória, ordenada da mais recente para a
+    mais antiga, com índices por timestamp, email, ação e UO para consultas sem varredura.
+    """
+
+    def __init__(self, name, headers, rows):
+        self.name = name
+        frame = pd.DataFrame(rows, columns=headers)
+        timestamps = pd.to_datetime(frame.iloc[:, TIMESTAMP_COL], errors='coerce')
+        # Linhas sem data válida assumem a data vizinha (o log é anexado em ordem cronológica)
+        timestamps = timestamps.ffill().bfill().fillna(pd.Timestamp(0)).astype('datetime64[ns]')
+        order = np.argsort(-timestamps.to_numpy().view('i8'), kind='stable')
+        self.frame = frame.iloc[order].reset_index(drop=True)
+        # Chaves crescentes (timestamps negados) para busca binária por período
+        self._keys = -timestamps.to_numpy().view('i8')[order]
+        self._indexes = {}
+        for field, col in INDEXED_FIELDS.items():
+            values = self.frame.iloc[:, col].astype(str).str.strip().str.lower()
+            self._indexes[field] = {value: np.asarray(positions) for value, positions in values.groupby(values).indices.items()}
+
+    def __len__(self):
+        return len(self.frame)
+
+    def values(self, field):
+        """Valores distintos de um campo indexado (para os filtros da interface)."""
+        values = self.frame.iloc[:, INDEXED_FIELDS[field]].astype(str).str.strip()
+        return sorted(v for v in values.unique() if v)
+
+    def select(self, start=None, end=None, email=None, action=None, uo=None, text=None):
+        """Posições (mais recentes primeiro) das linhas que atendem a todos os filtros."""
+        lo, hi = 0, len(self._keys)
+        if end is not None:
+            lo = np.searchsorted(self._keys, -pd.Timestamp(end).value, side='left')
+        if start is not None:
+            hi = np.searchsorted(self._keys, -pd.Timestamp(start).value, side='right')
+        positions = np.arange(lo, hi)
+
+        for field, value in (('email', email), ('action', action), ('uo', uo)):
+            if value:
+                matches = self._indexes[field].get(str(value).strip().lower())
+                if matches is None:
+                    return np.array([], dtype=int)
+                positions = np.intersect1d(positions, matches, assume_unique=True)
+
+        if text and len(positions):
+            details = self.frame.iloc[positions, DETAILS_COL].astype(str)
+            positions = positions[details.str.contains(text, case=False, regex=False, na=False).to_numpy()]
+        return positions
+
+
+def _load_partition(name):
+    uploader = GoogleDriveUploader(is_matrix=True)
+    headers, rows = _normalize_rows(uploader.get_data_from_sheet(name) or [])
+    return AuditPartition(name, headers, rows)
+
+
+@st.cache_resource(ttl=60, max_entries=4, show_spinner=False)
+def _load_hot_partition(version):
+    return _load_partition(AUDIT_LOG_SHEET_NAME)
+
+
+@st.cache_resource(max_entries=24, show_spinner=False)
+def _load_month_partition(name, version):
+    # Abas de arquivo só mudam ao rotacionar, que incrementa a versão
+    return _load_partition(name)
+
+
+@st.cache_resource(ttl=600, max_entries=2, show_spinner=False)
+def _list_archived_months(version):
+    uploader = GoogleDriveUploader(is_matrix=True)
+    months = []
+    for title in uploader.get_sheet_ids():
+        match = MONTH_TAB_PATTERN.match(title)
+        if match:
+            months.append(f"{match.group(1)}-{match.group(2)}")
+    return sorted(months, reverse=True)
+
+
+def get_hot_partition():
+    return _load_hot_partition(_version(AUDIT_LOG_SHEET_NAME))
+
+
+def list_archived_months():
+    """Meses arquivados (AAAA-MM), do mais recente para o mais antigo."""
+    return _list_archived_months(_version('__tabs__'))
+
+
+def _partitions_for_range(start_date, end_date):
+    """Partições que podem conter linhas no período: a aba quente e os meses do intervalo."""
+    first, last = start_date.strftime('%Y-%m'), end_date.strftime('%Y-%m')
+    yield get_hot_partition()
+    for month in list_archived_months():
+        if first <= month <= last:
+            name = month_tab_name(month)
+            yield _load_month_partition(name, _version(name))
+
+
+def query_audit_log(start_date, end_date, email=None, action=None, uo=None, text=None, page=0, page_size=50):
+    """
+    Consulta o log de auditoria com os filtros aplicados em cada partição (apenas os meses
+    do período são lidos) e materializa somente a página pedida.
+
+    Returns:
+        tuple: (DataFrame da página, total de linhas encontradas)
+    """
+    start = datetime.combine(start_date, dt_time.min)
+    end = datetime.combine(end_date, dt_time.max)
+
+    matches = []
+    for partition in _partitions_for_range(start_date, end_date):
+        positions = partition.select(start, end, email, action, uo, text)
+        if len(positions):
+            matches.append((partition, positions))
+
+    total = sum(len(positions) for _, positions in matches)
+    offset, remaining, pieces = page * page_size, page_size, []
+    for partition, positions in matches:
+        if remaining <= 0:
+            break
+        if offset >= len(positions):
+            offset -= len(positions)
+            continue
+        chunk = positions[offset:offset + remaining]
+        pieces.append(partition.frame.iloc[chunk])
+        remaining -= len(chunk)
+        offset = 0
+
+    page_df = pd.concat(pieces, ignore_index=True) if pieces else pd.DataFrame(columns=DEFAULT_HEADERS)
+    return page_df, total
+
+
+def rotate_audit_log(max_hot_rows=None):
+    """
+    Move para as abas mensais as linhas de meses anteriores da aba quente e, se ela
+    ainda passar de `max_hot_rows`, as linhas mais antigas excedentes. As linhas são
+    primeiro copiadas para o arquivo e só depois removidas da aba quente, de forma que
+    uma falha no meio nunca perde registros (no pior caso, duplica-os).
+
+    Returns:
+        int: Número de linhas arquivadas
+    """
+    max_hot_rows = max_hot_rows or get_hot_max_rows()
+    uploader = GoogleDriveUploader(is_matrix=True)
+    data = uploader.get_data_from_sheet(AUDIT_LOG_SHEET_NAME)
+    if not data or len(data) < 2:
+        return 0
+
+    headers, rows = _normalize_rows(data)
+    months = _row_months([row[TIMESTAMP_COL] for row in rows])
+    current_month = _current_month()
+
+    # Linhas de meses anteriores no início da aba (o log é anexado em ordem cronológica)
+    older = (months < current_month).to_numpy()
+    archive_count = len(older) if older.all() else int(np.argmin(older))
+    archive_count = max(archive_count, len(rows) - max_hot_rows)
+    if archive_count <= 0:
+        return 0
+
+    existing_tabs = uploader.get_sheet_ids()
+    archived = pd.DataFrame({'month': months[:archive_count].to_numpy(), 'pos': np.arange(archive_count)})
+    for month, group in archived.groupby('month', sort=True):
+        name = month_tab_name(month)
+        if name not in existing_tabs:
+            uploader.add_sheet(name, headers)
+        uploader.append_data_to_sheet(name, [rows[i] for i in group['pos']])
+        invalidate_audit_partitions(name)
+
+    # Remove as linhas arquivadas (cabeçalho é a linha 0); linhas anexadas depois não são tocadas
+    uploader.delete_rows(AUDIT_LOG_SHEET_NAME, 1, archive_count + 1)
+    invalidate_audit_partitions(AUDIT_LOG_SHEET_NAME, '__tabs__')
+    logger.info(f"Log de auditoria rotacionado: {archive_count} linha(s) arquivada(s)")
+    return archive_count
@@ -0,0 +1,305 @@
+import streamlit as st
+import os
+import json
+import time
+import queue
+import atexit
+import uuid
+import logging
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from gdrive.config import AUDIT_LOG_SHEET_NAME
+
+logger = logging.getLogger(__name__)
+
+# Configuráveis em st.secrets["audit_log"]
+DEFAULT_QUEUE_SIZE = 5000
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL_SECONDS = 5
+DEFAULT_SPOOL_DIR = os.path.join(tempfile.gettempdir(), "isf_audit_spool")
+
+# Espera máxima entre tentativas quando a planilha de auditoria está indisponível
+MAX_RETRY_BACKOFF_SECONDS = 300
+# Tempo máximo gasto esvaziando a fila no encerramento do processo
+SHUTDOWN_FLUSH_TIMEOUT_SECONDS = 15
+
+
+class AuditSink:
+    """
+    Grava o log de auditoria em segundo plano, em lotes.
+
+    Cada linha é primeiro anexada a um arquivo de spool local (sobrevive a uma
+    queda do processo) e colocada numa fila em memória limitada. Uma thread envia
+    lotes para a aba de auditoria a cada `flush_interval` segundos ou ao juntar
+    `batch_size` linhas. Linhas que não couberam na fila ou cujo envio falhou
+    continuam no spool e são reenviadas a partir dele; o spool é truncado quando
+    não há mais nada pendente.
+
+    Cada processo tem seu próprio arquivo em `spool_dir`, travado enquanto o processo
+    vive. Na partida, spools destravados (de processos encerrados) são adotados.
+    """
+
+    def __init__(self, spool_dir, queue_size, batch_size, flush_interval):
+        os.makedirs(spool_dir, exist_ok=True)
+        self.spool_dir = spool_dir
+        self.spool_path = os.path.join(spool_dir, f"spool-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl")
+        self._spool_lock = _open_locked(self.spool_path + ".lock")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._next_seq = 0
+        self._pending = set()      # seqs gravados no spool e ainda não enviados
+        self._spilled = False      # há pendências fora da fila (só no spool)
+        self._failures = 0         # falhas de envio consecutivas
+        self._uploader = None
+        self.metrics = {
+            "enqueued": 0, "flushed": 0, "batches": 0, "failed_batches": 0,
+            "overflowed": 0, "replayed": 0, "last_flush_ms": 0.0, "last_error": None,
+        }
+        self._recover_spool()
+        self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+        self._thread.start()
+
+    # --- Caminho da requisição (nunca faz chamadas de rede) ---
+
+    def enqueue(self, rows):
+        """Registra linhas de auditoria: grava no spool e coloca na fila sem bloquear."""
+        with self._lock:
+            entries = []
+            for row in rows:
+                entries.append((self._next_seq, list(row)))
+                self._pending.add(self._next_seq)
+                self._next_seq += 1
+            self._append_to_spool(entries)
+            self.metrics["enqueued"] += len(entries)
+
+            for entry in entries:
+                try:
+                    self._queue.put_nowait(entry)
+                except queue.Full:
+                    # A linha já está no spool: será enviada quando a fila esvaziar
+                    self._spilled = True
+                    self.metrics["overflowed"] += 1
+
+    def _append_to_spool(self, entries):
+        try:
+            with open(self.spool_path, "a", encoding="utf-8") as spool:
+                for seq, row in entries:
+                    spool.write(json.dumps({"seq": seq, "row": row}, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            logger.error(f"Falha ao gravar spool de auditoria '{self.spool_path}': {e}")
+
+    def _read_spool(self, path=None):
+        entries = []
+        try:
+            with open(path or self.spool_path, encoding="utf-8") as spool:
+                for line in spool:
+                    try:
+                        record = json.loads(line)
+                        entries.append((record["seq"], record["row"]))
+                    except (ValueError, KeyError):
+                        continue  # linha incompleta de uma escrita interrompida
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _recover_spool(self):
+        """
+        Adota os spools de processos encerrados (cuja trava está livre): as linhas são
+        copiadas para o spool deste processo, com novos seqs, e reenviadas pela thread.
+        """
+        for name in sorted(os.listdir(self.spool_dir)):
+            path = os.path.join(self.spool_dir, name)
+            if not name.startswith("spool-") or not name.endswith(".jsonl") or path == self.spool_path:
+                continue
+            lock = _open_locked(path + ".lock")
+            if lock is None:
+                continue  # processo ainda ativo
+            try:
+                entries = self._read_spool(path)
+                if entries:
+                    self._adopt_rows([row for _, row in entries])
+                    logger.info(f"Spool de auditoria: {len(entries)} linha(s) pendente(s) recuperada(s) de '{name}'")
+                os.remove(path)
+            except OSError as e:
+                logger.error(f"Falha ao recuperar spool de auditoria '{path}': {e}")
+            finally:
+                lock.close()
+                _remove_quietly(path + ".lock")
+
+    def _adopt_rows(self, rows):
+        # Só no spool: a thread as envia pelo reenvio, sem ocupar a fila
+        with self._lock:
+            entries = []
+            for row in rows:
+                entries.append((self._next_seq, list(row)))
+                self._pending.add(self._next_seq)
+                self._next_seq += 1
+            self._append_to_spool(entries)
+            self._spilled = True
+
+    # --- Thread de envio ---
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect_batch(self.flush_interval)
+            sent = self._send(batch) if batch else True
+            if sent and self._spilled:
+                # Um lote do spool por ciclo, intercalado com as linhas novas da fila
+                sent = self._replay_spool()
+            if not sent:
+                # Espera exponencial; depois, o reenvio parte do spool (que contém o lote que falhou)
+                self._stop.wait(min(self.flush_interval * 2 ** (self._failures - 1), MAX_RETRY_BACKOFF_SECONDS))
+
+    def _collect_batch(self, timeout):
+        batch = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _send(self, batch):
+        start = time.perf_counter()
+        try:
+            if self._uploader is None:
+                from gdrive.gdrive_upload import GoogleDriveUploader
+                self._uploader = GoogleDriveUploader(is_matrix=True)
+            self._uploader.append_data_to_sheet(AUDIT_LOG_SHEET_NAME, [row for _, row in batch])
+        except Exception as e:
+            self._uploader = None
+            self._failures += 1
+            with self._lock:
+                self._spilled = True  # as linhas continuam no spool
+                self.metrics["failed_batches"] += 1
+                self.metrics["last_error"] = str(e)[:200]
+            logger.warning(f"Falha ao enviar {len(batch)} linha(s) de auditoria (tentativa {self._failures}): {e}")
+            return False
+
+        self._failures = 0
+
+        with self._lock:
+            self._pending.difference_update(seq for seq, _ in batch)
+            self.metrics["flushed"] += len(batch)
+            self.metrics["batches"] += 1
+            self.metrics["last_flush_ms"] = (time.perf_counter() - start) * 1000
+            self._truncate_spool_if_idle()
+        return True
+
+    def _replay_spool(self):
+        """Reenvia, a partir do spool, um lote das pendências que não estão na fila."""
+        with self._lock:
+            queued = {seq for seq, _ in list(self._queue.queue)}
+            spooled = self._read_spool()
+            entries = [(seq, row) for seq, row in spooled if seq in self._pending and seq not in queued]
+            # Pendências que não estão nem na fila nem no spool (falha de escrita do spool) foram perdidas
+            self._pending &= queued | {seq for seq, _ in spooled}
+            # O restante fica para os próximos ciclos
+            self._spilled = len(entries) > self.batch_size
+        batch = entries[:self.batch_size]
+        if batch and not self._send(batch):
+            return False
+        with self._lock:
+            self.metrics["replayed"] += len(batch)
+        return True
+
+    def _truncate_spool_if_idle(self):
+        # Chamado com self._lock adquirido
+        if self._pending:
+            return
+        try:
+            open(self.spool_path, "w").close()
+        except OSError as e:
+            logger.error(f"Falha ao truncar spool de auditoria: {e}")
+
+    def close(self, timeout=SHUTDOWN_FLUSH_TIMEOUT_SECONDS):
+        """Envia o que estiver na fila antes de o processo encerrar."""
+        self._stop.set()
+        self._thread.join(timeout=self.flush_interval + 1)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch or not self._send(batch):
+                break
+        with self._lock:
+            if self._pending:
+                logger.warning(f"{len(self._pending)} linha(s) de auditoria ficaram no spool para o próximo início")
+                return
+        # Nada pendente: o spool deste processo pode ser removido
+        _remove_quietly(self.spool_path)
+        if self._spool_lock is not None:
+            self._spool_lock.close()
+            _remove_quietly(self.spool_path + ".lock")
+
+    def stats(self):
+        """Métricas de pressão da fila e de envio."""
+        with self._lock:
+            return dict(self.metrics, queue_depth=self._queue.qsize(),
+                        queue_capacity=self._queue.maxsize, pending=len(self._pending))
+
+
+def _open_locked(path):
+    """Abre e trava `path` sem bloquear; retorna o arquivo (a trava dura enquanto aberto) ou None se já travado."""
+    try:
+        handle = open(path, "a+")
+    except OSError as e:
+        logger.error(f"Falha ao abrir trava do spool de auditoria '{path}': {e}")
+        return None
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# Instância global (singleton)
+_audit_sink = None
+_audit_sink_lock = threading.Lock()
+
+
+def get_audit_sink():
+    """Retorna o gravador de auditoria do processo, iniciando a thread na primeira chamada."""
+    global _audit_sink
+    if _audit_sink is None:
+        with _audit_sink_lock:
+            if _audit_sink is None:
+                config = st.secrets.get("audit_log", {})
+                _audit_sink = AuditSink(
+                    spool_dir=config.get("spool_dir", DEFAULT_SPOOL_DIR),
+                    queue_size=config.get("queue_size", DEFAULT_QUEUE_SIZE),
+                    batch_size=config.get("batch_size", DEFAULT_BATCH_SIZE),
+                    flush_interval=config.get("flush_interval_seconds", DEFAULT_FLUSH_INTERVAL_SECONDS),
+                )
+                atexit.register(_audit_sink.close)
+    return _audit_sink
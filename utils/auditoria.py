@@ -2,18 +2,29 @@
 import streamlit as st
 from datetime import datetime
 import pytz
-from gdrive.gdrive_upload import GoogleDriveUploader
-from gdrive.config import AUDIT_LOG_SHEET_NAME
 from auth.auth_utils import get_user_email, get_user_role
+from utils.audit_sink import get_audit_sink
 
 def get_sao_paulo_time_str():
     """Retorna o timestamp atual formatado para São Paulo."""
     sao_paulo_tz = pytz.timezone("America/Sao_Paulo")
     return datetime.now(sao_paulo_tz).strftime('%Y-%m-%d %H:%M:%S')
 
+def log_audit_rows(rows):
+    """
+    Enfileira linhas já montadas (timestamp, email, role, ação, detalhes, UO) para o
+    log de auditoria global. A gravação na planilha é feita em segundo plano, em lotes.
+    """
+    try:
+        get_audit_sink().enqueue(rows)
+    except Exception as e:
+        print(f"ALERTA: Falha ao registrar a ação de auditoria. Erro: {e}")
+
+
 def log_action(action: str, details: str = "", target_uo: str = None):
     """
-    Registra uma ação de usuário no log de auditoria global.
+    Registra uma ação de usuário no log de auditoria global. A linha é enfileirada
+    e gravada em segundo plano (ver utils.audit_sink), sem esperar pela planilha.
 
     Args:
         action (str): Um identificador curto para a ação (ex: "LOGIN_SUCCESS").
@@ -41,9 +52,8 @@ def log_action(action: str, details: str = "", target_uo: str = None):
             target_uo
         ]
 
-        # Usa o uploader no modo 'matrix' para escrever na planilha global
-        matrix_uploader = GoogleDriveUploader(is_matrix=True)
-        matrix_uploader.append_data_to_sheet(AUDIT_LOG_SHEET_NAME, log_row)
+        # Enfileira para a planilha global; o envio é feito em lote por outra thread
+        get_audit_sink().enqueue([log_row])
 
     except Exception as e:
         # Em caso de falha no log, apenas exibe um aviso no console/log do Streamlit
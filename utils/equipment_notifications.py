@@ -4,11 +4,14 @@ Monitora vencimentos e pendências, enviando alertas automáticos para usuários
 """
 
 import os
+import time
 import pandas as pd
 import logging
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, timedelta, datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Setup de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -112,10 +115,9 @@ except ImportError as e:
                 self.sheets_service = None
 
         def get_data_from_sheet(self, sheet_name):
-            """Busca dados da planilha usando o serviço real se disponível"""
+            """Busca dados da planilha; erros (ex.: 429) são propagados como no uploader real"""
             if not self.sheets_service or not self.spreadsheet_id:
-                logger.warning(f"Serviço não disponível para buscar dados de {sheet_name}")
-                return []
+                raise RuntimeError(f"Serviço Google Sheets não disponível para buscar dados de {sheet_name}")
             
             try:
                 range_name = f"{sheet_name}!A:Z"
@@ -130,7 +132,25 @@ except ImportError as e:
                 
             except Exception as e:
                 logger.error(f"Erro ao buscar dados de {sheet_name}: {e}")
-                return []
+                raise
+
+        def get_data_from_sheets(self, sheet_names):
+            """Busca várias abas em uma única requisição (values.batchGet); erros são propagados"""
+            if not self.sheets_service or not self.spreadsheet_id:
+                raise RuntimeError(f"Serviço Google Sheets não disponível para buscar dados de {', '.join(sheet_names)}")
+            
+            try:
+                result = self.sheets_service.spreadsheets().values().batchGet(
+                    spreadsheetId=self.spreadsheet_id,
+                    ranges=[f"{name}!A:Z" for name in sheet_names]
+                ).execute()
+                
+                value_ranges = result.get('valueRanges', [])
+                return {name: vr.get('values', []) for name, vr in zip(sheet_names, value_ranges)}
+                
+            except Exception as e:
+                logger.error(f"Erro ao buscar dados de {', '.join(sheet_names)}: {e}")
+                raise
 
         def append_data_to_sheet(self, sheet_name, data):
             """Adiciona dados à planilha usando o serviço real se disponível"""
@@ -171,6 +191,49 @@ except ImportError as e:
     FOAM_CHAMBER_INVENTORY_SHEET_NAME = "camaras_espuma_inventario"
     MULTIGAS_INSPECTIONS_SHEET_NAME = "inspecoes_multigas"
 
+# Abas lidas por inquilino na varredura periódica, em uma única chamada batchGet
+TENANT_SCAN_SHEETS = [
+    EXTINGUISHER_SHEET_NAME, HOSE_SHEET_NAME, SCBA_SHEET_NAME,
+    MULTIGAS_INVENTORY_SHEET_NAME, MULTIGAS_INSPECTIONS_SHEET_NAME
+]
+# Configuráveis em st.secrets["notifications"] ou pelas variáveis de ambiente equivalentes
+DEFAULT_SCAN_WORKERS = 8
+# A cota de leitura da API do Sheets é de 60 requisições/min por usuário (a conta de serviço)
+DEFAULT_SHEETS_READS_PER_MINUTE = 60
+SHEETS_READ_RETRIES = 3
+
+
+def get_scan_setting(key: str, env_var: str, default: int) -> int:
+    """Configuração da varredura: st.secrets["notifications"][key], variável de ambiente ou padrão"""
+    try:
+        value = st.secrets.get("notifications", {}).get(key)
+    except Exception:
+        value = None
+    if value is None:
+        value = os.environ.get(env_var)
+    return int(value) if value not in (None, "") else default
+
+
+def _is_rate_limited(error) -> bool:
+    return any(marker in str(error) for marker in ("429", "RATE_LIMIT", "Quota exceeded"))
+
+
+class SheetsReadLimiter:
+    """Espaça as leituras do Sheets para caber na cota; compartilhado pelos workers da varredura"""
+    
+    def __init__(self, reads_per_minute: int):
+        self.interval = 60.0 / reads_per_minute
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        time.sleep(max(slot - now, 0))
+
+
 def get_notification_handler():
     """Carrega o handler de notificações com import dinâmico"""
     logger.info("Inicializando handler de notificações...")
@@ -373,6 +436,77 @@ class EquipmentNotificationSystem:
     
     def __init__(self):
         self.notification_handler = get_notification_handler()
+        self.read_limiter = SheetsReadLimiter(get_scan_setting(
+            "sheets_reads_per_minute", "SHEETS_READS_PER_MINUTE", DEFAULT_SHEETS_READS_PER_MINUTE
+        ))
+        self._thread_local = threading.local()
+    
+    def _tenant_uploader(self, spreadsheet_id: str):
+        """Uploader da thread atual (os clientes da API do Google não são thread-safe) apontado para a planilha"""
+        uploader = getattr(self._thread_local, 'uploader', None)
+        if uploader is None:
+            uploader = GoogleDriveUploader(is_matrix=False)
+            self._thread_local.uploader = uploader
+        uploader.spreadsheet_id = spreadsheet_id
+        return uploader
+    
+    def _read_with_retry(self, read):
+        """Executa uma leitura dentro da cota, repetindo com espera se a API responder 429"""
+        for attempt in range(SHEETS_READ_RETRIES):
+            self.read_limiter.acquire()
+            try:
+                return read()
+            except Exception as e:
+                if not _is_rate_limited(e) or attempt == SHEETS_READ_RETRIES - 1:
+                    raise
+                wait = 5 * 2 ** attempt
+                logger.warning(f"Cota de leitura do Sheets excedida; nova tentativa em {wait}s")
+                time.sleep(wait)
+    
+    def fetch_tenant_sheets(self, spreadsheet_id: str) -> Dict[str, list]:
+        """
+        Lê de uma vez (batchGet) as abas usadas pelas análises de vencimentos e pendências.
+        Se a leitura conjunta falhar (ex.: planilha sem alguma das abas), lê as abas uma a
+        uma; abas que não puderem ser lidas ficam vazias. Cota esgotada mesmo após as novas
+        tentativas é propagada: o inquilino falha na varredura em vez de parecer sem equipamentos.
+        """
+        uploader = self._tenant_uploader(spreadsheet_id)
+        try:
+            sheets = self._read_with_retry(lambda: uploader.get_data_from_sheets(TENANT_SCAN_SHEETS)) or {}
+        except Exception as e:
+            if _is_rate_limited(e):
+                raise
+            logger.warning(f"Leitura conjunta das abas falhou para {spreadsheet_id}; lendo uma a uma: {e}")
+            sheets = {}
+        
+        for sheet_name in TENANT_SCAN_SHEETS:
+            if sheet_name in sheets:
+                continue
+            try:
+                sheets[sheet_name] = self._read_with_retry(lambda: uploader.get_data_from_sheet(sheet_name))
+            except Exception as e:
+                if _is_rate_limited(e):
+                    raise
+                logger.warning(f"Erro ao ler a aba {sheet_name}: {e}")
+                sheets[sheet_name] = []
+        return sheets
+    
+    def scan_tenant(self, spreadsheet_id: str, days_notice: int = 30):
+        """
+        Lê as abas do inquilino uma única vez e roda as análises de vencimentos e pendências sobre elas.
+        
+        Returns:
+            tuple: (equipamentos vencendo, pendências, tempos em segundos de leitura/análise/total)
+        """
+        start = time.perf_counter()
+        sheets = self.fetch_tenant_sheets(spreadsheet_id)
+        fetched = time.perf_counter()
+        expiring_equipment = self.get_user_expiring_equipment(spreadsheet_id, days_notice, sheets=sheets)
+        pending_issues = self.get_user_pending_issues(spreadsheet_id, sheets=sheets)
+        done = time.perf_counter()
+        return expiring_equipment, pending_issues, {
+            'leitura': fetched - start, 'analise': done - fetched, 'total': done - start
+        }
         
     def notify_equipment_expiring(self, user_email: str, user_name: str, expiring_equipment: List[Dict], days_notice: int = 30):
         """Notifica usuário sobre equipamentos vencendo"""
@@ -397,21 +531,24 @@ class EquipmentNotificationSystem:
             login_url=st.secrets.get("app", {}).get("url", "https://isnpecoessmaia.streamlit.app")
         )
     
-    def get_user_expiring_equipment(self, user_spreadsheet_id: str, days_ahead: int = 30) -> List[Dict]:
-        """Busca equipamentos que vencem nos próximos X dias para um usuário específico"""
+    def get_user_expiring_equipment(self, user_spreadsheet_id: str, days_ahead: int = 30,
+                                    sheets: Optional[Dict[str, list]] = None) -> List[Dict]:
+        """
+        Busca equipamentos que vencem nos próximos X dias para um usuário específico.
+        `sheets` são as abas já lidas por fetch_tenant_sheets (lidas aqui se omitidas).
+        """
         expiring_equipment = []
         target_date = date.today() + timedelta(days=days_ahead)
 
         try:
             logger.info(f"Verificando equipamentos vencendo para planilha {user_spreadsheet_id}")
             
-            # Cria uploader para planilha do usuário
-            user_uploader = GoogleDriveUploader(is_matrix=False)
-            user_uploader.spreadsheet_id = user_spreadsheet_id
+            if sheets is None:
+                sheets = self.fetch_tenant_sheets(user_spreadsheet_id)
             
             # Verifica extintores
             try:
-                extinguisher_data = user_uploader.get_data_from_sheet(EXTINGUISHER_SHEET_NAME)
+                extinguisher_data = sheets.get(EXTINGUISHER_SHEET_NAME, [])
                 if extinguisher_data and len(extinguisher_data) > 1:
                     df_ext = pd.DataFrame(extinguisher_data[1:], columns=extinguisher_data[0])
                     
@@ -441,7 +578,7 @@ class EquipmentNotificationSystem:
             
             # Verifica mangueiras
             try:
-                hose_data = user_uploader.get_data_from_sheet(HOSE_SHEET_NAME)
+                hose_data = sheets.get(HOSE_SHEET_NAME, [])
                 if hose_data and len(hose_data) > 1:
                     df_hose = pd.DataFrame(hose_data[1:], columns=hose_data[0])
                     
@@ -468,7 +605,7 @@ class EquipmentNotificationSystem:
             
             # Verifica SCBAs
             try:
-                scba_data = user_uploader.get_data_from_sheet(SCBA_SHEET_NAME)
+                scba_data = sheets.get(SCBA_SHEET_NAME, [])
                 if scba_data and len(scba_data) > 1:
                     df_scba = pd.DataFrame(scba_data[1:], columns=scba_data[0])
                     
@@ -495,13 +632,13 @@ class EquipmentNotificationSystem:
             
             # Verifica detectores multigás
             try:
-                multigas_data = user_uploader.get_data_from_sheet(MULTIGAS_INVENTORY_SHEET_NAME)
+                multigas_data = sheets.get(MULTIGAS_INVENTORY_SHEET_NAME, [])
                 if multigas_data and len(multigas_data) > 1:
                     df_multi = pd.DataFrame(multigas_data[1:], columns=multigas_data[0])
                     
                     # Busca calibrações na aba de inspeções
                     try:
-                        inspections_data = user_uploader.get_data_from_sheet(MULTIGAS_INSPECTIONS_SHEET_NAME)
+                        inspections_data = sheets.get(MULTIGAS_INSPECTIONS_SHEET_NAME, [])
                         if inspections_data and len(inspections_data) > 1:
                             df_insp = pd.DataFrame(inspections_data[1:], columns=inspections_data[0])
                             
@@ -537,19 +674,23 @@ class EquipmentNotificationSystem:
         logger.info(f"Total de equipamentos vencendo encontrados: {len(expiring_equipment)}")
         return expiring_equipment
     
-    def get_user_pending_issues(self, user_spreadsheet_id: str) -> List[Dict]:
-        """Busca pendências não resolvidas para um usuário específico"""
+    def get_user_pending_issues(self, user_spreadsheet_id: str,
+                                sheets: Optional[Dict[str, list]] = None) -> List[Dict]:
+        """
+        Busca pendências não resolvidas para um usuário específico.
+        `sheets` são as abas já lidas por fetch_tenant_sheets (lidas aqui se omitidas).
+        """
         pending_issues = []
 
         try:
             logger.info(f"Verificando pendências para planilha {user_spreadsheet_id}")
             
-            user_uploader = GoogleDriveUploader(is_matrix=False)
-            user_uploader.spreadsheet_id = user_spreadsheet_id
+            if sheets is None:
+                sheets = self.fetch_tenant_sheets(user_spreadsheet_id)
             
             # Verifica extintores reprovados sem ações corretivas
             try:
-                extinguisher_data = user_uploader.get_data_from_sheet(EXTINGUISHER_SHEET_NAME)
+                extinguisher_data = sheets.get(EXTINGUISHER_SHEET_NAME, [])
                 if extinguisher_data and len(extinguisher_data) > 1:
                     df_ext = pd.DataFrame(extinguisher_data[1:], columns=extinguisher_data[0])
                     
@@ -574,7 +715,7 @@ class EquipmentNotificationSystem:
             
             # Verifica mangueiras reprovadas/condenadas
             try:
-                hose_data = user_uploader.get_data_from_sheet(HOSE_SHEET_NAME)
+                hose_data = sheets.get(HOSE_SHEET_NAME, [])
                 if hose_data and len(hose_data) > 1:
                     df_hose = pd.DataFrame(hose_data[1:], columns=hose_data[0])
                     
@@ -598,7 +739,7 @@ class EquipmentNotificationSystem:
                 logger.warning(f"Erro ao verificar pendências de mangueiras: {e}")
             
             # Verifica equipamentos vencidos (já passaram da data)
-            expired_equipment = self.get_user_expiring_equipment(user_spreadsheet_id, days_ahead=0)
+            expired_equipment = self.get_user_expiring_equipment(user_spreadsheet_id, days_ahead=0, sheets=sheets)
             expired_equipment = [eq for eq in expired_equipment if eq['dias_restantes'] < 0]
             
             for eq in expired_equipment:
@@ -693,67 +834,93 @@ class EquipmentNotificationSystem:
                 logger.info("Nenhum usuário ativo com planilha encontrado")
                 return
             
-            notifications_sent = 0
-            
+            # Valida os inquilinos antes de distribuí-los entre os workers
+            tenants = []
             for idx, user in active_users.iterrows():
-                try:
-                    user_email = str(user.get(email_col, '')).strip()
-                    user_name = str(user.get(nome_col, user_email)).strip()
-                    spreadsheet_id = str(user.get(spreadsheet_col, '')).strip()
-                    
-                    # Validações básicas
-                    if not user_email or '@' not in user_email:
-                        logger.warning(f"Email inválido para usuário na linha {idx}: '{user_email}'")
-                        continue
-                    
-                    if not spreadsheet_id:
-                        logger.warning(f"spreadsheet_id vazio para usuário {user_email}")
-                        continue
-                    
-                    logger.info(f"Processando notificações para {user_email} (planilha: {spreadsheet_id})")
-                    
-                    # Busca equipamentos vencendo
-                    expiring_equipment = self.get_user_expiring_equipment(spreadsheet_id, days_notice)
-                    logger.info(f"Equipamentos vencendo para {user_email}: {len(expiring_equipment)}")
-                    
-                    # Busca pendências
-                    pending_issues = self.get_user_pending_issues(spreadsheet_id)
-                    logger.info(f"Pendências para {user_email}: {len(pending_issues)}")
-                    
-                    # Envia notificação se houver vencimentos
-                    if expiring_equipment:
-                        success = self.notify_equipment_expiring(
-                            user_email=user_email,
-                            user_name=user_name,
-                            expiring_equipment=expiring_equipment,
-                            days_notice=days_notice
-                        )
-                        if success:
-                            notifications_sent += 1
-                            logger.info(f"Notificação de vencimentos enviada para {user_email} ({len(expiring_equipment)} itens)")
-                        else:
-                            logger.error(f"Falha ao enviar notificação de vencimentos para {user_email}")
-                    
-                    # Envia notificação se houver pendências
-                    if pending_issues:
-                        success = self.notify_pending_issues(
-                            user_email=user_email,
-                            user_name=user_name,
-                            pending_issues=pending_issues
-                        )
-                        if success:
-                            notifications_sent += 1
-                            logger.info(f"Notificação de pendências enviada para {user_email} ({len(pending_issues)} itens)")
-                        else:
-                            logger.error(f"Falha ao enviar notificação de pendências para {user_email}")
-                            
-                except Exception as e:
-                    logger.error(f"Erro ao processar usuário {user.get('email', 'N/A')}: {e}")
-                    import traceback
-                    logger.error(traceback.format_exc())
+                user_email = str(user.get(email_col, '')).strip()
+                user_name = str(user.get(nome_col, user_email)).strip()
+                spreadsheet_id = str(user.get(spreadsheet_col, '')).strip()
+                
+                # Validações básicas
+                if not user_email or '@' not in user_email:
+                    logger.warning(f"Email inválido para usuário na linha {idx}: '{user_email}'")
+                    continue
+                
+                if not spreadsheet_id:
+                    logger.warning(f"spreadsheet_id vazio para usuário {user_email}")
                     continue
+                
+                tenants.append((user_email, user_name, spreadsheet_id))
+            
+            if not tenants:
+                logger.info("Nenhum usuário válido para processar")
+                return
+            
+            workers = max(1, min(get_scan_setting("scan_workers", "NOTIFICATION_SCAN_WORKERS", DEFAULT_SCAN_WORKERS), len(tenants)))
+            logger.info(f"Varrendo {len(tenants)} inquilinos com {workers} workers "
+                        f"(até {60 / self.read_limiter.interval:.0f} leituras/min no Sheets)")
+            
+            notifications_sent = 0
+            tenant_timings = []
+            scan_start = time.perf_counter()
+            
+            # As leituras e análises rodam no pool; os envios ficam na thread principal
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tenant-scan") as executor:
+                futures = {
+                    executor.submit(self.scan_tenant, spreadsheet_id, days_notice): (user_email, user_name, spreadsheet_id)
+                    for user_email, user_name, spreadsheet_id in tenants
+                }
+                
+                for future in as_completed(futures):
+                    user_email, user_name, spreadsheet_id = futures[future]
+                    try:
+                        expiring_equipment, pending_issues, timing = future.result()
+                        tenant_timings.append(timing['total'])
+                        logger.info(
+                            f"Inquilino {user_email} (planilha: {spreadsheet_id}): leitura {timing['leitura']:.2f}s, "
+                            f"análise {timing['analise']:.2f}s, total {timing['total']:.2f}s - "
+                            f"{len(expiring_equipment)} vencendo, {len(pending_issues)} pendências"
+                        )
+                        
+                        # Envia notificação se houver vencimentos
+                        if expiring_equipment:
+                            success = self.notify_equipment_expiring(
+                                user_email=user_email,
+                                user_name=user_name,
+                                expiring_equipment=expiring_equipment,
+                                days_notice=days_notice
+                            )
+                            if success:
+                                notifications_sent += 1
+                                logger.info(f"Notificação de vencimentos enviada para {user_email} ({len(expiring_equipment)} itens)")
+                            else:
+                                logger.error(f"Falha ao enviar notificação de vencimentos para {user_email}")
+                        
+                        # Envia notificação se houver pendências
+                        if pending_issues:
+                            success = self.notify_pending_issues(
+                                user_email=user_email,
+                                user_name=user_name,
+                                pending_issues=pending_issues
+                            )
+                            if success:
+                                notifications_sent += 1
+                                logger.info(f"Notificação de pendências enviada para {user_email} ({len(pending_issues)} itens)")
+                            else:
+                                logger.error(f"Falha ao enviar notificação de pendências para {user_email}")
+                                
+                    except Exception as e:
+                        logger.error(f"Erro ao processar usuário {user_email}: {e}")
+                        import traceback
+                        logger.error(traceback.format_exc())
+                        continue
             
-            logger.info(f"Notificações periódicas concluídas: {notifications_sent} enviadas de {len(active_users)} usuários processados")
+            if tenant_timings:
+                logger.info(
+                    f"Varredura concluída em {time.perf_counter() - scan_start:.1f}s - por inquilino: "
+                    f"média {sum(tenant_timings) / len(tenant_timings):.2f}s, máximo {max(tenant_timings):.2f}s"
+                )
+            logger.info(f"Notificações periódicas concluídas: {notifications_sent} enviadas de {len(tenants)} usuários processados")
             
         except Exception as e:
             logger.error(f"Erro crítico no envio de notificações periódicas: {e}")
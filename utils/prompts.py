@@ -284,3 +284,23 @@ def get_multigas_calibration_prompt():
       }
     }
     """
+
+
+def get_prompt_kind(prompt):
+    """
+    Chave principal do JSON pedido por um dos prompts acima ('extintores', 'calibracao'...),
+    ou None para prompts avulsos. Prompts com instruções acrescentadas no final (ex.: trechos
+    de páginas em AI.pdf_chunking) contam como o prompt original.
+    """
+    prompts_by_kind = {
+        "extintores": get_extinguisher_inspection_prompt,
+        "mangueiras": get_hose_inspection_prompt,
+        "abrigos": get_shelter_inventory_prompt,
+        "scbas": get_scba_inspection_prompt,
+        "laudo": get_air_quality_prompt,
+        "calibracao": get_multigas_calibration_prompt,
+    }
+    for kind, get_prompt in prompts_by_kind.items():
+        if prompt.startswith(get_prompt()):
+            return kind
+    return None
@@ -1,29 +1,8 @@
+import importlib
+import importlib.util
 
-from . import (
-    administracao,
-    dashboard,
-    inspecao_extintores,
-    inspecao_mangueiras,
-    inspecao_scba,
-    inspecao_chuveiros,
-    inspecao_camaras_espuma,
-    historico,
-    utilitarios,
-    resumo_gerencial,
-    inspecao_multigas,
-    inspecao_alarmes,
-    demo_page,
-    trial_expired_page
-)
-
-# Módulo opcional - perfil do usuário
-try:
-    from . import perfil_usuario
-    _PERFIL_DISPONIVEL = True
-except ImportError:
-    _PERFIL_DISPONIVEL = False
-
-# Lista de módulos sempre disponíveis
+# Lista de módulos sempre disponíveis. Os submódulos são importados sob demanda
+# (ver __getattr__), para que `import views` não carregue todas as páginas.
 __all__ = [
     "administracao",
     "dashboard",
@@ -32,6 +11,7 @@ __all__ = [
     "inspecao_scba",
     "inspecao_chuveiros",
     "inspecao_camaras_espuma",
+    "inspecao_canhoes_monitores",
     "historico",
     "utilitarios",
     "resumo_gerencial",
@@ -41,13 +21,20 @@ __all__ = [
     "trial_expired_page"
 ]
 
+# Módulo opcional - perfil do usuário
+_PERFIL_DISPONIVEL = importlib.util.find_spec(f"{__name__}.perfil_usuario") is not None
+
 # Adiciona perfil_usuario à lista se disponível
 if _PERFIL_DISPONIVEL:
     __all__.append("perfil_usuario")
 
-# Função utilitária para verificar se o perfil está disponível
-def is_perfil_available():
-    return _PERFIL_DISPONIVEL
 
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
+# Função utilitária para verificar se o perfil está disponível
+def is_perfil_available():
+    return _PERFIL_DISPONIVEL
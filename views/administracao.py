@@ -21,7 +21,14 @@ from gdrive.config import (
 from config.page_config import set_page_config
 from utils.auditoria import log_action
 from AI.api_key_manager import get_api_key_manager
-from AI.api_Operation import PDFQA
+from operations.history import clear_sheet_caches
+from operations.frame_store import get_frame_store
+from utils.audit_sink import get_audit_sink
+from utils.audit_log_store import (
+    query_audit_log, rotate_audit_log, get_hot_partition, get_hot_max_rows,
+    list_archived_months, invalidate_audit_partitions
+)
+from views.paginated_list import PAGE_SIZE_OPTIONS
 
 set_page_config()
 
@@ -34,7 +41,7 @@ def show_api_key_management():
     st.warning("⚠️ **Acesso Restrito:** Esta seção é visível apenas para o desenvolvedor/superusuário.")
     
     # Subtabs
-    subtab_stats, subtab_test = st.tabs(["📊 Estatísticas", "🧪 Testes"])
+    subtab_stats, subtab_test, subtab_benchmark = st.tabs(["📊 Estatísticas", "🧪 Testes", "🏁 Benchmark"])
     
     with subtab_stats:
         show_api_key_statistics()
@@ -42,6 +49,9 @@ def show_api_key_management():
     with subtab_test:
         show_api_key_tests()
 
+    with subtab_benchmark:
+        show_ai_benchmark()
+
 def show_api_key_statistics():
     """Mostra estatísticas de uso das chaves API"""
     st.subheader("📊 Estatísticas de Chaves API do Gemini")
@@ -56,6 +66,30 @@ def show_api_key_statistics():
         col2.metric("Chaves Disponíveis", stats['available_keys'])
         col3.metric("Chaves em Cooldown", stats['keys_in_cooldown'])
         col4.metric("Estratégia", stats['strategy'])
+
+        # Cache de extrações: reenvios do mesmo PDF não consomem cota
+        from AI.extraction_cache import get_extraction_cache
+        cache_stats = get_extraction_cache().stats()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Acertos no Cache de Extração", stats['cache_hits'])
+        col2.metric("Taxa de Acerto", f"{cache_stats['hit_rate']:.0%}")
+        col3.metric("Extrações em Cache", cache_stats['entries'])
+        col4.metric("Tamanho do Cache", f"{cache_stats['size_bytes'] / (1024 * 1024):.1f} MB")
+        st.caption(f"📄 Extrações resolvidas por leitura local do PDF (sem IA): {stats['local_hits']}")
+
+        # Roteamento por complexidade: o limite se ajusta pela latência e erros de cada rota
+        from AI.model_routing import get_model_router
+        routing = get_model_router().stats()
+        st.markdown(f"**🔀 Roteamento de modelos** (limite de complexidade atual: {routing['threshold']:.2f})")
+        st.dataframe(pd.DataFrame([
+            {
+                "Rota": route,
+                "Modelo": metrics['model'],
+                "Requisições": metrics['requests'],
+                "Erros": metrics['errors'],
+                "Latência Média (s)": round(metrics['avg_seconds'], 1),
+            } for route, metrics in routing['routes'].items()
+        ]), use_container_width=True, hide_index=True)
         
         st.markdown("---")
         
@@ -69,6 +103,7 @@ def show_api_key_statistics():
                 usage = stats['usage_count'].get(key, 0)
                 failures = stats['failure_count'].get(key, 0)
                 in_cooldown = "🔴 Sim" if key in key_manager.key_cooldown else "🟢 Não"
+                budget = stats['remaining_budget'].get(key, {})
                 
                 # Calcula taxa de sucesso
                 total_requests = usage
@@ -80,6 +115,9 @@ def show_api_key_statistics():
                     "Usos Totais": usage,
                     "Falhas": failures,
                     "Taxa de Sucesso": f"{success_rate:.1f}%",
+                    "Tokens": stats['token_count'].get(key, 0),
+                    "Saldo RPM": budget.get('rpm', 0),
+                    "Saldo TPM": budget.get('tpm', 0),
                     "Em Cooldown": in_cooldown
                 })
             
@@ -117,7 +155,7 @@ def show_api_key_statistics():
             st.markdown("### ⏱️ Chaves em Cooldown")
             cooldown_data = []
             
-            for key, cooldown_until in key_manager.key_cooldown.items():
+            for key, cooldown_until in dict(key_manager.key_cooldown).items():
                 masked_key = key_manager._mask_key(key)
                 remaining_time = (cooldown_until - datetime.now()).total_seconds() / 60
                 
@@ -135,9 +173,7 @@ def show_api_key_statistics():
         with col_reset2:
             if st.button("🔄 Resetar Estatísticas", type="secondary"):
                 # Limpa contadores
-                key_manager.key_usage_count.clear()
-                key_manager.key_failures.clear()
-                key_manager.key_last_used.clear()
+                key_manager.reset_statistics()
                 st.success("✅ Estatísticas resetadas!")
                 st.rerun()
                 
@@ -172,7 +208,10 @@ def show_api_key_tests():
                 rotation_results = []
                 
                 for i in range(num_tests):
-                    key = key_manager.get_next_key()
+                    key = key_manager.acquire(timeout=0)
+                    if key is None:
+                        st.warning(f"Sem orçamento disponível na requisição #{i+1}.")
+                        break
                     masked = key_manager._mask_key(key)
                     rotation_results.append({
                         "Requisição": f"#{i+1}",
@@ -219,23 +258,30 @@ def show_api_key_tests():
         
         if st.button("📡 Testar Requisição Real", type="primary"):
             with st.spinner("Enviando requisição ao Gemini..."):
+                # Reserva a chave pelo escalonador, como nas requisições do sistema
+                api_key = key_manager.get_next_key()
                 try:
-                    pdf_qa = PDFQA()
+                    if not api_key:
+                        raise RuntimeError("Nenhuma chave API com orçamento disponível")
+                    from AI.gemini_backend import get_gemini_backend
+                    model = get_gemini_backend().model('gemini-2.5-pro', api_key=api_key)
                     
                     # Tenta uma requisição simples
-                    response = pdf_qa.model.generate_content(test_prompt)
+                    response = model.generate_content(test_prompt)
                     
                     if response and response.text:
+                        key_manager.report_key_success(api_key)
                         st.success("✅ Requisição bem-sucedida!")
                         st.write(f"**Resposta da API:** {response.text}")
                         
                         # Mostra qual chave foi usada
-                        current_key = key_manager.keys[key_manager.current_key_index]
-                        st.info(f"🔑 Chave utilizada: {key_manager._mask_key(current_key)}")
+                        st.info(f"🔑 Chave utilizada: {key_manager._mask_key(api_key)}")
                     else:
                         st.error("❌ Resposta vazia da API")
                         
                 except Exception as e:
+                    if api_key:
+                        key_manager.report_key_failure(api_key, str(e))
                     st.error(f"❌ Erro na requisição: {str(e)}")
                     
                     # Mostra estatísticas após erro
@@ -251,7 +297,7 @@ def show_api_key_tests():
             st.write(f"**Chaves atualmente em cooldown:** {len(key_manager.key_cooldown)}")
             
             if st.button("🔓 Remover Todos os Cooldowns", type="secondary"):
-                key_manager.key_cooldown.clear()
+                key_manager.clear_cooldowns()
                 st.success("✅ Todos os cooldowns foram removidos!")
                 st.rerun()
         else:
@@ -260,8 +306,166 @@ def show_api_key_tests():
     except Exception as e:
         st.error(f"❌ Erro ao executar testes: {e}")
         st.exception(e)
+
+
+def show_ai_benchmark():
+    """Benchmark do pipeline de extração contra o Gemini simulado (não consome cota)"""
+    from AI.benchmark import BENCHMARK_MODES, run_benchmark, synthetic_pdf
+    from AI.fake_gemini import FakeGeminiConfig
+    from utils.prompts import get_extinguisher_inspection_prompt
+
+    st.subheader("🏁 Benchmark com Gemini Simulado")
+    st.write("Mede vazão, latência e uso das chaves nos modos de extração, com respostas simuladas.")
+
+    col1, col2, col3 = st.columns(3)
+    modes = col1.multiselect("Modos", list(BENCHMARK_MODES), default=list(BENCHMARK_MODES),
+                             format_func=BENCHMARK_MODES.get)
+    num_documents = col2.number_input("Documentos", 1, 50, 6)
+    pages = col3.number_input("Páginas por documento", 1, 100, 12)
+    col1, col2, col3 = st.columns(3)
+    num_keys = col1.number_input("Chaves simuladas", 1, 20, 4)
+    requests_per_minute = col2.number_input("RPM por chave", 1, 1000, 60)
+    latency = col3.number_input("Latência base (s)", 0.0, 30.0, 0.5, step=0.1)
+    col1, col2, col3 = st.columns(3)
+    seconds_per_page = col1.number_input("Latência por página (s)", 0.0, 5.0, 0.05, step=0.01)
+    rate_limit_rate = col2.slider("Taxa de 429", 0.0, 0.5, 0.05)
+    malformed_json_rate = col3.slider("Taxa de JSON malformado", 0.0, 0.5, 0.02)
+
+    if st.button("🏁 Executar Benchmark", key="run_ai_benchmark"):
+        prompt = get_extinguisher_inspection_prompt()
+        rows = []
+        for mode in modes:
+            with st.spinner(f"Executando modo {BENCHMARK_MODES[mode]}..."):
+                pdf_files = [synthetic_pdf(pages, f"benchmark_{i + 1}.pdf") for i in range(num_documents)]
+                report = run_benchmark(mode, pdf_files, prompt, FakeGeminiConfig(
+                    latency_seconds=latency, seconds_per_page=seconds_per_page,
+                    rate_limit_rate=rate_limit_rate, malformed_json_rate=malformed_json_rate,
+                ), num_keys=num_keys, requests_per_minute=requests_per_minute)
+            key_requests = [usage['requests'] for usage in report['key_utilization'].values()]
+            rows.append({
+                "Modo": BENCHMARK_MODES[mode],
+                "Sucessos": f"{report['successes']}/{report['documents']}",
+                "Tempo Total (s)": round(report['wall_seconds'], 1),
+                "Documentos/min": round(report['throughput_per_minute'], 1),
+                "Requisições": report['requests'],
+                "Latência p50 (s)": round(report['latency_p50'], 2),
+                "Latência p95 (s)": round(report['latency_p95'], 2),
+                "429": report['outcomes'].get('rate_limited', 0),
+                "JSON Malformado": report['outcomes'].get('malformed', 0),
+                "Requisições por Chave (mín-máx)": f"{min(key_requests)}-{max(key_requests)}",
+                "Modelos": ", ".join(f"{m}: {n}" for m, n in report['calls_per_model'].items()),
+            })
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
 #-----------------------------------------------------------------------------------------------------------------------------------------------
 
+def show_frame_store_metrics():
+    """Métricas do armazenamento de dados compartilhado entre as sessões deste processo."""
+    stats = get_frame_store().stats()
+    with st.expander("🧠 Memória de Dados Compartilhados (este servidor)"):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Memória Residente", f"{stats['resident_bytes'] / 1024**2:.1f} MB",
+                    help=f"Orçamento: {stats['memory_budget_bytes'] / 1024**2:.0f} MB")
+        col2.metric("Planilhas em Memória", stats['frames'])
+        col3.metric("Taxa de Acerto", f"{stats['hit_rate']:.0%}")
+        col4.metric("Descartes (LRU)", stats['evictions'])
+
+        if stats['resident_bytes_by_tenant']:
+            df_tenants = pd.DataFrame({
+                'Planilha (tenant)': list(stats['resident_bytes_by_tenant'].keys()),
+                'Memória (MB)': [round(b / 1024**2, 2) for b in stats['resident_bytes_by_tenant'].values()],
+                'Abas': [stats['frames_by_tenant'][t] for t in stats['resident_bytes_by_tenant']],
+            }).sort_values('Memória (MB)', ascending=False)
+            st.dataframe(df_tenants, use_container_width=True, hide_index=True)
+
+
+def _set_audit_page(page):
+    st.session_state['audit_log_page'] = page
+
+
+def show_audit_log():
+    """Consulta paginada do log de auditoria, lendo apenas as abas mensais do período filtrado."""
+    hot = get_hot_partition()
+    archived_months = list_archived_months()
+    hot_max_rows = get_hot_max_rows()
+
+    col_info, col_refresh, col_rotate = st.columns([3, 1, 1])
+    col_info.caption(
+        f"Aba atual: {len(hot)}/{hot_max_rows} registros · "
+        f"{len(archived_months)} mês(es) arquivado(s)" + (f" (desde {archived_months[-1]})" if archived_months else "")
+    )
+    if col_refresh.button("🔄 Atualizar", key="audit_refresh", use_container_width=True):
+        invalidate_audit_partitions(AUDIT_LOG_SHEET_NAME, '__tabs__')
+        st.rerun()
+    if col_rotate.button("🗄️ Arquivar", key="audit_rotate", use_container_width=True,
+                         help="Move meses anteriores (e o excedente do limite) para as abas mensais"):
+        with st.spinner("Arquivando registros antigos..."):
+            try:
+                moved = rotate_audit_log(hot_max_rows)
+                if moved:
+                    log_action("ARQUIVOU_LOG_AUDITORIA", f"{moved} registro(s) movidos para abas mensais")
+                st.success(f"{moved} registro(s) arquivado(s).")
+            except Exception as e:
+                st.error(f"Falha ao arquivar o log de auditoria: {e}")
+
+    today = date.today()
+    col_period, col_email, col_action, col_uo = st.columns(4)
+    period = col_period.date_input("Período:", value=(today - timedelta(days=30), today), key="audit_period")
+    email = col_email.text_input("Email:", key="audit_email").strip()
+    action = col_action.selectbox("Ação:", [""] + hot.values('action'), key="audit_action",
+                                  format_func=lambda a: a or "Todas")
+    uo = col_uo.text_input("UO:", key="audit_uo").strip()
+
+    col_text, col_size = st.columns([4, 1])
+    text = col_text.text_input("Buscar nos detalhes:", key="audit_text").strip()
+    page_size = col_size.selectbox("Por página", PAGE_SIZE_OPTIONS, index=2, key="audit_page_size")
+
+    if not isinstance(period, (list, tuple)) or len(period) != 2:
+        st.info("Selecione a data inicial e a final do período.")
+        return
+    start_date, end_date = period
+
+    # Volta para a primeira página quando os filtros mudam
+    signature = (start_date, end_date, email, action, uo, text, page_size)
+    if st.session_state.get('audit_log_signature') != signature:
+        st.session_state['audit_log_signature'] = signature
+        st.session_state['audit_log_page'] = 0
+    page = st.session_state.get('audit_log_page', 0)
+
+    try:
+        page_df, total = query_audit_log(start_date, end_date, email, action, uo, text, page, page_size)
+    except Exception as e:
+        st.error(f"Erro ao consultar o log de auditoria: {e}")
+        return
+
+    if total == 0:
+        st.warning("Nenhum registro de auditoria encontrado para os filtros selecionados.")
+        return
+
+    total_pages = (total - 1) // page_size + 1
+    st.dataframe(page_df, use_container_width=True, hide_index=True)
+
+    col_prev, col_pages, col_next = st.columns([1, 3, 1])
+    col_prev.button("◀ Anterior", key="audit_prev", disabled=page == 0,
+                    on_click=_set_audit_page, args=(page - 1,), use_container_width=True)
+    col_pages.caption(f"Página {page + 1} de {total_pages} · {total} registro(s)")
+    col_next.button("Próxima ▶", key="audit_next", disabled=page >= total_pages - 1,
+                    on_click=_set_audit_page, args=(page + 1,), use_container_width=True)
+
+
+def show_audit_sink_metrics():
+    """Fila de gravação do log de auditoria deste processo."""
+    stats = get_audit_sink().stats()
+    with st.expander("📝 Fila do Log de Auditoria (este servidor)"):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Na Fila", f"{stats['queue_depth']}/{stats['queue_capacity']}")
+        col2.metric("Pendentes (spool)", stats['pending'])
+        col3.metric("Gravadas", stats['flushed'], help=f"Último lote: {stats['last_flush_ms']:.0f} ms")
+        col4.metric("Excedentes da Fila", stats['overflowed'])
+        if stats['failed_batches']:
+            st.warning(f"{stats['failed_batches']} lote(s) com falha de envio. Último erro: {stats['last_error']}")
+
+
 @st.cache_data(show_spinner=False)
 def load_sheets_config():
     """Carrega a configuração de cabeçalhos das planilhas a partir de um arquivo YAML."""
@@ -324,7 +528,7 @@ def show_page():
         
         # Botão para recarregar os dados
         if st.button("Recarregar Dados Globais"):
-            st.cache_data.clear()
+            clear_sheet_caches(all_tenants=True)
             st.rerun()
     
         # Carregamento dos dados necessários para o dashboard
@@ -417,20 +621,22 @@ def show_page():
             with col_health2:
                 st.write("**Últimos Erros Registrados na Auditoria**")
                 
-                audit_data = matrix_uploader.get_data_from_sheet(AUDIT_LOG_SHEET_NAME)
-                if not audit_data or len(audit_data) < 2:
+                # Apenas a aba quente (período recente, de tamanho limitado) é consultada
+                df_log = get_hot_partition().frame
+                if df_log.empty:
                     st.info("Nenhum log de auditoria encontrado.")
                 else:
-                    df_log = pd.DataFrame(audit_data[1:], columns=audit_data[0])
-                    error_logs = df_log[df_log['action'].str.contains("FALHA|ERRO", case=False, na=False)].copy()
+                    error_logs = df_log[df_log['action'].str.contains("FALHA|ERRO", case=False, na=False)]
                     
                     if error_logs.empty:
                         st.success("✅ Nenhum erro recente registrado.")
                     else:
-                        error_logs = error_logs.sort_values(by='timestamp', ascending=False)
                         st.warning(f"Encontrados {len(error_logs)} logs de erro.")
                         st.dataframe(error_logs.head(5)[['timestamp', 'user_email', 'action', 'details']], use_container_width=True)
 
+        show_frame_store_metrics()
+        show_audit_sink_metrics()
+
     with tab_requests:
         st.header("Gerenciar Solicitações de Acesso Pendentes")
         matrix_uploader = GoogleDriveUploader(is_matrix=True)
@@ -481,7 +687,7 @@ def show_page():
                                         st.success(f"✅ Usuário {request['nome_usuario']} aprovado!")
                                         st.warning(f"⚠️ Erro na notificação: {e}")
                                     
-                                    st.cache_data.clear()
+                                    clear_sheet_caches()
                                     st.rerun()
                         
                         if cols[2].button("Rejeitar", key=f"reject_{index}"):
@@ -503,7 +709,7 @@ def show_page():
                             except:
                                 st.warning(f"Solicitação de {request['nome_usuario']} rejeitada.")
                             
-                            st.cache_data.clear()
+                            clear_sheet_caches()
                             st.rerun()
         except Exception as e:
             st.error(f"Erro ao carregar solicitações: {e}")
@@ -552,18 +758,12 @@ def show_page():
                     
                     log_action("ALTEROU_USUARIO", f"Email: {selected_email}, Plano: {new_plan}, Status: {new_status}, Perfil: {new_role}")
                     st.success("Usuário atualizado com sucesso!")
-                    st.cache_data.clear()
+                    clear_sheet_caches()
                     st.rerun()
 
     with tab_audit:
         st.header("Log de Auditoria do Sistema")
-        matrix_uploader = GoogleDriveUploader(is_matrix=True)
-        log_data = matrix_uploader.get_data_from_sheet(AUDIT_LOG_SHEET_NAME)
-        if not log_data or len(log_data) < 2:
-            st.warning("Nenhum registro de auditoria encontrado.")
-        else:
-            df_log = pd.DataFrame(log_data[1:], columns=log_data[0]).sort_values(by='timestamp', ascending=False)
-            st.dataframe(df_log, use_container_width=True, hide_index=True)
+        show_audit_log()
 
     with tab_support_admin:  
         st.header("🎫 Gerenciar Solicitações de Suporte")
@@ -629,7 +829,7 @@ def show_page():
                                     matrix_uploader.update_cells(SUPPORT_REQUESTS_SHEET_NAME, f"J{row_index}", [[response_text]])
                                     
                                     st.success("✅ Resposta enviada!")
-                                    st.cache_data.clear()
+                                    clear_sheet_caches()
                                     st.rerun()
         except Exception as e:
             st.error(f"Erro ao carregar solicitações: {e}")
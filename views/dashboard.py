@@ -1,11 +1,9 @@
 import streamlit as st
 import pandas as pd
 from datetime import date
-from dateutil.relativedelta import relativedelta
 from datetime import datetime
 import sys
 import os
-import numpy as np
 import json
 from streamlit_js_eval import streamlit_js_eval
 from operations.photo_operations import display_drive_image
@@ -14,7 +12,10 @@ from reports.alarm_report import generate_alarm_inspection_html
 
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from operations.history import load_sheet_data, find_last_record
+from operations.history import (
+    load_sheet_data, find_last_record, current_tenant_key, get_sheet_versions, invalidate_sheet_data,
+    clear_sheet_caches, is_sheet_data_loaded, prefetch_sheet_data
+)
 from auth.login_page import show_login_page, show_user_header, show_logout_button
 from auth.auth_utils import can_edit, setup_sidebar, is_admin, can_view, get_user_display_name
 from config.page_config import set_page_config
@@ -35,7 +36,14 @@ from gdrive.config import (
     ALARM_INSPECTIONS_SHEET_NAME,
     LOG_ALARM_SHEET_NAME,
     CANHAO_MONITOR_INVENTORY_SHEET_NAME,      
-    CANHAO_MONITOR_INSPECTIONS_SHEET_NAME    
+    CANHAO_MONITOR_INSPECTIONS_SHEET_NAME,
+    LOG_CANHAO_MONITOR_SHEET_NAME,
+    LOG_MULTIGAS_SHEET_NAME,
+    LOG_SCBA_SHEET_NAME,
+    LOG_EYEWASH_SHEET_NAME,
+    EXTINGUISHER_SHEET_NAME,
+    LOCATIONS_SHEET_NAME,
+    EXTINGUISHER_DISPOSAL_LOG_SHEET_NAME
 )
 from reports.reports_pdf import generate_shelters_html
 from operations.shelter_operations import save_shelter_action_log, save_shelter_inspection
@@ -56,7 +64,15 @@ from operations.canhao_monitor_operations import (
     save_canhao_monitor_inspection,
     CHECKLIST_VISUAL as CANHAO_CHECKLIST_VISUAL
 )
-from operations.dashboard_operations import load_all_dashboard_data, get_dashboard_summary_stats
+from operations.dashboard_operations import (
+    get_canhao_monitor_status_df, get_multigas_status_df, get_foam_chamber_status_df,
+    get_eyewash_status_df, get_scba_status_df, get_hose_status_df, get_shelter_status_df,
+    get_consolidated_status_df, calculate_equipment_metrics
+)
+from operations.checklist_store import build_checklist_store
+from operations.disposal_index import invalidate_disposal_index
+from views.paginated_list import render_paginated_list
+from views.lazy_tabs import render_lazy_tabs
 
 
 
@@ -64,25 +80,6 @@ set_page_config()
 
 
 
-def get_canhao_monitor_status_df(df_inspections):
-    if df_inspections.empty:
-        return pd.DataFrame()
-
-    df_inspections['data_inspecao'] = pd.to_datetime(df_inspections['data_inspecao'], errors='coerce')
-    latest_inspections = df_inspections.sort_values('data_inspecao', ascending=False).drop_duplicates(subset='id_equipamento', keep='first').copy()
-    
-    today = pd.Timestamp(date.today())
-    latest_inspections['data_proxima_inspecao'] = pd.to_datetime(latest_inspections['data_proxima_inspecao'], errors='coerce')
-    
-    conditions = [
-        (latest_inspections['data_proxima_inspecao'] < today),
-        (latest_inspections['status_geral'] == 'Reprovado com Pendências')
-    ]
-    choices = ['🔴 VENCIDO', '🟠 COM PENDÊNCIAS']
-    latest_inspections['status_dashboard'] = np.select(conditions, choices, default='🟢 OK')
-    
-    return latest_inspections
-
 @st.dialog("Registrar Ação Corretiva para Canhão Monitor")
 def action_dialog_canhao_monitor(item_row):
     equipment_id = item_row['id_equipamento']
@@ -128,205 +125,12 @@ def action_dialog_canhao_monitor(item_row):
             
             if inspection_saved:
                 st.success("Ação registrada e status do equipamento regularizado com sucesso!")
-                st.cache_data.clear()
+                invalidate_dashboard_tab('canhoes')
                 st.rerun()
             else:
                 st.error("Log salvo, mas falha ao registrar a nova inspeção de regularização.")
                 
 
-def get_multigas_status_df(df_inventory, df_inspections):
-    if df_inventory.empty:
-        return pd.DataFrame()
-
-    # Começa com o inventário
-    dashboard_df = df_inventory.copy()
-
-    # Se não houver inspeções, define todos como pendentes e retorna
-    # Esta parte garante que a estrutura de colunas seja sempre a mesma
-    if df_inspections.empty:
-        dashboard_df['status_calibracao'] = '🔵 PENDENTE'
-        dashboard_df['status_bump_test'] = '🔵 PENDENTE'
-        dashboard_df['proxima_calibracao'] = pd.NaT
-        dashboard_df['resultado_ultimo_bump_test'] = 'N/A'
-        dashboard_df['data_ultimo_bump_test'] = pd.NaT
-        dashboard_df['link_certificado'] = None
-        return dashboard_df
-
-    # Converte a coluna de data para o formato datetime uma única vez
-    df_inspections['data_teste'] = pd.to_datetime(df_inspections['data_teste'], errors='coerce')
-
-    # Cria as colunas de resultados no DataFrame principal com valores padrão
-    dashboard_df['proxima_calibracao'] = pd.NaT
-    dashboard_df['link_certificado'] = None
-    dashboard_df['resultado_ultimo_bump_test'] = 'N/A'
-    dashboard_df['data_ultimo_bump_test'] = pd.NaT
-
-    # Itera sobre cada equipamento do inventário para encontrar seus últimos testes
-    for index, row in dashboard_df.iterrows():
-        equip_id = row['id_equipamento']
-        # Filtra as inspeções apenas para o equipamento atual
-        equip_inspections = df_inspections[df_inspections['id_equipamento'] == equip_id]
-
-        if not equip_inspections.empty:
-            # Encontra a última calibração anual
-            calibrations = equip_inspections[equip_inspections['tipo_teste'] == 'Calibração Anual']
-            if not calibrations.empty:
-                last_calib = calibrations.sort_values('data_teste', ascending=False).iloc[0]
-                dashboard_df.loc[index, 'proxima_calibracao'] = last_calib.get('proxima_calibracao')
-                dashboard_df.loc[index, 'link_certificado'] = last_calib.get('link_certificado')
-
-            # Encontra o último bump test (qualquer teste que não seja calibração anual)
-            bump_tests = equip_inspections[equip_inspections['tipo_teste'] != 'Calibração Anual']
-            if not bump_tests.empty:
-                last_bump = bump_tests.sort_values('data_teste', ascending=False).iloc[0]
-                dashboard_df.loc[index, 'resultado_ultimo_bump_test'] = last_bump.get('resultado_teste')
-                dashboard_df.loc[index, 'data_ultimo_bump_test'] = last_bump.get('data_teste')
-
-    # Agora que os dados estão consolidados, calcula os status
-    today = pd.Timestamp(date.today())
-    
-    # Status da Calibração
-    dashboard_df['proxima_calibracao'] = pd.to_datetime(dashboard_df['proxima_calibracao'], errors='coerce')
-    dashboard_df['status_calibracao'] = np.where(
-        dashboard_df['proxima_calibracao'].isna(), '🔵 PENDENTE',
-        np.where(dashboard_df['proxima_calibracao'] < today, '🔴 VENCIDO', '🟢 OK')
-    )
-
-    # Status do Bump Test
-    dashboard_df['status_bump_test'] = np.where(
-        dashboard_df['resultado_ultimo_bump_test'].isin(['N/A', None, '']), '🔵 PENDENTE',
-        np.where(dashboard_df['resultado_ultimo_bump_test'] == 'Reprovado', '🟠 REPROVADO', '🟢 OK')
-    )
-    
-    return dashboard_df
-
-def get_foam_chamber_status_df(df_inspections):
-    if df_inspections.empty:
-        return pd.DataFrame()
-
-    df_inspections['data_inspecao'] = pd.to_datetime(df_inspections['data_inspecao'], errors='coerce')
-    latest_inspections = df_inspections.sort_values('data_inspecao', ascending=False).drop_duplicates(subset='id_camara', keep='first').copy()
-    
-    today = pd.Timestamp(date.today())
-    latest_inspections['data_proxima_inspecao'] = pd.to_datetime(latest_inspections['data_proxima_inspecao'], errors='coerce')
-    
-    conditions = [
-        (latest_inspections['data_proxima_inspecao'] < today),
-        (latest_inspections['status_geral'] == 'Reprovado com Pendências')
-    ]
-    choices = ['🔴 VENCIDO', '🟠 COM PENDÊNCIAS']
-    latest_inspections['status_dashboard'] = np.select(conditions, choices, default='🟢 OK')
-    
-    return latest_inspections
-
-
-def get_eyewash_status_df(df_inspections):
-    if df_inspections.empty:
-        return pd.DataFrame()
-
-    # Garante que a coluna de data é do tipo datetime
-    df_inspections['data_inspecao'] = pd.to_datetime(df_inspections['data_inspecao'], errors='coerce')
-    
-    # Pega o último registro para cada equipamento
-    latest_inspections = df_inspections.sort_values('data_inspecao', ascending=False).drop_duplicates(subset='id_equipamento', keep='first').copy()
-    
-    today = pd.Timestamp(date.today())
-    latest_inspections['data_proxima_inspecao'] = pd.to_datetime(latest_inspections['data_proxima_inspecao'], errors='coerce')
-    
-    conditions = [
-        (latest_inspections['data_proxima_inspecao'] < today),
-        (latest_inspections['status_geral'] == 'Reprovado com Pendências')
-    ]
-    choices = ['🔴 VENCIDO', '🟠 COM PENDÊNCIAS']
-    latest_inspections['status_dashboard'] = np.select(conditions, choices, default='🟢 OK')
-    
-    return latest_inspections
-
-def get_scba_status_df(df_scba_main, df_scba_visual):
-    if df_scba_main.empty:
-        return pd.DataFrame()
-
-    equipment_tests = df_scba_main.dropna(subset=['numero_serie_equipamento', 'data_teste']).copy()
-    if equipment_tests.empty:
-        return pd.DataFrame()
-        
-    latest_tests = equipment_tests.sort_values('data_teste', ascending=False).drop_duplicates(subset='numero_serie_equipamento', keep='first')
-    
-    if not df_scba_visual.empty:
-        df_scba_visual['data_inspecao'] = pd.to_datetime(df_scba_visual['data_inspecao'], errors='coerce')
-        latest_visual = df_scba_visual.sort_values('data_inspecao', ascending=False).drop_duplicates(subset='numero_serie_equipamento', keep='first')
-        dashboard_df = pd.merge(latest_tests, latest_visual, on='numero_serie_equipamento', how='left', suffixes=('_teste', '_visual'))
-    else:
-        dashboard_df = latest_tests
-        for col in ['data_inspecao', 'data_proxima_inspecao', 'status_geral', 'resultados_json']:
-            dashboard_df[col] = None
-
-    today = pd.Timestamp(date.today())
-    dashboard_df['data_validade'] = pd.to_datetime(dashboard_df['data_validade'], errors='coerce')
-    dashboard_df['data_proxima_inspecao'] = pd.to_datetime(dashboard_df['data_proxima_inspecao'], errors='coerce')
-    
-    conditions = [
-        (dashboard_df['data_validade'] < today),
-        (dashboard_df['data_proxima_inspecao'] < today),
-        (dashboard_df['status_geral'] == 'Reprovado com Pendências')
-    ]
-    choices = ['🔴 VENCIDO (Teste Posi3)', '🔴 VENCIDO (Insp. Periódica)', '🟠 COM PENDÊNCIAS']
-    dashboard_df['status_consolidado'] = np.select(conditions, choices, default='🟢 OK')
-    
-    return dashboard_df
-    
-def get_hose_status_df(df_hoses, df_disposals):
-    if df_hoses.empty:
-        return pd.DataFrame()
-    
-    # Garante que as colunas de data existam e sejam do tipo datetime
-    for col in ['data_inspecao', 'data_proximo_teste']:
-        if col not in df_hoses.columns:
-            df_hoses[col] = pd.NaT
-        df_hoses[col] = pd.to_datetime(df_hoses[col], errors='coerce')
-
-    # Pega apenas o último registro de cada mangueira
-    latest_hoses = df_hoses.sort_values('data_inspecao', ascending=False).drop_duplicates(subset='id_mangueira', keep='first').copy()
-    
-    # Remove mangueiras que já foram baixadas
-    if not df_disposals.empty and 'id_mangueira' in df_disposals.columns:
-        disposed_ids = df_disposals['id_mangueira'].astype(str).unique()
-        latest_hoses = latest_hoses[~latest_hoses['id_mangueira'].astype(str).isin(disposed_ids)]
-
-    if latest_hoses.empty:
-        return pd.DataFrame()
-
-    today = pd.Timestamp(date.today())
-    
-    if 'resultado' not in latest_hoses.columns:
-        latest_hoses['resultado'] = ''
-    latest_hoses['resultado'] = latest_hoses['resultado'].fillna('').str.lower()
-    
-    rejection_keywords = ['reprovado', 'condenada', 'rejeitado', 'condenado']
-    
-    is_rejected = latest_hoses['resultado'].str.contains('|'.join(rejection_keywords), na=False)
-
-    conditions = [
-        is_rejected,  # 1. Prioridade máxima: se o resultado for negativo
-        (latest_hoses['data_proximo_teste'] < today) # 2. Segunda prioridade: se a data estiver vencida
-    ]
-    choices = ['🟠 REPROVADA', '🔴 VENCIDO']
-    latest_hoses['status'] = np.select(conditions, choices, default='🟢 OK')
-    
-    latest_hoses['data_inspecao'] = latest_hoses['data_inspecao'].dt.strftime('%d/%m/%Y')
-    latest_hoses['data_proximo_teste'] = latest_hoses['data_proximo_teste'].dt.strftime('%d/%m/%Y')
-    
-    display_columns = [
-        'id_mangueira', 'status', 'marca', 'diametro', 'tipo',
-        'comprimento', 'ano_fabricacao', 'data_inspecao',
-        'data_proximo_teste', 'link_certificado_pdf', 'registrado_por'
-    ]
-    
-    existing_display_columns = [col for col in display_columns if col in latest_hoses.columns]
-    
-    return latest_hoses[existing_display_columns]
-
-
 @st.dialog("Registrar Ação Corretiva para Detector Multigás")
 def action_dialog_multigas(item_row):
     equipment_id = item_row['id_equipamento']
@@ -359,7 +163,7 @@ def action_dialog_multigas(item_row):
             
             if log_saved:
                 st.success("Ação registrada com sucesso!")
-                st.cache_data.clear()
+                invalidate_dashboard_tab('multigas')
                 st.rerun()
             else:
                 st.error("Falha ao salvar o log da ação.")
@@ -448,7 +252,7 @@ def disposal_dialog_extinguisher(item_row):
                 st.success(f"✅ Extintor {equipment_id} baixado definitivamente!")
                 st.success(f"🔄 Lembre-se de instalar o substituto {substitute_id} no local.")
                 st.balloons()
-                st.cache_data.clear()
+                invalidate_dashboard_tab('extintores')
                 st.rerun()
             else:
                 st.error("❌ Falha ao registrar a baixa. Tente novamente.")
@@ -476,180 +280,15 @@ def dispose_hose_dialog(hose_id):
             try:
                 uploader = GoogleDriveUploader()
                 uploader.append_data_to_sheet(HOSE_DISPOSAL_LOG_SHEET_NAME, [log_row])
+                invalidate_disposal_index()
                 st.success(f"Baixa da mangueira {hose_id} registrada com sucesso!")
-                st.cache_data.clear()
+                invalidate_dashboard_tab('mangueiras')
                 st.rerun()
             except Exception as e:
                 st.error(f"Ocorreu um erro ao registrar a baixa: {e}")
 
 
 
-def get_shelter_status_df(df_shelters_registered, df_inspections):
-    if df_shelters_registered.empty:
-        return pd.DataFrame()
-
-    latest_inspections_list = []
-    if not df_inspections.empty:
-        df_inspections['data_inspecao'] = pd.to_datetime(df_inspections['data_inspecao'], errors='coerce').dt.date
-
-        for shelter_id in df_shelters_registered['id_abrigo'].unique():
-            shelter_inspections = df_inspections[df_inspections['id_abrigo'] == shelter_id].copy()
-            if not shelter_inspections.empty:
-                shelter_inspections = shelter_inspections.sort_values(by='data_inspecao', ascending=False)
-                
-        
-                latest_date = shelter_inspections['data_inspecao'].iloc[0]
-                inspections_on_latest_date = shelter_inspections[shelter_inspections['data_inspecao'] == latest_date]
-                
-                approved_on_latest = inspections_on_latest_date[inspections_on_latest_date['status_geral'] != 'Reprovado com Pendências']
-                
-                if not approved_on_latest.empty:
-                    latest_inspections_list.append(approved_on_latest.iloc[0])
-                else:
-                    latest_inspections_list.append(inspections_on_latest_date.iloc[0])
-
-    latest_inspections = pd.DataFrame(latest_inspections_list)
-
-    if not latest_inspections.empty:
-        dashboard_df = pd.merge(df_shelters_registered[['id_abrigo', 'cliente', 'local']], latest_inspections, on='id_abrigo', how='left')
-    else:
-
-        dashboard_df = df_shelters_registered.copy()
-        for col in ['data_inspecao', 'data_proxima_inspecao', 'status_geral', 'inspetor', 'resultados_json']:
-            dashboard_df[col] = None
-
-    today = pd.to_datetime(date.today()).date()
-    dashboard_df['data_proxima_inspecao'] = pd.to_datetime(dashboard_df['data_proxima_inspecao'], errors='coerce').dt.date
-
-    conditions = [
-        (dashboard_df['data_inspecao'].isna()),
-        (dashboard_df['data_proxima_inspecao'] < today),
-        (dashboard_df['status_geral'] == 'Reprovado com Pendências')
-    ]
-    choices = ['🔵 PENDENTE (Nova Inspeção)', '🔴 VENCIDO', '🟠 COM PENDÊNCIAS']
-    dashboard_df['status_dashboard'] = np.select(conditions, choices, default='🟢 OK')
-
-    dashboard_df['data_inspecao_str'] = dashboard_df['data_inspecao'].apply(lambda x: x.strftime('%d/%m/%Y') if pd.notna(x) else 'N/A')
-    dashboard_df['data_proxima_inspecao_str'] = dashboard_df['data_proxima_inspecao'].apply(lambda x: x.strftime('%d/%m/%Y') if pd.notna(x) else 'N/A')
-    dashboard_df['inspetor'] = dashboard_df['inspetor'].fillna('N/A')
-    dashboard_df['resultados_json'] = dashboard_df['resultados_json'].fillna('{}')
-
-    display_columns = ['id_abrigo', 'status_dashboard', 'data_inspecao_str', 'data_proxima_inspecao_str', 'status_geral', 'inspetor', 'resultados_json', 'local']
-    existing_columns = [col for col in display_columns if col in dashboard_df.columns]
-    
-    return dashboard_df[existing_columns]
-
-
-def get_consolidated_status_df(df_full, df_locais):
-    if df_full.empty: 
-        return pd.DataFrame()
-    
-    from operations.extinguisher_disposal_operations import get_disposed_extinguishers
-    
-    consolidated_data = []
-    df_copy = df_full.copy()
-    df_copy['data_servico'] = pd.to_datetime(df_copy['data_servico'], errors='coerce')
-    df_copy = df_copy.dropna(subset=['data_servico'])
-    
-    df_disposed = get_disposed_extinguishers()
-    disposed_ids = df_disposed['numero_identificacao'].tolist() if not df_disposed.empty else []
-    
-    unique_ids = df_copy['numero_identificacao'].unique()
-
-    for ext_id in unique_ids:
-        if ext_id in disposed_ids:
-            continue
-            
-        ext_df = df_copy[df_copy['numero_identificacao'] == ext_id].sort_values(by='data_servico')
-        if ext_df.empty: 
-            continue
-        
-        latest_record_info = ext_df.iloc[-1]
-        
-        # Busca as últimas datas de cada tipo de serviço
-        last_insp_date = ext_df['data_servico'].max()
-        last_maint2_date = ext_df[ext_df['tipo_servico'] == 'Manutenção Nível 2']['data_servico'].max()
-        last_maint3_date = ext_df[ext_df['tipo_servico'] == 'Manutenção Nível 3']['data_servico'].max()
-        
-        # ✅ CORREÇÃO: Calcula próximos vencimentos considerando a hierarquia
-        # Nível 3 renova TUDO (vale por 1, 2 e 3)
-        # Nível 2 renova 1 e 2 (mas não o 3)
-        # Inspeção renova apenas o 1
-        
-        # Próxima inspeção mensal (Nível 1)
-        # Usa a data mais recente entre inspeção, N2 ou N3 (todos renovam o N1)
-        dates_that_renew_inspection = [last_insp_date, last_maint2_date, last_maint3_date]
-        valid_dates_inspection = [d for d in dates_that_renew_inspection if pd.notna(d)]
-        if valid_dates_inspection:
-            most_recent_inspection_renewal = max(valid_dates_inspection)
-            next_insp = most_recent_inspection_renewal + relativedelta(months=1)
-        else:
-            next_insp = pd.NaT
-        
-        # Próxima Manutenção Nível 2
-        # Usa a data mais recente entre N2 ou N3 (N3 também renova o N2)
-        dates_that_renew_n2 = [last_maint2_date, last_maint3_date]
-        valid_dates_n2 = [d for d in dates_that_renew_n2 if pd.notna(d)]
-        if valid_dates_n2:
-            most_recent_n2_renewal = max(valid_dates_n2)
-            next_maint2 = most_recent_n2_renewal + relativedelta(months=12)
-        else:
-            next_maint2 = pd.NaT
-        
-        # Próxima Manutenção Nível 3
-        # Apenas o próprio N3 renova o N3
-        if pd.notna(last_maint3_date):
-            next_maint3 = last_maint3_date + relativedelta(years=5)
-        else:
-            next_maint3 = pd.NaT
-        
-        # Determina o próximo vencimento mais crítico
-        vencimentos = [d for d in [next_insp, next_maint2, next_maint3] if pd.notna(d)]
-        if not vencimentos: 
-            continue
-        proximo_vencimento_real = min(vencimentos)
-        
-        today_ts = pd.Timestamp(date.today())
-        status_atual = "OK"
-        
-        if latest_record_info.get('plano_de_acao') == "FORA DE OPERAÇÃO (SUBSTITUÍDO)":
-            status_atual = "FORA DE OPERAÇÃO"
-        elif latest_record_info.get('aprovado_inspecao') == 'Não': 
-            status_atual = "NÃO CONFORME (Aguardando Ação)"
-        elif proximo_vencimento_real < today_ts: 
-            status_atual = "VENCIDO"
-
-        if status_atual == "FORA DE OPERAÇÃO":
-            continue
-
-        consolidated_data.append({
-            'numero_identificacao': ext_id,
-            'numero_selo_inmetro': latest_record_info.get('numero_selo_inmetro'),
-            'tipo_agente': latest_record_info.get('tipo_agente'),
-            'status_atual': status_atual,
-            'proximo_vencimento_geral': proximo_vencimento_real.strftime('%d/%m/%Y'),
-            'prox_venc_inspecao': next_insp.strftime('%d/%m/%Y') if pd.notna(next_insp) else "N/A",
-            'prox_venc_maint2': next_maint2.strftime('%d/%m/%Y') if pd.notna(next_maint2) else "N/A",
-            'prox_venc_maint3': next_maint3.strftime('%d/%m/%Y') if pd.notna(next_maint3) else "N/A",
-            'plano_de_acao': latest_record_info.get('plano_de_acao'),
-        })
-
-    if not consolidated_data:
-        return pd.DataFrame()
-
-    dashboard_df = pd.DataFrame(consolidated_data)
-    if not df_locais.empty:
-        df_locais = df_locais.rename(columns={'id': 'numero_identificacao'})
-        df_locais['numero_identificacao'] = df_locais['numero_identificacao'].astype(str)
-        dashboard_df = pd.merge(dashboard_df, df_locais[['numero_identificacao', 'local']], on='numero_identificacao', how='left')
-        dashboard_df['status_instalacao'] = dashboard_df['local'].apply(lambda x: f"✅ {x}" if pd.notna(x) and str(x).strip() != '' else "⚠️ Local não definido")
-    else:
-        dashboard_df['status_instalacao'] = "⚠️ Local não definido"
-        
-    return dashboard_df
-
-
-
 @st.dialog("Registrar Ação Corretiva para Sistema de Alarme")
 def action_dialog_alarm(item_row):
     system_id = item_row['id_sistema']
@@ -694,7 +333,7 @@ def action_dialog_alarm(item_row):
             
             if inspection_saved:
                 st.success("Ação registrada e status do sistema regularizado com sucesso!")
-                st.cache_data.clear()
+                invalidate_dashboard_tab('alarmes')
                 st.rerun()
             else:
                 st.error("Log salvo, mas falha ao registrar a nova inspeção de regularização. O status pode continuar pendente.")
@@ -734,7 +373,7 @@ def action_dialog_foam_chamber(item_row):
             
             if inspection_saved:
                 st.success("Ação registrada e status do equipamento regularizado com sucesso!")
-                st.cache_data.clear()
+                invalidate_dashboard_tab('espuma')
                 st.rerun()
             else:
                 st.error("Log salvo, mas falha ao registrar a nova inspeção de regularização.")
@@ -778,7 +417,7 @@ def action_dialog_eyewash(item_row):
             
             if inspection_saved:
                 st.success("Ação registrada e status do equipamento regularizado com sucesso!")
-                st.cache_data.clear()
+                invalidate_dashboard_tab('chuveiros')
                 st.rerun()
             else:
                 st.error("Log salvo, mas falha ao registrar a nova inspeção de regularização. O status pode continuar pendente.")
@@ -798,7 +437,7 @@ def action_dialog_scba(equipment_id, problem):
             results = {"Info": {"Status": "Regularizado via Ação Corretiva", "Ação": action_taken}}
             save_scba_visual_inspection(equipment_id, "Aprovado", results, get_user_display_name())
             st.success("Ação registrada e status regularizado!")
-            st.cache_data.clear()
+            invalidate_dashboard_tab('scba')
             st.rerun()
 
 @st.dialog("Registrar Plano de Ação para Abrigo")
@@ -853,7 +492,7 @@ def action_dialog_shelter(shelter_id, problem):
             
             if inspection_saved:
                 st.success("Plano de ação registrado e status do abrigo regularizado com sucesso!")
-                st.cache_data.clear()
+                invalidate_dashboard_tab('abrigos')
                 st.rerun()
             else:
                 st.error("Log salvo, mas falha ao registrar a nova inspeção de regularização. O status pode continuar pendente.")
@@ -951,7 +590,7 @@ def action_form(item, df_full_history, location):
                     st.success(f"✅ Extintor {item['numero_identificacao']} baixado definitivamente!")
                     st.success(f"🔄 Lembre-se de instalar o substituto {substitute_id} no local.")
                     st.balloons()
-                    st.cache_data.clear()
+                    invalidate_dashboard_tab('extintores')
                     st.rerun()
                 else:
                     st.error("❌ Falha ao registrar a baixa. Tente novamente.")
@@ -1040,840 +679,947 @@ def action_form(item, df_full_history, location):
                         st.success("Substituição registrada com sucesso!")
                     else:
                         st.success("Ação corretiva registrada com sucesso!")
-                    st.cache_data.clear() 
+                    invalidate_dashboard_tab('extintores')
                     st.rerun()
                 else:
                     st.error("Falha ao registrar a ação.")
 
-def show_page():
-
+def _build_foam_chamber_tab_status(df_foam_history, df_foam_inventory):
+    if df_foam_history.empty:
+        return pd.DataFrame()
+    dashboard_df = get_foam_chamber_status_df(df_foam_history)
+    
+    if not df_foam_inventory.empty:
+        dashboard_df = pd.merge(
+            dashboard_df, 
+            df_foam_inventory[['id_camara', 'localizacao', 'modelo']], 
+            on='id_camara', 
+            how='left'
+        )
+    else:
+        dashboard_df['localizacao'] = 'Localização não definida'
+        dashboard_df['modelo'] = 'N/A'
     
-        
-    st.title("Situação Atual dos Equipamentos de Emergência")
-      
-    if st.button("Limpar Cache e Recarregar Dados"):
-        st.cache_data.clear()
-        st.rerun()
+    dashboard_df['localizacao'] = dashboard_df['localizacao'].fillna('Localização não definida')
+    return dashboard_df
 
-    tab_help, tab_extinguishers, tab_hoses, tab_shelters, tab_scba, tab_eyewash, tab_foam, tab_multigas, tab_alarms, tab_canhoes = st.tabs([
-        "📘 Como Usar","🔥 Extintores", "💧 Mangueiras", "🧯 Abrigos", "💨 C. Autônomo", 
-        "🚿 Chuveiros/Lava-Olhos", "☁️ Câmaras de Espuma", "💨 Multigás", "🔔 Alarmes", "🌊 Canhões Monitores"
-    ])
 
-    location = streamlit_js_eval(js_expressions="""
-        new Promise(function(resolve, reject) {
-            navigator.geolocation.getCurrentPosition(
-                function(position) { resolve({ latitude: position.coords.latitude, longitude: position.coords.longitude }); },
-                function(error) { resolve(null); }
-            );
-        });
-    """)
+def _build_alarm_tab_status(df_alarm_inspections, df_alarm_inventory):
+    if df_alarm_inspections.empty:
+        return pd.DataFrame()
+    dashboard_df = get_alarm_status_df(df_alarm_inspections)
+    
+    # Se tiver dados de inventário, faz merge para obter localização e modelo
+    if not df_alarm_inventory.empty:
+        dashboard_df = pd.merge(
+            dashboard_df, 
+            df_alarm_inventory[['id_sistema', 'localizacao', 'modelo', 'marca']], 
+            on='id_sistema', 
+            how='left'
+        )
+    return dashboard_df
+
+
+def _build_canhao_monitor_tab_status(df_inspections, df_inventory):
+    if df_inspections.empty:
+        return pd.DataFrame()
+    dashboard_df = get_canhao_monitor_status_df(df_inspections)
+    
+    if not df_inventory.empty:
+        dashboard_df = pd.merge(
+            dashboard_df, 
+            df_inventory[['id_equipamento', 'localizacao', 'modelo']], 
+            on='id_equipamento', 
+            how='left'
+        )
+    else:
+        dashboard_df['localizacao'] = 'N/A'
+        dashboard_df['modelo'] = 'N/A'
+    return dashboard_df
+
+
+def _when_not_empty(builder):
+    """Só chama o builder se a primeira aba (histórico/inventário principal) tiver dados."""
+    return lambda first, *others: builder(first, *others) if not first.empty else pd.DataFrame()
+
+
+# Aba do dashboard -> (builder do status, abas de entrada do builder, outras abas exibidas na aba)
+DASHBOARD_TABS = {
+    'extintores': (_when_not_empty(get_consolidated_status_df), (EXTINGUISHER_SHEET_NAME, LOCATIONS_SHEET_NAME), (EXTINGUISHER_DISPOSAL_LOG_SHEET_NAME,)),
+    'mangueiras': (_when_not_empty(get_hose_status_df), (HOSE_SHEET_NAME,), (HOSE_DISPOSAL_LOG_SHEET_NAME,)),
+    'abrigos': (_when_not_empty(get_shelter_status_df), (SHELTER_SHEET_NAME, INSPECTIONS_SHELTER_SHEET_NAME), (LOG_SHELTER_SHEET_NAME,)),
+    'scba': (_when_not_empty(get_scba_status_df), (SCBA_SHEET_NAME, SCBA_VISUAL_INSPECTIONS_SHEET_NAME), (LOG_SCBA_SHEET_NAME,)),
+    'chuveiros': (_when_not_empty(get_eyewash_status_df), (EYEWASH_INSPECTIONS_SHEET_NAME,), (LOG_EYEWASH_SHEET_NAME,)),
+    'espuma': (_build_foam_chamber_tab_status, (FOAM_CHAMBER_INSPECTIONS_SHEET_NAME, FOAM_CHAMBER_INVENTORY_SHEET_NAME), (LOG_FOAM_CHAMBER_SHEET_NAME,)),
+    'multigas': (_when_not_empty(get_multigas_status_df), (MULTIGAS_INVENTORY_SHEET_NAME, MULTIGAS_INSPECTIONS_SHEET_NAME), (LOG_MULTIGAS_SHEET_NAME,)),
+    'alarmes': (_build_alarm_tab_status, (ALARM_INSPECTIONS_SHEET_NAME, ALARM_INVENTORY_SHEET_NAME), (LOG_ALARM_SHEET_NAME,)),
+    'canhoes': (_build_canhao_monitor_tab_status, (CANHAO_MONITOR_INSPECTIONS_SHEET_NAME, CANHAO_MONITOR_INVENTORY_SHEET_NAME), (LOG_CANHAO_MONITOR_SHEET_NAME,)),
+}
+
+
+def _dashboard_tab_sheets(tab):
+    _, input_sheets, other_sheets = DASHBOARD_TABS[tab]
+    return input_sheets + other_sheets
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _compute_dashboard_tab_status(tab, tenant, versions):
+    """Status de uma aba; `tenant` e `versions` fazem parte apenas da chave de cache."""
+    builder, input_sheets, _ = DASHBOARD_TABS[tab]
+    return builder(*(load_sheet_data(sheet_name) for sheet_name in input_sheets))
+
+
+def load_dashboard_tab_status(tab):
+    """
+    Status consolidado de uma aba do dashboard, em cache pelas versões das abas
+    da planilha que ela usa. Uma ação em outra aba não invalida este cache.
+    """
+    versions = get_sheet_versions(*_dashboard_tab_sheets(tab))
+    try:
+        return _compute_dashboard_tab_status(tab, current_tenant_key(), versions)
+    except Exception as e:
+        # Ex.: log de baixas ilegível; nada foi guardado em cache e a próxima execução tenta de novo
+        st.error(f"Erro ao calcular o status do dashboard: {e}")
+        return pd.DataFrame()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _compute_dashboard_tab_metrics(tab, tenant, versions):
+    """
+    Métricas da aba (ver calculate_equipment_metrics) pela coluna categórica 'status_code';
+    só o dicionário de contagens fica em cache, por versão das abas da planilha.
+    """
+    dashboard_df = _compute_dashboard_tab_status(tab, tenant, versions)
+    codes = dashboard_df['status_code'] if 'status_code' in dashboard_df.columns else pd.Series(dtype=object)
+    return calculate_equipment_metrics(codes)
+
+
+def load_dashboard_tab_metrics(tab):
+    """Métricas da aba para os cartões de resumo (zeradas se o status não puder ser calculado)."""
+    versions = get_sheet_versions(*_dashboard_tab_sheets(tab))
+    try:
+        return _compute_dashboard_tab_metrics(tab, current_tenant_key(), versions)
+    except Exception:
+        # O erro já é exibido por load_dashboard_tab_status
+        return calculate_equipment_metrics(pd.Series(dtype=object))
+
+
+def show_status_metrics(tab, total_label, cards):
+    """
+    Cartões de resumo da aba: o total e a contagem de cada código de status.
+    O texto com emoji é usado só como rótulo do cartão.
+
+    Args:
+        tab (str): Chave da aba em DASHBOARD_TABS
+        total_label (str): Rótulo do cartão de total
+        cards (list): [(rótulo, código)] com código em 'ok', 'expired' ou 'pending'
+    """
+    metrics = load_dashboard_tab_metrics(tab)
+    columns = st.columns(1 + len(cards))
+    columns[0].metric(total_label, metrics['total'])
+    for column, (label, code) in zip(columns[1:], cards):
+        column.metric(label, metrics[f'{code}_count'])
+
+
+def get_dashboard_tab_counts(tab):
+    """
+    Contagens (total, com pendência) de uma aba, calculadas só a partir de abas da planilha
+    já carregadas no armazenamento compartilhado (por qualquer sessão ou pelo pré-carregamento).
+    None se alguma ainda não foi lida (a badge nunca dispara uma leitura da planilha) ou se
+    o status não pôde ser calculado.
+    """
+    sheets = _dashboard_tab_sheets(tab)
+    if not is_sheet_data_loaded(*sheets):
+        return None
+    try:
+        metrics = _compute_dashboard_tab_metrics(tab, current_tenant_key(), get_sheet_versions(*sheets))
+    except Exception:
+        return None  # o erro é exibido quando a aba é aberta
+    return metrics['total'], metrics['total'] - metrics['ok_count']
+
+
+def dashboard_tab_badge(tab):
+    counts = get_dashboard_tab_counts(tab) if tab in DASHBOARD_TABS else None
+    if counts is None:
+        return None
+    total, attention = counts
+    return f"⚠️ {attention}" if attention else f"✅ {total}"
+
+
+def prefetch_dashboard_tab(tab):
+    """Lê em segundo plano as abas da planilha usadas pela aba, sem bloquear nem renderizá-la."""
+    if tab in DASHBOARD_TABS:
+        prefetch_sheet_data(*_dashboard_tab_sheets(tab))
+
+
+def invalidate_dashboard_tab(tab):
+    """Invalida apenas os dados da aba informada (substitui st.cache_data.clear() nos diálogos)."""
+    invalidate_sheet_data(*_dashboard_tab_sheets(tab))
+
+
+def _format_date_br(value):
+    """Formata uma data para dd/mm/aaaa ou 'N/A'."""
+    return pd.to_datetime(value).strftime('%d/%m/%Y') if pd.notna(value) else "N/A"
+
+
+def _extinguisher_title(row):
+    status_icon = "🟢" if row['status_atual'] == 'OK' else ('🔴' if row['status_atual'] == 'VENCIDO' else '🟠')
+    return f"{status_icon} **ID:** {row['numero_identificacao']} | **Tipo:** {row['tipo_agente']} | **Status:** {row['status_atual']} | **Localização:** {row['status_instalacao']}"
+
+
+def _show_extinguisher_details(index, row, df_full_history, location):
+    st.markdown(f"**Plano de Ação Sugerido:** {row['plano_de_acao']}")
+    st.markdown("---")
+    st.subheader("Próximos Vencimentos:")
     
-    with tab_help:
-        instru_dash()
-        
+    col_venc1, col_venc2, col_venc3 = st.columns(3)
+    col_venc1.metric("Inspeção Mensal", value=row['prox_venc_inspecao'])
+    col_venc2.metric("Manutenção Nível 2", value=row['prox_venc_maint2'])
+    col_venc3.metric("Manutenção Nível 3", value=row['prox_venc_maint3'])
+
+    st.caption(f"Último Selo INMETRO registrado: {row.get('numero_selo_inmetro', 'N/A')}")
     
-    with tab_extinguishers:
-        st.header("Dashboard de Extintores")
+    # ✅ ADIÇÃO: Exibe a foto de não conformidade se houver
+    st.markdown("---")
+    st.subheader("📸 Evidências Fotográficas")
+    
+    # Busca o último registro completo do extintor para pegar a foto
+    ext_id = row['numero_identificacao']
+    ext_history = df_full_history[df_full_history['numero_identificacao'] == ext_id].sort_values('data_servico', ascending=False)
+    
+    if not ext_history.empty:
+        latest_full_record = ext_history.iloc[0]
+        photo_link = latest_full_record.get('link_foto_nao_conformidade')
         
-        if is_admin():
-            with st.expander("⚙️ Ações de Administrador"):
-                st.warning("Esta ação criará um registro de inspeção 'Aprovado' com a data de hoje para TODOS os extintores com inspeção mensal vencida.")
-                if st.button("Regularizar Todas as Inspeções Mensais Vencidas", type="primary"):
-                    with st.spinner("Verificando e regularizando extintores..."):
-                        df_history_for_action = load_sheet_data("extintores")
-                        num_regularized = batch_regularize_monthly_inspections(df_history_for_action)
-                        
-                        if num_regularized > 0:
-                            st.success(f"{num_regularized} extintores foram regularizados com sucesso!")
-                            st.balloons()
-                            st.cache_data.clear()
-                            st.rerun()
-                        elif num_regularized == 0:
-                            pass
-                        else:
-                            st.error("A operação de regularização falhou. Verifique os logs.")
-                            
+        if photo_link and pd.notna(photo_link) and str(photo_link).strip() != '':
+            display_drive_image(photo_link, caption="Foto da Não Conformidade", width=400)
+        else:
+            st.info("Nenhuma foto de não conformidade registrada para este equipamento.")
+    else:
+        st.info("Sem histórico fotográfico disponível.")
     
-        with st.expander("📄 Gerar Relatório Mensal..."):
-            show_monthly_report_interface()
+    if row['status_atual'] != 'OK':
         st.markdown("---")
-        
-        df_full_history = load_sheet_data("extintores")
-        df_locais = load_sheet_data("locais") 
+        if st.button("✍️ Registrar Ação Corretiva", key=f"action_ext_{index}", use_container_width=True):
+            action_form(row.to_dict(), df_full_history, location)
+
+
+def _show_hose_details(_, row):
+    cols = st.columns(4)
+    cols[0].metric("Marca", row.get('marca', 'N/A') or 'N/A')
+    cols[1].metric("Diâmetro", row.get('diametro', 'N/A') or 'N/A')
+    cols[2].metric("Tipo", row.get('tipo', 'N/A') or 'N/A')
+    cols[3].metric("Comprimento", row.get('comprimento', 'N/A') or 'N/A')
+    st.write(f"**Último Teste:** {_format_date_br(row.get('data_inspecao'))} | **Registrado por:** {row.get('registrado_por', 'N/A')}")
     
-        if df_full_history.empty:
-            st.warning("Ainda não há registros de inspeção para exibir."); return
+    certificate_link = row.get('link_certificado_pdf')
+    if certificate_link and pd.notna(certificate_link):
+        st.markdown(f"**[🔗 Ver Certificado]({certificate_link})**")
     
-        with st.spinner("Analisando o status de todos os extintores..."):
-            dashboard_df = get_consolidated_status_df(df_full_history, df_locais)
-        
-        if dashboard_df.empty:
-            st.warning("Não foi possível gerar o dashboard ou não há equipamentos ativos."); return
-    
-        status_counts = dashboard_df['status_atual'].value_counts()
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("✅ Total Ativo", len(dashboard_df))
-        col2.metric("🟢 OK", status_counts.get("OK", 0))
-        col3.metric("🔴 VENCIDO", status_counts.get("VENCIDO", 0))
-        col4.metric("🟠 NÃO CONFORME", status_counts.get("NÃO CONFORME (Aguardando Ação)", 0))
-        st.markdown("---")
-        
-        status_filter = st.multiselect("Filtrar por Status:", options=sorted(dashboard_df['status_atual'].unique()), default=sorted(dashboard_df['status_atual'].unique()))
-        filtered_df = dashboard_df[dashboard_df['status_atual'].isin(status_filter)]
-        
-        st.subheader("Lista de Equipamentos")
-        
-        if filtered_df.empty:
-            st.info("Nenhum item corresponde ao filtro selecionado.")
+    if row['status'] == '🟠 REPROVADA':
+        if st.button("🗑️ Registrar Baixa", key=f"dispose_{row['id_mangueira']}", use_container_width=True):
+            dispose_hose_dialog(row['id_mangueira'])
+
+
+def _show_shelter_details(inspection_id, row, checklist):
+    status = row['status_dashboard']
+    st.write(f"**Última inspeção:** {row['data_inspecao_str']} por **{row['inspetor']}**")
+    st.write(f"**Resultado da última inspeção:** {row.get('status_geral', 'N/A')}")
+    
+    if status not in ["🟢 OK", "🟢 OK (Ação Realizada)"]:
+        problem_description = status.replace("🔴 ", "").replace("🟠 ", "").replace("🔵 ", "")
+        if st.button("✍️ Registrar Ação", key=f"action_{row['id_abrigo']}", use_container_width=True):
+            action_dialog_shelter(row['id_abrigo'], problem_description)
+    
+    st.markdown("---")
+    st.write("**Detalhes da Última Inspeção:**")
+
+    if checklist.is_invalid(inspection_id):
+        st.error("Não foi possível carregar os detalhes desta inspeção (formato inválido).")
+    elif checklist.has_items(inspection_id):
+        inventory_items = checklist.items_for(inspection_id, category='')
+        general_conditions = checklist.items_for(inspection_id, category='Condições Gerais')
+
+        if not inventory_items.empty:
+            st.write("**Itens do Inventário:**")
+            st.table(inventory_items.set_index('question')[['status', 'note']].rename(columns={'note': 'observacao'}))
+
+        if not general_conditions.empty:
+            st.write("**Condições Gerais do Abrigo:**")
+            cols = st.columns(len(general_conditions))
+            for i, (key, value) in enumerate(zip(general_conditions['question'], general_conditions['status'])):
+                with cols[i]:
+                    st.metric(label=key, value=value)
+    else:
+        st.info("Nenhum detalhe de inspeção disponível.")
+
+
+def _show_scba_details(inspection_id, row, checklist):
+    status = row['status_consolidado']
+    st.write(f"**Última Inspeção Periódica:** {_format_date_br(row.get('data_inspecao'))} - **Status:** {row.get('status_geral', 'N/A')}")
+    
+    if status != "🟢 OK":
+        if st.button("✍️ Registrar Plano de Ação", key=f"action_scba_{row['numero_serie_equipamento']}", use_container_width=True):
+            action_dialog_scba(row['numero_serie_equipamento'], status)
+    
+    st.markdown("**Detalhes da Última Inspeção Periódica:**")
+    if not checklist.has_items(inspection_id):
+        st.info("Nenhum detalhe de inspeção periódica encontrado.")
+        return
+
+    st.markdown("""
+    <style>
+    .small-font {
+        font-size:0.9rem;
+        line-height: 1.2;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # 1. Testes Funcionais (agora dentro de colunas menores)
+    st.markdown("<p class='small-font' style='font-weight: bold;'>Testes Funcionais</p>", unsafe_allow_html=True)
+    testes = checklist.items_for(inspection_id, category="Testes Funcionais")
+    if not testes.empty:
+        cols_testes = st.columns(len(testes))
+        for i, (teste, resultado) in enumerate(zip(testes['question'], testes['status'])):
+            icon = "✅" if resultado == "Aprovado" else "❌"
+            # Usando markdown para controlar o tamanho
+            cols_testes[i].markdown(f"<p class='small-font'><b>{teste}</b><br>{icon} {resultado}</p>", unsafe_allow_html=True)
+    
+    # 2. Checklist Visual
+    st.markdown("<p class='small-font' style='font-weight: bold; margin-top: 10px;'>Checklist Visual</p>", unsafe_allow_html=True)
+    col_cilindro, col_mascara = st.columns(2)
+
+    for column, category, title in [(col_cilindro, "Cilindro", "Cilindro de Ar"), (col_mascara, "Mascara", "Máscara Facial")]:
+        with column:
+            st.markdown(f"<p class='small-font'><b>{title}</b></p>", unsafe_allow_html=True)
+            itens = checklist.items_for(inspection_id, category=category)
+            is_obs = itens['question'] == "Observações"
+            obs = itens.loc[is_obs, 'status'].iloc[0] if is_obs.any() else ""
+            for item, item_status in zip(itens.loc[~is_obs, 'question'], itens.loc[~is_obs, 'status']):
+                icon = "✔️" if item_status == "C" else ("❌" if item_status == "N/C" else "➖")
+                st.markdown(f"<p class='small-font'>{icon} {item}</p>", unsafe_allow_html=True)
+            if obs:
+                st.markdown(f"<p class='small-font' style='font-style: italic;'>Obs: {obs}</p>", unsafe_allow_html=True)
+
+
+def _show_checklist_non_conformities(inspection_id, row, checklist, photo_width=300):
+    """Bloco comum de detalhes: itens não conformes da última inspeção e foto."""
+    if checklist.is_invalid(inspection_id):
+        st.error("Não foi possível carregar os detalhes da inspeção (formato de dados inválido).")
+        return
+    if checklist.has_items(inspection_id):
+        # Apenas os itens não conformes, para destacar o problema
+        if checklist.nc_count(inspection_id) > 0:
+            st.write("Itens não conformes encontrados:")
+            st.table(checklist.non_conformities(inspection_id))
         else:
-            for index, row in filtered_df.iterrows():
-                status_icon = "🟢" if row['status_atual'] == 'OK' else ('🔴' if row['status_atual'] == 'VENCIDO' else '🟠')
-                
-                expander_title = f"{status_icon} **ID:** {row['numero_identificacao']} | **Tipo:** {row['tipo_agente']} | **Status:** {row['status_atual']} | **Localização:** {row['status_instalacao']}"
-                
-                with st.expander(expander_title):
-                    st.markdown(f"**Plano de Ação Sugerido:** {row['plano_de_acao']}")
-                    st.markdown("---")
-                    st.subheader("Próximos Vencimentos:")
-                    
-                    col_venc1, col_venc2, col_venc3 = st.columns(3)
-                    col_venc1.metric("Inspeção Mensal", value=row['prox_venc_inspecao'])
-                    col_venc2.metric("Manutenção Nível 2", value=row['prox_venc_maint2'])
-                    col_venc3.metric("Manutenção Nível 3", value=row['prox_venc_maint3'])
+            st.success("Todos os itens estavam conformes na última inspeção.")
+    else:
+        st.info("Nenhum detalhe de inspeção disponível.")
     
-                    st.caption(f"Último Selo INMETRO registrado: {row.get('numero_selo_inmetro', 'N/A')}")
-                    
-                    # ✅ ADIÇÃO: Exibe a foto de não conformidade se houver
-                    st.markdown("---")
-                    st.subheader("📸 Evidências Fotográficas")
-                    
-                    # Busca o último registro completo do extintor para pegar a foto
-                    ext_id = row['numero_identificacao']
-                    ext_history = df_full_history[df_full_history['numero_identificacao'] == ext_id].sort_values('data_servico', ascending=False)
-                    
-                    if not ext_history.empty:
-                        latest_full_record = ext_history.iloc[0]
-                        photo_link = latest_full_record.get('link_foto_nao_conformidade')
-                        
-                        if photo_link and pd.notna(photo_link) and str(photo_link).strip() != '':
-                            display_drive_image(photo_link, caption="Foto da Não Conformidade", width=400)
-                        else:
-                            st.info("Nenhuma foto de não conformidade registrada para este equipamento.")
-                    else:
-                        st.info("Sem histórico fotográfico disponível.")
-                    
-                    if row['status_atual'] != 'OK':
-                        st.markdown("---")
-                        if st.button("✍️ Registrar Ação Corretiva", key=f"action_ext_{index}", use_container_width=True):
-                            action_form(row.to_dict(), df_full_history, location)
-                           
-
-    with tab_hoses:
-        st.header("Dashboard de Mangueiras de Incêndio")
-        
-        df_hoses_history = load_sheet_data(HOSE_SHEET_NAME)
-        df_disposals = load_sheet_data(HOSE_DISPOSAL_LOG_SHEET_NAME) 
+    photo_link = row.get('link_foto_nao_conformidade')
+    display_drive_image(photo_link, caption="Foto da Não Conformidade", width=photo_width)
 
-        if df_hoses_history.empty:
-            st.warning("Ainda não há registros de inspeção de mangueiras para exibir no dashboard.")
-        else:
-            dashboard_df_hoses = get_hose_status_df(df_hoses_history, df_disposals)
-            
-            status_counts = dashboard_df_hoses['status'].value_counts()
-            col1, col2, col3, col4 = st.columns(4)
-            col1.metric("✅ Total Ativas", len(dashboard_df_hoses))
-            col2.metric("🟢 OK", status_counts.get("🟢 OK", 0))
-            col3.metric("🔴 VENCIDO", status_counts.get("🔴 VENCIDO", 0))
-            col4.metric("🟠 REPROVADA", status_counts.get("🟠 REPROVADA", 0)) # Nova métrica
-            
-            st.markdown("---")
-            
-            st.subheader("Lista de Mangueiras Ativas")
-            
-            # Itera sobre o dataframe para adicionar o botão de ação
-            for _, row in dashboard_df_hoses.iterrows():
-                if row['status'] == '🟠 REPROVADA':
-                    with st.container(border=True):
-                        cols = st.columns([5, 2])
-                        with cols[0]:
-                            st.markdown(f"**ID:** {row['id_mangueira']} | **Status:** {row['status']} | **Próx. Teste:** {row['data_proximo_teste']}")
-                        with cols[1]:
-                            if st.button("🗑️ Registrar Baixa", key=f"dispose_{row['id_mangueira']}", use_container_width=True):
-                                dispose_hose_dialog(row['id_mangueira'])
-                else:
-                    st.text(f"ID: {row['id_mangueira']} | Status: {row['status']} | Próx. Teste: {row['data_proximo_teste']}")
-            
-            with st.expander("Ver tabela completa de mangueiras ativas"):
-                st.dataframe(
-                    dashboard_df_hoses,
-                    column_config={
-                        "id_mangueira": "ID", "status": "Status", "marca": "Marca",
-                        "diametro": "Diâmetro", "tipo": "Tipo", "comprimento": "Comprimento",
-                        "ano_fabricacao": "Ano Fab.", "data_inspecao": "Último Teste",
-                        "data_proximo_teste": "Próximo Teste", "registrado_por": "Registrado Por",
-                        "link_certificado_pdf": st.column_config.LinkColumn(
-                            "Certificado", display_text="🔗 Ver PDF"
-                        )
-                    },
-                    hide_index=True,
-                    use_container_width=True
-                )
+
+def _show_eyewash_details(inspection_id, row, checklist):
+    st.write(f"**Última inspeção:** {_format_date_br(row['data_inspecao'])} por **{row['inspetor']}**")
+    st.write(f"**Plano de Ação Sugerido:** {row.get('plano_de_acao', 'N/A')}")
     
-    with tab_shelters:
-        st.header("Dashboard de Status dos Abrigos de Emergência")
-        
-        df_shelters_registered = load_sheet_data(SHELTER_SHEET_NAME)
-        df_inspections_history = load_sheet_data(INSPECTIONS_SHELTER_SHEET_NAME)
-        df_action_log = load_sheet_data(LOG_SHELTER_SHEET_NAME)
+    if row['status_dashboard'] == "🟠 COM PENDÊNCIAS":
+        if st.button("✍️ Registrar Ação Corretiva", key=f"action_eyewash_{row['id_equipamento']}"):
+            action_dialog_eyewash(row.to_dict())
 
-        if df_shelters_registered.empty:
-            st.warning("Nenhum abrigo de emergência cadastrado.")
-        else:
-            st.info("Aqui está o status de todos os abrigos. Gere um relatório de status completo para impressão ou registre ações corretivas.")
-            if st.button("📄 Gerar Relatório de Status em PDF", type="primary"):
-                report_html = generate_shelters_html(df_shelters_registered, df_inspections_history, df_action_log)
-                js_code = f"""
-                    const reportHtml = {json.dumps(report_html)};
-                    const printWindow = window.open('', '_blank');
-                    if (printWindow) {{
-                        printWindow.document.write(reportHtml);
-                        printWindow.document.close();
-                        printWindow.focus();
-                        setTimeout(() => {{ printWindow.print(); printWindow.close(); }}, 500);
-                    }} else {{
-                        alert('Por favor, desabilite o bloqueador de pop-ups para este site.');
-                    }}
-                """
-                streamlit_js_eval(js_expressions=js_code, key="print_shelters_js")
-                st.success("Relatório de status enviado para impressão!")
-            st.markdown("---")
+    st.markdown("---")
+    st.write("**Detalhes da Última Inspeção:**")
+    _show_checklist_non_conformities(inspection_id, row, checklist)
 
-            dashboard_df_shelters = get_shelter_status_df(df_shelters_registered, df_inspections_history)
-            
-            status_counts = dashboard_df_shelters['status_dashboard'].value_counts()
-            ok_count = status_counts.get("🟢 OK", 0) + status_counts.get("🟢 OK (Ação Realizada)", 0)
-            pending_count = status_counts.get("🟠 COM PENDÊNCIAS", 0) + status_counts.get("🔵 PENDENTE (Nova Inspeção)", 0)
-            col1, col2, col3, col4 = st.columns(4)
-            col1.metric("✅ Total de Abrigos", len(dashboard_df_shelters))
-            col2.metric("🟢 OK", ok_count)
-            col3.metric("🟠 Pendentes", pending_count)
-            col4.metric("🔴 Vencido", status_counts.get("🔴 VENCIDO", 0))
-            st.markdown("---")
-            
-            st.subheader("Lista de Abrigos e Status")
-            for _, row in dashboard_df_shelters.iterrows():
-                status = row['status_dashboard']
-                prox_inspecao_str = row['data_proxima_inspecao_str']
-                local_info = row.get('local', 'N/A') 
-                expander_title = f"{status} | **ID:** {row['id_abrigo']} | **Local:** {local_info} | **Próx. Inspeção:** {prox_inspecao_str}"
-                
-                with st.expander(expander_title):
-                    data_inspecao_str = row['data_inspecao_str']
-                    st.write(f"**Última inspeção:** {data_inspecao_str} por **{row['inspetor']}**")
-                    st.write(f"**Resultado da última inspeção:** {row.get('status_geral', 'N/A')}")
-                    
-                    if status not in ["🟢 OK", "🟢 OK (Ação Realizada)"]:
-                        problem_description = status.replace("🔴 ", "").replace("🟠 ", "").replace("🔵 ", "")
-                        if st.button("✍️ Registrar Ação", key=f"action_{row['id_abrigo']}", use_container_width=True):
-                            action_dialog_shelter(row['id_abrigo'], problem_description)
-                    
-                    st.markdown("---")
-                    st.write("**Detalhes da Última Inspeção:**")
 
-                    try:
-                        results_dict = json.loads(row['resultados_json'])
-                        
-                        if results_dict:                
-                            general_conditions = results_dict.pop('Condições Gerais', {})
-                           
-                            if results_dict: 
-                                st.write("**Itens do Inventário:**")
-                                items_df = pd.DataFrame.from_dict(results_dict, orient='index')
-                                st.table(items_df)
-                            
-                            if general_conditions:
-                                st.write("**Condições Gerais do Abrigo:**")
-                                cols = st.columns(len(general_conditions))
-                                for i, (key, value) in enumerate(general_conditions.items()):
-                                    with cols[i]:
-                                        st.metric(label=key, value=value)
-                            
-                        else:
-                            st.info("Nenhum detalhe de inspeção disponível.")
-                            
-                    except (json.JSONDecodeError, TypeError):
-                        st.error("Não foi possível carregar os detalhes desta inspeção (formato inválido).")
+def _show_foam_chamber_details(inspection_id, row, checklist):
+    cols = st.columns(3)
+    cols[0].metric("Última Inspeção", _format_date_br(row['data_inspecao']))
+    cols[1].metric("Próxima Inspeção", _format_date_br(row['data_proxima_inspecao']))
+    cols[2].metric("Tipo da Última Insp.", row.get('tipo_inspecao', 'N/A'))
     
-    with tab_scba:
-        st.header("Dashboard de Status dos Conjuntos Autônomos")
-        
-        # Carrega os dados diretamente como DataFrames
-        df_scba_main = load_sheet_data(SCBA_SHEET_NAME)
-        df_scba_visual = load_sheet_data(SCBA_VISUAL_INSPECTIONS_SHEET_NAME)
+    st.write(f"**Plano de Ação Sugerido:** {row['plano_de_acao']}")
+    
+    if row['status_dashboard'] == "🟠 COM PENDÊNCIAS":
+        if st.button("✍️ Registrar Ação Corretiva", key=f"action_foam_{row['id_camara']}", use_container_width=True):
+            action_dialog_foam_chamber(row.to_dict())
 
-        # A VERIFICAÇÃO AGORA USA .empty
-        if df_scba_main.empty:
-            st.warning("Nenhum teste de equipamento (Posi3) registrado.")
-        else:
-            dashboard_df = get_scba_status_df(df_scba_main, df_scba_visual)
-            
-            if dashboard_df.empty:
-                st.info("Não há equipamentos SCBA para exibir no dashboard.")
-            else:
-                status_counts = dashboard_df['status_consolidado'].value_counts()
-                col1, col2, col3, col4 = st.columns(4)
-                col1.metric("✅ Total", len(dashboard_df))
-                col2.metric("🟢 OK", status_counts.get("🟢 OK", 0))
-                col3.metric("🟠 Pendências", status_counts.get("🟠 COM PENDÊNCIAS", 0))
-                col4.metric("🔴 Vencidos", status_counts.get("🔴 VENCIDO (Teste Posi3)", 0) + status_counts.get("🔴 VENCIDO (Insp. Periódica)", 0))
-                st.markdown("---")
-                
-                for _, row in dashboard_df.iterrows():
-                    val_teste_str = pd.to_datetime(row['data_validade']).strftime('%d/%m/%Y') if pd.notna(row['data_validade']) else 'N/A'
-                    prox_insp_str = pd.to_datetime(row['data_proxima_inspecao']).strftime('%d/%m/%Y') if pd.notna(row['data_proxima_inspecao']) else 'N/A'
-                    status = row['status_consolidado']
-                    expander_title = f"{status} | **S/N:** {row['numero_serie_equipamento']} | **Val. Teste:** {val_teste_str} | **Próx. Insp.:** {prox_insp_str}"
+    st.markdown("---")
+    st.write("**Detalhes da Última Inspeção:**")
+    if not checklist.is_invalid(inspection_id) and not checklist.has_items(inspection_id):
+        st.error("Não foi possível carregar os detalhes da inspeção: resultados ausentes ou inválidos.")
+    else:
+        _show_checklist_non_conformities(inspection_id, row, checklist)
+
+
+def _show_multigas_details(_, row):
+    status_calibracao = row['status_calibracao']
+    status_bump = row['status_bump_test']
+    st.write(f"**Marca/Modelo:** {row.get('marca', 'N/A')} / {row.get('modelo', 'N/A')}")
+    
+    cols = st.columns(2)
+    with cols[0]:
+        st.subheader("Status da Calibração Anual")
+        st.markdown(f"**Status:** {status_calibracao}")
+        st.markdown(f"**Próxima Calibração:** {_format_date_br(row['proxima_calibracao'])}")
+        if status_calibracao != '🟢 OK':
+            st.warning(f"**Ação:** Realizar calibração anual do equipamento.")
+
+    with cols[1]:
+        st.subheader("Status do Último Bump Test")
+        st.markdown(f"**Status:** {status_bump}")
+        st.markdown(f"**Data do Último Teste:** {_format_date_br(row['data_ultimo_bump_test'])}")
+        if status_bump == '🟠 REPROVADO':
+            st.error(f"**Ação:** Equipamento reprovado. Enviar para manutenção/calibração.")
+        elif status_bump == '🔵 PENDENTE':
+             st.info(f"**Ação:** Realizar novo teste de resposta.")
+
+    # Botão de ação
+    if row['status_geral'] != "🟢":
+        if st.button("✍️ Registrar Ação Corretiva", key=f"action_multigas_{row['id_equipamento']}"):
+            action_dialog_multigas(row.to_dict())
+
+    # Opcional: Mostrar detalhes da última calibração (se houver)
+    if pd.notna(row.get('link_certificado')):
+        st.markdown(f"**[🔗 Ver Último Certificado de Calibração]({row.get('link_certificado')})**")
+
+
+def _show_alarm_details(inspection_id, row, checklist):
+    st.write(f"**Última inspeção:** {_format_date_br(row['data_inspecao'])} por **{row['inspetor']}**")
+    st.write(f"**Plano de Ação Sugerido:** {row.get('plano_de_acao', 'N/A')}")
+    
+    if row['status_dashboard'] in ["🟠 COM PENDÊNCIAS", "🔴 VENCIDO"]:
+        if st.button("✍️ Registrar Ação Corretiva", key=f"action_alarm_{row['id_sistema']}"):
+            action_dialog_alarm(row.to_dict())
+
+    st.markdown("---")
+    st.write("**Detalhes da Última Inspeção:**")
+    _show_checklist_non_conformities(inspection_id, row, checklist)
+
+
+def _show_canhao_monitor_details(inspection_id, row, checklist):
+    st.write(f"**Última inspeção:** {_format_date_br(row['data_inspecao'])} por **{row['inspetor']}** ({row['tipo_inspecao']})")
+    st.write(f"**Plano de Ação Sugerido:** {row.get('plano_de_acao', 'N/A')}")
+    
+    if row['status_dashboard'] in ["🟠 COM PENDÊNCIAS", "🔴 VENCIDO"]:
+        if st.button("✍️ Registrar Ação Corretiva", key=f"action_canhao_{row['id_equipamento']}"):
+            action_dialog_canhao_monitor(row.to_dict())
+
+    st.markdown("---")
+    st.write("**Detalhes da Última Inspeção:**")
+    _show_checklist_non_conformities(inspection_id, row, checklist)
+
+
+@st.fragment
+def _render_extinguishers_tab(location):
+    st.header("Dashboard de Extintores")
+    
+    if is_admin():
+        with st.expander("⚙️ Ações de Administrador"):
+            st.warning("Esta ação criará um registro de inspeção 'Aprovado' com a data de hoje para TODOS os extintores com inspeção mensal vencida.")
+            if st.button("Regularizar Todas as Inspeções Mensais Vencidas", type="primary"):
+                with st.spinner("Verificando e regularizando extintores..."):
+                    df_history_for_action = load_sheet_data("extintores")
+                    num_regularized = batch_regularize_monthly_inspections(df_history_for_action)
                     
-                    with st.expander(expander_title):
-                        data_insp_str = pd.to_datetime(row.get('data_inspecao')).strftime('%d/%m/%Y') if pd.notna(row.get('data_inspecao')) else 'N/A'
-                        st.write(f"**Última Inspeção Periódica:** {data_insp_str} - **Status:** {row.get('status_geral', 'N/A')}")
-                        
-                        if status != "🟢 OK":
-                            if st.button("✍️ Registrar Plano de Ação", key=f"action_scba_{row['numero_serie_equipamento']}", use_container_width=True):
-                                action_dialog_scba(row['numero_serie_equipamento'], status)
+                    if num_regularized > 0:
+                        st.success(f"{num_regularized} extintores foram regularizados com sucesso!")
+                        st.balloons()
+                        invalidate_dashboard_tab('extintores')
+                        st.rerun(scope="fragment")
+                    elif num_regularized == 0:
+                        pass
+                    else:
+                        st.error("A operação de regularização falhou. Verifique os logs.")
                         
-                        st.markdown("**Detalhes da Última Inspeção Periódica:**")
-                    try:
-                        results_json = row.get('resultados_json')
-                        if results_json and pd.notna(results_json):
-                            results = json.loads(results_json)
-                            
-                            with st.expander("Ver detalhes da inspeção"):
-                                
-                                st.markdown("""
-                                <style>
-                                .small-font {
-                                    font-size:0.9rem;
-                                    line-height: 1.2;
-                                }
-                                </style>
-                                """, unsafe_allow_html=True)
-
-                                # 1. Testes Funcionais (agora dentro de colunas menores)
-                                st.markdown("<p class='small-font' style='font-weight: bold;'>Testes Funcionais</p>", unsafe_allow_html=True)
-                                testes = results.get("Testes Funcionais", {})
-                                if testes:
-                                    cols_testes = st.columns(len(testes))
-                                    for i, (teste, resultado) in enumerate(testes.items()):
-                                        icon = "✅" if resultado == "Aprovado" else "❌"
-                                        # Usando markdown para controlar o tamanho
-                                        cols_testes[i].markdown(f"<p class='small-font'><b>{teste}</b><br>{icon} {resultado}</p>", unsafe_allow_html=True)
-                                
-                                # 2. Checklist Visual
-                                st.markdown("<p class='small-font' style='font-weight: bold; margin-top: 10px;'>Checklist Visual</p>", unsafe_allow_html=True)
-                                col_cilindro, col_mascara = st.columns(2)
-
-                                with col_cilindro:
-                                    st.markdown("<p class='small-font'><b>Cilindro de Ar</b></p>", unsafe_allow_html=True)
-                                    cilindro_itens = results.get("Cilindro", {})
-                                    obs_cilindro = cilindro_itens.pop("Observações", "")
-                                    for item, status in cilindro_itens.items():
-                                        icon = "✔️" if status == "C" else ("❌" if status == "N/C" else "➖")
-                                        st.markdown(f"<p class='small-font'>{icon} {item}</p>", unsafe_allow_html=True)
-                                    if obs_cilindro:
-                                        st.markdown(f"<p class='small-font' style='font-style: italic;'>Obs: {obs_cilindro}</p>", unsafe_allow_html=True)
-
-                                with col_mascara:
-                                    st.markdown("<p class='small-font'><b>Máscara Facial</b></p>", unsafe_allow_html=True)
-                                    mascara_itens = results.get("Mascara", {})
-                                    obs_mascara = mascara_itens.pop("Observações", "")
-                                    for item, status in mascara_itens.items():
-                                        icon = "✔️" if status == "C" else ("❌" if status == "N/C" else "➖")
-                                        st.markdown(f"<p class='small-font'>{icon} {item}</p>", unsafe_allow_html=True)
-                                    if obs_mascara:
-                                        st.markdown(f"<p class='small-font' style='font-style: italic;'>Obs: {obs_mascara}</p>", unsafe_allow_html=True)
 
-                        else:
-                            st.info("Nenhum detalhe de inspeção periódica encontrado.")
-                    except (json.JSONDecodeError, TypeError, AttributeError):
-                        st.info("Nenhum detalhe de inspeção periódica encontrado.")
+    with st.expander("📄 Gerar Relatório Mensal..."):
+        show_monthly_report_interface()
+    st.markdown("---")
+    
+    df_full_history = load_sheet_data("extintores")
+
+    if df_full_history.empty:
+        st.warning("Ainda não há registros de inspeção para exibir."); return
 
-    with tab_eyewash:
-        st.header("Dashboard de Chuveiros e Lava-Olhos")
+    with st.spinner("Analisando o status de todos os extintores..."):
+        dashboard_df = load_dashboard_tab_status('extintores')
+    
+    if dashboard_df.empty:
+        st.warning("Não foi possível gerar o dashboard ou não há equipamentos ativos."); return
+
+    show_status_metrics('extintores', "✅ Total Ativo", [("🟢 OK", 'ok'), ("🔴 VENCIDO", 'expired'), ("🟠 NÃO CONFORME", 'pending')])
+    st.markdown("---")
+    
+    st.subheader("Lista de Equipamentos")
+    render_paginated_list(
+        dashboard_df, key="dash_ext",
+        title_fn=_extinguisher_title,
+        detail_fn=lambda index, row: _show_extinguisher_details(index, row, df_full_history, location),
+        search_columns=['numero_identificacao', 'tipo_agente', 'status_instalacao', 'numero_selo_inmetro'],
+        status_column='status_atual',
+        sort_options={
+            "ID": ('numero_identificacao', True),
+            "Status": ('status_atual', True),
+            "Localização": ('status_instalacao', True),
+        }
+    )
+
+
+@st.fragment
+def _render_hoses_tab():
+    st.header("Dashboard de Mangueiras de Incêndio")
+    
+    df_hoses_history = load_sheet_data(HOSE_SHEET_NAME)
+
+    if df_hoses_history.empty:
+        st.warning("Ainda não há registros de inspeção de mangueiras para exibir no dashboard.")
+    else:
+        dashboard_df_hoses = load_dashboard_tab_status('mangueiras')
         
-        df_eyewash_history = load_sheet_data(EYEWASH_INSPECTIONS_SHEET_NAME)
+        show_status_metrics('mangueiras', "✅ Total Ativas", [("🟢 OK", 'ok'), ("🔴 VENCIDO", 'expired'), ("🟠 REPROVADA", 'pending')])
         
-        if df_eyewash_history.empty:
-            st.warning("Nenhuma inspeção de chuveiro/lava-olhos registrada.")
-        else:
-            dashboard_df = get_eyewash_status_df(df_eyewash_history)
-            
-            status_counts = dashboard_df['status_dashboard'].value_counts()
-            col1, col2, col3, col4 = st.columns(4)
-            col1.metric("✅ Total de Equipamentos", len(dashboard_df))
-            col2.metric("🟢 OK", status_counts.get("🟢 OK", 0))
-            col3.metric("🟠 Com Pendências", status_counts.get("🟠 COM PENDÊNCIAS", 0))
-            col4.metric("🔴 Vencido", status_counts.get("🔴 VENCIDO", 0))
-            st.markdown("---")
-
-            st.subheader("Lista de Equipamentos e Status")
-            for _, row in dashboard_df.iterrows():
-                status = row['status_dashboard']
-                prox_inspecao = pd.to_datetime(row['data_proxima_inspecao']).strftime('%d/%m/%Y') if pd.notna(row['data_proxima_inspecao']) else "N/A"
-                expander_title = f"{status} | **ID:** {row['id_equipamento']} | **Próx. Inspeção:** {prox_inspecao}"
-                
-                with st.expander(expander_title):
-                    ultima_inspecao = pd.to_datetime(row['data_inspecao']).strftime('%d/%m/%Y') if pd.notna(row['data_inspecao']) else "N/A"
-                    st.write(f"**Última inspeção:** {ultima_inspecao} por **{row['inspetor']}**")
-                    st.write(f"**Plano de Ação Sugerido:** {row.get('plano_de_acao', 'N/A')}")
-                    
-                    if status == "🟠 COM PENDÊNCIAS":
-                        if st.button("✍️ Registrar Ação Corretiva", key=f"action_eyewash_{row['id_equipamento']}"):
-                            action_dialog_eyewash(row.to_dict())
-
-                    st.markdown("---")
-                    st.write("**Detalhes da Última Inspeção:**")
-                    try:
-                        results_json = row.get('resultados_json')
-                        if results_json and pd.notna(results_json):
-                            results = json.loads(results_json)
-                            # Filtra apenas os itens que não estão conformes para destacar o problema
-                            non_conformities = {q: status for q, status in results.items() if str(status).upper() == "NÃO CONFORME"}
-                            
-                            if non_conformities:
-                                st.write("Itens não conformes encontrados:")
-                                st.table(pd.DataFrame.from_dict(non_conformities, orient='index', columns=['Status']))
-                            else:
-                                st.success("Todos os itens estavam conformes na última inspeção.")
-                        else:
-                            st.info("Nenhum detalhe de inspeção disponível.")
-                        
-                        photo_link = row.get('link_foto_nao_conformidade')
-                        display_drive_image(photo_link, caption="Foto da Não Conformidade", width=300)
+        st.markdown("---")
+        
+        st.subheader("Lista de Mangueiras Ativas")
+        
+        render_paginated_list(
+            dashboard_df_hoses, key="dash_hoses",
+            title_fn=lambda row: f"{row['status']} | **ID:** {row['id_mangueira']} | **Próx. Teste:** {_format_date_br(row['data_proximo_teste'])}",
+            detail_fn=_show_hose_details,
+            search_columns=['id_mangueira', 'marca', 'tipo', 'diametro'],
+            status_column='status',
+            sort_options={
+                "Próximo Teste": ('data_proximo_teste', True),
+                "ID": ('id_mangueira', True),
+                "Status": ('status', True),
+            }
+        )
+        
+        with st.expander("Ver tabela completa de mangueiras ativas"):
+            st.dataframe(
+                dashboard_df_hoses,
+                column_config={
+                    "id_mangueira": "ID", "status": "Status", "status_code": None, "marca": "Marca",
+                    "diametro": "Diâmetro", "tipo": "Tipo", "comprimento": "Comprimento",
+                    "ano_fabricacao": "Ano Fab.",
+                    "data_inspecao": st.column_config.DateColumn("Último Teste", format="DD/MM/YYYY"),
+                    "data_proximo_teste": st.column_config.DateColumn("Próximo Teste", format="DD/MM/YYYY"),
+                    "registrado_por": "Registrado Por",
+                    "link_certificado_pdf": st.column_config.LinkColumn(
+                        "Certificado", display_text="🔗 Ver PDF"
+                    )
+                },
+                hide_index=True,
+                use_container_width=True
+            )
 
-                    except (json.JSONDecodeError, TypeError):
-                        st.error("Não foi possível carregar os detalhes da inspeção (formato de dados inválido).")
 
+@st.fragment
+def _render_shelters_tab():
+    st.header("Dashboard de Status dos Abrigos de Emergência")
     
-    with tab_foam:
-        st.header("Dashboard de Câmaras de Espuma")
+    df_shelters_registered = load_sheet_data(SHELTER_SHEET_NAME)
+    df_inspections_history = load_sheet_data(INSPECTIONS_SHELTER_SHEET_NAME)
+    df_action_log = load_sheet_data(LOG_SHELTER_SHEET_NAME)
+
+    if df_shelters_registered.empty:
+        st.warning("Nenhum abrigo de emergência cadastrado.")
+    else:
+        st.info("Aqui está o status de todos os abrigos. Gere um relatório de status completo para impressão ou registre ações corretivas.")
+        if st.button("📄 Gerar Relatório de Status em PDF", type="primary"):
+            report_html = generate_shelters_html(df_shelters_registered, df_inspections_history, df_action_log)
+            js_code = f"""
+                const reportHtml = {json.dumps(report_html)};
+                const printWindow = window.open('', '_blank');
+                if (printWindow) {{
+                    printWindow.document.write(reportHtml);
+                    printWindow.document.close();
+                    printWindow.focus();
+                    setTimeout(() => {{ printWindow.print(); printWindow.close(); }}, 500);
+                }} else {{
+                    alert('Por favor, desabilite o bloqueador de pop-ups para este site.');
+                }}
+            """
+            streamlit_js_eval(js_expressions=js_code, key="print_shelters_js")
+            st.success("Relatório de status enviado para impressão!")
+        st.markdown("---")
+
+        dashboard_df_shelters = load_dashboard_tab_status('abrigos')
+        
+        show_status_metrics('abrigos', "✅ Total de Abrigos", [("🟢 OK", 'ok'), ("🟠 Pendentes", 'pending'), ("🔴 Vencido", 'expired')])
+        st.markdown("---")
         
-        df_foam_inventory = load_sheet_data(FOAM_CHAMBER_INVENTORY_SHEET_NAME)
-        df_foam_history = load_sheet_data(FOAM_CHAMBER_INSPECTIONS_SHEET_NAME)
+        st.subheader("Lista de Abrigos e Status")
+        checklist = build_checklist_store(dashboard_df_shelters)
+        render_paginated_list(
+            dashboard_df_shelters, key="dash_shelters",
+            title_fn=lambda row: f"{row['status_dashboard']} | **ID:** {row['id_abrigo']} | **Local:** {row.get('local', 'N/A')} | **Próx. Inspeção:** {row['data_proxima_inspecao_str']}",
+            detail_fn=lambda inspection_id, row: _show_shelter_details(inspection_id, row, checklist),
+            search_columns=['id_abrigo', 'local', 'inspetor'],
+            status_column='status_dashboard',
+            sort_options={
+                "ID": ('id_abrigo', True),
+                "Status": ('status_dashboard', True),
+                "Local": ('local', True),
+            }
+        )
+
+
+@st.fragment
+def _render_scba_tab():
+    st.header("Dashboard de Status dos Conjuntos Autônomos")
+    
+    # Carrega os dados diretamente como DataFrames
+    df_scba_main = load_sheet_data(SCBA_SHEET_NAME)
+
+    # A VERIFICAÇÃO AGORA USA .empty
+    if df_scba_main.empty:
+        st.warning("Nenhum teste de equipamento (Posi3) registrado.")
+    else:
+        dashboard_df = load_dashboard_tab_status('scba')
         
-        if df_foam_history.empty:
-            st.warning("Nenhuma inspeção de câmara de espuma registrada.")
+        if dashboard_df.empty:
+            st.info("Não há equipamentos SCBA para exibir no dashboard.")
         else:
-            dashboard_df = get_foam_chamber_status_df(df_foam_history)
-            
-            if not df_foam_inventory.empty:
-                dashboard_df = pd.merge(
-                    dashboard_df, 
-                    df_foam_inventory[['id_camara', 'localizacao', 'modelo']], 
-                    on='id_camara', 
-                    how='left'
-                )
-            else:
-                dashboard_df['localizacao'] = 'Localização não definida'
-                dashboard_df['modelo'] = 'N/A'
-            
-            dashboard_df['localizacao'] = dashboard_df['localizacao'].fillna('Localização não definida')
-    
-            status_counts = dashboard_df['status_dashboard'].value_counts()
-            col1, col2, col3, col4 = st.columns(4)
-            col1.metric("✅ Total de Câmaras", len(dashboard_df))
-            col2.metric("🟢 OK", status_counts.get("🟢 OK", 0))
-            col3.metric("🟠 Com Pendências", status_counts.get("🟠 COM PENDÊNCIAS", 0))
-            col4.metric("🔴 Vencido", status_counts.get("🔴 VENCIDO", 0))
+            show_status_metrics('scba', "✅ Total", [("🟢 OK", 'ok'), ("🟠 Pendências", 'pending'), ("🔴 Vencidos", 'expired')])
             st.markdown("---")
-    
-            st.subheader("Status dos Equipamentos por Localização")
             
-            grouped_by_location = dashboard_df.groupby('localizacao')
+            checklist = build_checklist_store(dashboard_df)
+            render_paginated_list(
+                dashboard_df, key="dash_scba",
+                title_fn=lambda row: f"{row['status_consolidado']} | **S/N:** {row['numero_serie_equipamento']} | **Val. Teste:** {_format_date_br(row['data_validade'])} | **Próx. Insp.:** {_format_date_br(row['data_proxima_inspecao'])}",
+                detail_fn=lambda inspection_id, row: _show_scba_details(inspection_id, row, checklist),
+                search_columns=['numero_serie_equipamento', 'status_geral'],
+                status_column='status_consolidado',
+                sort_options={
+                    "Validade do Teste": ('data_validade', True),
+                    "Próxima Inspeção": ('data_proxima_inspecao', True),
+                    "S/N": ('numero_serie_equipamento', True),
+                }
+            )
+
+
+@st.fragment
+def _render_eyewash_tab():
+    st.header("Dashboard de Chuveiros e Lava-Olhos")
     
-            for location, group_df in grouped_by_location:
-                location_status_counts = group_df['status_dashboard'].value_counts()
-                ok_count = location_status_counts.get("🟢 OK", 0)
-                pending_count = location_status_counts.get("🟠 COM PENDÊNCIAS", 0)
-                expired_count = location_status_counts.get("🔴 VENCIDO", 0)
+    df_eyewash_history = load_sheet_data(EYEWASH_INSPECTIONS_SHEET_NAME)
     
-                expander_title = f"📍 **Local:** {location}  |  (🟢{ok_count} OK, 🟠{pending_count} Pendente, 🔴{expired_count} Vencido)"
-                
-                with st.expander(expander_title):
-                    for _, row in group_df.iterrows():
-                        status = row['status_dashboard']
-                        modelo = row.get('modelo', 'N/A')
-                        ultima_inspecao_str = pd.to_datetime(row['data_inspecao']).strftime('%d/%m/%Y') if pd.notna(row['data_inspecao']) else "N/A"
-                        prox_inspecao_str = pd.to_datetime(row['data_proxima_inspecao']).strftime('%d/%m/%Y') if pd.notna(row['data_proxima_inspecao']) else "N/A"
-                        
-                        with st.container(border=True):
-                            st.markdown(f"##### {status} | **ID:** {row['id_camara']} | **Modelo:** {modelo}")
-                            
-                            cols = st.columns(3)
-                            cols[0].metric("Última Inspeção", ultima_inspecao_str)
-                            cols[1].metric("Próxima Inspeção", prox_inspecao_str)
-                            cols[2].metric("Tipo da Última Insp.", row.get('tipo_inspecao', 'N/A'))
-                            
-                            st.write(f"**Plano de Ação Sugerido:** {row['plano_de_acao']}")
-                            
-                            if status == "🟠 COM PENDÊNCIAS":
-                                if st.button("✍️ Registrar Ação Corretiva", key=f"action_foam_{row['id_camara']}", use_container_width=True):
-                                    action_dialog_foam_chamber(row.to_dict())
-    
-                            with st.expander("Ver detalhes da última inspeção"):
-                                try:
-                                    results = json.loads(row['resultados_json'])
-                                    non_conformities = {q: status_item for q, status_item in results.items() if status_item == "Não Conforme"}
-                                    
-                                    if non_conformities:
-                                        st.write("**Itens não conformes encontrados:**")
-                                        st.table(pd.DataFrame.from_dict(non_conformities, orient='index', columns=['Status']))
-                                    else:
-                                        st.success("Todos os itens estavam conformes na última inspeção.")
-                                    
-                                    st.markdown("---")
-                                    photo_link = row.get('link_foto_nao_conformidade')
-                                    display_drive_image(photo_link, caption="Foto", width=300)
-                            
-                                except (json.JSONDecodeError, TypeError) as e:
-                                    st.error(f"Não foi possível carregar os detalhes da inspeção: {e}")
-
-
-
-    with tab_multigas:
-        st.header("Dashboard de Detectores Multigás")
-        df_inventory = load_sheet_data(MULTIGAS_INVENTORY_SHEET_NAME)
-        df_inspections = load_sheet_data(MULTIGAS_INSPECTIONS_SHEET_NAME)
-
-        if df_inventory.empty:
-            st.warning("Nenhum detector multigás cadastrado.")
-        else:
-            dashboard_df = get_multigas_status_df(df_inventory, df_inspections)
-            
-            # --- LÓGICA DE MÉTRICAS ATUALIZADA ---
-            total_equip = len(dashboard_df)
-            calib_ok = (dashboard_df['status_calibracao'] == '🟢 OK').sum()
-            bump_ok = (dashboard_df['status_bump_test'] == '🟢 OK').sum()
-            
-            col1, col2, col3 = st.columns(3)
-            col1.metric("✅ Total de Detectores", total_equip)
-            col2.metric("🗓️ Calibração Anual OK", f"{calib_ok} / {total_equip}")
-            col3.metric("💨 Bump Test OK", f"{bump_ok} / {total_equip}")
-            st.markdown("---")
+    if df_eyewash_history.empty:
+        st.warning("Nenhuma inspeção de chuveiro/lava-olhos registrada.")
+    else:
+        dashboard_df = load_dashboard_tab_status('chuveiros')
+        
+        show_status_metrics('chuveiros', "✅ Total de Equipamentos", [("🟢 OK", 'ok'), ("🟠 Com Pendências", 'pending'), ("🔴 Vencido", 'expired')])
+        st.markdown("---")
 
-            st.subheader("Lista de Detectores e Status")
-            for _, row in dashboard_df.iterrows():
-                
-                # --- LÓGICA DE EXIBIÇÃO ATUALIZADA ---
-                status_calibracao = row['status_calibracao']
-                status_bump = row['status_bump_test']
-                
-                # Define um ícone de status geral (a pior condição prevalece)
-                geral_icon = "🟢"
-                if "🔴" in status_calibracao or "🟠" in status_bump:
-                    geral_icon = "🔴" if "🔴" in status_calibracao else "🟠"
-                elif "🔵" in status_calibracao or "🔵" in status_bump:
-                    geral_icon = "🔵"
-                
-                prox_calibracao_str = pd.to_datetime(row['proxima_calibracao']).strftime('%d/%m/%Y') if pd.notna(row['proxima_calibracao']) else "N/A"
-                
-                expander_title = f"{geral_icon} **ID:** {row['id_equipamento']} | **S/N:** {row['numero_serie']}"
-                
-                with st.expander(expander_title):
-                    st.write(f"**Marca/Modelo:** {row.get('marca', 'N/A')} / {row.get('modelo', 'N/A')}")
-                    
-                    cols = st.columns(2)
-                    with cols[0]:
-                        st.subheader("Status da Calibração Anual")
-                        st.markdown(f"**Status:** {status_calibracao}")
-                        st.markdown(f"**Próxima Calibração:** {prox_calibracao_str}")
-                        if status_calibracao != '🟢 OK':
-                            st.warning(f"**Ação:** Realizar calibração anual do equipamento.")
-
-                    with cols[1]:
-                        st.subheader("Status do Último Bump Test")
-                        ultimo_bump_str = pd.to_datetime(row['data_ultimo_bump_test']).strftime('%d/%m/%Y') if pd.notna(row['data_ultimo_bump_test']) else "N/A"
-                        st.markdown(f"**Status:** {status_bump}")
-                        st.markdown(f"**Data do Último Teste:** {ultimo_bump_str}")
-                        if status_bump == '🟠 REPROVADO':
-                            st.error(f"**Ação:** Equipamento reprovado. Enviar para manutenção/calibração.")
-                        elif status_bump == '🔵 PENDENTE':
-                             st.info(f"**Ação:** Realizar novo teste de resposta.")
-
-                    # Botão de ação
-                    if geral_icon != "🟢":
-                        if st.button("✍️ Registrar Ação Corretiva", key=f"action_multigas_{row['id_equipamento']}"):
-                            action_dialog_multigas(row.to_dict())
-
-                    # Opcional: Mostrar detalhes da última calibração (se houver)
-                    if pd.notna(row.get('link_certificado')):
-                        st.markdown(f"**[🔗 Ver Último Certificado de Calibração]({row.get('link_certificado')})**")
-
-
-
-
-    with tab_alarms:
-        st.header("Dashboard de Sistemas de Alarme")
+        st.subheader("Lista de Equipamentos e Status")
+        checklist = build_checklist_store(dashboard_df)
+        render_paginated_list(
+            dashboard_df, key="dash_eyewash",
+            title_fn=lambda row: f"{row['status_dashboard']} | **ID:** {row['id_equipamento']} | **Próx. Inspeção:** {_format_date_br(row['data_proxima_inspecao'])}",
+            detail_fn=lambda inspection_id, row: _show_eyewash_details(inspection_id, row, checklist),
+            search_columns=['id_equipamento', 'inspetor', 'plano_de_acao'],
+            status_column='status_dashboard',
+            sort_options={
+                "Próxima Inspeção": ('data_proxima_inspecao', True),
+                "ID": ('id_equipamento', True),
+                "Status": ('status_dashboard', True),
+            }
+        )
+
+
+@st.fragment
+def _render_foam_chamber_tab():
+    st.header("Dashboard de Câmaras de Espuma")
+    
+    df_foam_history = load_sheet_data(FOAM_CHAMBER_INSPECTIONS_SHEET_NAME)
+    
+    if df_foam_history.empty:
+        st.warning("Nenhuma inspeção de câmara de espuma registrada.")
+    else:
+        dashboard_df = load_dashboard_tab_status('espuma')
+
+        show_status_metrics('espuma', "✅ Total de Câmaras", [("🟢 OK", 'ok'), ("🟠 Com Pendências", 'pending'), ("🔴 Vencido", 'expired')])
+        st.markdown("---")
+
+        st.subheader("Status dos Equipamentos por Localização")
         
-        try:
-            # Carrega os dados com cache individual (já tem cache do load_sheet_data)
-            df_alarm_inspections = load_sheet_data(ALARM_INSPECTIONS_SHEET_NAME)
-            df_alarm_inventory = load_sheet_data(ALARM_INVENTORY_SHEET_NAME)
-            
-            # Debug: mostra quantos registros foram encontrados
-            if df_alarm_inspections.empty and df_alarm_inventory.empty:
-                st.warning("Nenhum sistema de alarme ou inspeção cadastrada.")
-                st.info("Cadastre sistemas de alarme na aba 'Alarmes' do menu principal.")
-            elif df_alarm_inspections.empty:
-                st.warning("Nenhuma inspeção de sistema de alarme registrada.")
-            else:
-                # --- SEÇÃO DE RELATÓRIO COM OPÇÃO MENSAL/SEMESTRAL ---
-                with st.expander("📄 Gerar Relatório de Inspeções", expanded=False):
-                    # Converte a coluna de data para o formato datetime
-                    df_alarm_inspections['data_inspecao_dt'] = pd.to_datetime(df_alarm_inspections['data_inspecao'], errors='coerce')
-    
-                    # Seletor de tipo de relatório
-                    col_type, col_rest = st.columns([1, 3])
-                    with col_type:
-                        report_type = st.radio(
-                            "Tipo de Relatório:",
-                            ["📅 Mensal", "📆 Semestral"],
-                            key="dashboard_alarm_report_type"
-                        )
+        checklist = build_checklist_store(dashboard_df)
+        render_paginated_list(
+            dashboard_df, key="dash_foam",
+            title_fn=lambda row: f"{row['status_dashboard']} | **ID:** {row['id_camara']} | **Modelo:** {row.get('modelo', 'N/A')} | 📍 {row['localizacao']}",
+            detail_fn=lambda inspection_id, row: _show_foam_chamber_details(inspection_id, row, checklist),
+            search_columns=['id_camara', 'localizacao', 'modelo'],
+            status_column='status_dashboard',
+            sort_options={
+                "Localização": ('localizacao', True),
+                "ID": ('id_camara', True),
+                "Próxima Inspeção": ('data_proxima_inspecao', True),
+            },
+            search_placeholder="ID, localização, modelo..."
+        )
+
+
+@st.fragment
+def _render_multigas_tab():
+    st.header("Dashboard de Detectores Multigás")
+    df_inventory = load_sheet_data(MULTIGAS_INVENTORY_SHEET_NAME)
+
+    if df_inventory.empty:
+        st.warning("Nenhum detector multigás cadastrado.")
+    else:
+        dashboard_df = load_dashboard_tab_status('multigas')
+        
+        # --- LÓGICA DE MÉTRICAS ATUALIZADA ---
+        total_equip = len(dashboard_df)
+        calib_ok = (dashboard_df['status_calibracao'] == '🟢 OK').sum()
+        bump_ok = (dashboard_df['status_bump_test'] == '🟢 OK').sum()
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("✅ Total de Detectores", total_equip)
+        col2.metric("🗓️ Calibração Anual OK", f"{calib_ok} / {total_equip}")
+        col3.metric("💨 Bump Test OK", f"{bump_ok} / {total_equip}")
+        st.markdown("---")
+
+        st.subheader("Lista de Detectores e Status")
+        render_paginated_list(
+            dashboard_df, key="dash_multigas",
+            title_fn=lambda row: f"{row['status_geral']} **ID:** {row['id_equipamento']} | **S/N:** {row['numero_serie']}",
+            detail_fn=_show_multigas_details,
+            search_columns=['id_equipamento', 'numero_serie', 'marca', 'modelo'],
+            status_column='status_geral',
+            sort_options={
+                "Próxima Calibração": ('proxima_calibracao', True),
+                "ID": ('id_equipamento', True),
+            }
+        )
+
+
+@st.fragment
+def _render_alarms_tab():
+    st.header("Dashboard de Sistemas de Alarme")
+    
+    try:
+        # Carrega os dados com cache individual (já tem cache do load_sheet_data)
+        df_alarm_inspections = load_sheet_data(ALARM_INSPECTIONS_SHEET_NAME)
+        df_alarm_inventory = load_sheet_data(ALARM_INVENTORY_SHEET_NAME)
+        
+        # Debug: mostra quantos registros foram encontrados
+        if df_alarm_inspections.empty and df_alarm_inventory.empty:
+            st.warning("Nenhum sistema de alarme ou inspeção cadastrada.")
+            st.info("Cadastre sistemas de alarme na aba 'Alarmes' do menu principal.")
+        elif df_alarm_inspections.empty:
+            st.warning("Nenhuma inspeção de sistema de alarme registrada.")
+        else:
+            # --- SEÇÃO DE RELATÓRIO COM OPÇÃO MENSAL/SEMESTRAL ---
+            with st.expander("📄 Gerar Relatório de Inspeções", expanded=False):
+                # Converte a coluna de data para o formato datetime
+                df_alarm_inspections['data_inspecao_dt'] = pd.to_datetime(df_alarm_inspections['data_inspecao'], errors='coerce')
+
+                # Seletor de tipo de relatório
+                col_type, col_rest = st.columns([1, 3])
+                with col_type:
+                    report_type = st.radio(
+                        "Tipo de Relatório:",
+                        ["📅 Mensal", "📆 Semestral"],
+                        key="dashboard_alarm_report_type"
+                    )
+                
+                with col_rest:
+                    today = datetime.now()
                     
-                    with col_rest:
-                        today = datetime.now()
+                    if report_type == "📅 Mensal":
+                        # Filtros para mês e ano
+                        col1, col2 = st.columns(2)
                         
-                        if report_type == "📅 Mensal":
-                            # Filtros para mês e ano
-                            col1, col2 = st.columns(2)
-                            
-                            with col1:
-                                years_with_data = sorted(df_alarm_inspections['data_inspecao_dt'].dt.year.unique(), reverse=True)
-                                if not years_with_data:
-                                    years_with_data = [today.year]
-                                selected_year = st.selectbox("Selecione o Ano:", years_with_data, key="dashboard_alarm_report_year")
-                            
-                            with col2:
-                                months = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", 
-                                         "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
-                                default_month_index = today.month - 1
-                                selected_month_name = st.selectbox("Selecione o Mês:", months, 
-                                                                 index=default_month_index, key="dashboard_alarm_report_month")
-                            
-                            selected_month_number = months.index(selected_month_name) + 1
-    
-                            # Filtra os dados pelo mês e ano selecionados
-                            inspections_selected = df_alarm_inspections[
-                                (df_alarm_inspections['data_inspecao_dt'].dt.year == selected_year) &
-                                (df_alarm_inspections['data_inspecao_dt'].dt.month == selected_month_number)
-                            ].sort_values(by='data_inspecao_dt')
-                            
-                            period_description = f"{selected_month_name}/{selected_year}"
-                            period_type = "monthly"
-                            
-                        else:  # Semestral
-                            col1, col2 = st.columns(2)
-                            
-                            with col1:
-                                years_with_data = sorted(df_alarm_inspections['data_inspecao_dt'].dt.year.unique(), reverse=True)
-                                if not years_with_data:
-                                    years_with_data = [today.year]
-                                selected_year = st.selectbox("Selecione o Ano:", years_with_data, key="dashboard_alarm_report_year_sem")
-                            
-                            with col2:
-                                selected_semester = st.selectbox(
-                                    "Selecione o Semestre:",
-                                    ["1º Semestre (Jan-Jun)", "2º Semestre (Jul-Dez)"],
-                                    key="dashboard_alarm_report_semester"
-                                )
-                            
-                            # Define os meses do semestre selecionado
-                            if "1º" in selected_semester:
-                                semester_months = [1, 2, 3, 4, 5, 6]
-                                semester_num = 1
-                            else:
-                                semester_months = [7, 8, 9, 10, 11, 12]
-                                semester_num = 2
-                            
-                            # Filtra os dados pelo semestre e ano selecionados
-                            inspections_selected = df_alarm_inspections[
-                                (df_alarm_inspections['data_inspecao_dt'].dt.year == selected_year) &
-                                (df_alarm_inspections['data_inspecao_dt'].dt.month.isin(semester_months))
-                            ].sort_values(by='data_inspecao_dt')
-                            
-                            period_description = f"{semester_num}º Semestre de {selected_year}"
-                            period_type = "biannual"
-    
-                    if inspections_selected.empty:
-                        st.info(f"Nenhuma inspeção foi registrada em {period_description}.")
-                    else:
-                        st.write(f"Encontradas {len(inspections_selected)} inspeções em {period_description}.")
+                        with col1:
+                            years_with_data = sorted(df_alarm_inspections['data_inspecao_dt'].dt.year.unique(), reverse=True)
+                            if not years_with_data:
+                                years_with_data = [today.year]
+                            selected_year = st.selectbox("Selecione o Ano:", years_with_data, key="dashboard_alarm_report_year")
+                        
+                        with col2:
+                            months = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", 
+                                     "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+                            default_month_index = today.month - 1
+                            selected_month_name = st.selectbox("Selecione o Mês:", months, 
+                                                             index=default_month_index, key="dashboard_alarm_report_month")
                         
-                        if st.button("📄 Gerar e Imprimir Relatório do Dashboard", type="primary", key="dashboard_generate_alarm_report"):
-                            unit_name = st.session_state.get('current_unit_name', 'N/A')
-                            report_html = generate_alarm_inspection_html(
-                                inspections_selected, 
-                                df_alarm_inventory, 
-                                unit_name,
-                                period_type=period_type
+                        selected_month_number = months.index(selected_month_name) + 1
+
+                        # Filtra os dados pelo mês e ano selecionados
+                        inspections_selected = df_alarm_inspections[
+                            (df_alarm_inspections['data_inspecao_dt'].dt.year == selected_year) &
+                            (df_alarm_inspections['data_inspecao_dt'].dt.month == selected_month_number)
+                        ].sort_values(by='data_inspecao_dt')
+                        
+                        period_description = f"{selected_month_name}/{selected_year}"
+                        period_type = "monthly"
+                        
+                    else:  # Semestral
+                        col1, col2 = st.columns(2)
+                        
+                        with col1:
+                            years_with_data = sorted(df_alarm_inspections['data_inspecao_dt'].dt.year.unique(), reverse=True)
+                            if not years_with_data:
+                                years_with_data = [today.year]
+                            selected_year = st.selectbox("Selecione o Ano:", years_with_data, key="dashboard_alarm_report_year_sem")
+                        
+                        with col2:
+                            selected_semester = st.selectbox(
+                                "Selecione o Semestre:",
+                                ["1º Semestre (Jan-Jun)", "2º Semestre (Jul-Dez)"],
+                                key="dashboard_alarm_report_semester"
                             )
-                            
-                            js_code = f"""
-                                const reportHtml = {json.dumps(report_html)};
-                                const printWindow = window.open('', '_blank');
-                                if (printWindow) {{
-                                    printWindow.document.write(reportHtml);
-                                    printWindow.document.close();
-                                    printWindow.focus();
-                                    setTimeout(() => {{ 
-                                        printWindow.print(); 
-                                        printWindow.close(); 
-                                    }}, 500);
-                                }} else {{
-                                    alert('Por favor, desabilite o bloqueador de pop-ups para este site.');
-                                }}
-                            """
-                            
-                            streamlit_js_eval(js_expressions=js_code, key="dashboard_print_alarm_report_js")
-                            st.success("Relatório enviado para impressão!")
-                
-                st.markdown("---")
-                
-                # Dashboard principal dos alarmes
-                dashboard_df = get_alarm_status_df(df_alarm_inspections)
-                
-                # Se tiver dados de inventário, faz merge para obter localização e modelo
-                if not df_alarm_inventory.empty:
-                    dashboard_df = pd.merge(
-                        dashboard_df, 
-                        df_alarm_inventory[['id_sistema', 'localizacao', 'modelo', 'marca']], 
-                        on='id_sistema', 
-                        how='left'
-                    )
-                
-                status_counts = dashboard_df['status_dashboard'].value_counts()
-                col1, col2, col3, col4 = st.columns(4)
-                col1.metric("✅ Total de Sistemas", len(dashboard_df))
-                col2.metric("🟢 OK", status_counts.get("🟢 OK", 0))
-                col3.metric("🟠 Com Pendências", status_counts.get("🟠 COM PENDÊNCIAS", 0))
-                col4.metric("🔴 Vencido", status_counts.get("🔴 VENCIDO", 0))
-                st.markdown("---")
-        
-                st.subheader("Lista de Sistemas e Status")
-                for _, row in dashboard_df.iterrows():
-                    status = row['status_dashboard']
-                    prox_inspecao = pd.to_datetime(row['data_proxima_inspecao']).strftime('%d/%m/%Y') if pd.notna(row['data_proxima_inspecao']) else "N/A"
-                    localizacao = row.get('localizacao', 'Local não definido')
-                    
-                    expander_title = f"{status} | **ID:** {row['id_sistema']} | **Local:** {localizacao} | **Próx. Inspeção:** {prox_inspecao}"
+                        
+                        # Define os meses do semestre selecionado
+                        if "1º" in selected_semester:
+                            semester_months = [1, 2, 3, 4, 5, 6]
+                            semester_num = 1
+                        else:
+                            semester_months = [7, 8, 9, 10, 11, 12]
+                            semester_num = 2
+                        
+                        # Filtra os dados pelo semestre e ano selecionados
+                        inspections_selected = df_alarm_inspections[
+                            (df_alarm_inspections['data_inspecao_dt'].dt.year == selected_year) &
+                            (df_alarm_inspections['data_inspecao_dt'].dt.month.isin(semester_months))
+                        ].sort_values(by='data_inspecao_dt')
+                        
+                        period_description = f"{semester_num}º Semestre de {selected_year}"
+                        period_type = "biannual"
+
+                if inspections_selected.empty:
+                    st.info(f"Nenhuma inspeção foi registrada em {period_description}.")
+                else:
+                    st.write(f"Encontradas {len(inspections_selected)} inspeções em {period_description}.")
                     
-                    with st.expander(expander_title):
-                        ultima_inspecao = pd.to_datetime(row['data_inspecao']).strftime('%d/%m/%Y') if pd.notna(row['data_inspecao']) else "N/A"
-                        st.write(f"**Última inspeção:** {ultima_inspecao} por **{row['inspetor']}**")
-                        st.write(f"**Plano de Ação Sugerido:** {row.get('plano_de_acao', 'N/A')}")
+                    if st.button("📄 Gerar e Imprimir Relatório do Dashboard", type="primary", key="dashboard_generate_alarm_report"):
+                        unit_name = st.session_state.get('current_unit_name', 'N/A')
+                        report_html = generate_alarm_inspection_html(
+                            inspections_selected, 
+                            df_alarm_inventory, 
+                            unit_name,
+                            period_type=period_type
+                        )
                         
-                        if status in ["🟠 COM PENDÊNCIAS", "🔴 VENCIDO"]:
-                            if st.button("✍️ Registrar Ação Corretiva", key=f"action_alarm_{row['id_sistema']}"):
-                                action_dialog_alarm(row.to_dict())
-        
-                        st.markdown("---")
-                        st.write("**Detalhes da Última Inspeção:**")
-                        try:
-                            results_json = row.get('resultados_json')
-                            if results_json and pd.notna(results_json):
-                                results = json.loads(results_json)
-                                
-                                # Filtra apenas os itens que não estão conformes para destacar o problema
-                                non_conformities = {q: status for q, status in results.items() if status == "Não Conforme"}
-                                
-                                if non_conformities:
-                                    st.write("Itens não conformes encontrados:")
-                                    st.table(pd.DataFrame.from_dict(non_conformities, orient='index', columns=['Status']))
-                                else:
-                                    st.success("Todos os itens estavam conformes na última inspeção.")
-                            else:
-                                st.info("Nenhum detalhe de inspeção disponível.")
-                            
-                            # Exibe a foto da não conformidade, se houver
-                            photo_link = row.get('link_foto_nao_conformidade')
-                            display_drive_image(photo_link, caption="Foto da Não Conformidade", width=300)
-        
-                        except (json.JSONDecodeError, TypeError):
-                            st.error("Não foi possível carregar os detalhes da inspeção (formato de dados inválido).")
-                            
-        except Exception as e:
-            st.error(f"Erro ao carregar os dados dos sistemas de alarme: {e}")
-            import traceback
-            st.error(f"Detalhes do erro: {traceback.format_exc()}")
+                        js_code = f"""
+                            const reportHtml = {json.dumps(report_html)};
+                            const printWindow = window.open('', '_blank');
+                            if (printWindow) {{
+                                printWindow.document.write(reportHtml);
+                                printWindow.document.close();
+                                printWindow.focus();
+                                setTimeout(() => {{ 
+                                    printWindow.print(); 
+                                    printWindow.close(); 
+                                }}, 500);
+                            }} else {{
+                                alert('Por favor, desabilite o bloqueador de pop-ups para este site.');
+                            }}
+                        """
+                        
+                        streamlit_js_eval(js_expressions=js_code, key="dashboard_print_alarm_report_js")
+                        st.success("Relatório enviado para impressão!")
             
-
-    with tab_canhoes:
-        st.header("Dashboard de Canhões Monitores")
-        
-        df_inventory = load_sheet_data(CANHAO_MONITOR_INVENTORY_SHEET_NAME)
-        df_inspections = load_sheet_data(CANHAO_MONITOR_INSPECTIONS_SHEET_NAME)
-
-        if df_inspections.empty:
-            st.warning("Nenhuma inspeção de canhão monitor registrada.")
-        else:
-            dashboard_df = get_canhao_monitor_status_df(df_inspections)
+            st.markdown("---")
             
-            if not df_inventory.empty:
-                dashboard_df = pd.merge(
-                    dashboard_df, 
-                    df_inventory[['id_equipamento', 'localizacao', 'modelo']], 
-                    on='id_equipamento', 
-                    how='left'
-                )
-            else:
-                dashboard_df['localizacao'] = 'N/A'
-                dashboard_df['modelo'] = 'N/A'
+            # Dashboard principal dos alarmes
+            dashboard_df = load_dashboard_tab_status('alarmes')
             
-            status_counts = dashboard_df['status_dashboard'].value_counts()
-            col1, col2, col3, col4 = st.columns(4)
-            col1.metric("✅ Total de Canhões", len(dashboard_df))
-            col2.metric("🟢 OK", status_counts.get("🟢 OK", 0))
-            col3.metric("🟠 Com Pendências", status_counts.get("🟠 COM PENDÊNCIAS", 0))
-            col4.metric("🔴 Vencido", status_counts.get("🔴 VENCIDO", 0))
+            show_status_metrics('alarmes', "✅ Total de Sistemas", [("🟢 OK", 'ok'), ("🟠 Com Pendências", 'pending'), ("🔴 Vencido", 'expired')])
             st.markdown("---")
-
-            st.subheader("Lista de Equipamentos e Status")
-            for _, row in dashboard_df.iterrows():
-                status = row['status_dashboard']
-                prox_inspecao = pd.to_datetime(row['data_proxima_inspecao']).strftime('%d/%m/%Y') if pd.notna(row['data_proxima_inspecao']) else "N/A"
-                localizacao = row.get('localizacao', 'Local não definido')
-                
-                expander_title = f"{status} | **ID:** {row['id_equipamento']} | **Local:** {localizacao} | **Próx. Inspeção:** {prox_inspecao}"
-                
-                with st.expander(expander_title):
-                    ultima_inspecao = pd.to_datetime(row['data_inspecao']).strftime('%d/%m/%Y') if pd.notna(row['data_inspecao']) else "N/A"
-                    st.write(f"**Última inspeção:** {ultima_inspecao} por **{row['inspetor']}** ({row['tipo_inspecao']})")
-                    st.write(f"**Plano de Ação Sugerido:** {row.get('plano_de_acao', 'N/A')}")
-                    
-                    if status in ["🟠 COM PENDÊNCIAS", "🔴 VENCIDO"]:
-                        if st.button("✍️ Registrar Ação Corretiva", key=f"action_canhao_{row['id_equipamento']}"):
-                            action_dialog_canhao_monitor(row.to_dict())
-    
-                    st.markdown("---")
-                    st.write("**Detalhes da Última Inspeção:**")
-                    try:
-                        results_json = row.get('resultados_json')
-                        if results_json and pd.notna(results_json):
-                            results = json.loads(results_json)
-                            non_conformities = {q: s for q, s in results.items() if s in ["Não Conforme", "Reprovado"]}
-                            
-                            if non_conformities:
-                                st.write("Itens não conformes encontrados:")
-                                st.table(pd.DataFrame.from_dict(non_conformities, orient='index', columns=['Status']))
-                            else:
-                                st.success("Todos os itens estavam conformes na última inspeção.")
-                        else:
-                            st.info("Nenhum detalhe de inspeção disponível.")
+    
+            st.subheader("Lista de Sistemas e Status")
+            checklist = build_checklist_store(dashboard_df)
+            render_paginated_list(
+                dashboard_df, key="dash_alarms",
+                title_fn=lambda row: f"{row['status_dashboard']} | **ID:** {row['id_sistema']} | **Local:** {row.get('localizacao', 'Local não definido')} | **Próx. Inspeção:** {_format_date_br(row['data_proxima_inspecao'])}",
+                detail_fn=lambda inspection_id, row: _show_alarm_details(inspection_id, row, checklist),
+                search_columns=['id_sistema', 'localizacao', 'modelo', 'marca', 'inspetor'],
+                status_column='status_dashboard',
+                sort_options={
+                    "Próxima Inspeção": ('data_proxima_inspecao', True),
+                    "ID": ('id_sistema', True),
+                    "Local": ('localizacao', True),
+                }
+            )
                         
-                        photo_link = row.get('link_foto_nao_conformidade')
-                        display_drive_image(photo_link, caption="Foto da Não Conformidade", width=300)
+    except Exception as e:
+        st.error(f"Erro ao carregar os dados dos sistemas de alarme: {e}")
+        import traceback
+        st.error(f"Detalhes do erro: {traceback.format_exc()}")
+
+
+@st.fragment
+def _render_canhao_monitor_tab():
+    st.header("Dashboard de Canhões Monitores")
+    
+    df_inspections = load_sheet_data(CANHAO_MONITOR_INSPECTIONS_SHEET_NAME)
+
+    if df_inspections.empty:
+        st.warning("Nenhuma inspeção de canhão monitor registrada.")
+    else:
+        dashboard_df = load_dashboard_tab_status('canhoes')
+        
+        show_status_metrics('canhoes', "✅ Total de Canhões", [("🟢 OK", 'ok'), ("🟠 Com Pendências", 'pending'), ("🔴 Vencido", 'expired')])
+        st.markdown("---")
+
+        st.subheader("Lista de Equipamentos e Status")
+        checklist = build_checklist_store(dashboard_df)
+        render_paginated_list(
+            dashboard_df, key="dash_canhoes",
+            title_fn=lambda row: f"{row['status_dashboard']} | **ID:** {row['id_equipamento']} | **Local:** {row.get('localizacao', 'Local não definido')} | **Próx. Inspeção:** {_format_date_br(row['data_proxima_inspecao'])}",
+            detail_fn=lambda inspection_id, row: _show_canhao_monitor_details(inspection_id, row, checklist),
+            search_columns=['id_equipamento', 'localizacao', 'modelo', 'inspetor'],
+            status_column='status_dashboard',
+            sort_options={
+                "Próxima Inspeção": ('data_proxima_inspecao', True),
+                "ID": ('id_equipamento', True),
+                "Local": ('localizacao', True),
+            }
+        )
+
+
+def show_page():
+
+    
+        
+    st.title("Situação Atual dos Equipamentos de Emergência")
+      
+    if st.button("Limpar Cache e Recarregar Dados"):
+        clear_sheet_caches()
+        st.rerun()
+
+    location = streamlit_js_eval(js_expressions="""
+        new Promise(function(resolve, reject) {
+            navigator.geolocation.getCurrentPosition(
+                function(position) { resolve({ latitude: position.coords.latitude, longitude: position.coords.longitude }); },
+                function(error) { resolve(null); }
+            );
+        });
+    """)
 
-                    except (json.JSONDecodeError, TypeError):
-                        st.error("Não foi possível carregar os detalhes da inspeção.")
+    # Apenas a aba selecionada carrega e calcula seus dados
+    render_lazy_tabs(
+        {
+            'ajuda': ("📘 Como Usar", instru_dash),
+            'extintores': ("🔥 Extintores", lambda: _render_extinguishers_tab(location)),
+            'mangueiras': ("💧 Mangueiras", _render_hoses_tab),
+            'abrigos': ("🧯 Abrigos", _render_shelters_tab),
+            'scba': ("💨 C. Autônomo", _render_scba_tab),
+            'chuveiros': ("🚿 Chuveiros/Lava-Olhos", _render_eyewash_tab),
+            'espuma': ("☁️ Câmaras de Espuma", _render_foam_chamber_tab),
+            'multigas': ("💨 Multigás", _render_multigas_tab),
+            'alarmes': ("🔔 Alarmes", _render_alarms_tab),
+            'canhoes': ("🌊 Canhões Monitores", _render_canhao_monitor_tab),
+        },
+        key="dashboard_tab",
+        badge_fn=dashboard_tab_badge,
+        prefetch_fn=prefetch_dashboard_tab
+    )
@@ -2,14 +2,18 @@ import streamlit as st
 import pandas as pd
 import sys
 import os
+from datetime import date
 from config.page_config import set_page_config
 
 set_page_config()
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from operations.history import load_sheet_data
-from auth.auth_utils import check_user_access, can_view
+from operations.history import load_sheet_data, clear_sheet_caches
+from operations.history_archive import (
+    ARCHIVABLE_SHEETS, load_history_data, get_archive_years, get_retention_days, archive_old_history
+)
+from auth.auth_utils import check_user_access, can_view, is_admin
 from gdrive.config import (
     EXTINGUISHER_SHEET_NAME, HOSE_SHEET_NAME, SHELTER_SHEET_NAME,
     INSPECTIONS_SHELTER_SHEET_NAME, SCBA_SHEET_NAME, SCBA_VISUAL_INSPECTIONS_SHEET_NAME,
@@ -89,9 +93,25 @@ def format_dataframe_for_display(df, sheet_name):
     
     return renamed_df
 
+def select_archive_start(sheet_name):
+    """
+    Para abas com histórico arquivado, permite incluir registros antigos a partir de
+    um ano. Retorna a data inicial escolhida ou None (apenas a aba principal).
+    """
+    if sheet_name not in ARCHIVABLE_SHEETS:
+        return None
+    years = get_archive_years(sheet_name)
+    if not years:
+        return None
+    options = ["Somente registros recentes"] + [f"Desde {year}" for year in reversed(years)]
+    choice = st.selectbox("Período", options, key=f"archive_since_{sheet_name}")
+    if choice == options[0]:
+        return None
+    return date(int(choice.split()[-1]), 1, 1)
+
 def display_formatted_dataframe(sheet_name):
     """Função helper para carregar, formatar e exibir um DataFrame com links clicáveis."""
-    df = load_sheet_data(sheet_name)
+    df = load_history_data(sheet_name, since=select_archive_start(sheet_name))
     
     if df.empty:
         st.info("Nenhum registro encontrado.")
@@ -238,6 +258,30 @@ def display_disposal_summary():
     except Exception as e:
         st.error(f"Erro ao carregar resumo de baixas: {e}")
         
+def show_archive_controls():
+    """Arquivamento manual dos registros antigos em abas anuais (apenas administradores)."""
+    with st.expander("🗄️ Arquivar Histórico Antigo"):
+        st.caption(
+            "Move para abas anuais de arquivo (ex.: extintores_arquivo_2022) os registros mais antigos "
+            "que o período de retenção. O último registro de cada equipamento sempre permanece, "
+            "e os registros arquivados continuam disponíveis no seletor de período de cada aba."
+        )
+        retention_days = st.number_input(
+            "Período de retenção (dias)", min_value=180, step=30, value=get_retention_days()
+        )
+        if st.button("Arquivar Registros Antigos", type="primary"):
+            progress = st.progress(0.0)
+            results = archive_old_history(
+                retention_days=int(retention_days),
+                progress_callback=lambda fraction, name: progress.progress(fraction, text=f"Arquivando '{name}'...")
+            )
+            progress.progress(1.0, text="Concluído")
+            archived = sum(count for count in results.values() if isinstance(count, int))
+            errors = {name: result for name, result in results.items() if not isinstance(result, int)}
+            if errors:
+                st.error("Falha ao arquivar: " + "; ".join(f"{name} ({error})" for name, error in errors.items()))
+            st.success(f"{archived} registro(s) arquivado(s).")
+
 def show_page():
     st.title("Histórico e Logs do Sistema")
     
@@ -249,9 +293,12 @@ def show_page():
     st.info("Consulte o histórico de registros e ações para todos os equipamentos do sistema.")
     
     if st.button("Limpar Cache e Recarregar Dados"):
-        st.cache_data.clear()
+        clear_sheet_caches()
         st.rerun()
 
+    if is_admin():
+        show_archive_controls()
+
     tab_registros, tab_logs, tab_disposals = st.tabs([
         "📜 Histórico de Registros", 
         "📖 Logs de Ações Corretivas", 
@@ -3,7 +3,7 @@ import sys
 import os
 import pandas as pd
 import json
-from datetime import datetime
+from datetime import datetime, date
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -19,7 +19,8 @@ from auth.auth_utils import (
     has_ai_features
 )
 from config.page_config import set_page_config
-from operations.history import load_sheet_data
+from operations.history import load_sheet_data, clear_sheet_caches
+from operations.history_archive import load_history_data, get_archive_years
 from gdrive.config import ALARM_INVENTORY_SHEET_NAME, ALARM_INSPECTIONS_SHEET_NAME
 from reports.alarm_report import generate_alarm_inspection_html
 from streamlit_js_eval import streamlit_js_eval
@@ -55,19 +56,23 @@ def show_page():
         with st.expander("📄 Gerar Relatório Mensal de Inspeções"):
             df_inspections_full = load_sheet_data(ALARM_INSPECTIONS_SHEET_NAME)
             df_inventory_full = load_sheet_data(ALARM_INVENTORY_SHEET_NAME)
+            archive_years = get_archive_years(ALARM_INSPECTIONS_SHEET_NAME)
             
-            if df_inspections_full.empty:
+            if df_inspections_full.empty and not archive_years:
                 st.info("Nenhuma inspeção de sistema de alarme registrada para gerar relatórios.")
             else:
                 # Converte a coluna de data para o formato datetime
-                df_inspections_full['data_inspecao_dt'] = pd.to_datetime(df_inspections_full['data_inspecao'], errors='coerce')
+                if not df_inspections_full.empty:
+                    df_inspections_full['data_inspecao_dt'] = pd.to_datetime(df_inspections_full['data_inspecao'], errors='coerce')
 
                 # Filtros para mês e ano
                 today = datetime.now()
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    years_with_data = sorted(df_inspections_full['data_inspecao_dt'].dt.year.unique(), reverse=True)
+                    # Anos da aba principal e das abas de arquivo (ver operations.history_archive)
+                    hot_years = df_inspections_full['data_inspecao_dt'].dt.year.dropna().astype(int) if not df_inspections_full.empty else []
+                    years_with_data = sorted(set(hot_years) | set(archive_years), reverse=True)
                     if not years_with_data:
                         years_with_data = [today.year]
                     selected_year = st.selectbox("Selecione o Ano:", years_with_data, key="alarm_report_year")
@@ -81,11 +86,18 @@ def show_page():
                 
                 selected_month_number = months.index(selected_month_name) + 1
 
+                if selected_year in archive_years:
+                    # Ano com registros arquivados: une as abas de arquivo ao histórico recente
+                    df_with_archive = load_history_data(ALARM_INSPECTIONS_SHEET_NAME, since=date(selected_year, 1, 1))
+                    if not df_with_archive.empty:
+                        df_inspections_full = df_with_archive
+                        df_inspections_full['data_inspecao_dt'] = pd.to_datetime(df_inspections_full['data_inspecao'], errors='coerce')
+
                 # Filtra os dados pelo mês e ano selecionados
                 inspections_selected_month = df_inspections_full[
                     (df_inspections_full['data_inspecao_dt'].dt.year == selected_year) &
                     (df_inspections_full['data_inspecao_dt'].dt.month == selected_month_number)
-                ].sort_values(by='data_inspecao_dt')
+                ].sort_values(by='data_inspecao_dt') if not df_inspections_full.empty else df_inspections_full
 
                 if inspections_selected_month.empty:
                     st.info(f"Nenhuma inspeção foi registrada em {selected_month_name} de {selected_year}.")
@@ -203,7 +215,7 @@ def show_page():
                                             st.balloons()
                                             
                                         # Limpa o cache e recarrega a página
-                                        st.cache_data.clear()
+                                        clear_sheet_caches()
                                         st.rerun()
                                     else:
                                         st.error("Ocorreu um erro ao salvar a inspeção.")
@@ -273,7 +285,7 @@ def show_page():
                                     st.info(f"Observações registradas: {additional_info}")
                                     
                                 # Limpa o cache de dados
-                                st.cache_data.clear()
+                                clear_sheet_caches()
 
     # Aba de Cadastro Rápido
     with tab_quick_register:
@@ -327,6 +339,6 @@ def show_page():
                             if save_new_alarm_system(quick_id, quick_location, final_brand, system_type):
                                 st.success(f"Sistema '{quick_id}' cadastrado rapidamente!")
                                 st.balloons()
-                                st.cache_data.clear()
+                                clear_sheet_caches()
                             else:
                                 st.error("Erro ao cadastrar. Verifique se o ID já não existe.")
@@ -15,7 +15,7 @@ from auth.auth_utils import (
     get_user_display_name, check_user_access, can_edit, has_ai_features
 )
 from config.page_config import set_page_config
-from operations.history import load_sheet_data  
+from operations.history import load_sheet_data, clear_sheet_caches
 from gdrive.config import (
     FOAM_CHAMBER_INVENTORY_SHEET_NAME,
     FOAM_CHAMBER_INSPECTIONS_SHEET_NAME  
@@ -156,7 +156,7 @@ def show_page():
                                     ):
                                         st.success(f"Inspeção '{inspection_type}' para a câmara '{selected_chamber_id}' salva com sucesso!")
                                         st.balloons() if not has_issues else None
-                                        st.cache_data.clear()
+                                        clear_sheet_caches()
                                         st.rerun()
                                     else:
                                         st.error("Ocorreu um erro ao salvar a inspeção.")
@@ -208,7 +208,7 @@ def show_page():
                                 st.success(f"Câmara de espuma '{new_id}' ({new_specific_size}) cadastrada com sucesso!")
                                 if additional_info:
                                     st.info(f"Observações registradas: {additional_info}")
-                                st.cache_data.clear()
+                                clear_sheet_caches()
 
     with tab_manual_register:
         st.header("Cadastro Rápido de Câmara")
@@ -263,7 +263,7 @@ def show_page():
                             if save_new_foam_chamber(quick_id, quick_location, final_brand, chamber_type, quick_size):
                                 st.success(f"Câmara '{quick_id}' ({quick_size}) cadastrada rapidamente!")
                                 st.balloons()
-                                st.cache_data.clear()
+                                clear_sheet_caches()
                             else:
                                 st.error("Erro ao cadastrar. Verifique se o ID já não existe.")
 
@@ -289,7 +289,7 @@ def show_page():
         
         with col2:
             if st.button("🔄 Atualizar Dados", use_container_width=True):
-                st.cache_data.clear()
+                clear_sheet_caches()
                 st.rerun()
         
         st.markdown("---")
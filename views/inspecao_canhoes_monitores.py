@@ -7,7 +7,7 @@ from operations.canhao_monitor_operations import (
     CHECKLIST_FUNCIONAL
 )
 from auth.auth_utils import get_user_display_name, can_edit
-from operations.history import load_sheet_data
+from operations.history import load_sheet_data, clear_sheet_caches
 from gdrive.config import CANHAO_MONITOR_INVENTORY_SHEET_NAME
 from operations.instrucoes import instru_canhoes_monitores
 
@@ -120,7 +120,7 @@ def show_page():
                                     if success:
                                         st.success(f"Registro para '{selected_id}' salvo com sucesso!")
                                         if not has_issues: st.balloons()
-                                        st.cache_data.clear()
+                                        clear_sheet_caches()
                                     else:
                                         st.error("Falha ao salvar o registro.")
     
@@ -148,4 +148,4 @@ def show_page():
                         with st.spinner("Cadastrando..."):
                             if save_new_canhao_monitor(new_id, new_location, new_brand, new_model):
                                 st.success(f"Canhão Monitor '{new_id}' cadastrado com sucesso!")
-                                st.cache_data.clear()
+                                clear_sheet_caches()
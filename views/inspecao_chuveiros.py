@@ -15,7 +15,7 @@ from auth.auth_utils import (
     get_user_display_name, check_user_access, can_edit, has_ai_features
 )
 from config.page_config import set_page_config
-from operations.history import load_sheet_data
+from operations.history import load_sheet_data, clear_sheet_caches
 from gdrive.config import EYEWASH_INVENTORY_SHEET_NAME
 from operations.instrucoes import instru_eyewash
 
@@ -99,7 +99,7 @@ def show_page():
                                     if save_eyewash_inspection(selected_equipment_id, overall_status, inspection_results, photo_file, get_user_display_name()):
                                         st.success(f"Inspeção para '{selected_equipment_id}' salva com sucesso!")
                                         st.balloons() if not non_conformities_found else None
-                                        st.cache_data.clear()
+                                        clear_sheet_caches()
                                         st.rerun()
                                     else:
                                         st.error("Ocorreu um erro ao salvar a inspeção.")
@@ -153,7 +153,7 @@ def show_page():
                                 st.success(f"Equipamento '{new_id}' cadastrado com sucesso!")
                                 if additional_notes:
                                     st.info(f"Observações registradas: {additional_notes}")
-                                st.cache_data.clear()
+                                clear_sheet_caches()
 
     # --- NOVA ABA DE CADASTRO RÁPIDO ---
     with tab_quick_register:
@@ -200,6 +200,6 @@ def show_page():
                             if save_new_eyewash_station(quick_id, quick_location, final_brand, model_to_use):
                                 st.success(f"Equipamento '{quick_id}' ({quick_type}) cadastrado rapidamente!")
                                 st.balloons()
-                                st.cache_data.clear()
+                                clear_sheet_caches()
                             else:
                                 st.error("Erro ao cadastrar. Verifique se o ID já não existe.")
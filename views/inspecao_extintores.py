@@ -13,7 +13,7 @@ from operations.extinguisher_operations import (
     generate_action_plan, clean_and_prepare_ia_data, save_new_extinguisher,
     update_extinguisher_location, save_inspection_batch 
 )
-from operations.history import find_last_record, load_sheet_data
+from operations.history import find_last_record, load_sheet_data, clear_sheet_caches, get_shared_sheet_data
 from operations.qr_inspection_utils import decode_qr_from_image
 from operations.photo_operations import upload_evidence_photo
 from operations.location_operations import show_location_selector
@@ -29,12 +29,9 @@ from config.page_config import set_page_config
 
 set_page_config()
 
-@st.cache_data(ttl=300)
 def load_page_data():
-    uploader = GoogleDriveUploader()
-    ext_data = uploader.get_data_from_sheet(EXTINGUISHER_SHEET_NAME)
-    df_ext = pd.DataFrame(ext_data[1:], columns=ext_data[0]) if ext_data and len(ext_data) > 1 else pd.DataFrame()
-    return df_ext
+    """Inventário de extintores do tenant atual, compartilhado entre sessões (somente leitura)."""
+    return get_shared_sheet_data(EXTINGUISHER_SHEET_NAME)
 
 def show_upgrade_callout(feature_name="Esta funcionalidade", required_plan="Premium IA"):
     st.info(f"✨ **{feature_name}** está disponível no plano **{required_plan}**. Faça o upgrade para automatizar seu trabalho!", icon="🚀")
@@ -183,7 +180,7 @@ def show_page():
                             st.balloons()
                             st.session_state.batch_step = 'start'
                             st.session_state.processed_data = None
-                            st.cache_data.clear()
+                            clear_sheet_caches()
                             st.rerun()
                         else:
                             st.error("❌ Erro ao salvar registros. Verifique os logs.")
@@ -559,7 +556,7 @@ def show_page():
                                     # Reset para próxima inspeção
                                     st.session_state.qr_step = 'start'
                                     st.session_state.location = None
-                                    st.cache_data.clear()
+                                    clear_sheet_caches()
                                     st.rerun()
                                 else:
                                     st.error("❌ Erro ao salvar inspeção. Tente novamente.")
@@ -606,7 +603,7 @@ def show_page():
                                 uploader = GoogleDriveUploader()
                                 uploader.append_data_to_sheet(EXTINGUISHER_SHEET_NAME, [new_row])
                                 log_action("CADASTROU_EXTINTOR", f"ID: {numero_id}")
-                                st.success(f"Extintor '{numero_id}' cadastrado com sucesso!"); st.cache_data.clear(); st.rerun()
+                                st.success(f"Extintor '{numero_id}' cadastrado com sucesso!"); clear_sheet_caches(); st.rerun()
                             except Exception as e: st.error(f"Erro ao salvar: {e}")
 
             st.markdown("---")
@@ -630,7 +627,7 @@ def show_page():
                                     uploader = GoogleDriveUploader()
                                     uploader.update_cells(EXTINGUISHER_SHEET_NAME, range_to_update, values_to_update)
                                     log_action("ATUALIZOU_EXTINTOR", f"ID: {ext_id_to_edit}")
-                                    st.success(f"Extintor '{ext_id_to_edit}' atualizado com sucesso!"); st.cache_data.clear(); st.rerun()
+                                    st.success(f"Extintor '{ext_id_to_edit}' atualizado com sucesso!"); clear_sheet_caches(); st.rerun()
                                 except Exception as e: st.error(f"Erro ao atualizar: {e}")
 
     # Nova aba para cadastro manual de inspeções
@@ -881,7 +878,7 @@ def show_page():
                                     st.session_state['manual_lat_captured'] = None
                                     st.session_state['manual_lon_captured'] = None
                                     
-                                    st.cache_data.clear()
+                                    clear_sheet_caches()
                                     st.rerun()
                             except Exception as e:
                                 st.error(f"❌ Erro ao salvar a inspeção: {e}")
@@ -13,21 +13,20 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from operations.shelter_operations import save_shelter_inventory, save_shelter_inspection
 from operations.hose_operations import save_new_hose
 from gdrive.gdrive_upload import GoogleDriveUploader
-from AI.api_Operation import PDFQA
-from gdrive.config import SHELTER_SHEET_NAME, HOSE_SHEET_NAME, AUDIT_LOG_SHEET_NAME
-from operations.history import load_sheet_data 
+from AI.client import pdf_qa
+from gdrive.config import SHELTER_SHEET_NAME, HOSE_SHEET_NAME
+from operations.history import load_sheet_data, clear_sheet_caches
 from utils.prompts import get_hose_inspection_prompt, get_shelter_inventory_prompt
 from auth.auth_utils import (
     get_user_display_name, get_user_email, get_user_role,
     check_user_access, can_edit, has_ai_features
 )
-from utils.auditoria import get_sao_paulo_time_str, log_action
+from utils.auditoria import get_sao_paulo_time_str, log_action, log_audit_rows
 from config.page_config import set_page_config
 from operations.instrucoes import instru_mangueiras
 
 
 set_page_config()
-pdf_qa = PDFQA()
 
 def show_page():
     st.title("💧 Gestão de Mangueiras e Abrigos de Incêndio")
@@ -148,8 +147,7 @@ def show_page():
 
                         try:
                             uploader.append_data_to_sheet(HOSE_SHEET_NAME, hose_rows)
-                            matrix_uploader = GoogleDriveUploader(is_matrix=True)
-                            matrix_uploader.append_data_to_sheet(AUDIT_LOG_SHEET_NAME, audit_log_rows)
+                            log_audit_rows(audit_log_rows)
 
                             st.success(f"{len(hose_rows)} registros de mangueiras salvos com sucesso!")
                             st.balloons()
@@ -157,7 +155,7 @@ def show_page():
                             st.session_state.hose_step = 'start'
                             st.session_state.hose_processed_data = None
                             st.session_state.hose_uploaded_pdf = None
-                            st.cache_data.clear()
+                            clear_sheet_caches()
                             st.rerun()
                         except Exception as e:
                             st.error(f"Ocorreu um erro durante o salvamento em lote: {e}")
@@ -223,7 +221,7 @@ def show_page():
                         
                         if save_new_hose(hose_data):
                             st.success(f"Mangueira '{hose_id}' cadastrada com sucesso!")
-                            st.cache_data.clear()
+                            clear_sheet_caches()
                             st.balloons()
 
     with tab_shelters:
@@ -310,8 +308,7 @@ def show_page():
                             uploader.append_data_to_sheet(SHELTER_SHEET_NAME, shelter_rows)
                             
                             # Salva logs de auditoria de uma vez
-                            matrix_uploader = GoogleDriveUploader(is_matrix=True)
-                            matrix_uploader.append_data_to_sheet(AUDIT_LOG_SHEET_NAME, audit_log_rows)
+                            log_audit_rows(audit_log_rows)
                             
                             total_count = len(st.session_state.shelter_processed_data)
                             st.success(f"✅ {total_count} abrigo(s) salvo(s) com sucesso em lote!")
@@ -321,7 +318,7 @@ def show_page():
                             st.session_state.shelter_step = 'start'
                             st.session_state.shelter_processed_data = None
                             st.session_state.shelter_uploaded_pdf = None
-                            st.cache_data.clear()
+                            clear_sheet_caches()
                             st.rerun()
                             
                         except Exception as e:
@@ -339,8 +336,7 @@ def show_page():
                                     f"Erro: {str(e)[:200]}",
                                     st.session_state.get('current_unit_name', 'N/A')
                                 ]
-                                matrix_uploader = GoogleDriveUploader(is_matrix=True)
-                                matrix_uploader.append_data_to_sheet(AUDIT_LOG_SHEET_NAME, [error_log_row])
+                                log_audit_rows([error_log_row])
                             except:
                                 pass  # Falha silenciosa no log de erro
 
@@ -416,7 +412,7 @@ def show_page():
                             # Salvar o abrigo no sistema
                             if save_shelter_inventory(shelter_id, client, local, inventory_items):
                                 st.success(f"Abrigo '{shelter_id}' cadastrado com sucesso!")
-                                st.cache_data.clear()
+                                clear_sheet_caches()
                                 st.balloons()
             
             # Inspeção de Abrigos
@@ -482,7 +478,7 @@ def show_page():
                                 if save_shelter_inspection(selected_shelter_id, overall_status, inspection_results, get_user_display_name()):
                                     st.success(f"Inspeção do abrigo '{selected_shelter_id}' salva com sucesso como '{overall_status}'!")
                                     st.balloons() if not has_issues else None
-                                    st.cache_data.clear()
+                                    clear_sheet_caches()
                                 else:
                                     st.error("Ocorreu um erro ao salvar a inspeção.")
 
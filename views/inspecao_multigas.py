@@ -9,7 +9,8 @@ import numpy as np
 
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from operations.history import load_sheet_data
+from operations.history import load_sheet_data, clear_sheet_caches
+from operations.history_archive import load_history_data, get_archive_years
 from operations.multigas_operations import (
     save_new_multigas_detector, 
     save_multigas_inspection, 
@@ -142,7 +143,7 @@ def show_page():
                             st.session_state.calib_data = None
                             st.session_state.calib_status = None
                             st.session_state.calib_uploaded_pdf = None
-                            st.cache_data.clear()
+                            clear_sheet_caches()
                             st.rerun()
 
     with tab_inspection:
@@ -156,12 +157,14 @@ def show_page():
             with st.expander("📄 Gerar Relatório Mensal de Bump Tests"):
                 df_inspections_full = load_sheet_data(MULTIGAS_INSPECTIONS_SHEET_NAME)
                 df_inventory_full = load_sheet_data(MULTIGAS_INVENTORY_SHEET_NAME)
+                archive_years = get_archive_years(MULTIGAS_INSPECTIONS_SHEET_NAME)
                 
-                if df_inspections_full.empty:
+                if df_inspections_full.empty and not archive_years:
                     st.info("Nenhum teste de resposta registrado no sistema para gerar relatórios.")
                 else:
                     # Converte a coluna de data para o formato datetime para permitir a filtragem
-                    df_inspections_full['data_teste_dt'] = pd.to_datetime(df_inspections_full['data_teste'], errors='coerce')
+                    if not df_inspections_full.empty:
+                        df_inspections_full['data_teste_dt'] = pd.to_datetime(df_inspections_full['data_teste'], errors='coerce')
 
                     # Filtros para mês e ano
                     now_str = get_sao_paulo_time_str()
@@ -169,7 +172,9 @@ def show_page():
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        years_with_data = sorted(df_inspections_full['data_teste_dt'].dt.year.unique(), reverse=True)
+                        # Anos da aba principal e das abas de arquivo (ver operations.history_archive)
+                        hot_years = df_inspections_full['data_teste_dt'].dt.year.dropna().astype(int) if not df_inspections_full.empty else []
+                        years_with_data = sorted(set(hot_years) | set(archive_years), reverse=True)
                         if not years_with_data:
                             years_with_data = [today_sao_paulo.year]
                         selected_year = st.selectbox("Selecione o Ano:", years_with_data, key="multigas_report_year")
@@ -182,12 +187,19 @@ def show_page():
                     
                     selected_month_number = months.index(selected_month_name) + 1
 
+                    if selected_year in archive_years:
+                        # Ano com registros arquivados: une as abas de arquivo ao histórico recente
+                        df_with_archive = load_history_data(MULTIGAS_INSPECTIONS_SHEET_NAME, since=date(selected_year, 1, 1))
+                        if not df_with_archive.empty:
+                            df_inspections_full = df_with_archive
+                            df_inspections_full['data_teste_dt'] = pd.to_datetime(df_inspections_full['data_teste'], errors='coerce')
+
                     # Filtra os dados pelo mês e ano selecionados
                     tests_selected_month = df_inspections_full[
                         (df_inspections_full['data_teste_dt'].dt.year == selected_year) &
                         (df_inspections_full['data_teste_dt'].dt.month == selected_month_number) &
                         (df_inspections_full['tipo_teste'] != 'Calibração Anual')
-                    ].sort_values(by='data_teste_dt')
+                    ].sort_values(by='data_teste_dt') if not df_inspections_full.empty else df_inspections_full
 
                     if tests_selected_month.empty:
                         st.info(f"Nenhum teste de resposta foi registrado em {selected_month_name} de {selected_year}.")
@@ -323,7 +335,7 @@ def show_page():
                             with st.spinner("Salvando o registro..."):
                                 if save_multigas_inspection(inspection_data):
                                     st.success(f"Teste para o detector '{selected_id}' salvo com sucesso!")
-                                    st.cache_data.clear()
+                                    clear_sheet_caches()
                                     # Limpa as chaves para resetar o toggle e os inputs
                                     keys_to_clear = ['new_lel', 'new_o2', 'new_h2s', 'new_co']
                                     for key in keys_to_clear:
@@ -375,7 +387,7 @@ def show_page():
                         if save_new_multigas_detector(detector_id, brand, model, serial_number, cylinder_values):
                             st.success(f"Detector '{detector_id}' cadastrado com sucesso!")
                             st.balloons()
-                            st.cache_data.clear()
+                            clear_sheet_caches()
 
     # Nova aba para cadastro manual simplificado
     with tab_manual_register:
@@ -415,4 +427,4 @@ def show_page():
                         
                         if save_new_multigas_detector(simple_id, simple_brand, simple_model, simple_serial, default_cylinder):
                             st.success(f"Detector '{simple_id}' cadastrado com sucesso com valores padrão de cilindro!")
-                            st.cache_data.clear()
+                            clear_sheet_caches()
@@ -1,4 +1,5 @@
 import streamlit as st
+import io
 import sys
 import os
 from datetime import date, timedelta
@@ -8,20 +9,26 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from operations.scba_operations import save_scba_inspection, save_scba_visual_inspection
 from gdrive.gdrive_upload import GoogleDriveUploader
-from AI.api_Operation import PDFQA
+from AI.client import pdf_qa
 from utils.prompts import get_scba_inspection_prompt, get_air_quality_prompt 
 from auth.auth_utils import (
     get_user_display_name, check_user_access, can_edit, has_ai_features
 )
 from config.page_config import set_page_config
-from operations.history import load_sheet_data
+from operations.history import load_sheet_data, clear_sheet_caches
 from gdrive.config import SCBA_SHEET_NAME, SCBA_VISUAL_INSPECTIONS_SHEET_NAME
 from utils.auditoria import log_action
 from operations.instrucoes import instru_scba
 
 
 set_page_config()
-pdf_qa = PDFQA()
+
+
+def _snapshot_pdf(pdf_file):
+    """Cópia do PDF enviado (nome, tipo e bytes) que não muda se o upload for trocado depois."""
+    snapshot = io.BytesIO(pdf_file.getvalue())
+    snapshot.name, snapshot.type = pdf_file.name, pdf_file.type
+    return snapshot
 
 def save_manual_scba(scba_data):
     """
@@ -151,55 +158,74 @@ def show_page():
             else:
                 st.session_state.setdefault('scba_step', 'start')
                 st.session_state.setdefault('scba_processed_data', None)
-                st.session_state.setdefault('scba_uploaded_pdf', None)
+                st.session_state.setdefault('scba_uploaded_pdfs', [])
+                st.session_state.setdefault('scba_analyzed_pdfs', [])
                 
-                st.subheader("1. Faça o Upload do Relatório de Teste Posi3")
-                st.info("O sistema analisará o PDF, extrairá os dados de todos os equipamentos listados e preparará os registros para salvamento.")
+                st.subheader("1. Faça o Upload dos Relatórios de Teste Posi3")
+                st.info("O sistema analisará os PDFs, extrairá os dados de todos os equipamentos listados e preparará os registros para salvamento. Vários relatórios são analisados em paralelo.")
                 
-                uploaded_pdf = st.file_uploader("Escolha o relatório PDF", type=["pdf"], key="scba_pdf_uploader")
-                if uploaded_pdf:
-                    st.session_state.scba_uploaded_pdf = uploaded_pdf
+                uploaded_pdfs = st.file_uploader("Escolha os relatórios PDF", type=["pdf"], key="scba_pdf_uploader", accept_multiple_files=True)
+                if uploaded_pdfs:
+                    st.session_state.scba_uploaded_pdfs = uploaded_pdfs
                 
-                if st.session_state.scba_uploaded_pdf and st.button("🔎 Analisar Relatório com IA"):
-                    with st.spinner("Analisando o documento com IA..."):
-                        prompt = get_scba_inspection_prompt()
-                        extracted_data = pdf_qa.extract_structured_data(st.session_state.scba_uploaded_pdf, prompt)
-                        
-                        if extracted_data and "scbas" in extracted_data and isinstance(extracted_data["scbas"], list):
-                            st.session_state.scba_processed_data = extracted_data["scbas"]
-                            st.session_state.scba_step = 'confirm'
-                            st.rerun()
+                if st.session_state.scba_uploaded_pdfs and st.button("🔎 Analisar Relatórios com IA"):
+                    # Os registros apontam para estes arquivos pelo índice: a cópia fica junto com eles
+                    # na sessão, pois scba_uploaded_pdfs muda se o upload for alterado na confirmação
+                    pdf_files = [_snapshot_pdf(pdf_file) for pdf_file in st.session_state.scba_uploaded_pdfs]
+                    prompt = get_scba_inspection_prompt()
+                    progress_bar = st.progress(0, f"Analisando {len(pdf_files)} relatório(s) com IA...")
+                    records, failures = [], []
+                    for done, (index, pdf_file, extracted_data, error) in enumerate(
+                        pdf_qa.extract_structured_data_batch(pdf_files, prompt), start=1
+                    ):
+                        progress_bar.progress(done / len(pdf_files), f"'{pdf_file.name}' concluído ({done}/{len(pdf_files)})")
+                        if extracted_data and isinstance(extracted_data.get("scbas"), list):
+                            # Cada registro guarda de qual arquivo veio, para receber o link do PDF certo
+                            records.extend(dict(record, _arquivo=index) for record in extracted_data["scbas"])
                         else:
-                            st.error("A IA não conseguiu extrair os dados no formato esperado. Verifique o documento.")
-                            st.json(extracted_data)
+                            failures.append((pdf_file.name, error or "formato inesperado"))
+                    
+                    for file_name, error in failures:
+                        st.error(f"A IA não conseguiu extrair os dados de '{file_name}': {error}")
+                    if records:
+                        st.session_state.scba_processed_data = sorted(records, key=lambda record: record['_arquivo'])
+                        st.session_state.scba_analyzed_pdfs = pdf_files
+                        st.session_state.scba_step = 'confirm'
+                        if not failures:
+                            st.rerun()
                 
                 if st.session_state.scba_step == 'confirm' and st.session_state.scba_processed_data:
                     st.subheader("2. Confira os Dados Extraídos e Salve no Sistema")
-                    st.dataframe(pd.DataFrame(st.session_state.scba_processed_data))
+                    pdf_files = st.session_state.scba_analyzed_pdfs
+                    df_preview = pd.DataFrame(st.session_state.scba_processed_data)
+                    df_preview['_arquivo'] = df_preview['_arquivo'].map(lambda i: pdf_files[i].name)
+                    st.dataframe(df_preview.rename(columns={'_arquivo': 'arquivo'}))
                     
                     if st.button("💾 Confirmar e Salvar Registros", type="primary", use_container_width=True):
                         with st.spinner("Salvando registros..."):
                             uploader = GoogleDriveUploader()
-                            pdf_name = f"Relatorio_SCBA_{date.today().isoformat()}_{st.session_state.scba_uploaded_pdf.name}"
-                            pdf_link = uploader.upload_file(st.session_state.scba_uploaded_pdf, novo_nome=pdf_name)
-                            
-                            if not pdf_link:
-                                st.error("Falha ao fazer o upload do relatório. Os dados não foram salvos.")
-                                st.stop()
+                            pdf_links = {}
+                            for index in sorted({record['_arquivo'] for record in st.session_state.scba_processed_data}):
+                                pdf_name = f"Relatorio_SCBA_{date.today().isoformat()}_{pdf_files[index].name}"
+                                pdf_links[index] = uploader.upload_file(pdf_files[index], novo_nome=pdf_name)
+                                if not pdf_links[index]:
+                                    st.error(f"Falha ao fazer o upload de '{pdf_files[index].name}'. Os dados não foram salvos.")
+                                    st.stop()
                             
                             total_count = len(st.session_state.scba_processed_data)
                             progress_bar = st.progress(0, "Salvando...")
                             
                             for i, record in enumerate(st.session_state.scba_processed_data):
-                                save_scba_inspection(record=record, pdf_link=pdf_link, user_name=get_user_display_name())
+                                save_scba_inspection(record=record, pdf_link=pdf_links[record['_arquivo']], user_name=get_user_display_name())
                                 progress_bar.progress((i + 1) / total_count)
                             
                             st.success(f"{total_count} registros de SCBA salvos com sucesso!")
                             
                             st.session_state.scba_step = 'start'
                             st.session_state.scba_processed_data = None
-                            st.session_state.scba_uploaded_pdf = None
-                            st.cache_data.clear()
+                            st.session_state.scba_uploaded_pdfs = []
+                            st.session_state.scba_analyzed_pdfs = []
+                            clear_sheet_caches()
                             st.rerun()
 
     # Nova aba para cadastro manual de teste SCBA
@@ -278,7 +304,7 @@ def show_page():
                         if save_scba_inspection(record=record, pdf_link=None, user_name=get_user_display_name()):
                             st.success(f"Teste para o SCBA '{numero_serie}' registrado com sucesso!")
                             st.balloons()
-                            st.cache_data.clear()
+                            clear_sheet_caches()
 
     with tab_quality_air:
         st.header("Registrar Laudo de Qualidade do Ar com IA")
@@ -349,7 +375,7 @@ def show_page():
                                     st.session_state.airq_step = 'start'
                                     st.session_state.airq_processed_data = None
                                     st.session_state.airq_uploaded_pdf = None
-                                    st.cache_data.clear()
+                                    clear_sheet_caches()
                                     st.rerun()
                             else:
                                 st.error("Falha no upload do PDF para o Google Drive. Nenhum dado foi salvo.")
@@ -395,7 +421,7 @@ def show_page():
                             cilindros_count = len([c.strip() for c in cilindros_text.split(',') if c.strip()])
                             st.success(f"Laudo de qualidade do ar registrado com sucesso para {cilindros_count} cilindro(s)!")
                             st.balloons()
-                            st.cache_data.clear()
+                            clear_sheet_caches()
 
     with tab_visual_insp:
         st.header("Realizar Inspeção Periódica de SCBA")
@@ -493,7 +519,7 @@ def show_page():
                             with st.spinner("Salvando inspeção..."):
                                 if save_scba_visual_inspection(selected_scba_id, overall_status, results, get_user_display_name()):
                                     st.success(f"Inspeção periódica para o SCBA '{selected_scba_id}' salva com sucesso!")
-                                    st.cache_data.clear()
+                                    clear_sheet_caches()
                                 else:
                                     st.error("Ocorreu um erro ao salvar a inspeção.")
 
@@ -549,4 +575,4 @@ def show_page():
                         
                         if save_manual_scba(scba_data):
                             st.success(f"SCBA com número de série '{numero_serie}' cadastrado com sucesso!")
-                            st.cache_data.clear()
+                            clear_sheet_caches()
@@ -0,0 +1,49 @@
+import streamlit as st
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def render_lazy_tabs(tabs, key, badge_fn=None, prefetch_fn=None):
+    """
+    Navegação por abas que executa apenas a aba selecionada.
+
+    Diferente de st.tabs (que executa o conteúdo de todas as abas a cada rerun),
+    aqui só a aba visível carrega e calcula seus dados, na primeira vez em que é
+    selecionada. Só a aba vista anteriormente é pré-carregada em segundo plano por
+    `prefetch_fn` (que não deve bloquear), para a volta a ela ser imediata sem gastar a
+    cota de leituras com abas que o usuário não abre. As badges usam apenas dados já
+    carregados.
+
+    Args:
+        tabs (dict): chave -> (rótulo, função que renderiza a aba)
+        key (str): Chave do seletor no session_state
+        badge_fn (callable, optional): chave -> texto curto exibido ao lado do rótulo, ou None
+        prefetch_fn (callable, optional): chave -> agenda a leitura dos dados da aba anterior em segundo plano
+    """
+    def format_tab(tab_key):
+        label = tabs[tab_key][0]
+        badge = badge_fn(tab_key) if badge_fn else None
+        return f"{label} ({badge})" if badge else label
+
+    selected = st.radio(
+        "Seção", list(tabs.keys()), format_func=format_tab,
+        horizontal=True, key=key, label_visibility="collapsed"
+    )
+
+    # Aba vista antes da atual: a única pré-carregada, para a volta a ela ser imediata
+    last_key, previous_key = f"{key}_last", f"{key}_previous"
+    if st.session_state.get(last_key) != selected:
+        st.session_state[previous_key] = st.session_state.get(last_key)
+        st.session_state[last_key] = selected
+    previous = st.session_state.get(previous_key)
+
+    if prefetch_fn and previous in tabs and previous != selected:
+        try:
+            prefetch_fn(previous)
+        except Exception as e:
+            # O pré-carregamento é apenas uma otimização: falhas não devem afetar a página
+            logger.warning(f"Falha ao agendar o pré-carregamento da aba '{previous}': {e}")
+
+    st.markdown("---")
+    tabs[selected][1]()
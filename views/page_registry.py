@@ -0,0 +1,80 @@
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Módulos de página já importados neste processo (compartilhados entre sessões)
+_loaded_pages = {}
+_lock = threading.Lock()
+
+
+try:
+    import resource  # Só existe em sistemas Unix
+except ImportError:
+    resource = None
+
+
+def _max_rss_mb():
+    """
+    Pico de memória residente do processo, em MB (ru_maxrss é em KB no Linux e em bytes no
+    macOS), ou None onde o módulo resource não existe (Windows).
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def is_page_available(module_path):
+    """Verifica se o módulo de página existe sem importá-lo."""
+    try:
+        return importlib.util.find_spec(module_path) is not None
+    except ImportError:
+        return False
+
+
+def load_page_module(module_path):
+    """
+    Importa o módulo de página na primeira navegação e o reutiliza depois.
+    O tempo de import e o crescimento de memória são registrados no log,
+    permitindo medir o custo de cada página por worker.
+    """
+    module = _loaded_pages.get(module_path)
+    if module is not None:
+        return module
+
+    with _lock:
+        module = _loaded_pages.get(module_path)
+        if module is None:
+            rss_before = _max_rss_mb()
+            start = time.perf_counter()
+            module = importlib.import_module(module_path)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            rss_info = f" (pico de RSS: {rss_before:.0f} -> {_max_rss_mb():.0f} MB)" if rss_before is not None else ""
+            logger.info(f"Página '{module_path}' carregada em {elapsed_ms:.0f} ms{rss_info}")
+            _loaded_pages[module_path] = module
+    return module
+
+
+class LazyPage:
+    """Referência a `show_page` de um módulo de página, resolvida apenas quando chamada."""
+
+    def __init__(self, module_path, attribute="show_page"):
+        self.module_path = module_path
+        self.attribute = attribute
+
+    def __call__(self, *args, **kwargs):
+        page_fn = getattr(load_page_module(self.module_path), self.attribute)
+        return page_fn(*args, **kwargs)
+
+    def __repr__(self):
+        return f"LazyPage({self.module_path!r})"
+
+
+def build_pages(page_paths):
+    """Converte um dict nome -> caminho de import em nome -> LazyPage."""
+    return {name: LazyPage(path) for name, path in page_paths.items()}
@@ -0,0 +1,136 @@
+import streamlit as st
+
+# Opções de itens por página nas listas de equipamentos
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+
+
+def filter_status_frame(df, search_text="", search_columns=None, status_column=None, statuses=None,
+                        sort_column=None, ascending=True):
+    """
+    Aplica busca, filtro de status e ordenação sobre um DataFrame de status
+    usando apenas operações vetorizadas (nada é enviado ao navegador aqui).
+
+    Args:
+        df (pd.DataFrame): DataFrame de status do dashboard
+        search_text (str): Texto livre buscado (sem diferenciar maiúsculas) nas colunas de busca
+        search_columns (list): Colunas consideradas na busca
+        status_column (str): Coluna usada no filtro de status
+        statuses (list): Status selecionados (None = todos)
+        sort_column (str): Coluna de ordenação
+        ascending (bool): Ordem crescente ou decrescente
+
+    Returns:
+        pd.DataFrame: Subconjunto filtrado e ordenado
+    """
+    result = df
+
+    if status_column and statuses is not None and status_column in result.columns:
+        result = result[result[status_column].isin(statuses)]
+
+    search_text = (search_text or "").strip()
+    columns = [col for col in (search_columns or []) if col in result.columns]
+    if search_text and columns and not result.empty:
+        haystack = result[columns[0]].astype(str)
+        for col in columns[1:]:
+            haystack = haystack + " " + result[col].astype(str)
+        result = result[haystack.str.contains(search_text, case=False, regex=False, na=False)]
+
+    if sort_column and sort_column in result.columns:
+        result = result.sort_values(sort_column, ascending=ascending, kind='stable', na_position='last')
+
+    return result
+
+
+def _set_page(page_key, page):
+    st.session_state[page_key] = page
+
+
+def _toggle_item(expanded_key, item_id):
+    st.session_state[expanded_key] = None if st.session_state.get(expanded_key) == item_id else item_id
+
+
+def render_paginated_list(df, key, title_fn, detail_fn, search_columns, status_column=None,
+                          sort_options=None, page_size=25, search_placeholder="ID, local..."):
+    """
+    Lista paginada de equipamentos. Apenas os itens da página atual são enviados
+    ao navegador e somente o item aberto renderiza seus detalhes, de modo que o
+    custo de cada rerun não cresce com o tamanho do inventário.
+
+    Args:
+        df (pd.DataFrame): DataFrame de status (o índice identifica cada item)
+        key (str): Prefixo único dos widgets desta lista
+        title_fn (callable): row -> texto (markdown) do resumo do item
+        detail_fn (callable): (item_id, row) -> renderiza os detalhes do item aberto
+        search_columns (list): Colunas usadas na busca livre
+        status_column (str, optional): Coluna para o filtro de status
+        sort_options (dict, optional): rótulo -> (coluna, crescente)
+        page_size (int): Itens por página padrão
+
+    Returns:
+        pd.DataFrame: DataFrame filtrado (todas as páginas)
+    """
+    if df.empty:
+        st.info("Nenhum equipamento para exibir.")
+        return df
+
+    page_key = f"{key}_page"
+    expanded_key = f"{key}_expanded"
+    signature_key = f"{key}_signature"
+
+    col_search, col_status, col_sort, col_size = st.columns([3, 3, 2, 1])
+    search_text = col_search.text_input("🔎 Buscar", key=f"{key}_search", placeholder=search_placeholder)
+
+    statuses = None
+    if status_column and status_column in df.columns:
+        status_options = sorted(df[status_column].dropna().astype(str).unique())
+        statuses = col_status.multiselect("Filtrar por Status:", options=status_options, default=status_options, key=f"{key}_status")
+
+    sort_label = None
+    sort_column, ascending = None, True
+    if sort_options:
+        sort_label = col_sort.selectbox("Ordenar por:", list(sort_options.keys()), key=f"{key}_sort")
+        sort_column, ascending = sort_options[sort_label]
+
+    default_size_index = PAGE_SIZE_OPTIONS.index(page_size) if page_size in PAGE_SIZE_OPTIONS else 1
+    page_size = col_size.selectbox("Por página", PAGE_SIZE_OPTIONS, index=default_size_index, key=f"{key}_page_size")
+
+    filtered_df = filter_status_frame(df, search_text, search_columns, status_column, statuses, sort_column, ascending)
+
+    # Volta para a primeira página sempre que a busca/filtro/ordenação mudar
+    signature = (search_text, tuple(statuses or ()), sort_label, page_size)
+    if st.session_state.get(signature_key) != signature:
+        st.session_state[signature_key] = signature
+        st.session_state[page_key] = 0
+
+    total_items = len(filtered_df)
+    if total_items == 0:
+        st.info("Nenhum item corresponde ao filtro selecionado.")
+        return filtered_df
+
+    total_pages = (total_items - 1) // page_size + 1
+    page = min(st.session_state.get(page_key, 0), total_pages - 1)
+    start = page * page_size
+    page_df = filtered_df.iloc[start:start + page_size]
+
+    for item_id, row in page_df.iterrows():
+        is_open = st.session_state.get(expanded_key) == item_id
+        with st.container(border=True):
+            col_title, col_button = st.columns([6, 1])
+            col_title.markdown(title_fn(row))
+            col_button.button(
+                "▲ Fechar" if is_open else "▼ Detalhes",
+                key=f"{key}_toggle_{item_id}",
+                on_click=_toggle_item, args=(expanded_key, item_id),
+                use_container_width=True
+            )
+            if is_open:
+                detail_fn(item_id, row)
+
+    col_prev, col_info, col_next = st.columns([1, 3, 1])
+    col_prev.button("◀ Anterior", key=f"{key}_prev", disabled=page == 0,
+                    on_click=_set_page, args=(page_key, page - 1), use_container_width=True)
+    col_info.caption(f"Página {page + 1} de {total_pages} · {start + 1}–{start + len(page_df)} de {total_items} itens")
+    col_next.button("Próxima ▶", key=f"{key}_next", disabled=page >= total_pages - 1,
+                    on_click=_set_page, args=(page_key, page + 1), use_container_width=True)
+
+    return filtered_df
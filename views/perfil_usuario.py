@@ -23,6 +23,7 @@ from utils.webhook_handler import (
     simulate_payment_webhook, set_payment_success_message, 
     get_payment_success_message, clear_payment_success_message
 )
+from operations.history import clear_sheet_caches
 
 set_page_config()
 
@@ -313,7 +314,7 @@ def show_page():
         st.success("🎉 **Pagamento realizado com sucesso!** Seu plano foi ativado.")
         #st.balloons()
         clear_payment_success_message()
-        st.cache_data.clear()
+        clear_sheet_caches()
 
     # Interface principal com tabs
     tab_profile, tab_plan_and_payment, tab_support = st.tabs([
@@ -411,7 +412,7 @@ def show_page():
                     with st.spinner("💾 Salvando alterações..."):
                         if update_user_profile(user_email, updated_data):
                             st.success("✅ Perfil atualizado com sucesso!")
-                            st.cache_data.clear()
+                            clear_sheet_caches()
                             st.rerun()
                         else:
                             st.error("❌ Erro ao atualizar perfil. Tente novamente.")
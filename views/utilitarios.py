@@ -3,7 +3,6 @@ import pandas as pd
 from datetime import date
 import io
 import zipfile
-import qrcode
 from PIL import Image
 
 import sys
@@ -24,6 +23,8 @@ from reports.shipment_report import (
 from config.page_config import set_page_config 
 from gdrive.gdrive_upload import GoogleDriveUploader
 from utils.auditoria import log_action
+from operations.disposal_index import get_disposed_index
+from operations.history import clear_sheet_caches
 
 set_page_config()
 
@@ -44,6 +45,7 @@ def load_all_data():
     }
 
 def generate_qr_code_image(data):
+    import qrcode
     qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4)
     qr.add_data(data); qr.make(fit=True)
     return qr.make_image(fill_color="black", back_color="white")
@@ -196,6 +198,8 @@ def show_page():
                 st.warning(f"Nenhum registro de {item_type.lower()} encontrado.")
             else:
                 df_latest = df_all.sort_values(by=df_all.columns[0], ascending=False).drop_duplicates(subset=[id_col], keep='first')
+                # Equipamentos baixados não podem ser enviados para manutenção/TH
+                df_latest = get_disposed_index().exclude(df_latest, 'extintores' if item_type == 'Extintores' else 'mangueiras', id_col)
                 options = df_latest[id_col].tolist()
                 selected_ids = st.multiselect(f"Selecione os IDs:", options, default=st.session_state.get('suggested_ids', []))
 
@@ -213,7 +217,7 @@ def show_page():
                                 pdf_bytes = generate_shipment_html_and_pdf(df_selected, item_type, remetente, destinatario, bulletin_number)
                                 log_shipment(df_selected, item_type, bulletin_number)
                                 st.session_state['pdf_generated_info'] = {"data": pdf_bytes, "file_name": f"Boletim_{bulletin_number}.pdf"}
-                                st.cache_data.clear(); st.rerun()
+                                clear_sheet_caches(); st.rerun()
 
                 if st.session_state.get('pdf_generated_info'):
                     pdf_info = st.session_state['pdf_generated_info']